@@ -16,7 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from core.session_manager import SessionManager
 from core.prompt_compiler import load_workflow, compile_workflow
-from core.comfy_client import submit, wait_for_prompt_completion, get_output_file_path
+from core.comfy_client import submit, wait_for_prompt_completion, fetch_output
 from core.video_regenerator import generate_unique_video_filename
 import config
 
@@ -224,35 +224,12 @@ def generate_videos_from_images(shots, output_dir, video_length=5, session_id=No
             video_outputs = [o for o in outputs if o['type'] == 'video']
 
             if video_outputs:
-                import shutil
-                import time
-
+                # Stream the video from ComfyUI's /view endpoint
                 video_info = video_outputs[0]
-                source_path = get_output_file_path(video_info)
-
-                # Wait for file to be written to disk
-                max_retries = 10
-                retry_delay = 2
-                file_found = False
-
-                for attempt in range(max_retries):
-                    if os.path.exists(source_path):
-                        initial_size = os.path.getsize(source_path)
-                        time.sleep(1)
-                        final_size = os.path.getsize(source_path)
-
-                        if initial_size == final_size and final_size > 0:
-                            file_found = True
-                            break
-                        else:
-                            if attempt < max_retries - 1:
-                                print(f"[WAIT] File still writing... (retry {attempt + 1}/{max_retries})")
-                                time.sleep(retry_delay)
-
-                if file_found:
-                    shutil.copy2(source_path, video_save_path)
-                    file_size = os.path.getsize(video_save_path)
-                    print(f"[PASS] Video saved: {video_filename} ({file_size:,} bytes)")
+                fetch = fetch_output(video_info, video_save_path)
+
+                if fetch['success']:
+                    print(f"[PASS] Video saved: {video_filename} ({fetch['size']:,} bytes, {fetch['method']})")
 
                     # Update session if provided
                     if session_mgr and session_id:
@@ -260,7 +237,7 @@ def generate_videos_from_images(shots, output_dir, video_length=5, session_id=No
 
                     success_count += 1
                 else:
-                    error = "Source video not found after retries"
+                    error = f"Video fetch failed: {fetch['error']}"
                     print(f"[FAIL] {error}")
                     errors.append(f"Shot {shot_idx}: {error}")
                     failed_count += 1
@@ -17,9 +17,23 @@ LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
 # Set higher to avoid truncation when generating many shots
 LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "16384"))  # Default: 16K tokens
 
+# Create the provider client and open its connection at startup (background thread)
+# so the first story/shot request does not pay for it
+LLM_WARMUP = os.getenv("LLM_WARMUP", "true").lower() == "true"
+
 # Batch size for generating shots (process scenes in batches to avoid truncation)
 SHOT_GENERATION_BATCH_SIZE = int(os.getenv("SHOT_GENERATION_BATCH_SIZE", "1"))  # Process 1 scene at a time
 
+# Incremental shot planning (auto mode): each planned batch is saved with its final
+# shot indices as soon as it and all earlier batches are done, and its images are
+# generated while later batches are still being planned
+STREAM_SHOT_PLANNING = os.getenv("STREAM_SHOT_PLANNING", "true").lower() == "true"
+# With incremental planning, stream each batch's LLM response and release every shot
+# as soon as its JSON object is complete (Gemini, Z.AI, Ollama, LM Studio)
+STREAM_LLM_SHOTS = os.getenv("STREAM_LLM_SHOTS", "true").lower() == "true"
+# Streamed shots arriving within this many seconds of the last save are saved together
+STREAM_SHOTS_SAVE_INTERVAL = float(os.getenv("STREAM_SHOTS_SAVE_INTERVAL", "2.0"))
+
 # Maximum parallel threads for batch processing (only for cloud providers, not local models)
 # Higher values = faster processing but more API rate limits
 # Recommended: 3-5 for most APIs, 1-2 for free tier accounts
@@ -238,6 +252,57 @@ COMFY_URL = "http://127.0.0.1:8188"
 #   COMFY_OUTPUT_DIR = "/home/user/ComfyUI/output"  # Manual path for Linux/Mac
 COMFY_OUTPUT_DIR = os.getenv("COMFY_OUTPUT_DIR", r"E:\ComfyUI\Output")
 
+# ComfyUI backend pool (multiple GPU boxes)
+# Comma-separated list of ComfyUI servers; each prompt goes to the least-loaded
+# healthy node and its outputs are fetched from that same node.
+# Defaults to just COMFY_URL. Example:
+#   COMFY_URLS=http://127.0.0.1:8188,http://10.0.0.12:8188,http://10.0.0.13:8188
+COMFY_URLS = [u.strip().rstrip("/") for u in os.getenv("COMFY_URLS", COMFY_URL).split(",") if u.strip()]
+# Seconds between /queue + /system_stats health checks per node
+COMFY_POOL_REFRESH_INTERVAL = float(os.getenv("COMFY_POOL_REFRESH_INTERVAL", "2"))
+# Dedicate nodes to one model family so Flux and Wan never swap on a GPU:
+#   COMFY_NODE_ROLES=http://10.0.0.12:8188=image,http://10.0.0.13:8188=video
+# Unlisted nodes serve both ("any")
+COMFY_NODE_ROLES = os.getenv("COMFY_NODE_ROLES", "")
+# Nodes are treated as local (sharing our filesystem: output links, no input
+# uploads) when their hostname is loopback or this machine's own name/address.
+# List extra nodes on shared storage here (comma-separated URLs)
+COMFY_LOCAL_URLS = [u.strip().rstrip("/") for u in os.getenv("COMFY_LOCAL_URLS", "").split(",") if u.strip()]
+# Where outputs from remote (non-local) nodes are downloaded via /view
+COMFY_REMOTE_OUTPUT_DIR = resolve_path(os.path.join(OUTPUT_DIR, "comfy_remote"))
+
+# Output retrieval: renders are streamed from each node's /view endpoint
+# straight into the session (SHA-256 computed while streaming)
+COMFY_FETCH_CHUNK_SIZE = int(os.getenv("COMFY_FETCH_CHUNK_SIZE", str(1024 * 1024)))  # 1 MB
+COMFY_FETCH_RETRIES = int(os.getenv("COMFY_FETCH_RETRIES", "3"))
+# Outputs of a local node found in its output directory (COMFY_OUTPUT_DIR) are
+# reflinked/hardlinked into the session instead of downloaded (core/materialize.py)
+COMFY_LINK_LOCAL_OUTPUTS = os.getenv("COMFY_LINK_LOCAL_OUTPUTS", "true").lower() == "true"
+
+# Input images: upload LoadImage inputs via /upload/image under a content-hash
+# filename instead of passing our absolute local path
+#   "remote" = only for nodes that don't share our filesystem (default)
+#   "always" = every node
+#   "never"  = always pass the absolute path (shared storage required)
+COMFY_UPLOAD_INPUTS = os.getenv("COMFY_UPLOAD_INPUTS", "remote")
+# Downscale input images to the video resolution before upload
+COMFY_UPLOAD_DOWNSCALE = os.getenv("COMFY_UPLOAD_DOWNSCALE", "false").lower() == "true"
+# Which content hashes each node already has (so re-renders skip the upload)
+COMFY_UPLOAD_REGISTRY = resolve_path(os.path.join(OUTPUT_DIR, "comfy_uploads.json"))
+
+# ==========================================
+# HTTP CLIENT CONFIGURATION
+# ==========================================
+# All ComfyUI and REST LLM calls share keep-alive connection pools (core/http_client.py)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # Hosts kept in the pool
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))  # Keep-alive connections per host
+# Retries for idempotent requests (GET/HEAD) on connection errors and 502/503/504
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+# Default timeouts (seconds) when a call does not pass its own
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "120"))
+
 # Path to your Wan 2.2 workflow template
 WORKFLOW_PATH = resolve_path("workflow/video/wan22_workflow.json")
 
@@ -430,6 +495,94 @@ TARGET_VIDEO_LENGTH = 600  # or specify like: 60.0 for 60 seconds
 # Maximum time to wait for a single video render to complete
 VIDEO_RENDER_TIMEOUT = 900  # 15 minutes
 
+# Pipelined rendering: number of compiled workflows kept queued ahead in ComfyUI
+# 1 = submit-and-wait per shot (original behaviour)
+# 2+ = keep that many prompts queued and collect finished videos out of order,
+#      so ComfyUI never sits idle while we verify and copy the previous video
+RENDER_PIPELINE_DEPTH = int(os.getenv("RENDER_PIPELINE_DEPTH", "3"))
+
+# Completion notifications: wait on ComfyUI's WebSocket instead of polling /history
+# HTTP polling is only used when the WebSocket is unavailable (or this is False),
+# backing off from COMFY_POLL_MIN_INTERVAL to COMFY_POLL_MAX_INTERVAL seconds
+COMFY_USE_EVENT_BUS = os.getenv("COMFY_USE_EVENT_BUS", "true").lower() == "true"
+COMFY_POLL_MIN_INTERVAL = float(os.getenv("COMFY_POLL_MIN_INTERVAL", "0.5"))
+COMFY_POLL_MAX_INTERVAL = float(os.getenv("COMFY_POLL_MAX_INTERVAL", "10"))
+
+# Render order (core/render_scheduler.py)
+# "lora_affinity" = group pending renders by LoRA stack so ComfyUI re-patches
+#                   the Wan model less often; "shot_order" = render in shot order
+# RENDER_AFFINITY_MAX_DELAY caps how many places a render may be pushed back
+# from its shot-order position (-1 = unlimited). Shots with a "render_priority"
+# value in shots.json render before lower ones.
+RENDER_SCHEDULE = os.getenv("RENDER_SCHEDULE", "lora_affinity")
+RENDER_AFFINITY_MAX_DELAY = int(os.getenv("RENDER_AFFINITY_MAX_DELAY", "8"))
+
+# Image/video stage scheduling on shared ComfyUI nodes (core/stage_scheduler.py)
+# "batched" = when a batch needs both images and videos (web UI batch generation),
+#             run all image prompts of GPU_STAGE_BATCH_WINDOW shots, then their
+#             videos, so Flux and Wan are not swapped in and out per shot
+# "interleaved" = image then video per shot
+# Batching is skipped when COMFY_NODE_ROLES dedicates nodes to both families
+GPU_STAGE_SCHEDULING = os.getenv("GPU_STAGE_SCHEDULING", "batched")
+GPU_STAGE_BATCH_WINDOW = int(os.getenv("GPU_STAGE_BATCH_WINDOW", "0"))  # shots per window, 0 = all
+
+# Streaming image -> video (auto mode): render each shot's video as soon as its
+# images are generated instead of waiting for the whole image step. Only used
+# when images come from another resource than the video GPU (Gemini/GeminiWeb,
+# or COMFY_NODE_ROLES with dedicated nodes); STREAM_QUEUE_SIZE bounds how many
+# finished shots may wait for the video stage before image generation pauses
+STREAM_IMAGES_TO_VIDEOS = os.getenv("STREAM_IMAGES_TO_VIDEOS", "true").lower() == "true"
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "4"))
+
+# Render cache: finished outputs stored by compiled-workflow hash (core/render_cache.py)
+# A byte-identical workflow (same image, prompt, LoRAs, frames, seed) is served
+# from the cache via hardlink/copy instead of being rendered again.
+# Inspect/prune: python -m core.render_cache stats|list|prune|clear
+RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+RENDER_CACHE_DIR = resolve_path(os.getenv("RENDER_CACHE_DIR", os.path.join(OUTPUT_DIR, "render_cache")))
+RENDER_CACHE_MAX_BYTES = int(float(os.getenv("RENDER_CACHE_MAX_GB", "20")) * 1024 ** 3)
+
+# On-disk cache of LLM responses (core/llm_cache.py), keyed by provider, model,
+# prompt, response format and max tokens; least recently used entries are evicted.
+# Inspect/prune: python -m core.llm_cache stats|prune|clear
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = resolve_path(os.getenv("LLM_CACHE_PATH", os.path.join(OUTPUT_DIR, "llm_cache.db")))
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 ** 2)
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))  # 0 = never expire
+# Skip cache lookups (fresh responses are still stored)
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "false").lower() == "true"
+
+# Content-addressed media store (core/blob_store.py): when a session completes,
+# files in BLOB_STORE_DIRS are stored once by SHA-256 and hardlinked from every
+# session that has the same content. Reclaim blobs no session uses with
+# python -m core.blob_store gc; see savings with python -m core.blob_store report
+BLOB_STORE_ENABLED = os.getenv("BLOB_STORE_ENABLED", "false").lower() == "true"
+BLOB_STORE_DIR = resolve_path(os.getenv("BLOB_STORE_DIR", os.path.join(OUTPUT_DIR, "blobs")))
+BLOB_STORE_DIRS = os.getenv("BLOB_STORE_DIRS", "videos")
+
+# Session storage: "files" = JSON files per session (+ journal below),
+# "sqlite" = SQLite database in WAL mode (core/session_store.py) with indexed
+# status queries; existing session folders are imported when it is first created.
+# SESSION_DB_PATH "" = sessions.db inside the sessions folder
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "files")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "")
+
+# Session journal (core/session_journal.py): per-shot updates (image/video marks,
+# in-flight renders) are appended to events.jsonl in the session folder and folded
+# into shots.json / the meta file once the journal grows past this many bytes,
+# or whenever a step completes
+SESSION_JOURNAL_COMPACT_BYTES = int(os.getenv("SESSION_JOURNAL_COMPACT_BYTES", str(256 * 1024)))
+
+# Write-back session state (core/session_state.py): per-shot updates are applied
+# in memory and appended to the journal in one write at most this many seconds
+# later (0 = append every update immediately); full saves and step completion
+# write at once
+SESSION_FLUSH_DELAY = float(os.getenv("SESSION_FLUSH_DELAY", "1.0"))
+
+# Converted API-format workflow templates (core/template_cache.py), keyed by
+# file path, mtime, dimensions and frame length; "" keeps them in memory only
+TEMPLATE_CACHE_DIR = resolve_path(os.getenv("TEMPLATE_CACHE_DIR", os.path.join(OUTPUT_DIR, "template_cache")))
+
 # LoRA node IDs in the workflow (for camera-based LoRA loading)
 # Array of LoRA node pairs - each pair contains HIGH_NOISE_LORA_NODE_ID and LOW_NOISE_LORA_NODE_ID
 # This allows up to 4 different camera types to load their LoRAs simultaneously
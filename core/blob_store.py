@@ -0,0 +1,268 @@
+"""
+Blob Store - Content-addressed (SHA-256) media shared across sessions
+
+Duplicated sessions, re-runs of the same prompts file and shots re-rendered
+with identical inputs leave byte-identical videos in many session folders.
+With BLOB_STORE_ENABLED, a session's media is ingested when it completes:
+each file is hashed and stored once under its digest, and every session file
+with that content becomes a hardlink to the blob, so it takes disk space once.
+
+- A blob's link count is its reference count: a blob only the store links to
+  (st_nlink == 1) belongs to no session any more and is reclaimed by gc().
+  Render cache entries (core/render_cache.py) of the same file count as
+  references too, until the cache evicts them.
+- Each session folder keeps media_manifest.json (relative path -> digest), so
+  re-ingesting skips files that are already linked to their blob.
+- Only BLOB_STORE_DIRS are ingested (default: videos). Videos are always
+  replaced atomically; image generators may rewrite a file in place, which
+  would write through a hardlink into every session sharing it.
+
+Layout:
+    BLOB_STORE_DIR/ab/abcdef...   (first two hex chars fan out the blobs)
+
+Ingest, reclaim and report with:
+    python -m core.blob_store ingest [session_id ...]|gc|report
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import config
+from core.logger_config import get_logger
+from core.session_journal import write_json_atomic
+
+
+# Get logger for the blob store
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "media_manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Global store instance
+_blob_store = None
+_blob_store_lock = threading.Lock()
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _same_file(a: str, b: str) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+class BlobStore:
+    """
+    Hardlink-referenced store of session media keyed by SHA-256.
+
+    Usage:
+        store = get_blob_store()
+        if store:
+            store.ingest_session(session_dir)   # dedup one session
+            store.gc()                          # drop blobs no session links to
+    """
+
+    def __init__(self, root: str = None, dirs: List[str] = None):
+        self.root = root or config.BLOB_STORE_DIR
+        self.dirs = dirs or [d.strip() for d in getattr(config, 'BLOB_STORE_DIRS', "videos").split(",") if d.strip()]
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def ingest_file(self, path: str, digest: str = None) -> Dict:
+        """
+        Store path's content (if new) and make path a hardlink to its blob.
+
+        Returns:
+            dict with 'digest', 'size' and 'saved' (bytes freed by linking to an existing blob)
+        """
+        digest = digest or _sha256_file(path)
+        size = os.path.getsize(path)
+        blob = self.blob_path(digest)
+        with self._lock:
+            if _same_file(path, blob):
+                return {'digest': digest, 'size': size, 'saved': 0}
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            if not os.path.exists(blob):
+                # First copy of this content: the session file becomes the blob
+                tmp_path = f"{blob}.{os.getpid()}.tmp"
+                os.link(path, tmp_path)
+                os.replace(tmp_path, blob)
+                return {'digest': digest, 'size': size, 'saved': 0}
+            if os.path.getsize(blob) != size:
+                raise IOError(f"Blob {digest[:12]} does not match {path} (size differs)")
+            tmp_path = path + ".part"
+            os.link(blob, tmp_path)
+            os.replace(tmp_path, path)
+        return {'digest': digest, 'size': size, 'saved': size}
+
+    def ingest_session(self, session_dir: str) -> Dict:
+        """
+        Ingest the media folders of one session and update its manifest.
+
+        Returns:
+            dict with 'files', 'linked' (files that now share a blob) and 'saved' bytes
+        """
+        manifest_path = os.path.join(session_dir, MANIFEST_FILE)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+        result = {'files': 0, 'linked': 0, 'saved': 0}
+        current = {}
+        for media_dir in self.dirs:
+            folder = os.path.join(session_dir, media_dir)
+            if not os.path.isdir(folder):
+                continue
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if not entry.is_file() or entry.name.endswith((".part", ".tmp")):
+                        continue
+                    rel_path = f"{media_dir}/{entry.name}"
+                    known = manifest.get(rel_path)
+                    result['files'] += 1
+                    if known and _same_file(entry.path, self.blob_path(known)):
+                        current[rel_path] = known
+                        continue
+                    try:
+                        outcome = self.ingest_file(entry.path)
+                    except OSError as e:
+                        # e.g. store on another filesystem (no hardlinks across devices)
+                        logger.warning(f"Could not ingest {entry.path}: {e}")
+                        continue
+                    current[rel_path] = outcome['digest']
+                    if outcome['saved']:
+                        result['linked'] += 1
+                        result['saved'] += outcome['saved']
+
+        if current or manifest:
+            write_json_atomic(manifest_path, current)
+        logger.info(f"Ingested {session_dir}: {result['files']} file(s), {result['linked']} linked "
+                    f"to existing blobs, {result['saved']:,} bytes saved")
+        return result
+
+    def blobs(self) -> List[Dict]:
+        """Every blob with its size and number of session references (links besides the store's)."""
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        with os.scandir(self.root) as fanout:
+            for bucket in fanout:
+                if not bucket.is_dir():
+                    continue
+                with os.scandir(bucket.path) as blobs:
+                    for blob in blobs:
+                        if blob.name.endswith(".tmp") or not blob.is_file():
+                            continue
+                        st = blob.stat()
+                        entries.append({'digest': blob.name, 'path': blob.path,
+                                        'size': st.st_size, 'refs': st.st_nlink - 1})
+        return entries
+
+    def gc(self, dry_run: bool = False) -> Dict:
+        """
+        Remove blobs that no session file links to any more.
+
+        Returns:
+            dict with 'removed' (count) and 'bytes' reclaimed
+        """
+        removed, reclaimed = 0, 0
+        with self._lock:
+            for blob in self.blobs():
+                if blob['refs'] > 0:
+                    continue
+                if not dry_run:
+                    os.remove(blob['path'])
+                removed += 1
+                reclaimed += blob['size']
+        logger.info(f"Blob store GC: {removed} unreferenced blob(s), {reclaimed:,} bytes"
+                    f"{' (dry run)' if dry_run else ' reclaimed'}")
+        return {'removed': removed, 'bytes': reclaimed}
+
+    def report(self) -> Dict:
+        """
+        Dedup savings: bytes the referencing session files would take without sharing vs. on disk.
+
+        Returns:
+            dict with 'blobs', 'references', 'logical_bytes', 'stored_bytes',
+            'saved_bytes' and 'unreferenced_bytes'
+        """
+        report = {'blobs': 0, 'references': 0, 'logical_bytes': 0, 'stored_bytes': 0,
+                  'saved_bytes': 0, 'unreferenced_bytes': 0}
+        for blob in self.blobs():
+            report['blobs'] += 1
+            report['stored_bytes'] += blob['size']
+            if blob['refs'] == 0:
+                report['unreferenced_bytes'] += blob['size']
+                continue
+            report['references'] += blob['refs']
+            report['logical_bytes'] += blob['size'] * blob['refs']
+            report['saved_bytes'] += blob['size'] * (blob['refs'] - 1)
+        return report
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """Get the global blob store, or None when BLOB_STORE_ENABLED is off."""
+    global _blob_store
+    if not getattr(config, 'BLOB_STORE_ENABLED', False):
+        return None
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore()
+        return _blob_store
+
+
+def _format_bytes(num_bytes: int) -> str:
+    return f"{num_bytes / 1024 ** 2:,.1f} MB"
+
+
+def main(argv=None):
+    """Command line entry point: python -m core.blob_store <command>"""
+    import argparse
+    from core.session_manager import SessionManager
+
+    parser = argparse.ArgumentParser(description="Deduplicate session media in the content-addressed blob store")
+    parser.add_argument("command", choices=["ingest", "gc", "report"])
+    parser.add_argument("sessions", nargs="*", help="Sessions to ingest (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="gc: only report what would be removed")
+    args = parser.parse_args(argv)
+
+    store = BlobStore()
+
+    if args.command == "ingest":
+        session_mgr = SessionManager()
+        session_ids = args.sessions or [meta['session_id'] for meta in session_mgr.list_all_sessions()]
+        saved = 0
+        for session_id in session_ids:
+            result = store.ingest_session(session_mgr.get_session_dir(session_id))
+            saved += result['saved']
+            print(f"[BLOBS] {session_id}: {result['files']} file(s), {result['linked']} deduplicated")
+        print(f"[BLOBS] Saved {_format_bytes(saved)}")
+    elif args.command == "gc":
+        result = store.gc(dry_run=args.dry_run)
+        action = "Would remove" if args.dry_run else "Removed"
+        print(f"[BLOBS] {action} {result['removed']} unreferenced blob(s), {_format_bytes(result['bytes'])}")
+    elif args.command == "report":
+        report = store.report()
+        print(f"[BLOBS] {store.root}")
+        print(f"        {report['blobs']} blobs, {report['references']} session file(s) referencing them")
+        print(f"        {_format_bytes(report['logical_bytes'])} in sessions, "
+              f"{_format_bytes(report['stored_bytes'])} on disk")
+        print(f"        Saved by dedup: {_format_bytes(report['saved_bytes'])}; "
+              f"reclaimable by gc: {_format_bytes(report['unreferenced_bytes'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import requests
-import uuid
 import time
 import config
 import os
+from core.http_client import get_session
 from core.logger_config import get_logger
 
 
@@ -35,7 +35,7 @@ def get_comfyui_output_directory():
 
     try:
         # Try to get ComfyUI settings - this includes path information
-        r = requests.get(f"{config.COMFY_URL}/settings", timeout=5)
+        r = get_session().get(f"{config.COMFY_URL}/settings", timeout=5)
 
         if r.status_code == 200:
             settings = r.json()
@@ -59,7 +59,7 @@ def get_comfyui_output_directory():
 
     try:
         # Alternative: Try the system_stats endpoint
-        r = requests.get(f"{config.COMFY_URL}/system_stats", timeout=5)
+        r = get_session().get(f"{config.COMFY_URL}/system_stats", timeout=5)
 
         if r.status_code == 200:
             stats = r.json()
@@ -79,7 +79,7 @@ def get_comfyui_output_directory():
 
     try:
         # Another approach: Check the extension settings
-        r = requests.get(f"{config.COMFY_URL}/extension_manager", timeout=5)
+        r = get_session().get(f"{config.COMFY_URL}/extension_manager", timeout=5)
 
         if r.status_code == 200:
             ext_data = r.json()
@@ -117,23 +117,57 @@ def get_comfyui_output_directory():
     logger.error(f"   If ComfyUI is installed elsewhere, set COMFY_OUTPUT_DIR in config.py")
     return _comfy_output_dir
 
-def submit(workflow):
+def get_prompt_url(prompt_id=None):
+    """Base URL of the ComfyUI node a prompt was submitted to."""
+    from core.comfy_pool import get_backend_pool
+    return get_backend_pool().url_for(prompt_id)
+
+
+def submit(workflow, stage=None):
     """
-    Submit a workflow to ComfyUI and return the response.
+    Submit a workflow to the least-loaded ComfyUI node and return the response.
+
+    Unreachable nodes are marked unhealthy and the next node is tried. Input
+    images referenced by absolute path are uploaded to the chosen node first
+    (see core/comfy_uploads.py).
+
+    Args:
+        workflow: Compiled API-format workflow
+        stage: "image" or "video" model family, used to route to dedicated
+            nodes (default: detected from the workflow's nodes)
 
     Returns:
-        dict with 'prompt_id' and 'number' of the prompt in queue
+        dict with 'prompt_id', 'number' of the prompt in queue and 'backend' URL
     """
-    payload = {
-        "prompt": workflow,
-        "client_id": str(uuid.uuid4())
-    }
-
-    r = requests.post(
-        f"{config.COMFY_URL}/prompt",
-        json=payload,
-        timeout=10
-    )
+    from core.comfy_events import get_client_id
+    from core.comfy_pool import get_backend_pool
+    from core.comfy_uploads import prepare_workflow_inputs
+    from core.stage_scheduler import workflow_stage
+
+    pool = get_backend_pool()
+    stage = stage or workflow_stage(workflow)
+    tried = []
+    while True:
+        backend = pool.acquire(exclude=tried, stage=stage)
+        tried.append(backend.url)
+        try:
+            # Submit under the process-wide client id so the shared event bus
+            # receives this prompt's execution events. Local LoadImage inputs
+            # are uploaded to the chosen node first (deduplicated by content hash)
+            payload = {
+                "prompt": prepare_workflow_inputs(workflow, backend),
+                "client_id": get_client_id()
+            }
+            r = get_session().post(
+                f"{backend.url}/prompt",
+                json=payload,
+                timeout=10
+            )
+            break
+        except (requests.ConnectionError, requests.Timeout) as e:
+            pool.mark_unhealthy(backend, str(e))
+            if len(tried) >= len(pool):
+                raise
 
     if r.status_code != 200:
         logger.error(f"ComfyUI returned status {r.status_code}: {r.text}")
@@ -141,34 +175,58 @@ def submit(workflow):
 
     result = r.json()
     prompt_id = result.get('prompt_id')
-    logger.info(f"Workflow submitted: prompt_id={prompt_id}")
+    pool.record_submit(backend, prompt_id, stage=stage)
+    result['backend'] = backend.url
+    if len(pool) > 1:
+        logger.info(f"Workflow submitted: prompt_id={prompt_id} on {backend.url}")
+    else:
+        logger.info(f"Workflow submitted: prompt_id={prompt_id}")
     return result
 
 
 def interrupt_generation():
-    """Interrupt the currently running generation in ComfyUI."""
+    """Interrupt the currently running generation on every ComfyUI node."""
+    from core.comfy_pool import get_backend_pool
+
+    interrupted = False
+    for url in get_backend_pool().urls:
+        try:
+            r = get_session().post(f"{url}/interrupt", timeout=5)
+            logger.info(f"ComfyUI interrupt sent to {url}, status: {r.status_code}")
+            interrupted = interrupted or r.status_code == 200
+        except Exception as e:
+            logger.error(f"Failed to interrupt ComfyUI at {url}: {e}")
+    return interrupted
+
+
+def delete_queued_prompt(prompt_id):
+    """Remove a pending prompt from its node's queue (no effect once it is running or finished)."""
+    base_url = get_prompt_url(prompt_id)
     try:
-        r = requests.post(f"{config.COMFY_URL}/interrupt", timeout=5)
-        logger.info(f"ComfyUI interrupt sent, status: {r.status_code}")
+        r = get_session().post(f"{base_url}/queue", json={"delete": [prompt_id]}, timeout=5)
         return r.status_code == 200
     except Exception as e:
-        logger.error(f"Failed to interrupt ComfyUI: {e}")
+        logger.warning(f"Failed to delete prompt {prompt_id} from {base_url}: {e}")
         return False
 
 
 def clear_queue():
-    """Clear all pending items from the ComfyUI queue."""
-    try:
-        r = requests.post(
-            f"{config.COMFY_URL}/queue",
-            json={"clear": True},
-            timeout=5
-        )
-        logger.info(f"ComfyUI queue clear sent, status: {r.status_code}")
-        return r.status_code == 200
-    except Exception as e:
-        logger.error(f"Failed to clear ComfyUI queue: {e}")
-        return False
+    """Clear all pending items from every ComfyUI node's queue."""
+    from core.comfy_pool import get_backend_pool
+
+    cleared = False
+    for url in get_backend_pool().urls:
+        try:
+            r = get_session().post(
+                f"{url}/queue",
+                json={"clear": True},
+                timeout=5
+            )
+            logger.info(f"ComfyUI queue clear sent to {url}, status: {r.status_code}")
+            cleared = cleared or r.status_code == 200
+        except Exception as e:
+            logger.error(f"Failed to clear ComfyUI queue at {url}: {e}")
+    return cleared
 
 
 def cancel_all():
@@ -178,159 +236,144 @@ def cancel_all():
     return interrupted or cleared
 
 
+def get_prompt_state(prompt_id):
+    """
+    Where a prompt stands on the node it was submitted to.
+
+    Returns:
+        "finished" (in /history), "queued" (running or pending in /queue),
+        "missing" (ComfyUI has no record of it) or "unreachable"
+    """
+    base_url = get_prompt_url(prompt_id)
+    try:
+        r = get_session("probe").get(f"{base_url}/history/{prompt_id}", timeout=5)
+        if r.status_code == 200 and prompt_id in r.json():
+            return "finished"
+
+        r = get_session("probe").get(f"{base_url}/queue", timeout=5)
+        r.raise_for_status()
+        queue_data = r.json()
+        for item in queue_data.get("queue_running", []) + queue_data.get("queue_pending", []):
+            if len(item) > 1 and item[1] == prompt_id:
+                return "queued"
+        return "missing"
+    except Exception as e:
+        logger.debug(f"Could not check prompt {prompt_id} on {base_url}: {e}")
+        return "unreachable"
+
+
 def wait_for_prompt_completion_with_progress(prompt_id, progress_callback=None, timeout=1800):
     """
-    Wait for a specific prompt to complete using WebSockets to get real-time progress.
-    
+    Wait for a specific prompt to complete using the shared ComfyUI event bus
+    to get real-time progress.
+
+    All waiters in the process share one WebSocket connection (see
+    core/comfy_events.py); completion is pushed by ComfyUI and the outputs are
+    read from /history once. Falls back to HTTP polling if the WebSocket
+    cannot be established.
+
     Args:
         prompt_id: The prompt ID to wait for
         progress_callback: Function called with (current_step, total_steps)
-        timeout: Maximum time to wait in seconds
+        timeout: Maximum time to wait in seconds once the prompt starts executing
     """
-    import asyncio
-    import json
-    import websockets
-    from urllib.parse import urlparse
+    from core.comfy_events import get_event_bus
 
-    # Convert http://... to ws://...
-    parsed_url = urlparse(config.COMFY_URL)
-    ws_url = f"ws://{parsed_url.netloc}/ws?clientId={str(uuid.uuid4())}"
+    base_url = get_prompt_url(prompt_id)
+    bus = get_event_bus(base_url)
+    sub = bus.subscribe(prompt_id, progress_callback=progress_callback)
 
-    # First, check if it's already in history (fast execution)
-    from core.comfy_client import wait_for_prompt_completion
     try:
-        check_response = requests.get(f"{config.COMFY_URL}/history/{prompt_id}", timeout=2)
-        if check_response.status_code == 200:
-            history = check_response.json()
-            if prompt_id in history:
+        # First, check if it's already in history (fast execution)
+        try:
+            check_response = get_session("probe").get(f"{base_url}/history/{prompt_id}", timeout=2)
+            if check_response.status_code == 200 and prompt_id in check_response.json():
                 logger.debug(f"Prompt {prompt_id} already in history, skipping WS progress.")
                 if progress_callback:
                     progress_callback(100, 100)
-                return wait_for_prompt_completion(prompt_id, timeout=10)
-    except Exception as e:
-        logger.debug(f"Initial history check failed: {e}")
-
-    async def _listen():
-        logger.info(f"Connecting to ComfyUI WebSocket: {ws_url}")
-        try:
-            async with websockets.connect(ws_url) as websocket:
-                start_time = time.time()
-                last_history_check = time.time()
-                our_prompt_is_executing = False  # Only true when OUR prompt is actively running
-                currently_executing_prompt_id = None  # Track exactly which prompt is running (for progress filtering)
-                execution_start_time = None  # Track when our prompt actually starts
-                
-                while True:
-                    current_time = time.time()
-                    
-                    # Use execution_start_time for timeout if our prompt has started,
-                    # otherwise use a generous queue timeout
-                    if our_prompt_is_executing and execution_start_time:
-                        if current_time - execution_start_time > timeout:
-                            return {'success': False, 'error': f'Timeout after {timeout}s of execution', 'outputs': []}
-                    else:
-                        # While queued, use a very generous timeout (e.g., 1 hour)
-                        queue_timeout = max(timeout, 3600)
-                        if current_time - start_time > queue_timeout:
-                            return {'success': False, 'error': f'Queue timeout after {int(current_time - start_time)}s', 'outputs': []}
-
-                    # Occasionally check history manually as fallback
-                    if current_time - last_history_check > 5.0:
-                        last_history_check = current_time
-                        try:
-                            hist_result = await asyncio.to_thread(requests.get, f"{config.COMFY_URL}/history/{prompt_id}", timeout=2)
-                            if hist_result.status_code == 200:
-                                history = hist_result.json()
-                                if prompt_id in history:
-                                    logger.info(f"Prompt {prompt_id} completed (found via history poll)")
-                                    if progress_callback:
-                                        progress_callback(100, 100)
-                                    return wait_for_prompt_completion(prompt_id, timeout=5)
-                        except:
-                            pass
-
-                    try:
-                        message_raw = await asyncio.wait_for(websocket.recv(), timeout=2.0)
-                        message = json.loads(message_raw)
-                        
-                        msg_type = message.get("type")
-                        data = message.get("data", {})
-
-                        if msg_type == "executing":
-                            msg_prompt_id = data.get("prompt_id")
-                            node = data.get("node")
-                            
-                            # Update global tracker for what's currently running
-                            if msg_prompt_id:
-                                currently_executing_prompt_id = msg_prompt_id
-                                
-                            if msg_prompt_id == prompt_id:
-                                if node is None:
-                                    # Our prompt finished execution
-                                    logger.info(f"Prompt {prompt_id} execution finished (via WS)")
-                                    if progress_callback:
-                                        progress_callback(100, 100)
-                                    return wait_for_prompt_completion(prompt_id, timeout=10)
-                                else:
-                                    # Our prompt started or is executing a node
-                                    if not our_prompt_is_executing:
-                                        logger.info(f"Prompt {prompt_id} started executing")
-                                        our_prompt_is_executing = True
-                                        execution_start_time = time.time()
-                            else:
-                                our_prompt_is_executing = False
-
-                        elif msg_type == "progress":
-                            # Progress messages in newer ComfyUI versions include prompt_id
-                            prog_prompt_id = data.get("prompt_id")
-                            
-                            # If prompt_id is directly in the progress message, trust it
-                            is_our_progress = False
-                            if prog_prompt_id == prompt_id:
-                                is_our_progress = True
-                            # If no prompt_id in progress message, fallback to tracking 'executing' events
-                            elif prog_prompt_id is None:
-                                if currently_executing_prompt_id == prompt_id:
-                                    is_our_progress = True
-                                # If we haven't seen ANY prompt start executing yet, it might be an early progress event for us
-                                elif currently_executing_prompt_id is None and not our_prompt_is_executing:
-                                    is_our_progress = True
-
-                            if is_our_progress and progress_callback:
-                                value = data.get("value", 0)
-                                max_val = data.get("max", 0)
-                                progress_callback(value, max_val)
-
-                    except asyncio.TimeoutError:
-                        continue
+                return _poll_prompt_completion(prompt_id, timeout=10)
         except Exception as e:
-            logger.error(f"WebSocket error in comfy_client: {e}")
-            # Fallback to polling if WebSocket fails
-            return wait_for_prompt_completion(prompt_id, timeout=timeout)
+            logger.debug(f"Initial history check failed: {e}")
+
+        if not bus.wait_until_connected(timeout=5):
+            logger.warning(f"ComfyUI event bus unavailable, polling for prompt {prompt_id}")
+            return _poll_prompt_completion(prompt_id, timeout=timeout)
+
+        start_time = time.time()
+        # While queued, use a very generous timeout (e.g., 1 hour)
+        queue_timeout = max(timeout, 3600)
+
+        last_status_check = start_time
+        while not sub.wait(timeout=1.0):
+            current_time = time.time()
+            # Without a progress callback (CLI), print a heartbeat every 30 seconds
+            if progress_callback is None and current_time - last_status_check > 30:
+                last_status_check = current_time
+                status_str = "processing" if sub.started_at else "queued"
+                print(f"       [STATUS] {status_str} ({int(current_time - start_time)}s elapsed)")
+            if sub.started_at:
+                if current_time - sub.started_at > timeout:
+                    return {'success': False, 'error': f'Timeout after {timeout}s of execution', 'outputs': [],
+                            'timed_out': True}
+            elif current_time - start_time > queue_timeout:
+                return {'success': False, 'error': f'Queue timeout after {int(current_time - start_time)}s', 'outputs': [],
+                        'timed_out': True}
+
+        if sub.status != "success":
+            logger.error(f"Prompt {prompt_id} failed: {sub.error}")
+            return {'success': False, 'error': sub.error or 'Unknown error', 'outputs': []}
+
+        logger.info(f"Prompt {prompt_id} execution finished (via event bus)")
+        return _poll_prompt_completion(prompt_id, timeout=10)
 
-    # Run the async listener
-    try:
-        return asyncio.run(_listen())
     except Exception as e:
-        logger.error(f"Error running asyncio loop in comfy_client: {e}")
+        logger.error(f"Event bus wait failed for {prompt_id}: {e}")
         # Always fallback to standard polling
-        return wait_for_prompt_completion(prompt_id, timeout=timeout)
+        return _poll_prompt_completion(prompt_id, timeout=timeout)
+    finally:
+        bus.unsubscribe(sub)
 
 
 def wait_for_prompt_completion(prompt_id, timeout=1800):
     """
     Wait for a specific prompt to complete and check for errors.
 
+    Completion is pushed over the shared ComfyUI event bus when
+    COMFY_USE_EVENT_BUS is enabled; HTTP polling with adaptive backoff is
+    only used as a fallback.
+
     Args:
         prompt_id: The prompt ID to wait for
         timeout: Maximum time to wait in seconds (default: 30 minutes)
 
     Returns:
-        dict with 'success' (bool), 'outputs' (list of output files), 'error' (str if failed)
+        dict with 'success' (bool), 'outputs' (list of output files), 'error' (str if failed),
+        and 'timed_out' (True when the prompt may still be queued or running)
+    """
+    if getattr(config, 'COMFY_USE_EVENT_BUS', True):
+        return wait_for_prompt_completion_with_progress(prompt_id, None, timeout=timeout)
+    return _poll_prompt_completion(prompt_id, timeout=timeout)
+
+
+def _poll_prompt_completion(prompt_id, timeout=1800):
+    """
+    Poll /history until a prompt completes and parse its outputs.
+
+    The poll interval starts at COMFY_POLL_MIN_INTERVAL and backs off up to
+    COMFY_POLL_MAX_INTERVAL while the prompt is still queued or running.
     """
     logger.info(f"Waiting for prompt {prompt_id} completion (timeout: {timeout}s)")
+    base_url = get_prompt_url(prompt_id)
     start_time = time.time()
     last_status_check = 0
+    min_interval = getattr(config, 'COMFY_POLL_MIN_INTERVAL', 0.5)
+    max_interval = getattr(config, 'COMFY_POLL_MAX_INTERVAL', 10.0)
+    interval = min_interval
+
+    def backoff():
+        nonlocal interval
+        time.sleep(min(interval, max(0.0, timeout - (time.time() - start_time)) + 0.1))
+        interval = min(interval * 1.5, max_interval)
 
     while True:
         elapsed = time.time() - start_time
@@ -338,7 +381,7 @@ def wait_for_prompt_completion(prompt_id, timeout=1800):
         if elapsed > timeout:
             # Check queue status before giving up
             try:
-                queue_response = requests.get(f"{config.COMFY_URL}/queue", timeout=5)
+                queue_response = get_session("probe").get(f"{base_url}/queue", timeout=5)
                 if queue_response.status_code == 200:
                     queue_data = queue_response.json()
                     queue_running = queue_data.get("queue_running", [])
@@ -346,7 +389,8 @@ def wait_for_prompt_completion(prompt_id, timeout=1800):
                     return {
                         'success': False,
                         'error': f'Timeout after {int(elapsed)}s. Queue running: {len(queue_running)}, pending: {len(queue_pending)}',
-                        'outputs': []
+                        'outputs': [],
+                        'timed_out': True
                     }
             except:
                 pass
@@ -354,15 +398,16 @@ def wait_for_prompt_completion(prompt_id, timeout=1800):
             return {
                 'success': False,
                 'error': f'Timeout waiting for prompt {prompt_id} after {int(elapsed)}s',
-                'outputs': []
+                'outputs': [],
+                'timed_out': True
             }
 
         try:
             # Check prompt status
-            response = requests.get(f"{config.COMFY_URL}/history/{prompt_id}", timeout=10)
+            response = get_session("probe").get(f"{base_url}/history/{prompt_id}", timeout=10)
 
             if response.status_code != 200:
-                time.sleep(2)
+                backoff()
                 continue
 
             history = response.json()
@@ -371,7 +416,7 @@ def wait_for_prompt_completion(prompt_id, timeout=1800):
                 # If it's not in history, check if it's still in the queue.
                 # If it's in neither, it was likely canceled/interrupted.
                 try:
-                    queue_resp = requests.get(f"{config.COMFY_URL}/queue", timeout=5)
+                    queue_resp = get_session("probe").get(f"{base_url}/queue", timeout=5)
                     if queue_resp.status_code == 200:
                         queue_data = queue_resp.json()
                         queue_running = queue_data.get("queue_running", [])
@@ -393,7 +438,7 @@ def wait_for_prompt_completion(prompt_id, timeout=1800):
                 except Exception as e:
                     logger.debug(f"Failed to check queue status: {e}")
 
-                time.sleep(2)
+                backoff()
                 continue
 
             prompt_data = history[prompt_id]
@@ -422,7 +467,8 @@ def wait_for_prompt_completion(prompt_id, timeout=1800):
                             output_files.append({
                                 'type': 'video',
                                 'filename': filename,
-                                'subfolder': subfolder
+                                'subfolder': subfolder,
+                                'backend': base_url
                             })
 
                     # Check for images - but filter for video files (.mp4, .webm, etc.)
@@ -437,14 +483,16 @@ def wait_for_prompt_completion(prompt_id, timeout=1800):
                                 output_files.append({
                                     'type': 'video',
                                     'filename': filename,
-                                    'subfolder': subfolder
+                                    'subfolder': subfolder,
+                                    'backend': base_url
                                 })
                             else:
                                 # Regular image
                                 output_files.append({
                                     'type': 'image',
                                     'filename': filename,
-                                    'subfolder': subfolder
+                                    'subfolder': subfolder,
+                                    'backend': base_url
                                 })
 
                 logger.info(f"Prompt {prompt_id[:8]}... completed successfully with {len(output_files)} output(s)")
@@ -475,20 +523,152 @@ def wait_for_prompt_completion(prompt_id, timeout=1800):
                     'outputs': []
                 }
 
-            # Still processing
-            if status.get("status", "") in ["queued", "processing"]:
-                time.sleep(2)
-                continue
+        except Exception as e:
+            logger.debug(f"Polling prompt {prompt_id} failed: {e}")
+
+        backoff()
+
+
+def _local_output_file(output_info, base_url):
+    """Path of an output in a local node's output directory, or None if it is not on this machine."""
+    from core.comfy_pool import get_backend_pool, is_local_url
+
+    backend = get_backend_pool().backend_for_url(base_url)
+    is_local = backend.is_local if backend is not None else is_local_url(base_url)
+    if not is_local:
+        return None
+    output_dir = get_comfyui_output_directory()
+    if not output_dir:
+        return None
+    path = os.path.join(output_dir, output_info.get('subfolder', ''), output_info['filename'])
+    return path if os.path.isfile(path) and os.path.getsize(path) > 0 else None
+
+
+def _sha256_file(path, chunk_size):
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch_output(output_info, dest_path, chunk_size=None, retries=None, link=True, expected_sha256=None):
+    """
+    Stream a ComfyUI output file from its node's /view endpoint into dest_path.
 
+    Works the same whether ComfyUI is local or on another host. The download
+    is written to a .part file, checked against Content-Length, hashed
+    (SHA-256) while streaming, re-read to confirm the file on disk has that
+    hash (and matches expected_sha256, when given) and only then atomically
+    renamed into place; a mismatch is rejected and retried. ComfyUI
+    only records a prompt in /history after its save nodes have finished
+    writing, so no settle wait is needed.
+
+    With COMFY_LINK_LOCAL_OUTPUTS, an output of a local node that is found in
+    its output directory is materialized instead (core/materialize.py: reflink,
+    hardlink when link is set, else copy), so no bytes go over HTTP.
+
+    Args:
+        output_info: dict with 'filename', 'subfolder' and optionally 'backend'
+        dest_path: Local path to write to
+        chunk_size: Streaming chunk size in bytes (default: COMFY_FETCH_CHUNK_SIZE)
+        retries: Attempts before giving up (default: COMFY_FETCH_RETRIES)
+        link: Allow a hardlink to the local output (pass False for files that
+              are later rewritten in place)
+        expected_sha256: Known SHA-256 of the output; a file with another hash is rejected
+
+    Returns:
+        dict with 'success' (bool), 'path', 'size', 'sha256', 'source' (URL or
+        local path), 'method' ("download", "reflink", "hardlink" or "copy") and 'error'
+    """
+    import hashlib
+
+    chunk_size = chunk_size or getattr(config, 'COMFY_FETCH_CHUNK_SIZE', 1024 * 1024)
+    retries = retries or getattr(config, 'COMFY_FETCH_RETRIES', 3)
+    base_url = output_info.get('backend') or get_prompt_url()
+    params = {
+        'filename': output_info['filename'],
+        'subfolder': output_info.get('subfolder', ''),
+        'type': 'output'
+    }
+    source = f"{base_url}/view?filename={params['filename']}&subfolder={params['subfolder']}"
+
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = dest_path + ".part"
+
+    if getattr(config, 'COMFY_LINK_LOCAL_OUTPUTS', True):
+        try:
+            local_source = _local_output_file(output_info, base_url)
+            if local_source:
+                from core.materialize import materialize_file
+
+                method = materialize_file(local_source, dest_path, link=link)
+                size = os.path.getsize(dest_path)
+                sha256 = _sha256_file(dest_path, chunk_size)
+                if expected_sha256 and sha256 != expected_sha256:
+                    os.remove(dest_path)
+                    raise IOError(f"Checksum mismatch: sha256={sha256[:12]}, expected {expected_sha256[:12]}")
+                logger.info(f"Materialized {params['filename']} from {local_source} "
+                            f"({method}, {size:,} bytes, sha256={sha256[:12]})")
+                return {'success': True, 'path': dest_path, 'size': size, 'sha256': sha256,
+                        'source': local_source, 'method': method, 'error': None}
         except Exception as e:
-            time.sleep(2)
-            continue
+            logger.warning(f"Local materialization of {params['filename']} failed, downloading instead: {e}")
+
+    error = None
+    for attempt in range(1, retries + 1):
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with get_session().get(f"{base_url}/view", params=params, stream=True, timeout=(5, 60)) as r:
+                r.raise_for_status()
+                expected = r.headers.get('Content-Length')
+                with open(tmp_path, 'wb') as f:
+                    for chunk in r.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+
+            if expected is not None and int(expected) != size:
+                raise IOError(f"Truncated download: {size} of {expected} bytes")
+            if size == 0:
+                raise IOError("Empty file")
+
+            sha256 = digest.hexdigest()
+            if expected_sha256 and sha256 != expected_sha256:
+                raise IOError(f"Checksum mismatch: sha256={sha256[:12]}, expected {expected_sha256[:12]}")
+            if _sha256_file(tmp_path, chunk_size) != sha256:
+                raise IOError("Checksum mismatch: written file differs from the downloaded bytes")
+
+            os.replace(tmp_path, dest_path)
+            logger.info(f"Fetched {params['filename']} from {base_url} ({size:,} bytes, sha256={sha256[:12]})")
+            return {'success': True, 'path': dest_path, 'size': size, 'sha256': sha256,
+                    'source': source, 'method': "download", 'error': None}
+
+        except Exception as e:
+            error = str(e)
+            logger.warning(f"Fetch of {params['filename']} from {base_url} failed "
+                           f"(attempt {attempt}/{retries}): {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if attempt < retries:
+                time.sleep(attempt)
+
+    return {'success': False, 'path': None, 'size': 0, 'sha256': None, 'source': source, 'method': None,
+            'error': error}
 
 
 def get_output_file_path(output_info):
     """
     Get the full local path for a ComfyUI output file.
 
+    Only checks the expected locations; to copy an output into a session use
+    fetch_output(), which streams it from /view and works for remote nodes.
+
     Args:
         output_info: dict with 'filename', 'subfolder', 'type'
 
@@ -501,6 +681,19 @@ def get_output_file_path(output_info):
 
     logger.debug(f"Getting output file path: {filename} (subfolder: '{subfolder}', type: {file_type})")
 
+    # Outputs rendered on a remote node are not on this filesystem; pull them
+    # from the node that produced them
+    backend_url = output_info.get('backend')
+    if backend_url:
+        from core.comfy_pool import get_backend_pool
+        backend = get_backend_pool().backend_for_url(backend_url)
+        if backend is not None and not backend.is_local:
+            host = backend_url.split('://')[-1].replace(':', '_').replace('/', '_')
+            local_path = os.path.join(config.COMFY_REMOTE_OUTPUT_DIR, host, subfolder, filename)
+            if not os.path.exists(local_path):
+                fetch_output(output_info, local_path)
+            return os.path.abspath(local_path)
+
     # Get ComfyUI's actual output directory
     comfy_output_dir = get_comfyui_output_directory()
 
@@ -531,23 +724,6 @@ def get_output_file_path(output_info):
             logger.debug(f"Output file found: {abs_path}")
             return abs_path
 
-    # If none of the exact paths work, try searching for files with similar names
-    if file_type == 'video':
-        logger.warning(f"Video not found at expected paths, searching for similar files...")
-        # Extract the base part of the filename (before the frame count)
-        # Example: 1771452785243_86b45e92_shot_003_00001_.mp4 -> 1771452785243_86b45e92_shot_003
-        import re
-        base_match = re.match(r'^(.*_shot_\d+)_\d+_(\.)?mp4$', filename)
-        if base_match:
-            base_name = base_match.group(1)
-            # Search for any files starting with this base name
-            if os.path.exists(comfy_output_dir):
-                for file in os.listdir(comfy_output_dir):
-                    if file.startswith(base_name) and file.endswith('.mp4'):
-                        found_path = os.path.join(comfy_output_dir, file)
-                        logger.info(f"Found video with similar name: {found_path}")
-                        return os.path.abspath(found_path)
-
     # Log the expected path even if not found
     logger.warning(f"Output file not found at any expected path")
     logger.warning(f"  ComfyUI output dir: {comfy_output_dir}")
@@ -0,0 +1,356 @@
+"""
+ComfyUI Event Bus - One long-lived WebSocket per process, dispatched by prompt_id
+
+Opening a WebSocket per prompt (and re-polling /history from inside each
+listener) means connection churn and duplicate polling when dozens of shots are
+in flight. The event bus keeps a single connection to ComfyUI's /ws endpoint on
+a background thread and routes `executing`, `progress`, `execution_success`,
+`execution_error` and `execution_interrupted` events to subscribers keyed by
+prompt_id, and tracks queue depth from `status` broadcasts so callers can wait
+for an idle queue without polling. It reconnects automatically and, after a
+drop, resyncs subscribed prompts via /history and /queue so no completion is
+missed.
+
+ComfyUI only sends execution events to the WebSocket whose clientId submitted
+the prompt, so prompts must be submitted with get_client_id().
+"""
+import json
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import config
+from core.http_client import get_session
+from core.logger_config import get_logger
+
+
+# Get logger for ComfyUI event bus
+logger = get_logger(__name__)
+
+# Per-process client id shared by submissions and the event bus connection
+_client_id = str(uuid.uuid4())
+
+# Global event bus instances, one per ComfyUI backend URL
+_event_buses = {}
+_event_bus_lock = threading.Lock()
+
+
+def get_client_id() -> str:
+    """Client id to send with every /prompt submission from this process."""
+    return _client_id
+
+
+class PromptSubscription:
+    """Completion state and progress routing for a single prompt_id"""
+
+    def __init__(self, prompt_id: str, progress_callback: Callable = None):
+        self.prompt_id = prompt_id
+        self.progress_callback = progress_callback
+        self.started_at: Optional[float] = None
+        self.status: Optional[str] = None  # "success", "error" or "interrupted"
+        self.error: Optional[str] = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the prompt finishes. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def mark_started(self):
+        if self.started_at is None:
+            self.started_at = time.time()
+
+    def mark_done(self, status: str, error: str = None):
+        if self._done.is_set():
+            return
+        self.status = status
+        self.error = error
+        self._done.set()
+
+    def report_progress(self, value, max_value):
+        if self.progress_callback:
+            try:
+                self.progress_callback(value, max_value)
+            except Exception as e:
+                logger.debug(f"Progress callback for {self.prompt_id} failed: {e}")
+
+
+class ComfyEventBus:
+    """
+    Shared WebSocket connection to ComfyUI with prompt_id dispatch.
+
+    Usage:
+        bus = get_event_bus()
+        sub = bus.subscribe(prompt_id, progress_callback=on_progress)
+        try:
+            sub.wait(timeout)
+        finally:
+            bus.unsubscribe(sub)
+    """
+
+    def __init__(self, comfy_url: str = None, client_id: str = None, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0):
+        self.comfy_url = comfy_url or config.COMFY_URL
+        self.client_id = client_id or get_client_id()
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._subscriptions: Dict[str, List[PromptSubscription]] = {}
+        self._lock = threading.Lock()
+        self._connected = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Prompt currently executing on the node, for progress events without prompt_id
+        self.executing_prompt_id: Optional[str] = None
+        self.reconnects = 0
+
+        # Queue depth from ComfyUI `status` broadcasts (None until the first one arrives)
+        self.queue_remaining: Optional[int] = None
+        self._idle = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def ws_url(self) -> str:
+        parsed_url = urlparse(self.comfy_url)
+        scheme = "wss" if parsed_url.scheme == "https" else "ws"
+        return f"{scheme}://{parsed_url.netloc}/ws?clientId={self.client_id}"
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def start(self):
+        """Start the background listener thread (idempotent)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="comfy-event-bus", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the listener thread."""
+        self._stopped.set()
+        self._connected.clear()
+
+    def wait_until_connected(self, timeout: float = 5.0) -> bool:
+        """Start the bus if needed and wait for the WebSocket to come up."""
+        self.start()
+        return self._connected.wait(timeout)
+
+    def wait_until_idle(self, timeout: float = None) -> bool:
+        """
+        Block until ComfyUI reports an empty queue.
+
+        Returns False on timeout. Callers should check `connected` first; while
+        the socket is down the queue state is unknown.
+        """
+        self.start()
+        return self._idle.wait(timeout)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+    def subscribe(self, prompt_id: str, progress_callback: Callable = None) -> PromptSubscription:
+        """Register interest in a prompt's events."""
+        sub = PromptSubscription(prompt_id, progress_callback)
+        with self._lock:
+            self._subscriptions.setdefault(prompt_id, []).append(sub)
+        if self.executing_prompt_id == prompt_id:
+            sub.mark_started()
+        self.start()
+        return sub
+
+    def unsubscribe(self, sub: PromptSubscription):
+        with self._lock:
+            subs = self._subscriptions.get(sub.prompt_id, [])
+            if sub in subs:
+                subs.remove(sub)
+            if not subs:
+                self._subscriptions.pop(sub.prompt_id, None)
+
+    def _subscribers(self, prompt_id: str) -> List[PromptSubscription]:
+        with self._lock:
+            return list(self._subscriptions.get(prompt_id, []))
+
+    def _finish(self, prompt_id: str, status: str, error: str = None):
+        for sub in self._subscribers(prompt_id):
+            sub.mark_done(status, error)
+
+    # ------------------------------------------------------------------
+    # Event dispatch
+    # ------------------------------------------------------------------
+    def dispatch(self, message: dict):
+        """Route a decoded ComfyUI WebSocket message to its subscribers."""
+        msg_type = message.get("type")
+        data = message.get("data", {}) or {}
+        prompt_id = data.get("prompt_id")
+
+        if msg_type == "status":
+            exec_info = (data.get("status") or {}).get("exec_info") or {}
+            if "queue_remaining" in exec_info:
+                self.queue_remaining = exec_info["queue_remaining"]
+                if self.queue_remaining == 0:
+                    self._idle.set()
+                else:
+                    self._idle.clear()
+
+        elif msg_type in ("execution_start", "execution_cached"):
+            if prompt_id:
+                self.executing_prompt_id = prompt_id
+                for sub in self._subscribers(prompt_id):
+                    sub.mark_started()
+
+        elif msg_type == "executing":
+            node = data.get("node")
+            if prompt_id:
+                if node is None:
+                    # Prompt finished executing
+                    if self.executing_prompt_id == prompt_id:
+                        self.executing_prompt_id = None
+                    for sub in self._subscribers(prompt_id):
+                        sub.report_progress(100, 100)
+                    self._finish(prompt_id, "success")
+                else:
+                    self.executing_prompt_id = prompt_id
+                    for sub in self._subscribers(prompt_id):
+                        sub.mark_started()
+
+        elif msg_type == "progress":
+            # Progress messages in newer ComfyUI versions include prompt_id,
+            # older ones rely on the last `executing` event
+            target = prompt_id or self.executing_prompt_id
+            if target:
+                for sub in self._subscribers(target):
+                    sub.report_progress(data.get("value", 0), data.get("max", 0))
+
+        elif msg_type == "execution_success":
+            if prompt_id:
+                self._finish(prompt_id, "success")
+
+        elif msg_type == "execution_error":
+            if prompt_id:
+                error = data.get("exception_message") or "Unknown error"
+                node_type = data.get("node_type")
+                if node_type:
+                    error = f"{node_type}: {error}"
+                self._finish(prompt_id, "error", f"ComfyUI error: {error}")
+
+        elif msg_type == "execution_interrupted":
+            if prompt_id:
+                self._finish(prompt_id, "interrupted", f"Prompt {prompt_id} was interrupted.")
+
+    def resync(self):
+        """
+        Reconcile subscribed prompts with ComfyUI after a (re)connect.
+
+        Events sent while the socket was down are lost, so each pending prompt
+        is looked up in /history (finished) and /queue (still waiting).
+        """
+        with self._lock:
+            pending = [pid for pid, subs in self._subscriptions.items() if any(not s.done for s in subs)]
+        if not pending:
+            return
+
+        logger.info(f"Resyncing {len(pending)} pending prompt(s) after WebSocket connect")
+
+        try:
+            r = get_session("probe").get(f"{self.comfy_url}/queue", timeout=5)
+            queue_data = r.json() if r.status_code == 200 else {}
+        except Exception as e:
+            logger.debug(f"Queue resync failed: {e}")
+            return
+
+        queued_ids = set()
+        for item in queue_data.get("queue_running", []) + queue_data.get("queue_pending", []):
+            if len(item) > 1:
+                queued_ids.add(item[1])
+        for item in queue_data.get("queue_running", []):
+            if len(item) > 1:
+                self.executing_prompt_id = item[1]
+
+        for prompt_id in pending:
+            if prompt_id in queued_ids:
+                continue
+            try:
+                r = get_session("probe").get(f"{self.comfy_url}/history/{prompt_id}", timeout=5)
+                history = r.json() if r.status_code == 200 else {}
+            except Exception as e:
+                logger.debug(f"History resync for {prompt_id} failed: {e}")
+                continue
+
+            if prompt_id in history:
+                status = history[prompt_id].get("status", {})
+                if status.get("status_str") == "error" or status.get("status") == "error":
+                    self._finish(prompt_id, "error", "ComfyUI error (found during resync)")
+                else:
+                    self._finish(prompt_id, "success")
+            else:
+                self._finish(prompt_id, "error", f"Prompt {prompt_id} was canceled or removed from queue.")
+
+    # ------------------------------------------------------------------
+    # Background connection
+    # ------------------------------------------------------------------
+    def _run(self):
+        import asyncio
+        try:
+            asyncio.run(self._listen_forever())
+        except Exception as e:
+            logger.error(f"ComfyUI event bus stopped: {e}")
+        finally:
+            self._connected.clear()
+
+    async def _listen_forever(self):
+        import asyncio
+        import websockets
+
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            try:
+                async with websockets.connect(self.ws_url, max_size=None) as websocket:
+                    logger.info(f"ComfyUI event bus connected: {self.ws_url}")
+                    self._connected.set()
+                    delay = self.reconnect_delay
+                    await asyncio.to_thread(self.resync)
+
+                    while not self._stopped.is_set():
+                        try:
+                            message_raw = await asyncio.wait_for(websocket.recv(), timeout=1.0)
+                        except asyncio.TimeoutError:
+                            continue
+                        # Binary frames are preview images; only JSON text frames carry events
+                        if isinstance(message_raw, bytes):
+                            continue
+                        try:
+                            self.dispatch(json.loads(message_raw))
+                        except json.JSONDecodeError:
+                            continue
+            except Exception as e:
+                if self._stopped.is_set():
+                    break
+                self._connected.clear()
+                self._idle.clear()
+                self.queue_remaining = None
+                self.reconnects += 1
+                logger.warning(f"ComfyUI event bus disconnected ({e}), reconnecting in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+        self._connected.clear()
+
+
+def get_event_bus(comfy_url: str = None) -> ComfyEventBus:
+    """Get the global ComfyUI event bus instance for a backend (default: COMFY_URL)."""
+    comfy_url = (comfy_url or config.COMFY_URL).rstrip('/')
+    with _event_bus_lock:
+        if comfy_url not in _event_buses:
+            _event_buses[comfy_url] = ComfyEventBus(comfy_url=comfy_url)
+        return _event_buses[comfy_url]
@@ -0,0 +1,272 @@
+"""
+ComfyUI Backend Pool - Route prompts across several ComfyUI nodes
+
+config.COMFY_URLS lists every ComfyUI server available to this process. The pool
+tracks each node's queue depth (/queue) and health (/system_stats), sends each
+new prompt to the least-loaded healthy node, and remembers which node a
+prompt_id was submitted to so completion waits and output retrieval go back to
+the node that rendered it.
+
+Nodes can be dedicated to one model family with COMFY_NODE_ROLES (see
+core/stage_scheduler.py); acquire(stage=...) then keeps Flux image prompts and
+Wan video prompts on their own nodes, and otherwise prefers a node that last
+ran the same stage so its loaded model can be reused.
+
+With a single URL the pool behaves exactly like the old hard-coded COMFY_URL.
+"""
+import functools
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import config
+from core.http_client import get_session
+from core.logger_config import get_logger
+
+
+# Get logger for backend pool
+logger = get_logger(__name__)
+
+# Global pool instance
+_backend_pool = None
+_backend_pool_lock = threading.Lock()
+
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "0.0.0.0", "::1")
+
+
+@functools.lru_cache(maxsize=1)
+def _own_host_names() -> frozenset:
+    """Hostnames and addresses of this machine (resolved once)."""
+    names = {socket.gethostname().lower(), socket.getfqdn().lower()}
+    for name in list(names):
+        try:
+            names.update(socket.gethostbyname_ex(name)[2])
+        except OSError:
+            pass
+    return frozenset(n for n in names if n)
+
+
+def is_local_url(url: str) -> bool:
+    """
+    True if the ComfyUI node at url shares this machine's filesystem.
+
+    URLs listed in COMFY_LOCAL_URLS are trusted as-is (e.g. a node on shared
+    storage); otherwise the hostname must be a loopback address or one of
+    this machine's own names/addresses.
+    """
+    url = url.rstrip('/')
+    if url in getattr(config, 'COMFY_LOCAL_URLS', []):
+        return True
+    host = (urlparse(url).hostname or "").lower()
+    if not host:
+        return False
+    if host in LOCAL_HOSTS or host.startswith("127."):
+        return True
+    return host in _own_host_names()
+
+
+@dataclass
+class ComfyBackend:
+    """Health and load snapshot for one ComfyUI node"""
+    url: str
+    healthy: bool = True
+    queue_running: int = 0
+    queue_pending: int = 0
+    submitted_since_refresh: int = 0  # Prompts we sent after the last /queue snapshot
+    vram_free: Optional[int] = None
+    last_refresh: float = 0.0
+    last_error: Optional[str] = None
+    total_submitted: int = 0
+    role: str = "any"  # "image", "video" or "any" (COMFY_NODE_ROLES)
+    last_stage: Optional[str] = None  # Stage of the last prompt we sent
+    stage_swaps: int = 0  # Times consecutive prompts switched model family
+
+    def serves(self, stage: Optional[str]) -> bool:
+        return stage is None or self.role in ("any", stage)
+
+    @property
+    def load(self) -> int:
+        return self.queue_running + self.queue_pending + self.submitted_since_refresh
+
+    @property
+    def is_local(self) -> bool:
+        """True if this node writes to the local filesystem (COMFY_OUTPUT_DIR)"""
+        return is_local_url(self.url)
+
+
+class ComfyBackendPool:
+    """
+    Least-loaded scheduling over a list of ComfyUI URLs.
+
+    Usage:
+        pool = get_backend_pool()
+        backend = pool.acquire()
+        ... POST /prompt to backend.url ...
+        pool.record_submit(backend, prompt_id)
+        url = pool.url_for(prompt_id)  # later: /history, /view, WebSocket
+    """
+
+    def __init__(self, urls: List[str] = None, refresh_interval: float = None):
+        from core.stage_scheduler import parse_node_roles
+
+        urls = urls or getattr(config, 'COMFY_URLS', None) or [config.COMFY_URL]
+        roles = parse_node_roles(getattr(config, 'COMFY_NODE_ROLES', ''))
+        self.backends: List[ComfyBackend] = [
+            ComfyBackend(url=u.rstrip('/'), role=roles.get(u.rstrip('/'), "any")) for u in urls
+        ]
+        self.refresh_interval = refresh_interval if refresh_interval is not None else \
+            getattr(config, 'COMFY_POOL_REFRESH_INTERVAL', 2.0)
+        self._prompt_backends: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.backends)
+
+    @property
+    def urls(self) -> List[str]:
+        return [b.url for b in self.backends]
+
+    def capacity(self, per_backend: int = 1, stage: str = None) -> int:
+        """Number of prompts worth keeping in flight across the pool (or the nodes serving stage)."""
+        serving = [b for b in self.backends if b.serves(stage)] or self.backends
+        return max(1, per_backend) * len(serving)
+
+    def has_dedicated_stages(self) -> bool:
+        """True if both model families have at least one node reserved for them."""
+        roles = {b.role for b in self.backends}
+        return "image" in roles and "video" in roles
+
+    # ------------------------------------------------------------------
+    # Health / load tracking
+    # ------------------------------------------------------------------
+    def refresh_backend(self, backend: ComfyBackend):
+        """Update queue depth and health for one node."""
+        try:
+            r = get_session("probe").get(f"{backend.url}/queue", timeout=2)
+            r.raise_for_status()
+            queue_data = r.json()
+            running = len(queue_data.get("queue_running", []))
+            pending = len(queue_data.get("queue_pending", []))
+
+            vram_free = None
+            try:
+                stats = get_session("probe").get(f"{backend.url}/system_stats", timeout=2).json()
+                devices = stats.get("devices", [])
+                if devices:
+                    vram_free = devices[0].get("vram_free")
+            except Exception as e:
+                logger.debug(f"system_stats unavailable for {backend.url}: {e}")
+
+            with self._lock:
+                if not backend.healthy:
+                    logger.info(f"ComfyUI backend {backend.url} is back online")
+                backend.queue_running = running
+                backend.queue_pending = pending
+                backend.submitted_since_refresh = 0
+                backend.vram_free = vram_free
+                backend.healthy = True
+                backend.last_error = None
+                backend.last_refresh = time.time()
+        except Exception as e:
+            self.mark_unhealthy(backend, str(e))
+
+    def refresh(self, force: bool = False):
+        """Refresh every node whose snapshot is older than refresh_interval."""
+        now = time.time()
+        stale = [b for b in self.backends if force or now - b.last_refresh >= self.refresh_interval]
+        if len(self.backends) == 1:
+            # Nothing to choose between; skip the extra round trips
+            return
+        for backend in stale:
+            self.refresh_backend(backend)
+
+    def mark_unhealthy(self, backend: ComfyBackend, error: str):
+        with self._lock:
+            if backend.healthy:
+                logger.warning(f"ComfyUI backend {backend.url} marked unhealthy: {error}")
+            backend.healthy = False
+            backend.last_error = error
+            backend.last_refresh = time.time()
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+    def acquire(self, exclude: List[str] = None, stage: str = None) -> ComfyBackend:
+        """
+        Pick the least-loaded healthy node (serving stage, when given).
+
+        Falls back to the least-loaded node overall if none look healthy, so a
+        transient health-check failure never blocks submission entirely.
+        """
+        self.refresh()
+        exclude = exclude or []
+        with self._lock:
+            candidates = [b for b in self.backends if b.url not in exclude]
+            if not candidates:
+                candidates = list(self.backends)
+            candidates = [b for b in candidates if b.serves(stage)] or candidates
+            healthy = [b for b in candidates if b.healthy] or candidates
+            # Prefer lower load, then a node whose loaded model matches, then
+            # more free VRAM, then config order
+            return min(healthy, key=lambda b: (b.load, stage is not None and b.last_stage not in (None, stage),
+                                               -(b.vram_free or 0)))
+
+    def record_submit(self, backend: ComfyBackend, prompt_id: str, stage: str = None):
+        """Pin a submitted prompt to its node and count it against the node's load."""
+        with self._lock:
+            backend.submitted_since_refresh += 1
+            backend.total_submitted += 1
+            if stage:
+                if backend.last_stage and backend.last_stage != stage:
+                    backend.stage_swaps += 1
+                backend.last_stage = stage
+            if prompt_id:
+                self._prompt_backends[prompt_id] = backend.url
+
+    def pin(self, prompt_id: str, url: str):
+        """Pin a prompt submitted by an earlier run (re-attach after a crash)."""
+        with self._lock:
+            self._prompt_backends[prompt_id] = url.rstrip('/')
+
+    def url_for(self, prompt_id: str = None) -> str:
+        """URL of the node a prompt was submitted to (default: first node)."""
+        with self._lock:
+            if prompt_id and prompt_id in self._prompt_backends:
+                return self._prompt_backends[prompt_id]
+        return self.backends[0].url
+
+    def backend_for_url(self, url: str) -> Optional[ComfyBackend]:
+        for backend in self.backends:
+            if backend.url == url:
+                return backend
+        return None
+
+    def stats(self) -> List[dict]:
+        """Snapshot of every node for logging / the web UI."""
+        with self._lock:
+            return [{
+                'url': b.url,
+                'healthy': b.healthy,
+                'queue_running': b.queue_running,
+                'queue_pending': b.queue_pending,
+                'load': b.load,
+                'vram_free': b.vram_free,
+                'total_submitted': b.total_submitted,
+                'role': b.role,
+                'stage_swaps': b.stage_swaps,
+                'last_error': b.last_error,
+            } for b in self.backends]
+
+
+def get_backend_pool() -> ComfyBackendPool:
+    """Get the global ComfyUI backend pool instance."""
+    global _backend_pool
+    with _backend_pool_lock:
+        if _backend_pool is None:
+            _backend_pool = ComfyBackendPool()
+            if len(_backend_pool) > 1:
+                logger.info(f"ComfyUI backend pool: {', '.join(_backend_pool.urls)}")
+        return _backend_pool
@@ -0,0 +1,226 @@
+"""
+ComfyUI Input Uploads - Content-hash-deduplicated /upload/image for LoadImage inputs
+
+compile_workflow() writes the shot image's absolute local path into the
+LoadImage node, which only works when ComfyUI shares our filesystem. Before a
+workflow is submitted, prepare_workflow_inputs() uploads such images through the
+target node's /upload/image endpoint under a content-hash filename and rewrites
+the LoadImage input to that name.
+
+The uploader remembers which hashes each backend already has (persisted in
+COMFY_UPLOAD_REGISTRY), so image variations rendered several times, or
+re-rendered later via regenerate.py, are only sent once per node. Images can
+optionally be downscaled to the video resolution before upload.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+import config
+from core.http_client import get_session
+from core.logger_config import get_logger
+
+
+# Get logger for ComfyUI uploads
+logger = get_logger(__name__)
+
+# Global uploader instance
+_uploader = None
+_uploader_lock = threading.Lock()
+
+
+class InputUploader:
+    """Upload local images to ComfyUI nodes once per content hash."""
+
+    def __init__(self, registry_path: str = None, downscale: bool = None):
+        self.registry_path = registry_path or getattr(config, 'COMFY_UPLOAD_REGISTRY', None)
+        self.downscale = downscale if downscale is not None else getattr(config, 'COMFY_UPLOAD_DOWNSCALE', False)
+
+        # backend url -> names recorded in the registry (from this or earlier runs)
+        self._known: Dict[str, Set[str]] = {}
+        # backend url -> names verified present during this process
+        self._confirmed: Dict[str, Set[str]] = {}
+        # (path, mtime, size, downscale) -> upload name, so unchanged files are hashed once
+        self._names: Dict[Tuple, str] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self.uploads = 0
+        self.reused = 0
+        self.bytes_sent = 0
+
+        self._load_registry()
+
+    # ------------------------------------------------------------------
+    # Registry persistence
+    # ------------------------------------------------------------------
+    def _load_registry(self):
+        if not self.registry_path or not os.path.exists(self.registry_path):
+            return
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._known = {url: set(names) for url, names in data.items()}
+        except Exception as e:
+            logger.warning(f"Could not read upload registry {self.registry_path}: {e}")
+
+    def _save_registry(self):
+        if not self.registry_path:
+            return
+        with self._lock:
+            data = {url: sorted(names) for url, names in self._known.items()}
+        try:
+            os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
+            tmp_path = self.registry_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.registry_path)
+        except Exception as e:
+            logger.warning(f"Could not write upload registry {self.registry_path}: {e}")
+
+    # ------------------------------------------------------------------
+    # Content preparation
+    # ------------------------------------------------------------------
+    def _target_size(self) -> Optional[Tuple[int, int]]:
+        if not self.downscale:
+            return None
+        return config.calculate_video_dimensions()
+
+    def _read_payload(self, image_path: str) -> Tuple[bytes, str]:
+        """Return (bytes to upload, file extension), downscaled if enabled and larger than the video."""
+        target = self._target_size()
+        if target:
+            from PIL import Image
+            with Image.open(image_path) as img:
+                if img.width > target[0] or img.height > target[1]:
+                    img.thumbnail(target, Image.LANCZOS)
+                    buffer = io.BytesIO()
+                    img.save(buffer, format="PNG")
+                    return buffer.getvalue(), ".png"
+
+        with open(image_path, 'rb') as f:
+            return f.read(), os.path.splitext(image_path)[1].lower() or ".png"
+
+    def upload_name(self, image_path: str) -> str:
+        """Content-hash filename this image is (or will be) stored under on ComfyUI."""
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size, self._target_size())
+        with self._lock:
+            if key in self._names:
+                return self._names[key]
+
+        data, ext = self._read_payload(image_path)
+        name = f"vf_{hashlib.sha256(data).hexdigest()[:32]}{ext}"
+        with self._lock:
+            self._names[key] = name
+        return name
+
+    # ------------------------------------------------------------------
+    # Upload
+    # ------------------------------------------------------------------
+    def _present_on_backend(self, backend_url: str, name: str) -> bool:
+        try:
+            r = get_session("probe").head(f"{backend_url}/view", params={'filename': name, 'type': 'input'}, timeout=5)
+            return r.status_code == 200
+        except Exception:
+            return False
+
+    def _key_lock(self, backend_url: str, name: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault((backend_url, name), threading.Lock())
+
+    def upload(self, image_path: str, backend_url: str) -> str:
+        """
+        Make sure image_path is in the backend's input folder.
+
+        Returns:
+            The filename to put into the LoadImage node
+        """
+        name = self.upload_name(image_path)
+
+        with self._key_lock(backend_url, name):
+            with self._lock:
+                confirmed = name in self._confirmed.get(backend_url, set())
+                known = name in self._known.get(backend_url, set())
+            if confirmed:
+                self.reused += 1
+                return name
+
+            # Recorded by an earlier run: cheap existence check instead of re-sending
+            if known and self._present_on_backend(backend_url, name):
+                with self._lock:
+                    self._confirmed.setdefault(backend_url, set()).add(name)
+                self.reused += 1
+                return name
+
+            data, _ = self._read_payload(image_path)
+            r = get_session().post(
+                f"{backend_url}/upload/image",
+                files={'image': (name, data)},
+                data={'type': 'input', 'overwrite': 'true'},
+                timeout=60
+            )
+            r.raise_for_status()
+            result = r.json()
+            uploaded = result.get('name', name)
+            if result.get('subfolder'):
+                uploaded = f"{result['subfolder']}/{uploaded}"
+
+            with self._lock:
+                self._confirmed.setdefault(backend_url, set()).add(name)
+                self._known.setdefault(backend_url, set()).add(name)
+                self.uploads += 1
+                self.bytes_sent += len(data)
+            self._save_registry()
+
+            logger.info(f"Uploaded {os.path.basename(image_path)} to {backend_url} as {uploaded} ({len(data):,} bytes)")
+            return uploaded
+
+    def stats(self) -> dict:
+        return {'uploads': self.uploads, 'reused': self.reused, 'bytes_sent': self.bytes_sent}
+
+
+def get_uploader() -> InputUploader:
+    """Get the global input uploader instance."""
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None:
+            _uploader = InputUploader()
+        return _uploader
+
+
+def prepare_workflow_inputs(workflow: dict, backend) -> dict:
+    """
+    Upload local LoadImage inputs to the backend and point the nodes at them.
+
+    COMFY_UPLOAD_INPUTS controls when this happens: "always", "remote" (only
+    for nodes that do not share our filesystem) or "never".
+
+    Args:
+        workflow: API-format workflow (not modified)
+        backend: ComfyBackend the workflow is about to be submitted to
+
+    Returns:
+        The workflow to submit (a shallow copy if any node was rewritten)
+    """
+    mode = getattr(config, 'COMFY_UPLOAD_INPUTS', 'remote')
+    if mode == 'never' or (mode == 'remote' and backend.is_local):
+        return workflow
+
+    result = workflow
+    for node_id, node in workflow.items():
+        if not isinstance(node, dict) or node.get('class_type') != 'LoadImage':
+            continue
+        image = node.get('inputs', {}).get('image')
+        if not isinstance(image, str) or not os.path.isabs(image) or not os.path.exists(image):
+            continue
+
+        uploaded = get_uploader().upload(image, backend.url)
+        if result is workflow:
+            result = dict(workflow)
+        result[node_id] = {**node, 'inputs': {**node['inputs'], 'image': uploaded}}
+
+    return result
@@ -2,13 +2,13 @@
 ComfyUI Image Generation Module
 Generates images using ComfyUI workflows (SDXL, Flux, etc.)
 """
-import requests
 import json
 import copy
 import config
 import os
 import time
 import uuid
+from core.http_client import get_session
 from core.logger_config import get_logger
 
 # Get logger for ComfyUI image generation
@@ -64,43 +64,16 @@ def generate_image_comfyui(prompt: str, output_path: str, negative_prompt: str =
         logger.info(f"Using workflow: {workflow_name} ({workflow_config.get('description', 'No description')})")
         logger.debug(f"Workflow file: {workflow_path}")
 
-        # Load the image generation workflow
-        with open(workflow_path, 'r', encoding='utf-8') as f:
-            workflow = json.load(f)
-
         # Get dimensions from config
         width, height = config.calculate_image_dimensions()
 
-        # Inject prompts into the workflow
-        # The workflow structure needs to be converted to API format
-        api_format = _convert_workflow_to_api_format(workflow, width=width, height=height)
-
-        # If it was already in API format, we still need to inject dimensions into specific nodes
-        if "nodes" not in workflow:
-            # Detect Flux v1 workflows and clamp width to 1536
-            node_classes = {nd.get("class_type", "") for nd in api_format.values()}
-            is_flux_v1 = ("ModelSamplingFlux" in node_classes or "EmptySD3LatentImage" in node_classes) \
-                         and "EmptyFlux2LatentImage" not in node_classes \
-                         and "Flux2Scheduler" not in node_classes
-            if is_flux_v1 and width > 1536:
-                logger.info(f"Flux v1 detected: clamping width from {width} to 1536")
-                height = int(height * (1536 / width))
-                width = 1536
-
-            for node_id, node_data in api_format.items():
-                class_type = node_data.get("class_type", "")
-                if class_type == "EmptySD3LatentImage":
-                    node_data["inputs"]["width"] = width
-                    node_data["inputs"]["height"] = height
-                elif class_type == "ModelSamplingFlux":
-                    node_data["inputs"]["width"] = width
-                    node_data["inputs"]["height"] = height
-                elif class_type == "EmptyFlux2LatentImage":
-                    node_data["inputs"]["width"] = width
-                    node_data["inputs"]["height"] = height
-                elif class_type == "Flux2Scheduler":
-                    node_data["inputs"]["width"] = width
-                    node_data["inputs"]["height"] = height
+        # Converted template is cached per file and size (core/template_cache.py)
+        from core.template_cache import get_template_cache, nodes_by_class
+        template = get_template_cache().get(
+            workflow_path, ("image", width, height),
+            lambda: _build_image_template(workflow_path, width, height)
+        )
+        api_format = copy.deepcopy(template)
 
         # Set the text prompts using workflow-specific node IDs
         if text_node_id and text_node_id in api_format:
@@ -112,14 +85,12 @@ def generate_image_comfyui(prompt: str, output_path: str, negative_prompt: str =
         # Set random seed if provided
         if seed is not None:
             # Find KSampler or RandomNoise node to set seed
-            for node_id, node_data in api_format.items():
-                class_type = node_data.get("class_type", "")
-                if class_type in ["KSampler", "KSamplerAdvanced"]:
-                    if "seed" in node_data.get("inputs", {}):
-                        api_format[node_id]["inputs"]["seed"] = seed
-                elif class_type == "RandomNoise":
-                    if "noise_seed" in node_data.get("inputs", {}):
-                        api_format[node_id]["inputs"]["noise_seed"] = seed
+            for node_id in nodes_by_class(api_format, "KSampler", "KSamplerAdvanced"):
+                if "seed" in api_format[node_id].get("inputs", {}):
+                    api_format[node_id]["inputs"]["seed"] = seed
+            for node_id in nodes_by_class(api_format, "RandomNoise"):
+                if "noise_seed" in api_format[node_id].get("inputs", {}):
+                    api_format[node_id]["inputs"]["noise_seed"] = seed
 
         # Set output filename for SaveImage node using workflow-specific node ID
         actual_prefix = ""
@@ -134,21 +105,24 @@ def generate_image_comfyui(prompt: str, output_path: str, negative_prompt: str =
             actual_prefix = f"{unique_id}_{base_name}"
             api_format[save_node_id]["inputs"]["filename_prefix"] = actual_prefix
 
-        # Submit to ComfyUI
-        payload = {
-            "prompt": api_format
-        }
-
-        response = requests.post(
-            f"{config.COMFY_URL}/prompt",
-            json=payload
-        )
-
-        if response.status_code != 200:
-            logger.error(f"ComfyUI returned status {response.status_code}: {response.text}")
+        # Identical workflow rendered before: reuse the cached image instead of the GPU.
+        # Images are copied rather than hardlinked since shot images get rewritten in place.
+        from core.prompt_compiler import workflow_hash
+        from core.render_cache import get_render_cache
+        cache = get_render_cache()
+        cache_key = workflow_hash(api_format) if cache else None
+        if cache and cache.materialize(cache_key, output_path, link=False):
+            logger.info(f"Reused cached image for identical workflow {cache_key[:12]}: {output_path}")
+            return output_path
+
+        # Submit to the least-loaded ComfyUI node (see core/comfy_pool.py)
+        from core.comfy_client import submit
+        try:
+            result = submit(api_format, stage="image")
+        except Exception as e:
+            logger.error(f"ComfyUI submission failed: {e}")
             return None
 
-        result = response.json()
         prompt_id = result.get("prompt_id")
 
         if not prompt_id:
@@ -156,7 +130,10 @@ def generate_image_comfyui(prompt: str, output_path: str, negative_prompt: str =
             return None
 
         # Wait for completion and get the result
-        return _wait_for_image(prompt_id, output_path, progress_callback=progress_callback)
+        image_path = _wait_for_image(prompt_id, output_path, progress_callback=progress_callback)
+        if image_path and cache:
+            cache.put(cache_key, image_path, link=False)
+        return image_path
 
     except Exception as e:
         logger.error(f"ComfyUI image generation failed: {e}")
@@ -165,6 +142,46 @@ def generate_image_comfyui(prompt: str, output_path: str, negative_prompt: str =
         return None
 
 
+def _build_image_template(workflow_path, width, height):
+    """Load an image workflow file and convert it to API format at the given size."""
+    # Load the image generation workflow
+    with open(workflow_path, 'r', encoding='utf-8') as f:
+        workflow = json.load(f)
+
+    # Inject prompts into the workflow
+    # The workflow structure needs to be converted to API format
+    api_format = _convert_workflow_to_api_format(workflow, width=width, height=height)
+
+    # If it was already in API format, we still need to inject dimensions into specific nodes
+    if "nodes" not in workflow:
+        # Detect Flux v1 workflows and clamp width to 1536
+        node_classes = {nd.get("class_type", "") for nd in api_format.values()}
+        is_flux_v1 = ("ModelSamplingFlux" in node_classes or "EmptySD3LatentImage" in node_classes) \
+                     and "EmptyFlux2LatentImage" not in node_classes \
+                     and "Flux2Scheduler" not in node_classes
+        if is_flux_v1 and width > 1536:
+            logger.info(f"Flux v1 detected: clamping width from {width} to 1536")
+            height = int(height * (1536 / width))
+            width = 1536
+
+        for node_id, node_data in api_format.items():
+            class_type = node_data.get("class_type", "")
+            if class_type == "EmptySD3LatentImage":
+                node_data["inputs"]["width"] = width
+                node_data["inputs"]["height"] = height
+            elif class_type == "ModelSamplingFlux":
+                node_data["inputs"]["width"] = width
+                node_data["inputs"]["height"] = height
+            elif class_type == "EmptyFlux2LatentImage":
+                node_data["inputs"]["width"] = width
+                node_data["inputs"]["height"] = height
+            elif class_type == "Flux2Scheduler":
+                node_data["inputs"]["width"] = width
+                node_data["inputs"]["height"] = height
+
+    return api_format
+
+
 def _convert_workflow_to_api_format(workflow, width=None, height=None):
     """
     Convert ComfyUI workflow from UI format to API format.
@@ -292,8 +309,9 @@ def _convert_workflow_to_api_format(workflow, width=None, height=None):
 
 def _wait_for_image(prompt_id, output_path, timeout=300, progress_callback=None):
     """Wait for ComfyUI to finish generating the image"""
-    import shutil
-    from core.comfy_client import get_output_file_path, get_comfyui_output_directory, wait_for_prompt_completion_with_progress
+    from core.materialize import materialize_file
+    from core.comfy_client import fetch_output, get_comfyui_output_directory, get_prompt_url, wait_for_prompt_completion_with_progress
+    from core.comfy_pool import get_backend_pool
 
     if progress_callback:
         wait_result = wait_for_prompt_completion_with_progress(prompt_id, progress_callback=progress_callback, timeout=timeout)
@@ -307,9 +325,14 @@ def _wait_for_image(prompt_id, output_path, timeout=300, progress_callback=None)
 
     logger.debug(f"Prompt {prompt_id} wait success, extracting results...")
 
+    # Outputs live on the node that rendered the prompt
+    base_url = get_prompt_url(prompt_id)
+    backend = get_backend_pool().backend_for_url(base_url)
+    is_local = backend is None or backend.is_local
+
     # Get the history to extract outputs
     try:
-        response = requests.get(f"{config.COMFY_URL}/history/{prompt_id}", timeout=10)
+        response = get_session("probe").get(f"{base_url}/history/{prompt_id}", timeout=10)
         if response.status_code != 200:
             logger.error(f"Failed to get history for prompt {prompt_id}")
             return None
@@ -341,7 +364,7 @@ def _wait_for_image(prompt_id, output_path, timeout=300, progress_callback=None)
 
         # STEP 1: Try to get the file via local filesystem if possible (faster/more reliable)
         try:
-            comfy_output_dir = get_comfyui_output_directory()
+            comfy_output_dir = get_comfyui_output_directory() if is_local else None
             if comfy_output_dir:
                 if subfolder:
                     local_source = os.path.join(comfy_output_dir, subfolder, image_filename)
@@ -349,29 +372,20 @@ def _wait_for_image(prompt_id, output_path, timeout=300, progress_callback=None)
                     local_source = os.path.join(comfy_output_dir, image_filename)
                 
                 if os.path.exists(local_source):
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    shutil.copy2(local_source, output_path)
+                    # Reflink or copy; never a hardlink, images may be rewritten in place
+                    materialize_file(local_source, output_path, link=False)
                     logger.info(f"Retrieved image from local filesystem: {output_path}")
                     return output_path
         except Exception as e:
             logger.debug(f"Failed to retrieve image via local filesystem: {e}")
 
-        # STEP 2: Fallback to /view API if local retrieval failed
-        try:
-            if subfolder:
-                url = f"{config.COMFY_URL}/view?filename={image_filename}&subfolder={subfolder}&type=output"
-            else:
-                url = f"{config.COMFY_URL}/view?filename={image_filename}&type=output"
-
-            img_response = requests.get(url, timeout=30)
-            if img_response.status_code == 200:
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                with open(output_path, 'wb') as f:
-                    f.write(img_response.content)
-                logger.info(f"Retrieved image from API: {output_path}")
-                return output_path
-        except Exception as e:
-            logger.error(f"Error during API image download: {e}")
+        # STEP 2: Fallback to streaming from the node's /view API
+        fetch = fetch_output({'filename': image_filename, 'subfolder': subfolder, 'backend': base_url}, output_path,
+                             link=False)
+        if fetch['success']:
+            logger.info(f"Retrieved image from API: {output_path}")
+            return output_path
+        logger.error(f"Error during API image download: {fetch['error']}")
 
     except Exception as e:
         logger.error(f"Error retrieving image: {e}")
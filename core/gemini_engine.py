@@ -2,9 +2,9 @@
 Gemini Text Generation Engine
 Replaces OpenAI for all text generation tasks
 """
-import google.genai as genai
 from google.genai import types  # Recommended for configuration types
 import config
+from core.llm_engine import get_provider
 from core.logger_config import get_logger
 from core.log_decorators import log_api_call
 
@@ -14,12 +14,8 @@ logger = get_logger(__name__)
 
 @log_api_call
 def ask(prompt: str, response_format: str = None) -> str:
-    # Initialize client once with your API key
-    # Use v1alpha for experimental models (like gemini-2.0-flash-exp)
-    client = genai.Client(
-        api_key=config.GEMINI_API_KEY,
-        http_options={'api_version': 'v1alpha'} 
-    )
+    # Shared long-lived client (v1alpha, for experimental models) from the provider registry
+    client = get_provider("gemini").client()
 
     # Use types.GenerateContentConfig for robust configuration
     gen_config = None
@@ -0,0 +1,125 @@
+"""
+Shared HTTP Client - One keep-alive connection pool per host for all outbound calls
+
+Bare requests.get/requests.post opens a new TCP (and TLS) connection for every
+call. ComfyUI polling, output fetches, uploads and the REST LLM providers all go
+through get_session() instead, which returns a process-wide requests.Session
+with:
+
+- keep-alive pools per host (HTTP_POOL_CONNECTIONS hosts, HTTP_POOL_MAXSIZE
+  connections each)
+- a retry policy for idempotent requests (GET/HEAD) on connection errors and
+  502/503/504 responses; POSTs such as /prompt are never retried automatically
+- a default (connect, read) timeout when the caller does not pass one
+
+pool_stats() reports requests vs. new connections per host so connection reuse
+can be checked.
+"""
+import threading
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+from core.logger_config import get_logger
+
+
+# Get logger for the shared HTTP client
+logger = get_logger(__name__)
+
+# Global session instances by name
+_sessions: Dict[str, 'PooledSession'] = {}
+_session_lock = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """requests.Session that applies a default timeout to every request."""
+
+    def __init__(self, default_timeout=None):
+        super().__init__()
+        self.default_timeout = default_timeout
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None and self.default_timeout is not None:
+            kwargs['timeout'] = self.default_timeout
+        return super().request(method, url, **kwargs)
+
+
+def create_session(retries: int = None) -> PooledSession:
+    """Build a session with the configured pool sizes, retry policy and timeouts."""
+    retry = Retry(
+        total=getattr(config, 'HTTP_RETRIES', 3) if retries is None else retries,
+        backoff_factor=getattr(config, 'HTTP_RETRY_BACKOFF', 0.5),
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=getattr(config, 'HTTP_POOL_CONNECTIONS', 10),
+        pool_maxsize=getattr(config, 'HTTP_POOL_MAXSIZE', 32),
+        max_retries=retry,
+    )
+
+    session = PooledSession(default_timeout=(
+        getattr(config, 'HTTP_CONNECT_TIMEOUT', 5),
+        getattr(config, 'HTTP_READ_TIMEOUT', 120),
+    ))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(name: str = "default") -> PooledSession:
+    """
+    Get a process-wide pooled HTTP session.
+
+    "default" retries idempotent requests; "probe" never retries, for health
+    checks and polling loops that have their own retry cadence.
+    """
+    with _session_lock:
+        if name not in _sessions:
+            _sessions[name] = create_session(retries=0 if name == "probe" else None)
+        return _sessions[name]
+
+
+def pool_stats() -> List[Dict]:
+    """
+    Connection reuse per host.
+
+    Returns:
+        List of dicts with 'host', 'requests', 'connections' (new connections
+        opened) and 'reuse' (fraction of requests served on an existing connection)
+    """
+    with _session_lock:
+        sessions = list(_sessions.values())
+
+    totals: Dict[str, List[int]] = {}
+    seen = set()
+    adapters = [adapter for session in sessions for adapter in session.adapters.values()]
+    for adapter in adapters:
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            counts = totals.setdefault(host, [0, 0])
+            counts[0] += getattr(pool, 'num_requests', 0)
+            counts[1] += getattr(pool, 'num_connections', 0)
+
+    return [{
+        'host': host,
+        'requests': num_requests,
+        'connections': num_connections,
+        'reuse': round(1 - num_connections / num_requests, 3) if num_requests else 0.0,
+    } for host, (num_requests, num_connections) in totals.items()]
+
+
+def log_pool_stats():
+    """Write connection reuse per host to the log."""
+    for entry in pool_stats():
+        logger.info(f"HTTP pool {entry['host']}: {entry['requests']} request(s) over "
+                    f"{entry['connections']} connection(s) (reuse {entry['reuse']:.0%})")
@@ -13,6 +13,7 @@ import config
 import os
 import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from core.logger_config import get_logger
 from typing import Optional, Tuple
@@ -185,6 +186,17 @@ def generate_image_variations(prompt: str, output_dir: str, count: int = 1, mode
     return generated_paths
 
 
+def _comfy_image_workers(mode: str) -> int:
+    """Concurrent ComfyUI image requests: one pipeline per node when a pool is configured."""
+    if mode != "comfyui":
+        return 1
+    from core.comfy_pool import get_backend_pool
+    pool = get_backend_pool()
+    if len(pool) <= 1:
+        return 1
+    return pool.capacity(getattr(config, 'RENDER_PIPELINE_DEPTH', 1), stage="image")
+
+
 def generate_images_for_shots(
     shots: list,
     output_dir: str,
@@ -193,7 +205,8 @@ def generate_images_for_shots(
     images_per_shot: int = 1,
     workflow_name: str = None,
     progress_callback=None,
-    retry_tracker=None
+    retry_tracker=None,
+    shot_callback=None
 ) -> Tuple[list, Optional['RetryTracker']]:
     """
     Generate images for all shots in the list, with multiple variations per shot.
@@ -208,6 +221,8 @@ def generate_images_for_shots(
         workflow_name: Workflow name for ComfyUI mode
         progress_callback: Optional callback function(shot_idx, image_path) called after each image generation
         retry_tracker: Optional RetryTracker instance for tracking failures
+        shot_callback: Optional callback function(shot) called as soon as every
+            variation of a shot succeeded in the initial pass (streaming to video)
 
     Returns:
         Tuple of (shots, retry_tracker):
@@ -244,11 +259,41 @@ def generate_images_for_shots(
     if track_retries:
         retry_tracker.summary.total_variations_attempted = total_images
 
+    # Plan every variation up front (seed and filename) so they can be
+    # submitted across all ComfyUI nodes at once when a backend pool is configured
+    plans = []
     for shot in shots:
         # Use the shot's stored index field for consistency
         shot_idx = shot.get('index', shots.index(shot) + 1)
-        image_prompt = shot.get('image_prompt', '')
+        variations = []
+        for variation_idx in range(images_per_shot):
+            # 1st time generation for a shot uses seed 1, next generations use random
+            if variation_idx == 0:
+                seed = 1
+            else:
+                seed = random.randint(0, 2**32 - 1)
 
+            # Generate filename: shot_001_001.png, shot_001_002.png, etc.
+            filename = f"shot_{shot_idx:03d}_{variation_idx + 1:03d}.png"
+            variations.append((variation_idx, seed, os.path.join(output_dir, filename)))
+        plans.append((shot, shot_idx, shot.get('image_prompt', ''), variations))
+
+    workers = _comfy_image_workers(mode)
+    executor = None
+    futures = {}
+    if workers > 1:
+        print(f"[INFO] Distributing images across ComfyUI nodes ({workers} in flight)")
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-gen")
+        for shot, shot_idx, image_prompt, variations in plans:
+            if not image_prompt:
+                continue
+            for variation_idx, seed, output_path in variations:
+                futures[(shot_idx, variation_idx)] = executor.submit(
+                    generate_image, prompt=image_prompt, output_path=output_path,
+                    mode=mode, seed=seed, workflow_name=workflow_name
+                )
+
+    for shot, shot_idx, image_prompt, variations in plans:
         if not image_prompt:
             print(f"[SKIP] Shot {shot_idx}: No image_prompt found, skipping")
             shot['image_paths'] = []
@@ -259,27 +304,20 @@ def generate_images_for_shots(
 
         # Generate multiple variations
         image_paths = []
-        for variation_idx in range(images_per_shot):
-            # 1st time generation for a shot uses seed 1, next generations use random
-            if variation_idx == 0:
-                seed = 1
-            else:
-                seed = random.randint(0, 2**32 - 1)
-
-            # Generate filename: shot_001_001.png, shot_001_002.png, etc.
-            filename = f"shot_{shot_idx:03d}_{variation_idx + 1:03d}.png"
-            output_path = os.path.join(output_dir, filename)
-
+        for variation_idx, seed, output_path in variations:
             print(f"  [{variation_idx + 1}/{images_per_shot}] Generating variation (seed: {seed})...")
 
-            # Generate image
-            image_path = generate_image(
-                prompt=image_prompt,
-                output_path=output_path,
-                mode=mode,
-                seed=seed,
-                workflow_name=workflow_name
-            )
+            # Generate image (or collect the result already rendering on the pool)
+            if executor:
+                image_path = futures[(shot_idx, variation_idx)].result()
+            else:
+                image_path = generate_image(
+                    prompt=image_prompt,
+                    output_path=output_path,
+                    mode=mode,
+                    seed=seed,
+                    workflow_name=workflow_name
+                )
 
             if image_path:
                 image_paths.append(image_path)
@@ -302,9 +340,14 @@ def generate_images_for_shots(
 
         if image_paths:
             print(f"  [SUMMARY] Generated {len(image_paths)}/{images_per_shot} variation(s) for shot {shot_idx}")
+            if shot_callback and len(image_paths) == images_per_shot:
+                shot_callback(shot)
         else:
             print(f"  [SUMMARY] All variations failed for shot {shot_idx}")
 
+    if executor:
+        executor.shutdown()
+
     # =========================================================================
     # PHASE 2: Retry Loop
     # =========================================================================
@@ -0,0 +1,366 @@
+"""
+LLM Cache - On-disk cache of LLM responses
+
+Replanning shots, regenerating a story, re-running tests and retrying after a
+downstream failure send byte-identical prompts to the LLM, each costing
+seconds and tokens. Every provider's ask() (core/llm_engine.py) goes through
+cached_ask(): a response is stored under the hash of provider, model, full
+prompt, response_format and max_tokens, and an identical request is answered
+from disk.
+
+- Responses are zlib-compressed in one SQLite (WAL) file, LLM_CACHE_PATH.
+- The cache is bounded by LLM_CACHE_MAX_BYTES; least recently used entries
+  are evicted first. Entries older than LLM_CACHE_TTL_HOURS (0 = never) miss.
+- JSON requests are only stored when the response contains parseable JSON,
+  so a truncated answer is not replayed on retry.
+- LLM_CACHE_BYPASS (or `with bypass_llm_cache():`) skips lookups but still
+  stores the fresh response.
+- Hits and misses are noted on the @log_api_call record of each call
+  (api_calls.log) and counted in stats(). Streamed requests
+  (LLMProvider.ask_stream, via cached_stream) share the same entries.
+
+Inspect and prune it with:
+    python -m core.llm_cache stats|prune [--max-mb N]|clear
+"""
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+import config
+from core.log_decorators import log_api_call, note_cache_result
+from core.logger_config import get_logger
+
+
+# Get logger for the LLM cache
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key       TEXT PRIMARY KEY,
+    provider  TEXT NOT NULL,
+    model     TEXT NOT NULL,
+    response  BLOB NOT NULL,
+    size      INTEGER NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+"""
+
+# Global cache instance
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+# Per-thread bypass (see bypass_llm_cache)
+_bypass = threading.local()
+
+
+def cache_key(provider: str, model: str, prompt: str, response_format: Optional[str] = None,
+              max_tokens: Optional[int] = None) -> str:
+    """SHA-256 of everything that determines an LLM response."""
+    payload = json.dumps([provider, model, response_format, max_tokens, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _has_json(response: str) -> bool:
+    """Whether response is (or wraps, e.g. in a markdown fence) a complete JSON value."""
+    text = response.strip()
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        return False
+    end = max(text.rfind('}'), text.rfind(']'))
+    for candidate in (text, text[min(starts):end + 1]):
+        try:
+            json.loads(candidate)
+            return True
+        except ValueError:
+            continue
+    return False
+
+
+class LLMCache:
+    """
+    Size-bounded LRU cache of LLM responses (one SQLite connection per thread).
+
+    Usage:
+        cache = get_llm_cache()
+        key = cache_key(provider.name, provider.model, prompt, response_format, max_tokens)
+        response = cache.get(key)
+        if response is None:
+            response = ...  # ask the LLM, then:
+            cache.put(key, response, provider.name, provider.model)
+    """
+
+    def __init__(self, db_path: str = None, max_bytes: int = None, ttl_seconds: float = None):
+        self.db_path = db_path or getattr(config, 'LLM_CACHE_PATH',
+                                          os.path.join(config.OUTPUT_DIR, "llm_cache.db"))
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            getattr(config, 'LLM_CACHE_MAX_BYTES', 256 * 1024 ** 2)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else \
+            getattr(config, 'LLM_CACHE_TTL_HOURS', 168) * 3600
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None (missing or older than the TTL). Counts as a use for LRU."""
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._count(hit=False)
+                return None
+            conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        self._count(hit=True)
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, key: str, response: str, provider: str, model: str) -> bool:
+        """Store a response under key and evict down to max_bytes."""
+        blob = zlib.compress(response.encode('utf-8'))
+        if len(blob) > self.max_bytes:
+            return False
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, response, size, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, provider, model, blob, len(blob), now, now))
+            self._evict(conn, self.max_bytes)
+        return True
+
+    # ------------------------------------------------------------------
+    # Eviction / inspection
+    # ------------------------------------------------------------------
+    def _evict(self, conn: sqlite3.Connection, max_bytes: int) -> int:
+        """Remove expired entries, then least recently used ones until the cache fits in max_bytes."""
+        removed = 0
+        if self.ttl_seconds:
+            removed += conn.execute("DELETE FROM responses WHERE created < ?",
+                                    (time.time() - self.ttl_seconds,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > max_bytes:
+            doomed = []
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                if total <= max_bytes:
+                    break
+                doomed.append((key,))
+                total -= size
+            conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            removed += len(doomed)
+        if removed:
+            logger.info(f"LLM cache evicted {removed} entr{'y' if removed == 1 else 'ies'}")
+        return removed
+
+    def prune(self, max_bytes: int = None) -> int:
+        """Evict expired and LRU entries down to max_bytes (default: LLM_CACHE_MAX_BYTES)."""
+        with self._conn() as conn:
+            return self._evict(conn, self.max_bytes if max_bytes is None else max_bytes)
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number removed."""
+        with self._conn() as conn:
+            return conn.execute("DELETE FROM responses").rowcount
+
+    def stats(self) -> Dict:
+        entries, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            return {
+                'entries': entries,
+                'bytes': total,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def models(self) -> List[Dict]:
+        """Entries, bytes and stored hits per provider and model."""
+        rows = self._conn().execute(
+            "SELECT provider, model, COUNT(*), SUM(size), SUM(hits) FROM responses "
+            "GROUP BY provider, model ORDER BY SUM(size) DESC").fetchall()
+        return [{'provider': provider, 'model': model, 'entries': entries, 'bytes': size, 'hits': hits}
+                for provider, model, entries, size, hits in rows]
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get the global LLM cache instance, or None when LLM_CACHE_ENABLED is off."""
+    global _llm_cache
+    if not getattr(config, 'LLM_CACHE_ENABLED', True):
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache()
+        return _llm_cache
+
+
+@contextlib.contextmanager
+def bypass_llm_cache():
+    """Within this block (on this thread), ask() calls skip the cache lookup but refresh the entry."""
+    previous = getattr(_bypass, 'active', False)
+    _bypass.active = True
+    try:
+        yield
+    finally:
+        _bypass.active = previous
+
+
+def carry_llm_cache_bypass(fn):
+    """Wrap fn so it runs with the calling thread's bypass state (for worker threads)."""
+    if not getattr(_bypass, 'active', False):
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with bypass_llm_cache():
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def _bypassed() -> bool:
+    return getattr(config, 'LLM_CACHE_BYPASS', False) or getattr(_bypass, 'active', False)
+
+
+def _store(cache: LLMCache, key: str, provider, response: str, response_format: Optional[str]):
+    if not response or (response_format == "application/json" and not _has_json(response)):
+        return
+    try:
+        cache.put(key, response, provider.name, provider.model)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not store LLM response in cache: {e}")
+
+
+def cached_ask(ask):
+    """
+    Decorator for LLMProvider.ask: answer identical requests from the LLM cache.
+
+    Usage:
+        class MyProvider(LLMProvider):
+            @cached_ask
+            def ask(self, prompt, response_format=None):
+                ...
+    """
+    @log_api_call
+    def ask_with_cache(provider, prompt: str, response_format: str = None) -> str:
+        cache = get_llm_cache()
+        if cache is None:
+            return ask(provider, prompt, response_format)
+
+        key = cache_key(provider.name, provider.model, prompt, response_format,
+                        getattr(provider, 'max_tokens', None))
+        if not _bypassed():
+            response = cache.get(key)
+            if response is not None:
+                note_cache_result(hit=True)
+                logger.debug(f"LLM cache hit {key[:12]} ({provider.name}, {provider.model})")
+                return response
+        note_cache_result(hit=False)
+
+        response = ask(provider, prompt, response_format)
+        _store(cache, key, provider, response, response_format)
+        return response
+
+    return functools.wraps(ask)(ask_with_cache)
+
+
+@log_api_call
+def cached_stream(provider, stream, prompt: str, response_format: str = None) -> Iterator[str]:
+    """
+    Streaming counterpart of cached_ask, used by LLMProvider.ask_stream.
+
+    A cached response is yielded as one chunk; otherwise the chunks of
+    stream(prompt, response_format) are passed through and the joined
+    response is stored once the stream is complete.
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        yield from stream(prompt, response_format)
+        return
+
+    key = cache_key(provider.name, provider.model, prompt, response_format,
+                    getattr(provider, 'max_tokens', None))
+    if not _bypassed():
+        response = cache.get(key)
+        if response is not None:
+            note_cache_result(hit=True)
+            logger.debug(f"LLM cache hit {key[:12]} ({provider.name}, {provider.model}, streamed)")
+            yield response
+            return
+    note_cache_result(hit=False)
+
+    chunks = []
+    for chunk in stream(prompt, response_format):
+        chunks.append(chunk)
+        yield chunk
+    _store(cache, key, provider, "".join(chunks), response_format)
+
+
+def _format_bytes(num_bytes: int) -> str:
+    return f"{num_bytes / 1024 ** 2:,.1f} MB"
+
+
+def main(argv=None):
+    """Command line entry point: python -m core.llm_cache <command>"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect and prune the LLM response cache")
+    parser.add_argument("command", choices=["stats", "prune", "clear"])
+    parser.add_argument("--max-mb", type=float, default=None,
+                        help="Size to prune down to (default: LLM_CACHE_MAX_BYTES)")
+    args = parser.parse_args(argv)
+
+    cache = LLMCache()
+
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"[LLM CACHE] {cache.db_path}")
+        print(f"            {stats['entries']} responses, {_format_bytes(stats['bytes'])} "
+              f"of {_format_bytes(stats['max_bytes'])}")
+        for entry in cache.models():
+            print(f"            {entry['provider']} {entry['model']}: {entry['entries']} responses, "
+                  f"{_format_bytes(entry['bytes'])}, {entry['hits']} hit(s)")
+    elif args.command == "prune":
+        max_bytes = int(args.max_mb * 1024 ** 2) if args.max_mb is not None else None
+        removed = cache.prune(max_bytes)
+        print(f"[LLM CACHE] Pruned {removed} responses, {_format_bytes(cache.stats()['bytes'])} remaining")
+    elif args.command == "clear":
+        print(f"[LLM CACHE] Removed {cache.clear()} responses")
+
+
+if __name__ == "__main__":
+    main()
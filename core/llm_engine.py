@@ -1,22 +1,62 @@
 """
 LLM Provider Base Classes
 Abstract base class for all LLM providers (Gemini, OpenAI, Z.AI, Qwen, Kimi K2 2.5)
+
+get_provider() keeps one provider per (provider, model, endpoint) for the
+life of the process. SDK clients (Gemini, OpenAI) are created once on first
+use and shared by all threads; REST providers use the pooled sessions from
+core/http_client.py. warm_up_provider() pays the client and connection setup
+at startup, and provider_stats() reports latency per provider. Identical
+requests are answered from the on-disk response cache (core/llm_cache.py).
+ask_stream() yields the response as the model writes it, for providers that
+support streaming (Gemini, Z.AI, Ollama, LM Studio).
 """
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
+import json
 import logging
+import threading
 import time
-import requests
 import config
 import os
+from core.http_client import get_session
+from core.llm_cache import cached_ask, cached_stream
 
 # Get logger for provider operations
 logger = logging.getLogger(__name__)
 
 
+# Providers kept for the life of the process, keyed by name and settings
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def _iter_chat_deltas(response) -> Iterator[str]:
+    """Text deltas of an OpenAI-compatible chat completion stream (server-sent events)."""
+    for line in response.iter_lines():
+        line = line.decode('utf-8') if isinstance(line, bytes) else line
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        choices = json.loads(data).get("choices") or [{}]
+        content = (choices[0].get("delta") or {}).get("content")
+        if content:
+            yield content
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers"""
 
+    def __init__(self):
+        self._client = None
+        self._client_ready = False
+        self._client_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'first_seconds': None,
+                       'last_seconds': None, 'client_setups': 0, 'setup_seconds': 0.0}
+
     @abstractmethod
     def ask(self, prompt: str, response_format: str = None) -> str:
         """
@@ -31,6 +71,45 @@ class LLMProvider(ABC):
         """
         pass
 
+    # Whether _stream() is implemented; otherwise ask_stream() yields ask() as one chunk
+    supports_streaming = False
+
+    def _stream(self, prompt: str, response_format: str = None) -> Iterator[str]:
+        """Yield response text chunks from the API (providers with supports_streaming)."""
+        raise NotImplementedError
+
+    def _logged_stream(self, prompt: str, response_format: str = None) -> Iterator[str]:
+        self.validate_config()
+        self.log_request(prompt, response_format)
+        self.log_request_full(prompt, response_format)
+
+        start_time = time.time()
+        chunks = []
+        try:
+            for chunk in self._stream(prompt, response_format):
+                if not chunks:
+                    logger.debug(f"  First chunk after {time.time() - start_time:.2f}s")
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            self.log_error(e, time.time() - start_time)
+            raise
+        content = "".join(chunks)
+        self.log_response(content, time.time() - start_time)
+        self.log_response_full(content, time.time() - start_time)
+
+    def ask_stream(self, prompt: str, response_format: str = None) -> Iterator[str]:
+        """
+        Send prompt to LLM and yield the response text as it is generated.
+
+        Joined, the chunks are the same text ask() returns (and share its cache).
+        Providers without streaming support yield the whole response as one chunk.
+        """
+        if not self.supports_streaming:
+            yield self.ask(prompt, response_format)
+            return
+        yield from cached_stream(self, self._logged_stream, prompt, response_format)
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -43,6 +122,61 @@ class LLMProvider(ABC):
         """Whether this provider needs API key"""
         pass
 
+    def _create_client(self):
+        """SDK client used by ask(); None for providers that post through core/http_client."""
+        return None
+
+    def client(self):
+        """Long-lived client, created on first use and shared by all threads."""
+        if not self._client_ready:
+            with self._client_lock:
+                if not self._client_ready:
+                    start_time = time.time()
+                    self._client = self._create_client()
+                    self._client_ready = True
+                    if self._client is not None:
+                        with self._stats_lock:
+                            self._stats['client_setups'] += 1
+                            self._stats['setup_seconds'] += time.time() - start_time
+        return self._client
+
+    def _warm_up_url(self) -> Optional[str]:
+        """URL on the API host to open a keep-alive connection to (REST providers)."""
+        return None
+
+    def warm_up(self):
+        """Create the client and open a connection, so the first ask() does not pay for them."""
+        self.client()
+        url = self._warm_up_url()
+        if url:
+            # Any answer will do: the connection stays in the shared pool for ask()
+            get_session().head(url, timeout=10, verify=not getattr(self, 'disable_ssl_verify', False))
+
+    def _record_call(self, elapsed: float, success: bool):
+        with self._stats_lock:
+            stats = self._stats
+            stats['calls'] += 1
+            if not success:
+                stats['errors'] += 1
+            stats['total_seconds'] += elapsed
+            stats['last_seconds'] = elapsed
+            if stats['first_seconds'] is None:
+                stats['first_seconds'] = elapsed
+
+    def latency_stats(self) -> Dict:
+        """
+        Call latency of this provider.
+
+        Returns:
+            dict with 'provider', 'model', 'calls', 'errors', 'avg_seconds',
+            'first_seconds', 'last_seconds', 'client_setups' and 'setup_seconds'
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['avg_seconds'] = round(stats.pop('total_seconds') / stats['calls'], 3) if stats['calls'] else None
+        stats['setup_seconds'] = round(stats['setup_seconds'], 3)
+        return {'provider': self.name, 'model': self.model, **stats}
+
     def validate_config(self) -> bool:
         """Validate required configuration exists"""
         if self.requires_api_key:
@@ -66,11 +200,13 @@ class LLMProvider(ABC):
         logger.debug(f"{self.name} API Response:")
         logger.debug(f"  Response length: {len(response)} characters")
         logger.debug(f"  Success in {elapsed:.2f}s")
+        self._record_call(elapsed, success=True)
 
     def log_error(self, error: Exception, elapsed: float):
         """Log errors with full traceback"""
         logger.debug(f"{self.name} API Error: {str(error)}")
         logger.error(f"  Elapsed: {elapsed:.2f}s")
+        self._record_call(elapsed, success=False)
         logger.debug(f"  Traceback: {error.__traceback__}")
 
     def log_request_full(self, prompt: str, response_format: Optional[str]):
@@ -105,6 +241,7 @@ class GeminiProvider(LLMProvider):
     """Google Gemini API provider (refactored from gemini_engine.py)"""
 
     def __init__(self, api_key: str, model: str):
+        super().__init__()
         self.api_key = api_key
         self.model = model
         self.env_key = "GEMINI_API_KEY"
@@ -119,35 +256,48 @@ class GeminiProvider(LLMProvider):
     def requires_api_key(self) -> bool:
         return True
 
+    def _create_client(self):
+        import google.genai as genai
+        return genai.Client(
+            api_key=self.api_key,
+            http_options={'api_version': 'v1alpha'}
+        )
+
+    def warm_up(self):
+        # Model lookup opens the TLS connection the client keeps alive
+        self.client().models.get(model=self.model)
+
+    def _generation_config(self, response_format: str = None):
+        from google.genai import types
+        return types.GenerateContentConfig(
+            response_mime_type="application/json" if response_format == "application/json" else "text/plain",
+            max_output_tokens=self.max_tokens
+        )
+
+    supports_streaming = True
+
+    def _stream(self, prompt: str, response_format: str = None) -> Iterator[str]:
+        for chunk in self.client().models.generate_content_stream(
+                model=self.model,
+                contents=prompt,
+                config=self._generation_config(response_format)):
+            if chunk.text:
+                yield chunk.text
+
+    @cached_ask
     def ask(self, prompt: str, response_format: str = None) -> str:
         """Send prompt to Gemini API"""
         self.validate_config()
         self.log_request(prompt, response_format)
         self.log_request_full(prompt, response_format)
 
+        start_time = time.time()
         try:
-            import google.genai as genai
-            from google.genai import types
-
-            start_time = time.time()
-
-            # Initialize client
-            client = genai.Client(
-                api_key=self.api_key,
-                http_options={'api_version': 'v1alpha'}
-            )
-
-            # Configure response format
-            gen_config = types.GenerateContentConfig(
-                response_mime_type="application/json" if response_format == "application/json" else "text/plain",
-                max_output_tokens=self.max_tokens
-            )
-
             # Make request
-            response = client.models.generate_content(
+            response = self.client().models.generate_content(
                 model=self.model,
                 contents=prompt,
-                config=gen_config
+                config=self._generation_config(response_format)
             )
 
             elapsed = time.time() - start_time
@@ -166,6 +316,7 @@ class OpenAIProvider(LLMProvider):
     """OpenAI (ChatGPT) API provider"""
 
     def __init__(self, api_key: str, model: str):
+        super().__init__()
         self.api_key = api_key
         self.model = model
         self.env_key = "OPENAI_API_KEY"
@@ -179,19 +330,23 @@ class OpenAIProvider(LLMProvider):
     def requires_api_key(self) -> bool:
         return True
 
+    def _create_client(self):
+        import openai
+        return openai.OpenAI(api_key=self.api_key)
+
+    def warm_up(self):
+        self.client().models.retrieve(self.model)
+
+    @cached_ask
     def ask(self, prompt: str, response_format: str = None) -> str:
         """Send prompt to OpenAI API"""
         self.validate_config()
         self.log_request(prompt, response_format)
         self.log_request_full(prompt, response_format)
 
+        start_time = time.time()
         try:
-            import openai
-
-            start_time = time.time()
-
-            # Initialize client
-            client = openai.OpenAI(api_key=self.api_key)
+            client = self.client()
 
             # Make request
             response = client.responses.create(
@@ -215,6 +370,7 @@ class ZAIProvider(LLMProvider):
     """Z.AI (Zhipu / BigModel) API provider"""
 
     def __init__(self, api_key: str, model: str, base_url: str = None, disable_ssl_verify: bool = False):
+        super().__init__()
         self.api_key = api_key
         self.model = model
         self.env_key = "ZHIPU_API_KEY"
@@ -232,6 +388,26 @@ class ZAIProvider(LLMProvider):
     def requires_api_key(self) -> bool:
         return True
 
+    def _warm_up_url(self) -> Optional[str]:
+        return f"{self.base_url}/models"
+
+    supports_streaming = True
+
+    def _stream(self, prompt: str, response_format: str = None) -> Iterator[str]:
+        data = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+            "max_tokens": self.max_tokens
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        with get_session().post(f"{self.base_url}/chat/completions", json=data, headers=headers,
+                                timeout=self.timeout, verify=not self.disable_ssl_verify, stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code}: {response.text}")
+            yield from _iter_chat_deltas(response)
+
+    @cached_ask
     def ask(self, prompt: str, response_format: str = None) -> str:
         """Send prompt to Z.AI API"""
         self.validate_config()
@@ -259,7 +435,7 @@ class ZAIProvider(LLMProvider):
             }
 
             # Make request
-            response = requests.post(
+            response = get_session().post(
                 url,
                 json=data,
                 headers=headers,
@@ -287,6 +463,7 @@ class QwenProvider(LLMProvider):
     """Qwen (Alibaba Cloud) API provider"""
 
     def __init__(self, api_key: str, model: str):
+        super().__init__()
         self.api_key = api_key
         self.model = model
         self.env_key = "QWEN_API_KEY"
@@ -300,6 +477,10 @@ class QwenProvider(LLMProvider):
     def requires_api_key(self) -> bool:
         return True
 
+    def _warm_up_url(self) -> Optional[str]:
+        return "https://dashscope.aliyuncs.com"
+
+    @cached_ask
     def ask(self, prompt: str, response_format: str = None) -> str:
         """Send prompt to Qwen API via DashScope"""
         self.validate_config()
@@ -324,7 +505,7 @@ class QwenProvider(LLMProvider):
             }
 
             # Make request
-            response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
+            response = get_session().post(url, json=data, headers=headers, timeout=self.timeout)
 
             if response.status_code == 200:
                 result = response.json()
@@ -346,6 +527,7 @@ class KimiProvider(LLMProvider):
     """Kimi K2 2.5 (Moonshot AI) API provider"""
 
     def __init__(self, api_key: str, model: str):
+        super().__init__()
         self.api_key = api_key
         self.model = model
         self.env_key = "KIMI_API_KEY"
@@ -359,6 +541,10 @@ class KimiProvider(LLMProvider):
     def requires_api_key(self) -> bool:
         return True
 
+    def _warm_up_url(self) -> Optional[str]:
+        return "https://api.moonshot.cn/v1"
+
+    @cached_ask
     def ask(self, prompt: str, response_format: str = None) -> str:
         """Send prompt to Kimi API via Moonshot"""
         self.validate_config()
@@ -382,7 +568,7 @@ class KimiProvider(LLMProvider):
             }
 
             # Make request
-            response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
+            response = get_session().post(url, json=data, headers=headers, timeout=self.timeout)
 
             if response.status_code == 200:
                 result = response.json()
@@ -404,6 +590,7 @@ class OllamaProvider(LLMProvider):
     """Ollama local LLM API provider (Open-source, self-hosted)"""
 
     def __init__(self, api_key: str, model: str, base_url: str = None):
+        super().__init__()
         # api_key not used for Ollama, but kept for interface consistency
         self.api_key = api_key  # Will be empty string
         self.model = model
@@ -418,6 +605,28 @@ class OllamaProvider(LLMProvider):
     def requires_api_key(self) -> bool:
         return False  # Ollama does NOT require API key!
 
+    def _warm_up_url(self) -> Optional[str]:
+        return f"{self.base_url}/api/tags"
+
+    supports_streaming = True
+
+    def _stream(self, prompt: str, response_format: str = None) -> Iterator[str]:
+        data = {"model": self.model, "prompt": prompt, "stream": True}
+        with get_session().post(f"{self.base_url}/api/generate", json=data, timeout=self.timeout,
+                                stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code}: {response.text}")
+            # One JSON object per line: {"response": "<text>", "done": false}
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                result = json.loads(line)
+                if result.get("response"):
+                    yield result["response"]
+                if result.get("done"):
+                    break
+
+    @cached_ask
     def ask(self, prompt: str, response_format: str = None) -> str:
         """Send prompt to Ollama API"""
         self.validate_config()
@@ -438,7 +647,7 @@ class OllamaProvider(LLMProvider):
             }
 
             # Make request
-            response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
+            response = get_session().post(url, json=data, headers=headers, timeout=self.timeout)
 
             if response.status_code == 200:
                 result = response.json()
@@ -460,6 +669,7 @@ class LMStudioProvider(LLMProvider):
     """LM Studio local LLM API provider (OpenAI-compatible)"""
 
     def __init__(self, api_key: str, model: str, base_url: str = None):
+        super().__init__()
         # api_key not used for LM Studio, but kept for interface consistency
         self.api_key = api_key  # Will be empty string
         self.model = model
@@ -474,6 +684,24 @@ class LMStudioProvider(LLMProvider):
     def requires_api_key(self) -> bool:
         return False  # LM Studio does NOT require API key!
 
+    def _warm_up_url(self) -> Optional[str]:
+        return f"{self.base_url}/v1/models"
+
+    supports_streaming = True
+
+    def _stream(self, prompt: str, response_format: str = None) -> Iterator[str]:
+        data = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True
+        }
+        with get_session().post(f"{self.base_url}/v1/chat/completions", json=data, timeout=self.timeout,
+                                stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code}: {response.text}")
+            yield from _iter_chat_deltas(response)
+
+    @cached_ask
     def ask(self, prompt: str, response_format: str = None) -> str:
         """Send prompt to LM Studio API"""
         self.validate_config()
@@ -494,7 +722,7 @@ class LMStudioProvider(LLMProvider):
             }
 
             # Make request
-            response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
+            response = get_session().post(url, json=data, headers=headers, timeout=self.timeout)
 
             if response.status_code == 200:
                 result = response.json()
@@ -514,7 +742,10 @@ class LMStudioProvider(LLMProvider):
 
 def get_provider(provider_name: Optional[str] = None, config_module=None) -> LLMProvider:
     """
-    Factory function to get LLM provider instance.
+    Get the long-lived LLM provider instance for the configured settings.
+
+    Providers are created once per (provider, model, endpoint) and reused, so
+    every caller shares the same client and connection pool.
 
     Args:
         provider_name: Name of provider (gemini, openai, zhipu, qwen, kimi, ollama, lmstudio)
@@ -532,47 +763,90 @@ def get_provider(provider_name: Optional[str] = None, config_module=None) -> LLM
     if provider_name is None:
         provider_name = getattr(config, 'LLM_PROVIDER', 'gemini')
 
-    logger.info(f"Initializing LLM provider: {provider_name}")
-
     if provider_name == "gemini":
-        api_key = getattr(config, 'GEMINI_API_KEY', '')
-        model = getattr(config, 'GEMINI_TEXT_MODEL', 'gemini-2.0-flash')
-        return GeminiProvider(api_key=api_key, model=model)
+        provider_class = GeminiProvider
+        settings = {'api_key': getattr(config, 'GEMINI_API_KEY', ''),
+                    'model': getattr(config, 'GEMINI_TEXT_MODEL', 'gemini-2.0-flash')}
 
     elif provider_name == "openai":
-        api_key = getattr(config, 'OPENAI_API_KEY', '')
-        model = getattr(config, 'OPENAI_MODEL', 'gpt-4o')
-        return OpenAIProvider(api_key=api_key, model=model)
+        provider_class = OpenAIProvider
+        settings = {'api_key': getattr(config, 'OPENAI_API_KEY', ''),
+                    'model': getattr(config, 'OPENAI_MODEL', 'gpt-4o')}
 
     elif provider_name == "zhipu":
-        api_key = getattr(config, 'ZHIPU_API_KEY', '')
-        model = getattr(config, 'ZHIPU_MODEL', 'deep-v3')
-        disable_ssl_verify = getattr(config, 'ZHIPU_DISABLE_SSL_VERIFY', False)
-        return ZAIProvider(api_key=api_key, model=model, disable_ssl_verify=disable_ssl_verify)
+        provider_class = ZAIProvider
+        settings = {'api_key': getattr(config, 'ZHIPU_API_KEY', ''),
+                    'model': getattr(config, 'ZHIPU_MODEL', 'deep-v3'),
+                    'disable_ssl_verify': getattr(config, 'ZHIPU_DISABLE_SSL_VERIFY', False)}
 
     elif provider_name == "qwen":
-        api_key = getattr(config, 'QWEN_API_KEY', '')
-        model = getattr(config, 'QWEN_MODEL', 'qwen-max')
-        return QwenProvider(api_key=api_key, model=model)
+        provider_class = QwenProvider
+        settings = {'api_key': getattr(config, 'QWEN_API_KEY', ''),
+                    'model': getattr(config, 'QWEN_MODEL', 'qwen-max')}
 
     elif provider_name == "kimi":
-        api_key = getattr(config, 'KIMI_API_KEY', '')
-        model = getattr(config, 'KIMI_MODEL', 'kimi-labs')
-        return KimiProvider(api_key=api_key, model=model)
+        provider_class = KimiProvider
+        settings = {'api_key': getattr(config, 'KIMI_API_KEY', ''),
+                    'model': getattr(config, 'KIMI_MODEL', 'kimi-labs')}
 
     elif provider_name == "ollama":
-        base_url = getattr(config, 'OLLAMA_BASE_URL', 'http://localhost:11434')
-        model = getattr(config, 'OLLAMA_MODEL', 'llama2')
-        return OllamaProvider(api_key="", model=model, base_url=base_url)
+        provider_class = OllamaProvider
+        settings = {'api_key': "",
+                    'model': getattr(config, 'OLLAMA_MODEL', 'llama2'),
+                    'base_url': getattr(config, 'OLLAMA_BASE_URL', 'http://localhost:11434')}
 
     elif provider_name == "lmstudio":
-        base_url = getattr(config, 'LMSTUDIO_BASE_URL', 'http://localhost:1234')
-        model = getattr(config, 'LMSTUDIO_MODEL', 'lmstudio-community/qwen2')
-        return LMStudioProvider(api_key="", model=model, base_url=base_url)
+        provider_class = LMStudioProvider
+        settings = {'api_key': "",
+                    'model': getattr(config, 'LMSTUDIO_MODEL', 'lmstudio-community/qwen2'),
+                    'base_url': getattr(config, 'LMSTUDIO_BASE_URL', 'http://localhost:1234')}
 
     else:
         raise ValueError(f"Unknown LLM provider: {provider_name}")
 
+    key = (provider_name, tuple(sorted(settings.items())))
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            logger.info(f"Initializing LLM provider: {provider_name}")
+            provider = provider_class(**settings)
+            _providers[key] = provider
+        return provider
+
+
+def warm_up_provider(provider_name: Optional[str] = None) -> bool:
+    """
+    Create the provider's client and open its connection ahead of the first request.
+
+    Returns:
+        True if the warm-up succeeded (failures are logged, the first ask() retries setup)
+    """
+    try:
+        provider = get_provider(provider_name)
+        start_time = time.time()
+        provider.warm_up()
+        logger.info(f"Warmed up LLM provider {provider.name} ({provider.model}) in {time.time() - start_time:.2f}s")
+        return True
+    except Exception as e:
+        logger.warning(f"LLM provider warm-up failed: {e}")
+        return False
+
+
+def warm_up_in_background(provider_name: Optional[str] = None) -> Optional[threading.Thread]:
+    """Run warm_up_provider() on a daemon thread when LLM_WARMUP is enabled."""
+    if not getattr(config, 'LLM_WARMUP', True):
+        return None
+    thread = threading.Thread(target=warm_up_provider, args=(provider_name,), name="llm-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def provider_stats() -> List[Dict]:
+    """Latency stats (see LLMProvider.latency_stats) of every provider used in this process."""
+    with _providers_lock:
+        providers = list(_providers.values())
+    return [provider.latency_stats() for provider in providers]
+
 
 if __name__ == "__main__":
     # Test provider instantiation
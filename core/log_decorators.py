@@ -3,6 +3,8 @@ Logging Decorators for AI Video Factory
 Provides decorators for automatic logging of function calls, errors, and timing
 """
 import functools
+import inspect
+import threading
 import time
 import logging
 import traceback
@@ -10,6 +12,15 @@ from inspect import signature
 from core.logger_config import get_logger, setup_api_logger, setup_agent_logger
 
 
+# Cache outcome noted by the function running under @log_api_call (per thread)
+_api_call_notes = threading.local()
+
+
+def note_cache_result(hit: bool):
+    """Record whether the current @log_api_call result was served from a cache."""
+    _api_call_notes.cache = "hit" if hit else "miss"
+
+
 def log_api_call(func):
     """
     Decorator to log API calls with timing, request/response preview, and errors.
@@ -20,11 +31,16 @@ def log_api_call(func):
     - Response preview (first 200 chars)
     - Errors with full traceback
 
+    Generator functions are logged once the stream is exhausted.
+
     Usage:
         @log_api_call
         def ask(prompt: str) -> str:
             ...
     """
+    if inspect.isgeneratorfunction(func):
+        return _log_api_stream(func)
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Get API logger for this function
@@ -40,14 +56,19 @@ def log_api_call(func):
         logger.debug(f"API CALL: {func.__name__}()")
         logger.debug(f"  Args: {param_str}")
 
-        # Execute with timing
+        # Execute with timing; the cache note is per call (nested calls restore the outer one)
         start_time = time.time()
+        outer_note = getattr(_api_call_notes, 'cache', None)
+        _api_call_notes.cache = None
         try:
             result = func(*args, **kwargs)
             elapsed = time.time() - start_time
 
             # Log success with timing
             logger.debug(f"  Response: {_truncate_value(result)}")
+            cache = getattr(_api_call_notes, 'cache', None)
+            if cache:
+                logger.info(f"  Cache {cache}: {func.__name__}() in {elapsed:.2f}s")
             logger.debug(f"  Success in {elapsed:.2f}s")
 
             return result
@@ -62,6 +83,57 @@ def log_api_call(func):
             # Re-raise exception
             raise
 
+        finally:
+            _api_call_notes.cache = outer_note
+
+    return wrapper
+
+
+def _log_api_stream(func):
+    """log_api_call for generator functions: the cache note is collected while each chunk is produced."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        logger = setup_api_logger(func.__module__)
+
+        bound_args = signature(func).bind(*args, **kwargs)
+        bound_args.apply_defaults()
+        param_str = ", ".join(f"{k}={_truncate_value(v)}" for k, v in bound_args.arguments.items())
+        logger.debug(f"API CALL: {func.__name__}() (stream)")
+        logger.debug(f"  Args: {param_str}")
+
+        start_time = time.time()
+        chunks = []
+        cache = None
+        stream = func(*args, **kwargs)
+        try:
+            while True:
+                # The stream's code runs between the caller's own calls on this
+                # thread, so the note is swapped in only while it advances
+                outer_note = getattr(_api_call_notes, 'cache', None)
+                _api_call_notes.cache = None
+                try:
+                    chunk = next(stream)
+                except StopIteration:
+                    break
+                finally:
+                    cache = getattr(_api_call_notes, 'cache', None) or cache
+                    _api_call_notes.cache = outer_note
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            elapsed = time.time() - start_time
+            logger.error(f"  Failed in {elapsed:.2f}s: {str(e)}")
+            logger.error(f"  Traceback: {traceback.format_exc()}")
+            raise
+        finally:
+            stream.close()
+
+        elapsed = time.time() - start_time
+        logger.debug(f"  Response: {_truncate_value(''.join(map(str, chunks)))}")
+        if cache:
+            logger.info(f"  Cache {cache}: {func.__name__}() in {elapsed:.2f}s")
+        logger.debug(f"  Success in {elapsed:.2f}s ({len(chunks)} chunk(s))")
+
     return wrapper
 
 
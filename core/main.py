@@ -53,12 +53,14 @@ STEP_NAMES = {
 
 from core.story_engine import build_story
 from core.scene_graph import build_scene_graph
-from core.shot_planner import plan_shots
-from core.prompt_compiler import load_workflow, compile_workflow
+from core.shot_planner import complete_planned_shots, plan_shots
+from core.prompt_compiler import load_workflow, compile_workflow, workflow_hash
 from core.comfy_client import submit, wait_for_prompt_completion
-from core.render_monitor import wait_until_idle
 from core.image_generator import generate_image_gemini
+from core.llm_engine import warm_up_in_background
 from core.session_manager import SessionManager
+from core.media_inventory import get_media_inventory
+from core.render_pipeline import RenderJob
 
 
 def generate_unique_video_filename(videos_dir, shot_idx):
@@ -79,20 +81,10 @@ def generate_unique_video_filename(videos_dir, shot_idx):
     Returns:
         tuple: (video_filename, video_save_path)
     """
-    # Suffix letters to try: empty (no suffix), 'a', 'b', 'c', ..., 'z'
-    suffixes = [''] + [chr(ord('a') + i) for i in range(26)]
-
-    for suffix in suffixes:
-        if suffix:
-            video_filename = f"shot_{shot_idx:03d}{suffix}.mp4"
-        else:
-            video_filename = f"shot_{shot_idx:03d}.mp4"
-
-        video_save_path = os.path.join(videos_dir, video_filename)
-
-        # Check if file exists
-        if not os.path.exists(video_save_path):
-            return video_filename, video_save_path
+    # Existing names come from one scan of the folder (core/media_inventory.py)
+    video_filename = get_media_inventory(videos_dir).next_video_filename(shot_idx)
+    if video_filename:
+        return video_filename, os.path.join(videos_dir, video_filename)
 
     # Fallback (should never reach here with 26+ suffixes)
     # Use timestamp as last resort
@@ -147,6 +139,9 @@ def print_configuration_summary():
     print(f"  FPS: {config.VIDEO_FPS}")
     if config.TARGET_VIDEO_LENGTH:
         print(f"  Target Length: {config.TARGET_VIDEO_LENGTH}s")
+    print(f"  Render Pipeline Depth: {getattr(config, 'RENDER_PIPELINE_DEPTH', 1)}")
+    comfy_urls = getattr(config, 'COMFY_URLS', [config.COMFY_URL])
+    print(f"  ComfyUI Nodes: {len(comfy_urls)} ({', '.join(comfy_urls)})")
 
     # Workflow Mode
     print("\n[Workflow]")
@@ -541,61 +536,247 @@ def regenerate_failed_images(session_id, session_meta, shots, session_mgr):
     return regenerated_count
 
 
-def submit_and_verify_video(template, shot, shot_length, session_id, shot_idx, session_mgr,
-                             image_path=None, variation_idx=1):
+def _compile_video_workflow(template, shot, shot_length, image_path=None):
+    """Compile a shot's workflow, optionally with a specific image variation."""
+    # If a specific image path is provided, temporarily override shot's image_path
+    original_image_path = None
+    if image_path:
+        original_image_path = shot.get('image_path')
+        shot['image_path'] = image_path
+
+    try:
+        return compile_workflow(template, shot, video_length_seconds=shot_length)
+    finally:
+        # Restore original image_path if we overrode it
+        if original_image_path is not None:
+            shot['image_path'] = original_image_path
+
+
+def _submit_video_prompt(template, shot, shot_length, image_path=None, session_id=None, session_mgr=None,
+                         variation_idx=1, wf=None):
     """
-    Submit a video to ComfyUI and wait for verification before marking as rendered.
+    Compile a shot's workflow and queue it in ComfyUI.
+
+    When a session is given, the prompt_id, backend and workflow hash are
+    recorded in shots.json right away so a crashed run can re-attach to the
+    render instead of queueing it again (see _reattach_render_jobs).
 
     Args:
         template: ComfyUI workflow template
         shot: Shot data dictionary
         shot_length: Length of each shot in seconds
-        session_id: Current session ID
-        shot_idx: Shot index (1-based)
-        session_mgr: SessionManager instance
         image_path: Specific image path to use (overrides shot['image_path'])
-        variation_idx: Variation index for naming (1 = first, 2 = second, etc.)
+        session_id: Current session ID (optional)
+        session_mgr: SessionManager instance (optional)
+        variation_idx: Variation index being rendered
+        wf: Already compiled workflow (skips compiling again)
 
     Returns:
-        tuple: (success: bool, error_message: str or None, video_path: str or None)
+        str: prompt_id returned by ComfyUI, or None
     """
-    import shutil
-    from core.comfy_client import get_output_file_path
+    if wf is None:
+        wf = _compile_video_workflow(template, shot, shot_length, image_path=image_path)
 
-    # Create session videos directory
+    result = submit(wf)
+    prompt_id = result.get('prompt_id')
+
+    if prompt_id and session_mgr and session_id:
+        session_mgr.record_render_submission(
+            session_id, shot.get('index', 0), variation_idx, prompt_id,
+            result.get('backend'), workflow_hash(wf)
+        )
+    return prompt_id
+
+
+def _video_save_path(session_id, shot_idx, session_mgr, variation_idx=1):
+    """Return (filename, path) for a rendered video in the session's videos folder."""
     videos_dir = session_mgr.get_videos_dir(session_id)
     os.makedirs(videos_dir, exist_ok=True)
 
-    # Expected video filename with uniqueness check
     # If variation_idx > 1, use shot_001_002.mp4 format
     # For main video (variation_idx == 1), use unique filename with suffix if needed
     if variation_idx > 1:
         video_filename = f"shot_{shot_idx:03d}_{variation_idx:03d}.mp4"
-        video_save_path = os.path.join(videos_dir, video_filename)
+        return video_filename, os.path.join(videos_dir, video_filename)
+    # Use helper to generate unique filename for main video
+    # This prevents overwriting existing videos when resuming
+    return generate_unique_video_filename(videos_dir, shot_idx)
+
+
+def _render_cache_key(wf):
+    """Render cache key for a compiled workflow, or None when the cache is disabled."""
+    from core.render_cache import get_render_cache
+
+    return workflow_hash(wf) if get_render_cache() else None
+
+
+def _materialize_cached_video(cache_key, session_id, shot_idx, session_mgr, variation_idx=1,
+                              variation_label=""):
+    """
+    Place a cached render of this workflow into the session instead of rendering it.
+
+    Returns:
+        tuple: (success, error, video_path) on a cache hit, None on a miss
+    """
+    from core.render_cache import get_render_cache
+
+    cache = get_render_cache()
+    if not cache or not cache_key:
+        return None
+
+    video_filename, video_save_path = _video_save_path(session_id, shot_idx, session_mgr, variation_idx)
+    method = cache.materialize(cache_key, video_save_path)
+    if not method:
+        return None
+
+    print(f"[CACHE] Shot {shot_idx}{variation_label}: Identical workflow rendered before, "
+          f"reusing {video_filename} ({method}, key {cache_key[:12]})")
+    if variation_idx == 1:
+        session_mgr.mark_video_rendered(session_id, shot_idx, video_save_path)
+    return True, None, video_save_path
+
+
+def _collect_video_output(wait_result, session_id, shot_idx, session_mgr, variation_idx=1,
+                          variation_label="", cache_key=None):
+    """
+    Verify a finished ComfyUI render, fetch its video into the session and
+    clear the in-flight record written at submission. Successful renders are
+    added to the render cache under cache_key.
+
+    The record is kept when the wait timed out (the prompt may still be queued
+    or running) or when ComfyUI produced outputs that could not be fetched, so
+    a later resume re-attaches to the prompt instead of rendering it again.
+
+    Returns:
+        tuple: (success: bool, error_message: str or None, video_path: str or None)
+    """
+    from core.render_cache import get_render_cache
+
+    result = _fetch_video_output(wait_result, session_id, shot_idx, session_mgr,
+                                 variation_idx=variation_idx, variation_label=variation_label)
+    if wait_result.get('timed_out') or (not result[0] and wait_result.get('outputs')):
+        print(f"[RESUME] Shot {shot_idx}{variation_label}: Keeping the ComfyUI prompt on record, "
+              f"a resume will re-attach to it")
     else:
-        # Use helper to generate unique filename for main video
-        # This prevents overwriting existing videos when resuming
-        video_filename, video_save_path = generate_unique_video_filename(videos_dir, shot_idx)
+        session_mgr.clear_render_submission(session_id, shot_idx, variation_idx)
 
-    # Initialize variation_label before try block for exception handler
-    variation_label = f" (variation {variation_idx})" if variation_idx > 1 else ""
+    cache = get_render_cache()
+    if result[0] and cache and cache_key:
+        cache.put(cache_key, result[2])
+    return result
 
-    try:
-        # If a specific image path is provided, temporarily override shot's image_path
-        original_image_path = None
-        if image_path:
-            original_image_path = shot.get('image_path')
-            shot['image_path'] = image_path
 
-        # Compile and submit workflow
-        wf = compile_workflow(template, shot, video_length_seconds=shot_length)
-        result = submit(wf)
+def _fetch_video_output(wait_result, session_id, shot_idx, session_mgr, variation_idx=1,
+                        variation_label=""):
+    """
+    Verify a finished ComfyUI render and fetch its video into the session.
 
-        # Restore original image_path if we overrode it
-        if original_image_path is not None:
-            shot['image_path'] = original_image_path
+    Args:
+        wait_result: Result dict from wait_for_prompt_completion
+        session_id: Current session ID
+        shot_idx: Shot index (1-based)
+        session_mgr: SessionManager instance
+        variation_idx: Variation index for naming (1 = first, 2 = second, etc.)
+        variation_label: Label appended to console output
+
+    Returns:
+        tuple: (success: bool, error_message: str or None, video_path: str or None)
+    """
+    from core.comfy_client import fetch_output
+
+    if not wait_result['success']:
+        error_msg = wait_result.get('error', 'Unknown error')
+        print(f"[FAIL] Shot {shot_idx}{variation_label}: {error_msg}")
+        return False, error_msg, None
+
+    # Check if we got any outputs
+    outputs = wait_result.get('outputs', [])
+    if not outputs:
+        print(f"[FAIL] Shot {shot_idx}{variation_label}: No output files generated")
+        return False, "No output files generated", None
+
+    # Expected video filename in the session videos directory, with uniqueness check
+    video_filename, video_save_path = _video_save_path(session_id, shot_idx, session_mgr, variation_idx)
+
+    # Find video outputs
+    video_outputs = [o for o in outputs if o['type'] == 'video']
+    image_outputs = [o for o in outputs if o['type'] == 'image']
+
+    if video_outputs:
+        print(f"[PASS] Shot {shot_idx}{variation_label}: Generated {len(video_outputs)} video(s)")
+
+        # Stream first video from ComfyUI's /view endpoint into the session folder
+        video_info = video_outputs[0]
+        fetch = fetch_output(video_info, video_save_path)
+
+        if fetch['success']:
+            print(f"[FETCH] Shot {shot_idx}{variation_label}: {video_filename} -> session/videos/")
+            print(f"       Source: {fetch['source']}")
+            print(f"       Target: {video_save_path}")
+            print(f"[INFO] Video saved: {video_filename} ({fetch['size']:,} bytes, sha256 {fetch['sha256'][:12]})")
+
+            # Mark as rendered with video path
+            # Only mark primary variation (1) in session metadata
+            if variation_idx == 1:
+                session_mgr.mark_video_rendered(session_id, shot_idx, video_save_path)
+            return True, None, video_save_path
+        else:
+            print(f"[FAIL] Could not fetch video {video_info['filename']} from ComfyUI: {fetch['error']}")
+            # DON'T mark as rendered - the video file doesn't exist
+            return False, f"Video fetch failed: {fetch['error']}", None
+
+    elif image_outputs:
+        print(f"[WARN] Shot {shot_idx}{variation_label}: Generated {len(image_outputs)} frame(s) instead of video")
+        for i in image_outputs[:3]:
+            print(f"       - {i['filename']}")
+        if len(image_outputs) > 3:
+            print(f"       ... and {len(image_outputs) - 3} more")
+
+        # No video file, just frames - this is a failure for video generation
+        # DON'T mark as rendered - we wanted a video, not frames
+        return False, "Generated frames instead of video", None
+
+    else:
+        print(f"[FAIL] Shot {shot_idx}{variation_label}: Unknown output type")
+        return False, "Unknown output type", None
+
+
+def submit_and_verify_video(template, shot, shot_length, session_id, shot_idx, session_mgr,
+                             image_path=None, variation_idx=1, wf=None, cache_key=None):
+    """
+    Submit a video to ComfyUI and wait for verification before marking as rendered.
 
-        prompt_id = result.get('prompt_id')
+    Args:
+        template: ComfyUI workflow template
+        shot: Shot data dictionary
+        shot_length: Length of each shot in seconds
+        session_id: Current session ID
+        shot_idx: Shot index (1-based)
+        session_mgr: SessionManager instance
+        image_path: Specific image path to use (overrides shot['image_path'])
+        variation_idx: Variation index for naming (1 = first, 2 = second, etc.)
+        wf: Already compiled workflow whose render cache lookup (cache_key) the
+            caller has done; skips compiling and the cache check
+
+    Returns:
+        tuple: (success: bool, error_message: str or None, video_path: str or None)
+    """
+    # Initialize variation_label before try block for exception handler
+    variation_label = f" (variation {variation_idx})" if variation_idx > 1 else ""
+
+    try:
+        if wf is None:
+            # Compile workflow; an identical one rendered before is served from the render cache
+            wf = _compile_video_workflow(template, shot, shot_length, image_path=image_path)
+            cache_key = _render_cache_key(wf)
+            cached = _materialize_cached_video(cache_key, session_id, shot_idx, session_mgr,
+                                               variation_idx=variation_idx, variation_label=variation_label)
+            if cached:
+                return cached
+
+        prompt_id = _submit_video_prompt(template, shot, shot_length, image_path=image_path,
+                                         session_id=session_id, session_mgr=session_mgr,
+                                         variation_idx=variation_idx, wf=wf)
         if not prompt_id:
             return False, "No prompt_id returned from ComfyUI", None
 
@@ -605,106 +786,9 @@ def submit_and_verify_video(template, shot, shot_length, session_id, shot_idx, s
         print(f"[WAIT] Shot {shot_idx}{variation_label}: Waiting for render...")
         wait_result = wait_for_prompt_completion(prompt_id, timeout=config.VIDEO_RENDER_TIMEOUT)
 
-        if not wait_result['success']:
-            error_msg = wait_result.get('error', 'Unknown error')
-            print(f"[FAIL] Shot {shot_idx}{variation_label}: {error_msg}")
-            return False, error_msg, None
-
-        # Check if we got any outputs
-        outputs = wait_result.get('outputs', [])
-        if not outputs:
-            print(f"[FAIL] Shot {shot_idx}{variation_label}: No output files generated")
-            return False, "No output files generated", None
-
-        # Find video outputs
-        video_outputs = [o for o in outputs if o['type'] == 'video']
-        image_outputs = [o for o in outputs if o['type'] == 'image']
-
-        if video_outputs:
-            print(f"[PASS] Shot {shot_idx}{variation_label}: Generated {len(video_outputs)} video(s)")
-
-            # Copy first video to session folder
-            video_info = video_outputs[0]
-            source_path = get_output_file_path(video_info)
-
-            # Wait for file to be written to disk with retry mechanism
-            # Video files can be large and take several seconds to finalize
-            max_retries = 10
-            retry_delay = 2  # seconds
-            file_found = False
-
-            for attempt in range(max_retries):
-                if os.path.exists(source_path):
-                    # File exists, but check if it's still being written
-                    # by checking if the file size is stable
-                    try:
-                        initial_size = os.path.getsize(source_path)
-                        time.sleep(1)  # Wait 1 second
-                        final_size = os.path.getsize(source_path)
-
-                        if initial_size == final_size and final_size > 0:
-                            # File size is stable and non-zero, file is complete
-                            file_found = True
-                            break
-                        else:
-                            if attempt < max_retries - 1:
-                                print(f"[WAIT] Shot {shot_idx}{variation_label}: File still writing... (retry {attempt + 1}/{max_retries})")
-                                time.sleep(retry_delay)
-                            else:
-                                print(f"[WARN] Shot {shot_idx}{variation_label}: File size unstable after {max_retries} retries")
-                    except OSError as e:
-                        if attempt < max_retries - 1:
-                            print(f"[WAIT] Shot {shot_idx}{variation_label}: Cannot access file yet... (retry {attempt + 1}/{max_retries})")
-                            time.sleep(retry_delay)
-                        else:
-                            print(f"[ERROR] Shot {shot_idx}{variation_label}: Cannot access file: {e}")
-                else:
-                    if attempt < max_retries - 1:
-                        print(f"[WAIT] Shot {shot_idx}{variation_label}: File not on disk yet... (retry {attempt + 1}/{max_retries})")
-                        time.sleep(retry_delay)
-                    else:
-                        print(f"[FAIL] Shot {shot_idx}{variation_label}: File not found after {max_retries} retries")
-
-            if file_found:
-                shutil.copy2(source_path, video_save_path)
-                print(f"[COPY] Shot {shot_idx}{variation_label}: {video_filename} -> session/videos/")
-                print(f"       Source: {source_path}")
-                print(f"       Target: {video_save_path}")
-
-                # Verify copy
-                if os.path.exists(video_save_path):
-                    file_size = os.path.getsize(video_save_path)
-                    print(f"[INFO] Video saved: {video_filename} ({file_size:,} bytes)")
-
-                    # Mark as rendered with video path
-                    # Only mark primary variation (1) in session metadata
-                    if variation_idx == 1:
-                        session_mgr.mark_video_rendered(session_id, shot_idx, video_save_path)
-                    return True, None, video_save_path
-                else:
-                    print(f"[WARN] Copy verification failed")
-                    return False, "Video copy failed", None
-            else:
-                print(f"[FAIL] Source video not found after retries: {source_path}")
-                print(f"[HINT] ComfyUI may have saved it to a different location")
-                print(f"[HINT] Check ComfyUI's output directory")
-                # DON'T mark as rendered - the video file doesn't exist
-                return False, "Source video not found", None
-
-        elif image_outputs:
-            print(f"[WARN] Shot {shot_idx}{variation_label}: Generated {len(image_outputs)} frame(s) instead of video")
-            for i in image_outputs[:3]:
-                print(f"       - {i['filename']}")
-            if len(image_outputs) > 3:
-                print(f"       ... and {len(image_outputs) - 3} more")
-
-            # No video file, just frames - this is a failure for video generation
-            # DON'T mark as rendered - we wanted a video, not frames
-            return False, "Generated frames instead of video", None
-
-        else:
-            print(f"[FAIL] Shot {shot_idx}{variation_label}: Unknown output type")
-            return False, "Unknown output type", None
+        return _collect_video_output(wait_result, session_id, shot_idx, session_mgr,
+                                     variation_idx=variation_idx, variation_label=variation_label,
+                                     cache_key=cache_key)
 
     except Exception as e:
         error_msg = f"Exception during render: {str(e)}"
@@ -714,6 +798,207 @@ def submit_and_verify_video(template, shot, shot_length, session_id, shot_idx, s
         return False, error_msg, None
 
 
+def _print_http_pool_stats():
+    """Print connection reuse of the shared HTTP pools (see core/http_client.py) and LLM latency."""
+    from core.http_client import pool_stats
+    from core.llm_cache import get_llm_cache
+    from core.llm_engine import provider_stats
+
+    for entry in pool_stats():
+        print(f"[HTTP] {entry['host']}: {entry['requests']} request(s) over "
+              f"{entry['connections']} connection(s) (reuse {entry['reuse']:.0%})")
+    for entry in provider_stats():
+        if not entry['calls']:
+            continue
+        print(f"[LLM] {entry['provider']} ({entry['model']}): {entry['calls']} call(s), "
+              f"avg {entry['avg_seconds']:.2f}s, first {entry['first_seconds']:.2f}s, "
+              f"client setup {entry['setup_seconds']:.2f}s x{entry['client_setups']}")
+    llm_cache = get_llm_cache()
+    if llm_cache and (llm_cache.hits or llm_cache.misses):
+        print(f"[LLM] Response cache: {llm_cache.hits} hit(s), {llm_cache.misses} miss(es)")
+
+
+def _reattach_render_jobs(jobs, session_id, session_mgr):
+    """
+    Re-attach render jobs to prompts queued by an earlier (crashed) run.
+
+    Every submission is recorded in shots.json with the hash of its workflow.
+    Jobs must be compiled first (job.workflow): a record whose hash differs
+    from the freshly compiled workflow (shot or template changed) is dropped
+    and its prompt removed from the ComfyUI queue if it is still pending.
+    If ComfyUI still has a matching prompt queued or running, or has already
+    finished it, the job takes over that prompt_id and is waited on /
+    collected instead of being submitted again. Prompts ComfyUI no longer
+    knows about are forgotten and rendered normally. When the node cannot be
+    reached the job is deferred (not submitted), since its prompt may still
+    be rendering there; the record is kept so a later run can re-attach.
+    """
+    from core.comfy_client import delete_queued_prompt, get_prompt_state
+    from core.comfy_pool import get_backend_pool
+
+    pool = get_backend_pool()
+    for job in jobs:
+        if job.workflow is None:
+            continue
+        record = session_mgr.get_render_submission(session_id, job.shot_idx, job.variation_idx)
+        if not record or not record.get('prompt_id'):
+            continue
+
+        prompt_id = record['prompt_id']
+        if record.get('backend'):
+            pool.pin(prompt_id, record['backend'])
+
+        current_hash = workflow_hash(job.workflow)
+        if record.get('workflow_hash') != current_hash:
+            print(f"[RESUME] {job.label}: Prompt {prompt_id[:8]}... was queued for an older version "
+                  f"of this shot, re-rendering")
+            delete_queued_prompt(prompt_id)
+            session_mgr.clear_render_submission(session_id, job.shot_idx, job.variation_idx)
+            continue
+
+        state = get_prompt_state(prompt_id)
+        if state in ("queued", "finished"):
+            job.prompt_id = prompt_id
+            job.cache_key = current_hash if _render_cache_key(job.workflow) else None
+            logger.info(f"{job.label}: re-attaching to prompt {prompt_id} ({state})")
+            print(f"[RESUME] {job.label}: Prompt {prompt_id[:8]}... {state} in ComfyUI, re-attaching")
+        elif state == "missing":
+            print(f"[RESUME] {job.label}: Prompt {prompt_id[:8]}... no longer in ComfyUI, re-rendering")
+            session_mgr.clear_render_submission(session_id, job.shot_idx, job.variation_idx)
+        else:
+            job.deferred = True
+            job.error = (f"ComfyUI node {record.get('backend')} unreachable; prompt {prompt_id[:8]}... "
+                         f"may still be rendering there, not resubmitted")
+            print(f"[WARN] {job.label}: {job.error}. Resume the session again once the node is back")
+
+
+def _prepare_render_jobs(template, jobs, shot_length, session_id, session_mgr):
+    """
+    Compile RenderJobs, re-attach them to prompts of an interrupted run and
+    serve workflows rendered before from the render cache.
+
+    Compile errors, deferred jobs and cache hits are settled on the jobs
+    themselves; only the jobs that still have to reach ComfyUI are returned,
+    ordered by core/render_scheduler.py (grouped by LoRA stack unless
+    RENDER_SCHEDULE is "shot_order").
+    """
+    from core.render_scheduler import schedule_render_jobs
+
+    # Compile every job up front (re-attaching compares against the fresh
+    # workflow), then serve workflows rendered before from the render cache;
+    # only misses reach ComfyUI
+    for job in jobs:
+        try:
+            job.workflow = _compile_video_workflow(template, job.shot, shot_length, image_path=job.image_path)
+        except Exception as e:
+            job.error = f"Exception while compiling workflow: {str(e)}"
+            variation_label = f" (variation {job.variation_idx})" if job.variation_idx > 1 else ""
+            print(f"[FAIL] Shot {job.shot_idx}{variation_label}: {job.error}")
+
+    _reattach_render_jobs(jobs, session_id, session_mgr)
+
+    pending = []
+    for job in jobs:
+        if job.workflow is None or job.deferred:
+            continue
+        if job.prompt_id:
+            pending.append(job)
+            continue
+        variation_label = f" (variation {job.variation_idx})" if job.variation_idx > 1 else ""
+        job.cache_key = _render_cache_key(job.workflow)
+        cached = _materialize_cached_video(job.cache_key, session_id, job.shot_idx, session_mgr,
+                                           variation_idx=job.variation_idx, variation_label=variation_label)
+        if cached:
+            job.success, job.error, job.video_path = cached
+        else:
+            pending.append(job)
+
+    # Group renders sharing a LoRA stack so ComfyUI re-patches the model less often
+    return schedule_render_jobs(pending)
+
+
+def _video_render_pipeline(template, shot_length, session_id, session_mgr):
+    """RenderPipeline submitting compiled video workflows across the backend pool."""
+    from core.render_pipeline import RenderPipeline
+    from core.comfy_pool import get_backend_pool
+
+    depth = getattr(config, 'RENDER_PIPELINE_DEPTH', 1)
+
+    def submit_job(job):
+        return _submit_video_prompt(template, job.shot, shot_length, image_path=job.image_path,
+                                    session_id=session_id, session_mgr=session_mgr,
+                                    variation_idx=job.variation_idx, wf=job.workflow)
+
+    def collect_job(job, wait_result):
+        variation_label = f" (variation {job.variation_idx})" if job.variation_idx > 1 else ""
+        return _collect_video_output(wait_result, session_id, job.shot_idx, session_mgr,
+                                     variation_idx=job.variation_idx, variation_label=variation_label,
+                                     cache_key=job.cache_key)
+
+    return RenderPipeline(submit_job, collect_job, depth=get_backend_pool().capacity(depth, stage="video"),
+                          timeout=config.VIDEO_RENDER_TIMEOUT)
+
+
+def _run_render_jobs(template, jobs, shot_length, session_id, session_mgr):
+    """
+    Render a list of RenderJobs, pipelined when RENDER_PIPELINE_DEPTH > 1.
+
+    Jobs are prepared by _prepare_render_jobs (compile, re-attach, render
+    cache, LoRA grouping). With a depth of 1 and a single ComfyUI node every
+    remaining job goes through submit_and_verify_video one at a time.
+    Otherwise up to depth x nodes compiled workflows stay queued across the
+    backend pool and finished videos are collected out of order on a separate
+    worker.
+
+    Args:
+        template: ComfyUI workflow template
+        jobs: List of RenderJob
+        shot_length: Length of each shot in seconds
+        session_id: Current session ID
+        session_mgr: SessionManager instance
+
+    Returns:
+        The list of jobs with success/error/video_path filled in
+    """
+    from core.comfy_pool import get_backend_pool
+
+    depth = getattr(config, 'RENDER_PIPELINE_DEPTH', 1)
+    pool = get_backend_pool()
+
+    pending = _prepare_render_jobs(template, jobs, shot_length, session_id, session_mgr)
+
+    if depth <= 1 and len(pool) <= 1:
+        for job in pending:
+            if job.prompt_id:
+                print(f"\n[ATTACH] {job.label}: Prompt {job.prompt_id[:8]}... already in ComfyUI")
+                variation_label = f" (variation {job.variation_idx})" if job.variation_idx > 1 else ""
+                try:
+                    wait_result = wait_for_prompt_completion(job.prompt_id, timeout=config.VIDEO_RENDER_TIMEOUT)
+                    job.success, job.error, job.video_path = _collect_video_output(
+                        wait_result, session_id, job.shot_idx, session_mgr,
+                        variation_idx=job.variation_idx, variation_label=variation_label,
+                        cache_key=job.cache_key
+                    )
+                except Exception as e:
+                    job.success, job.error, job.video_path = False, f"Exception while re-attaching: {str(e)}", None
+                    print(f"[FAIL] {job.label}: {job.error}")
+                    import traceback
+                    traceback.print_exc()
+                continue
+            print(f"\n[PROCESS] {job.label}: Using image '{os.path.basename(job.image_path)}'")
+            print(f"[SUBMIT] {job.label} ({shot_length}s)")
+            job.success, job.error, job.video_path = submit_and_verify_video(
+                template, job.shot, shot_length, session_id, job.shot_idx, session_mgr,
+                image_path=job.image_path, variation_idx=job.variation_idx,
+                wf=job.workflow, cache_key=job.cache_key
+            )
+        return jobs
+
+    if pending:
+        _video_render_pipeline(template, shot_length, session_id, session_mgr).run(pending)
+    return jobs
+
+
 def continue_session(session_id, session_meta, session_mgr, args=None):
     """Continue from an existing session"""
     if args is None:
@@ -734,8 +1019,7 @@ def continue_session(session_id, session_meta, session_mgr, args=None):
 
     # Load shots data
     if os.path.exists(shots_path):
-        with open(shots_path, 'r', encoding='utf-8') as f:
-            shots = json.load(f)
+        shots = session_mgr.get_shots(session_id)
     else:
         print("[ERROR] Cannot find shots data for session. Starting fresh.")
         return None
@@ -892,6 +1176,7 @@ def continue_session(session_id, session_meta, session_mgr, args=None):
     failed_renders = 0
     total_renders = 0
     errors = []
+    render_jobs = []
 
     for shot in valid_shots:
         shot_idx = shot.get('index', 0)
@@ -919,26 +1204,24 @@ def continue_session(session_id, session_meta, session_mgr, args=None):
             failed_renders += 1
             continue
 
-        # Print image name before video generation
-        print(f"\n[PROCESS] Shot {shot_idx}: Using image '{os.path.basename(image_paths[0])}'")
-
-        # Render video for each image variation
-        print(f"[SUBMIT] Shot {shot_idx} ({shot_length}s each, {len(image_paths)} variation(s))")
-
+        # Queue a render job for each image variation
         for variation_idx, img_path in enumerate(image_paths, 1):
-            total_renders += 1
-            variation_label = f" (variation {variation_idx}/{len(image_paths)})" if len(image_paths) > 1 else ""
-
-            success, error, video_path = submit_and_verify_video(
-                template, shot, shot_length, session_id, shot_idx, session_mgr,
-                image_path=img_path, variation_idx=variation_idx
-            )
-
-            if success:
-                successful_renders += 1
-            else:
-                failed_renders += 1
-                errors.append(f"Shot {shot_idx}{variation_label}: {error}")
+            render_jobs.append(RenderJob(
+                shot=shot, shot_idx=shot_idx, image_path=img_path,
+                variation_idx=variation_idx, variation_count=len(image_paths),
+                priority=shot.get('render_priority', 0)
+            ))
+
+    # Render all queued jobs (pipelined when RENDER_PIPELINE_DEPTH > 1)
+    _run_render_jobs(template, render_jobs, shot_length, session_id, session_mgr)
+
+    for job in render_jobs:
+        total_renders += 1
+        if job.success:
+            successful_renders += 1
+        else:
+            failed_renders += 1
+            errors.append(f"{job.label}: {job.error}")
 
     # Summary
     print("\n" + "="*70)
@@ -946,6 +1229,7 @@ def continue_session(session_id, session_meta, session_mgr, args=None):
     print("="*70)
     print(f"Successful: {successful_renders}/{total_renders}")
     print(f"Failed: {failed_renders}/{total_renders}")
+    _print_http_pool_stats()
 
     if errors:
         print("\n[ERRORS] Failed renders:")
@@ -959,8 +1243,11 @@ def continue_session(session_id, session_meta, session_mgr, args=None):
     # Mark step complete
     session_mgr.mark_step_complete(session_id, 'videos')
 
-    # Only mark session complete if all renders succeeded
-    if failed_renders == 0:
+    # Only mark session complete if all renders succeeded and every shot has a
+    # video (shots that never got an image have no render job at all)
+    shots_status = session_mgr.get_shots(session_id)
+    all_rendered = bool(shots_status) and all(s.get('video_rendered') for s in shots_status)
+    if failed_renders == 0 and all_rendered:
         session_mgr.mark_session_complete(session_id)
         print("\n[SUCCESS] SESSION COMPLETE!")
     else:
@@ -1377,7 +1664,12 @@ def _run_auto_mode(session_id, session_meta, session_mgr, idea, image_mode, nega
         print("\n[SKIP] STEP 3: Scene Graph already created")
 
     # STEP 4: Shot Planning (with max_shots if specified)
-    if not steps.get('shots', False):
+    if not steps.get('shots', False) and getattr(config, 'STREAM_SHOT_PLANNING', False) and not steps.get('images', False):
+        logger.info("STEP 4: Shot Planning (images start per planned batch)")
+        print("\nSTEP 4: Shot Planning (images start per planned batch)")
+        shots = _plan_and_generate_incremental(session_id, session_mgr, graph, max_shots, image_agent, video_agent,
+                                               shots_per_scene, image_mode, negative_prompt, images_per_shot)
+    elif not steps.get('shots', False):
         logger.info("STEP 4: Shot Planning")
         print("\nSTEP 4: Shot Planning")
         shots = plan_shots(graph, max_shots=max_shots, image_agent=image_agent, video_agent=video_agent, shots_per_scene=shots_per_scene)
@@ -1386,21 +1678,26 @@ def _run_auto_mode(session_id, session_meta, session_mgr, idea, image_mode, nega
         session_mgr.save_shots(session_id, shots)
     else:
         # Reload shots if already done
-        shots_dir = session_mgr.get_session_dir(session_id)
-        shots_path = os.path.join(shots_dir, "shots.json")
-        with open(shots_path, 'r', encoding='utf-8') as f:
-            shots = json.load(f)
+        shots = session_mgr.get_shots(session_id)
 
-    # STEP 4.5: Image Generation
+    # STEP 4.5: Image Generation (streamed into STEP 5 when STREAM_IMAGES_TO_VIDEOS allows it)
+    streamed = False
     if not steps.get('images', False):
-        logger.info("STEP 4.5: Image Generation")
-        print("\nSTEP 4.5: Image Generation")
-        _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot)
+        if not steps.get('videos', False) and _use_streaming_render(image_mode):
+            logger.info("STEP 4.5 + 5: Image Generation streamed into Rendering")
+            print("\nSTEP 4.5 + 5: Image Generation streamed into Rendering")
+            if not _generate_and_render_streaming(session_id, session_mgr, shots, image_mode, negative_prompt,
+                                                  images_per_shot, shot_length):
+                print("[STOP] Image generation failed; videos were rendered only for shots with images.")
+                print("[HINT] Resume the session to regenerate missing images, or use 'python regenerate.py --images'")
+                return None
+            streamed = True
+        else:
+            logger.info("STEP 4.5: Image Generation")
+            print("\nSTEP 4.5: Image Generation")
+            _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot)
         # Reload shots with updated paths
-        shots_dir = session_mgr.get_session_dir(session_id)
-        shots_path = os.path.join(shots_dir, "shots.json")
-        with open(shots_path, 'r', encoding='utf-8') as f:
-            shots = json.load(f)
+        shots = session_mgr.get_shots(session_id)
 
         # Check if all shots now have images after generation
         shots_with_images = [s for s in shots if s.get('image_path')]
@@ -1417,9 +1714,10 @@ def _run_auto_mode(session_id, session_meta, session_mgr, idea, image_mode, nega
 
         # Check if shots have image_path and files exist
         missing_images = False
+        inventory = get_media_inventory(images_dir)
         for shot in shots:
             img_path = shot.get('image_path')
-            if not img_path or not os.path.exists(os.path.join(images_dir, os.path.basename(img_path))):
+            if not img_path or not inventory.has(os.path.basename(img_path)):
                 missing_images = True
                 break
 
@@ -1427,10 +1725,7 @@ def _run_auto_mode(session_id, session_meta, session_mgr, idea, image_mode, nega
             print("[WARN] Some images are missing. Regenerating...")
             _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot)
             # Reload shots with updated paths
-            shots_dir = session_mgr.get_session_dir(session_id)
-            shots_path = os.path.join(shots_dir, "shots.json")
-            with open(shots_path, 'r', encoding='utf-8') as f:
-                shots = json.load(f)
+            shots = session_mgr.get_shots(session_id)
 
             # Check if all shots now have images after regeneration attempt
             shots_with_images = [s for s in shots if s.get('image_path')]
@@ -1445,9 +1740,10 @@ def _run_auto_mode(session_id, session_meta, session_mgr, idea, image_mode, nega
             # Update shots with image paths from disk
             for shot_idx, shot in enumerate(shots, start=1):
                 image_paths = []
+                existing = inventory.variations(shot_idx)
                 for var_idx in range(images_per_shot):
-                    img_path = os.path.join(images_dir, f"shot_{shot_idx:03d}_{var_idx + 1:03d}.png")
-                    if os.path.exists(img_path):
+                    img_path = existing.get(var_idx + 1)
+                    if img_path:
                         normalized_path = img_path.replace('\\', '/')
                         image_paths.append(normalized_path)
                 shot['image_paths'] = image_paths
@@ -1458,7 +1754,9 @@ def _run_auto_mode(session_id, session_meta, session_mgr, idea, image_mode, nega
     print(f"\n[DEBUG] Checking video step: steps.get('videos') = {steps.get('videos', False)}")
     print(f"[DEBUG] Shots with images: {len([s for s in shots if s.get('image_path')])}/{len(shots)}")
 
-    if not steps.get('videos', False):
+    if streamed:
+        print("[SKIP] STEP 5: Videos were rendered while images were generated")
+    elif not steps.get('videos', False):
         # Filter to only shots with successfully generated images
         valid_shots = [s for s in shots if s.get('image_path')]
 
@@ -1483,13 +1781,12 @@ def _run_auto_mode(session_id, session_meta, session_mgr, idea, image_mode, nega
 
         # Check if video files actually exist on disk
         # Check for any video matching the pattern shot_XXX*.mp4 (including suffixes)
-        import glob
+        inventory = get_media_inventory(videos_dir)
         missing_videos = False
         for shot in shots:
             shot_idx = shot.get('index', shots.index(shot) + 1)
             # Check for any video file with this shot number (shot_XXX.mp4, shot_XXXa.mp4, etc.)
-            video_pattern = os.path.join(videos_dir, f"shot_{shot_idx:03d}*.mp4")
-            matching_files = glob.glob(video_pattern)
+            matching_files = inventory.files(shot_idx, ext="mp4")
             if not matching_files:
                 missing_videos = True
                 break
@@ -1649,20 +1946,14 @@ def _run_manual_mode(session_id, session_meta, session_mgr, idea, image_mode, ne
             else:
                 print("\n[SKIP] STEP 4: Shots already planned")
                 # Load existing shots
-                shots_dir = session_mgr.get_session_dir(session_id)
-                shots_path = os.path.join(shots_dir, "shots.json")
-                with open(shots_path, 'r', encoding='utf-8') as f:
-                    shots = json.load(f)
+                shots = session_mgr.get_shots(session_id)
 
         elif current_step == 5:  # Image Generation
             if not session_meta.get('steps', {}).get('images', False):
                 print("\nSTEP 5: Image Generation")
                 _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot)
                 # Reload shots with updated paths
-                shots_dir = session_mgr.get_session_dir(session_id)
-                shots_path = os.path.join(shots_dir, "shots.json")
-                with open(shots_path, 'r', encoding='utf-8') as f:
-                    shots = json.load(f)
+                shots = session_mgr.get_shots(session_id)
             else:
                 print("\n[SKIP] STEP 5: Images already generated")
 
@@ -1750,8 +2041,19 @@ def _run_manual_mode(session_id, session_meta, session_mgr, idea, image_mode, ne
                 return
 
 
-def _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot=1):
-    """Generate images for all shots with optional multiple variations and automatic retry mechanism"""
+def _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot=1,
+                     shot_callback=None, partial=False):
+    """
+    Generate images for all shots with optional multiple variations and automatic retry mechanism.
+
+    shot_callback(shot), if given, is called for every shot whose images are
+    complete - already on disk or just generated - so video rendering can start
+    before the whole image step is done.
+
+    partial=True generates a subset of the session's shots (one planning batch):
+    the images step is not marked complete and failures are left for the
+    regular image step to retry.
+    """
     from core.image_generator import generate_images_for_shots
     from core.retry_tracker import RetryTracker
 
@@ -1761,23 +2063,27 @@ def _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt
     # First, try to load any existing images from disk (resume case)
     shots_with_existing_images = []
     shots_needing_images = []
+    inventory = get_media_inventory(images_dir)
 
-    for shot_idx, shot in enumerate(shots, start=1):
-        # Use sequential index to match filenames
+    for position, shot in enumerate(shots, start=1):
+        # Filenames use the stored shot index (sequential 1..n in shots.json)
+        shot_idx = shot.get('index', position)
         image_paths = []
+        existing = inventory.variations(shot_idx)
         for var_idx in range(images_per_shot):
-            img_path = os.path.join(images_dir, f"shot_{shot_idx:03d}_{var_idx + 1:03d}.png")
-            if os.path.exists(img_path):
+            img_path = existing.get(var_idx + 1)
+            if img_path:
                 normalized_path = img_path.replace('\\', '/')
                 image_paths.append(normalized_path)
-                stored_index = shot.get('index', shot_idx)
-                session_mgr.mark_image_generated(session_id, stored_index, normalized_path)
+                session_mgr.mark_image_generated(session_id, shot_idx, normalized_path)
 
         shot['image_paths'] = image_paths
         shot['image_path'] = image_paths[0] if image_paths else None
 
         if image_paths:
             shots_with_existing_images.append(shot)
+            if shot_callback and len(image_paths) == images_per_shot:
+                shot_callback(shot)
         else:
             shots_needing_images.append(shot)
 
@@ -1807,7 +2113,8 @@ def _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt
             negative_prompt=negative_prompt,
             images_per_shot=images_per_shot,
             progress_callback=update_state_callback,
-            retry_tracker=retry_tracker
+            retry_tracker=retry_tracker,
+            shot_callback=shot_callback
         )
 
         # Mark newly generated images in session
@@ -1831,6 +2138,12 @@ def _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt
     # Check final status and handle partial success
     shots_with_images = [s for s in shots if s.get('image_path')]
 
+    if partial:
+        if len(shots_with_images) < len(shots):
+            print(f"[WARNING] {len(shots) - len(shots_with_images)} shot(s) of this batch failed; "
+                  f"they are retried in the image step")
+        return
+
     if len(shots_with_images) == len(shots):
         # All shots have images
         session_mgr.mark_step_complete(session_id, 'images')
@@ -1850,28 +2163,94 @@ def _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt
         print(f"\n[ERROR] All shots failed to generate images. Cannot continue to video generation.")
         raise Exception("Image generation failed for all shots")
 
-def _render_videos(session_id, session_mgr, valid_shots, shot_length, shots):
-    """Render videos for all shots and all image variations"""
-    template = load_workflow(config.WORKFLOW_PATH, video_length_seconds=shot_length)
+def _plan_and_generate_incremental(session_id, session_mgr, graph, max_shots, image_agent, video_agent,
+                                   shots_per_scene, image_mode, negative_prompt, images_per_shot):
+    """
+    Plan shots batch by batch and generate images for each batch while later
+    batches are still being planned (STREAM_SHOT_PLANNING). With
+    STREAM_LLM_SHOTS, shots arrive one at a time while the LLM writes them.
+
+    plan_shots releases batches in order with final shot indices; each batch is
+    appended to shots.json and handed to an image worker thread. Batches saved
+    by an interrupted run are not planned again, except from the first batch
+    that was cut off mid-stream or failed: those shots and their images are
+    dropped and planned anew.
+    The regular image step runs afterwards and only has to fill in what failed
+    here.
 
-    # Load shots status from shots.json to check which videos are already rendered
-    shots_status = session_mgr.get_shots(session_id)
-    shots_status_dict = {s['index']: s for s in shots_status}
+    Returns:
+        list: All planned shots as stored in shots.json
+    """
+    import queue
+    import threading
+
+    planned = session_mgr.get_shots(session_id)
+    kept = complete_planned_shots(planned, session_mgr.load_session(session_id).get('planned_batches'))
+    if len(kept) < len(planned):
+        _discard_unfinished_batches(session_id, session_mgr, planned[len(kept):])
+        planned = session_mgr.truncate_shots(session_id, len(kept))
+    batches = queue.Queue()
+    done = object()
+
+    def on_batch(batch_shots):
+        batch_shots = enhance_motion_prompts_with_triggers(batch_shots)
+        stored = session_mgr.append_shots(session_id, batch_shots)
+        first, last = batch_shots[0]['index'], batch_shots[-1]['index']
+        print(f"[STREAM] Shots {first}-{last} planned, starting their images")
+        batches.put(stored[first - 1:last])
+
+    def image_stage():
+        while True:
+            batch_shots = batches.get()
+            if batch_shots is done:
+                return
+            try:
+                _generate_images(session_id, session_mgr, batch_shots, image_mode, negative_prompt,
+                                 images_per_shot, partial=True)
+            except Exception as e:
+                logger.error(f"Image generation for planned batch failed: {e}")
+                print(f"[WARNING] Image generation for planned batch failed: {e}")
 
-    # Filter out shots without images (in case of partial failure)
-    shots_with_images = [s for s in valid_shots if s.get('image_path')]
+    worker = threading.Thread(target=image_stage, name="stream-images", daemon=True)
+    worker.start()
+    try:
+        plan_shots(graph, max_shots=max_shots, image_agent=image_agent, video_agent=video_agent,
+                   shots_per_scene=shots_per_scene, on_batch=on_batch, planned=planned,
+                   on_batch_done=lambda batch_num: session_mgr.mark_batch_planned(session_id, batch_num))
+    finally:
+        batches.put(done)
+        worker.join()
 
-    if len(shots_with_images) < len(valid_shots):
-        skipped = len(valid_shots) - len(shots_with_images)
-        print(f"[INFO] Skipping {skipped} shot(s) without images (partial image generation failure)")
+    session_mgr.mark_step_complete(session_id, 'shots')
+    return session_mgr.get_shots(session_id)
 
-    # Update valid_shots to only include shots with images
-    valid_shots = shots_with_images
 
-    # Track results
-    successful_renders = 0
-    failed_renders = 0
-    total_renders = 0
+def _discard_unfinished_batches(session_id, session_mgr, shots):
+    """Delete the images of shots from planning batches dropped on resume (see complete_planned_shots)."""
+    images_dir = session_mgr.get_images_dir(session_id)
+    inventory = get_media_inventory(images_dir)
+    removed = 0
+    for shot in shots:
+        for img_path in inventory.variations(shot['index']).values():
+            try:
+                os.remove(img_path)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove {img_path}: {e}")
+    print(f"[RESUME] Batch {shots[0].get('batch_number')} did not finish planning: dropping "
+          f"{len(shots)} saved shot(s) from it on and {removed} image(s), planning them again")
+
+
+def _build_render_jobs(valid_shots, shots, shots_status_dict):
+    """
+    Build RenderJobs for every image variation of shots that still need a video.
+
+    Returns:
+        tuple: (render_jobs, already_rendered count, shots without images count, errors list)
+    """
+    render_jobs = []
+    already_rendered = 0
+    missing_images = 0
     errors = []
 
     for shot in valid_shots:
@@ -1881,7 +2260,7 @@ def _render_videos(session_id, session_mgr, valid_shots, shot_length, shots):
         # Skip if already rendered
         if shot_meta.get('video_rendered', False):
             print(f"[SKIP] Shot {shot_idx}: Video already marked as rendered")
-            successful_renders += 1
+            already_rendered += 1
             continue
 
         # Get all image paths for this shot
@@ -1895,29 +2274,32 @@ def _render_videos(session_id, session_mgr, valid_shots, shot_length, shots):
         if not image_paths:
             print(f"\n[SKIP] Shot {shot_idx}: No images found")
             errors.append(f"Shot {shot_idx}: No images found")
-            failed_renders += 1
+            missing_images += 1
             continue
 
-        # Print image name before video generation
-        print(f"\n[PROCESS] Shot {shot_idx}: Using image '{os.path.basename(image_paths[0])}'")
+        # Queue a render job for each image variation
+        for variation_idx, img_path in enumerate(image_paths, 1):
+            render_jobs.append(RenderJob(
+                shot=shot, shot_idx=shot_idx, image_path=img_path,
+                variation_idx=variation_idx, variation_count=len(image_paths),
+                priority=shot.get('render_priority', 0)
+            ))
 
-        # Render video for each image variation
-        print(f"[SUBMIT] Shot {shot_idx} ({shot_length}s each, {len(image_paths)} variation(s))")
+    return render_jobs, already_rendered, missing_images, errors
 
-        for variation_idx, img_path in enumerate(image_paths, 1):
-            total_renders += 1
-            variation_label = f" (variation {variation_idx}/{len(image_paths)})" if len(image_paths) > 1 else ""
 
-            success, error, video_path = submit_and_verify_video(
-                template, shot, shot_length, session_id, shot_idx, session_mgr,
-                image_path=img_path, variation_idx=variation_idx
-            )
+def _finish_render_step(session_id, session_mgr, render_jobs, successful_renders=0, failed_renders=0,
+                        errors=None):
+    """Print the render summary and mark the videos step / session complete."""
+    errors = list(errors or [])
 
-            if success:
-                successful_renders += 1
-            else:
-                failed_renders += 1
-                errors.append(f"Shot {shot_idx}{variation_label}: {error}")
+    for job in render_jobs:
+        if job.success:
+            successful_renders += 1
+        else:
+            failed_renders += 1
+            errors.append(f"{job.label}: {job.error}")
+    total_renders = successful_renders + failed_renders
 
     # Summary
     print("\n" + "="*70)
@@ -1925,6 +2307,7 @@ def _render_videos(session_id, session_mgr, valid_shots, shot_length, shots):
     print("="*70)
     print(f"Successful: {successful_renders}/{total_renders}")
     print(f"Failed: {failed_renders}/{total_renders}")
+    _print_http_pool_stats()
 
     if errors:
         print("\n[ERRORS] Failed renders:")
@@ -1939,8 +2322,11 @@ def _render_videos(session_id, session_mgr, valid_shots, shot_length, shots):
     if successful_renders > 0:
         session_mgr.mark_step_complete(session_id, 'videos')
 
-    # Only mark session complete if all renders succeeded
-    if failed_renders == 0:
+    # Only mark session complete if all renders succeeded and every shot has a
+    # video (shots that never got an image have no render job at all)
+    shots_status = session_mgr.get_shots(session_id)
+    all_rendered = bool(shots_status) and all(s.get('video_rendered') for s in shots_status)
+    if failed_renders == 0 and all_rendered:
         session_mgr.mark_session_complete(session_id)
         print("\n[SUCCESS] ALL RENDERS COMPLETE!")
     else:
@@ -1949,6 +2335,180 @@ def _render_videos(session_id, session_mgr, valid_shots, shot_length, shots):
     session_mgr.print_session_summary(session_id)
 
 
+def _render_videos(session_id, session_mgr, valid_shots, shot_length, shots):
+    """Render videos for all shots and all image variations"""
+    template = load_workflow(config.WORKFLOW_PATH, video_length_seconds=shot_length)
+
+    # Load shots status from shots.json to check which videos are already rendered
+    shots_status = session_mgr.get_shots(session_id)
+    shots_status_dict = {s['index']: s for s in shots_status}
+
+    # Filter out shots without images (in case of partial failure)
+    shots_with_images = [s for s in valid_shots if s.get('image_path')]
+
+    skipped = len(valid_shots) - len(shots_with_images)
+    if skipped:
+        print(f"[INFO] Skipping {skipped} shot(s) without images (partial image generation failure)")
+
+    render_jobs, already_rendered, missing_images, errors = _build_render_jobs(shots_with_images, shots,
+                                                                               shots_status_dict)
+    errors.extend(f"Shot {s.get('index', '?')}: no image generated" for s in valid_shots
+                  if not s.get('image_path'))
+
+    # Render all queued jobs (pipelined when RENDER_PIPELINE_DEPTH > 1)
+    _run_render_jobs(template, render_jobs, shot_length, session_id, session_mgr)
+
+    _finish_render_step(session_id, session_mgr, render_jobs, successful_renders=already_rendered,
+                        failed_renders=missing_images + skipped, errors=errors)
+
+
+def _use_streaming_render(image_mode):
+    """
+    True if images should stream into video rendering (STREAM_IMAGES_TO_VIDEOS).
+
+    Streaming only pays off when images are made on a different resource than
+    the video GPU: a non-ComfyUI image backend, or ComfyUI nodes dedicated to
+    each model family. Otherwise Flux and Wan would swap on the same GPU.
+    """
+    if not getattr(config, 'STREAM_IMAGES_TO_VIDEOS', False):
+        return False
+    if image_mode != "comfyui":
+        return True
+    from core.comfy_pool import get_backend_pool
+    return get_backend_pool().has_dedicated_stages()
+
+
+def _generate_and_render_streaming(session_id, session_mgr, shots, image_mode, negative_prompt,
+                                   images_per_shot, shot_length):
+    """
+    Generate images and render videos concurrently.
+
+    Each shot is handed to the video stage through a bounded queue
+    (STREAM_QUEUE_SIZE) as soon as its images are generated and marked in the
+    session, so the ComfyUI GPU starts rendering while later images are still
+    being made. The video stage prepares whatever shots are waiting as one
+    batch (_prepare_render_jobs: render cache, re-attach, LoRA grouping) and
+    feeds it to one long-lived RenderPipeline, which keeps its prompts queued
+    in ComfyUI across batches instead of draining at every batch boundary.
+    State is written per image and per video exactly as in the step-by-step
+    flow, so an interrupted run resumes normally.
+
+    Returns:
+        bool: False if image generation stopped the pipeline
+    """
+    import queue
+    import threading
+
+    template = load_workflow(config.WORKFLOW_PATH, video_length_seconds=shot_length)
+    shots_status_dict = {s['index']: s for s in session_mgr.get_shots(session_id)}
+
+    ready = queue.Queue(maxsize=max(1, getattr(config, 'STREAM_QUEUE_SIZE', 4)))
+    # Prepared job batches for the pipeline; bounded too, so the image stage
+    # still waits while renders fall behind
+    feed = queue.Queue(maxsize=ready.maxsize)
+    queued = set()
+    render_jobs = []
+    totals = {'already_rendered': 0, 'missing_images': 0, 'errors': []}
+    done = object()
+
+    def on_shot_ready(shot):
+        shot_idx = shot.get('index', shots.index(shot) + 1)
+        if shot_idx in queued:
+            return
+        queued.add(shot_idx)
+        print(f"[STREAM] Shot {shot_idx}: images ready, queued for video rendering")
+        ready.put(shot)  # Blocks while the video stage is STREAM_QUEUE_SIZE shots behind
+
+    def video_stage():
+        finished = False
+        try:
+            while not finished:
+                batch = [ready.get()]
+                # Prepare everything that is already waiting as one batch
+                while True:
+                    try:
+                        batch.append(ready.get_nowait())
+                    except queue.Empty:
+                        break
+                if done in batch:
+                    finished = True
+                    batch = [shot for shot in batch if shot is not done]
+                if not batch:
+                    continue
+
+                jobs, already_rendered, missing_images, errors = _build_render_jobs(batch, shots, shots_status_dict)
+                totals['already_rendered'] += already_rendered
+                totals['missing_images'] += missing_images
+                totals['errors'].extend(errors)
+                if not jobs:
+                    continue
+                render_jobs.extend(jobs)
+                try:
+                    pending = _prepare_render_jobs(template, jobs, shot_length, session_id, session_mgr)
+                except Exception as e:
+                    for job in jobs:
+                        if not job.success and not job.error:
+                            job.error = f"Exception while preparing render: {str(e)}"
+                    logger.error(f"Preparing streamed renders failed: {e}")
+                    continue
+                if pending:
+                    feed.put(pending)
+        finally:
+            feed.put(None)
+
+    def render_stage():
+        pipeline = _video_render_pipeline(template, shot_length, session_id, session_mgr)
+        try:
+            pipeline.run_stream(feed)
+        except Exception as e:
+            logger.error(f"Streaming render pipeline failed: {e}")
+            print(f"[ERROR] Video rendering stopped: {e}")
+            # Keep the video stage from blocking on a feed nobody reads
+            while preparer.is_alive() or not feed.empty():
+                try:
+                    feed.get(timeout=1)
+                except queue.Empty:
+                    pass
+            for job in render_jobs:
+                if not job.success and not job.error:
+                    job.error = f"Exception during render: {str(e)}"
+
+    print(f"[STREAM] Rendering videos while images are generated "
+          f"(up to {ready.maxsize} shot(s) queued between the stages)")
+    preparer = threading.Thread(target=video_stage, name="stream-prepare", daemon=True)
+    renderer = threading.Thread(target=render_stage, name="stream-render", daemon=True)
+    preparer.start()
+    renderer.start()
+
+    images_ok = True
+    try:
+        _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot,
+                         shot_callback=on_shot_ready)
+        # Shots that only succeeded in the retry rounds (or with fewer variations)
+        for shot in shots:
+            if shot.get('image_path'):
+                on_shot_ready(shot)
+    except Exception as e:
+        images_ok = False
+        print(f"[ERROR] Image generation stopped: {e}")
+        print("[INFO] Finishing videos for shots whose images are already done...")
+    finally:
+        ready.put(done)
+        preparer.join()
+        renderer.join()
+
+    # Shots whose images never arrived got no render job; they count as failed
+    without_images = [shot.get('index', shot_idx) for shot_idx, shot in enumerate(shots, start=1)
+                      if shot.get('index', shot_idx) not in queued]
+    totals['errors'].extend(f"Shot {shot_idx}: no image generated" for shot_idx in without_images)
+
+    _finish_render_step(session_id, session_mgr, render_jobs,
+                        successful_renders=totals['already_rendered'],
+                        failed_renders=totals['missing_images'] + len(without_images),
+                        errors=totals['errors'])
+    return images_ok
+
+
 def _run_with_prompts_file(session_mgr, args):
     """
     Run workflow using custom prompts file (skip story generation).
@@ -2078,10 +2638,7 @@ def _run_with_prompts_file(session_mgr, args):
     _generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot)
 
     # Reload shots with image paths
-    shots_dir = session_mgr.get_session_dir(session_id)
-    shots_path = os.path.join(shots_dir, "shots.json")
-    with open(shots_path, 'r', encoding='utf-8') as f:
-        shots = json.load(f)
+    shots = session_mgr.get_shots(session_id)
 
     # Count how many images were actually generated
     shots_with_images = [s for s in shots if s.get('image_path')]
@@ -2585,6 +3142,9 @@ Testing Options:
     # Print configuration summary after command-line overrides
     print_configuration_summary()
 
+    # Set up the LLM client and connection while the user picks a session
+    warm_up_in_background()
+
     # Initialize session manager
     session_mgr = SessionManager()
 
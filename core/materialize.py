@@ -0,0 +1,123 @@
+"""
+Materialize - Put a file (or folder) at a new path without copying bytes where possible
+
+Methods, tried in order:
+    reflink   copy-on-write clone (Btrfs, XFS, ZFS 2.2+, ...); the two files
+              share blocks until one is modified, so it is always safe
+    hardlink  second name for the same inode; only used where the caller
+              allows it, because a writer that opens the file in place would
+              change both names
+    copy      streamed copy (chunked, then copystat)
+
+The destination is always written as <dest>.part and renamed over dest_path,
+so an existing hardlink at dest_path is replaced rather than written through.
+"""
+import os
+import shutil
+
+from core.logger_config import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Get logger for materialization
+logger = get_logger(__name__)
+
+FICLONE = 0x40049409  # Linux ioctl: clone a whole file (reflink)
+COPY_CHUNK_SIZE = 1024 * 1024
+
+_reflink_unsupported = set()  # (source, dest) st_dev pairs that rejected FICLONE
+
+
+def reflink(source, dest_path):
+    """Clone source into a new file dest_path. Returns False if the filesystem cannot."""
+    if fcntl is None or not hasattr(fcntl, 'ioctl'):
+        return False
+    try:
+        devices = (os.stat(source).st_dev, os.stat(os.path.dirname(os.path.abspath(dest_path))).st_dev)
+    except OSError:
+        return False
+    if devices in _reflink_unsupported:
+        return False
+    try:
+        with open(source, 'rb') as src, open(dest_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        _reflink_unsupported.add(devices)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        return False
+    shutil.copystat(source, dest_path)
+    return True
+
+
+def copy_file(source, dest_path, chunk_size=COPY_CHUNK_SIZE):
+    """Streamed copy of source to dest_path, preserving timestamps and mode."""
+    with open(source, 'rb') as src, open(dest_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, chunk_size)
+    shutil.copystat(source, dest_path)
+
+
+def materialize_file(source, dest_path, link=True):
+    """
+    Make dest_path a copy of source: reflink, else hardlink (if link), else streamed copy.
+
+    Returns:
+        "reflink", "hardlink" or "copy"
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+    tmp_path = dest_path + ".part"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    if reflink(source, tmp_path):
+        method = "reflink"
+    else:
+        method = "copy"
+        if link:
+            try:
+                os.link(source, tmp_path)
+                method = "hardlink"
+            except OSError:
+                pass
+        if method == "copy":
+            copy_file(source, tmp_path)
+    os.replace(tmp_path, dest_path)
+    return method
+
+
+def materialize_tree(source_dir, dest_dir, link=False, skip=()):
+    """
+    Recreate source_dir at dest_dir, materializing every file.
+
+    Args:
+        source_dir: Folder to copy
+        dest_dir: New folder (created; existing files are replaced)
+        link: bool, or callable(relative_path) -> bool deciding per file
+              whether a hardlink is acceptable
+        skip: File names to leave out (at any depth)
+
+    Returns:
+        dict: Number of files per method, e.g. {"reflink": 0, "hardlink": 12, "copy": 3}
+    """
+    counts = {"reflink": 0, "hardlink": 0, "copy": 0}
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        os.makedirs(os.path.join(dest_dir, rel_dir), exist_ok=True)
+        with os.scandir(os.path.join(source_dir, rel_dir)) as entries:
+            for entry in entries:
+                if entry.name in skip:
+                    continue
+                rel_path = os.path.join(rel_dir, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(rel_path)
+                elif entry.is_file():
+                    allow_link = link(rel_path) if callable(link) else link
+                    method = materialize_file(entry.path, os.path.join(dest_dir, rel_path), link=allow_link)
+                    counts[method] += 1
+    logger.debug(f"Materialized {source_dir} -> {dest_dir}: {counts}")
+    return counts
@@ -0,0 +1,121 @@
+"""
+Media Inventory - One directory scan instead of per-file existence probes
+
+Session images and videos follow the shot_NNN[_VVV][suffix].ext naming
+(shot_001_002.png, shot_001.mp4, shot_001b.mp4). Resuming a session used to
+probe os.path.exists for every shot x variation, and picking a free video
+name probed up to 27 suffixed names per shot. On network storage those stats
+dominate resume time.
+
+MediaInventory reads a folder once with os.scandir and indexes the files by
+shot. get_media_inventory() reuses an inventory until the folder's mtime
+changes. Because some network filesystems have coarse mtimes, a name handed
+out for writing (next_video_filename / next_version) is still confirmed with
+a single existence check, and the folder is rescanned if it is taken.
+"""
+import os
+import re
+import threading
+from collections import defaultdict
+
+from core.logger_config import get_logger
+
+
+# Get logger for media inventory
+logger = get_logger(__name__)
+
+MEDIA_NAME_RE = re.compile(r"^shot_(\d{3,})(?:_(\d{3,}))?([a-z]?)\.([A-Za-z0-9]+)$")
+
+# Suffix letters for repeated renders of a shot: none, 'a', 'b', ..., 'z'
+VIDEO_SUFFIXES = [''] + [chr(ord('a') + i) for i in range(26)]
+
+
+def _dir_mtime(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+class MediaInventory:
+    """Files of one media folder, indexed by shot number."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.mtime = _dir_mtime(directory)
+        self.names = set()
+        self._shots = defaultdict(list)  # shot -> [(variation or None, suffix, ext, name)]
+        if self.mtime is None:
+            return
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    self._add(entry.name)
+
+    def _add(self, name):
+        self.names.add(name)
+        match = MEDIA_NAME_RE.match(name)
+        if match:
+            shot, variation, suffix, ext = match.groups()
+            self._shots[int(shot)].append((int(variation) if variation else None, suffix, ext.lower(), name))
+
+    def add(self, name):
+        """Register a file this process just created in the folder."""
+        if name not in self.names:
+            self._add(name)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def has(self, name):
+        return name in self.names
+
+    def files(self, shot_idx, ext=None):
+        """File names of a shot (any variation or suffix), sorted."""
+        return sorted(name for _, _, file_ext, name in self._shots.get(shot_idx, [])
+                      if ext is None or file_ext == ext)
+
+    def variations(self, shot_idx, ext="png"):
+        """{variation number: path} of shot_NNN_VVV.ext files."""
+        return {variation: self.path(name) for variation, suffix, file_ext, name in self._shots.get(shot_idx, [])
+                if variation is not None and not suffix and file_ext == ext}
+
+    def next_version(self, shot_idx, ext="png"):
+        """Next free variation number for shot_NNN_VVV.ext (starting at 1)."""
+        version = max(self.variations(shot_idx, ext), default=0) + 1
+        while os.path.exists(self.path(f"shot_{shot_idx:03d}_{version:03d}.{ext}")):
+            # Stale listing (coarse mtime): register the file and move on
+            self.add(f"shot_{shot_idx:03d}_{version:03d}.{ext}")
+            version += 1
+        return version
+
+    def next_video_filename(self, shot_idx):
+        """First free name of shot_NNN.mp4, shot_NNNa.mp4, ... shot_NNNz.mp4, or None."""
+        for suffix in VIDEO_SUFFIXES:
+            video_filename = f"shot_{shot_idx:03d}{suffix}.mp4"
+            if video_filename in self.names:
+                continue
+            if os.path.exists(self.path(video_filename)):
+                self.add(video_filename)
+                continue
+            return video_filename
+        return None
+
+
+_inventories = {}
+_inventories_lock = threading.Lock()
+
+
+def get_media_inventory(directory):
+    """Inventory of a media folder, rescanned only when its mtime changed."""
+    key = os.path.abspath(directory)
+    mtime = _dir_mtime(directory)
+    with _inventories_lock:
+        inventory = _inventories.get(key)
+        if inventory is not None and inventory.mtime == mtime:
+            return inventory
+    inventory = MediaInventory(directory)
+    logger.debug(f"Scanned {len(inventory.names)} file(s) in {directory}")
+    with _inventories_lock:
+        _inventories[key] = inventory
+    return inventory
@@ -118,7 +118,7 @@ def _generate_with_elevenlabs(script, output_path, voice="default"):
         Path to generated audio or None
     """
     try:
-        import requests
+        from core.http_client import get_session
 
         api_key = config.ELEVENLABS_API_KEY
         if not api_key:
@@ -170,7 +170,7 @@ def _generate_with_elevenlabs(script, output_path, voice="default"):
         print(f"[TTS] Sending to ElevenLabs API...")
         print(f"[TTS] Script length: {len(cleaned_script)} characters")
 
-        response = requests.post(url, json=data, headers=headers, timeout=120)
+        response = get_session().post(url, json=data, headers=headers, timeout=120)
 
         if response.status_code == 200:
             with open(output_path, 'wb') as f:
@@ -212,13 +212,13 @@ def _get_elevenlabs_voice_id(voice_name):
         Voice ID string or None if not found
     """
     try:
-        import requests
+        from core.http_client import get_session
 
         api_key = config.ELEVENLABS_API_KEY
         url = "https://api.elevenlabs.io/v1/voices"
         headers = {"xi-api-key": api_key}
 
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_session().get(url, headers=headers, timeout=30)
 
         if response.status_code == 200:
             voices_data = response.json()
@@ -283,7 +283,7 @@ def list_elevenlabs_voices():
         List of voice dictionaries or None if failed
     """
     try:
-        import requests
+        from core.http_client import get_session
 
         api_key = config.ELEVENLABS_API_KEY
         if not api_key:
@@ -293,7 +293,7 @@ def list_elevenlabs_voices():
         url = "https://api.elevenlabs.io/v1/voices"
         headers = {"xi-api-key": api_key}
 
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_session().get(url, headers=headers, timeout=30)
 
         if response.status_code == 200:
             voices_data = response.json()
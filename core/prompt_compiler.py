@@ -3,22 +3,44 @@ import copy
 import os
 import logging
 import config
+from core.template_cache import get_template_cache, nodes_by_class
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 def load_workflow(path, video_length_seconds=None):
-    """Load workflow and optionally set video length and dimensions"""
+    """
+    Load workflow and optionally set video length and dimensions.
+
+    The converted API-format template is cached by path, mtime, dimensions and
+    frame length (core/template_cache.py), so repeated calls skip re-reading and
+    re-converting the file. Each call returns its own copy.
+    """
     if not os.path.isabs(path):
         # Resolve relative to the project root (one level up from core/)
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         path = os.path.join(base_dir, path)
 
-    with open(path,"r",encoding="utf-8") as f:
-        workflow = json.load(f)
-
     # Get dimensions from config (use video dimensions for video workflow)
     width, height = config.calculate_video_dimensions()
+    frames = int(video_length_seconds * config.VIDEO_FPS) + 1 if video_length_seconds else None  # Wan2.2 needs +1 frame
+
+    template = get_template_cache().get(
+        path, ("video", width, height, frames, config.WAN_VIDEO_NODE_ID),
+        lambda: _convert_video_workflow(path, width, height, video_length_seconds)
+    )
+
+    if frames and config.WAN_VIDEO_NODE_ID in template:
+        print(f"[INFO] Set video length: {video_length_seconds}s ({frames-1}+1 frames at {config.VIDEO_FPS}fps)")
+        print(f"[INFO] Set dimensions: {width}x{height} ({config.VIDEO_ASPECT_RATIO} aspect ratio)")
+
+    return copy.deepcopy(template)
+
+
+def _convert_video_workflow(path, width, height, video_length_seconds=None):
+    """Read a video workflow file and convert it to API format with the given dimensions and length"""
+    with open(path,"r",encoding="utf-8") as f:
+        workflow = json.load(f)
 
     # Check if workflow is in UI format (has "nodes" array) or API format (node IDs as keys)
     if "nodes" in workflow:
@@ -88,8 +110,6 @@ def load_workflow(path, video_length_seconds=None):
                     if video_length_seconds and node_id == config.WAN_VIDEO_NODE_ID:
                         frames = int(video_length_seconds * config.VIDEO_FPS) + 1  # Wan2.2 needs +1 frame
                         node_data["inputs"]["length"] = frames
-                        print(f"[INFO] Set video length: {video_length_seconds}s ({frames-1}+1 frames at {config.VIDEO_FPS}fps)")
-                        print(f"[INFO] Set dimensions: {width}x{height} ({config.VIDEO_ASPECT_RATIO} aspect ratio)")
                     else:
                         node_data["inputs"]["length"] = frames
                 # For CLIPLoader
@@ -156,14 +176,39 @@ def load_workflow(path, video_length_seconds=None):
                 if video_length_seconds:
                     frames = int(video_length_seconds * config.VIDEO_FPS) + 1  # Wan2.2 needs +1 frame
                     wan_node['inputs']['length'] = frames
-                    print(f"[INFO] Set video length: {video_length_seconds}s ({frames-1}+1 frames at {config.VIDEO_FPS}fps)")
-                    print(f"[INFO] Set dimensions: {width}x{height} ({config.VIDEO_ASPECT_RATIO} aspect ratio)")
 
         return wf
 
+def apply_overlay(template, overlay):
+    """
+    Apply per-node input patches to a template without copying the whole graph.
+
+    Only the patched nodes (and their inputs dicts) are copied; every other node
+    is shared with the template, which therefore must be treated as immutable.
+
+    Args:
+        template: API-format workflow (not modified)
+        overlay: {node_id: {input_name: value}}
+
+    Returns:
+        New workflow dict, ready to be serialized into the /prompt payload
+    """
+    wf = copy.copy(template)  # shallow; keeps a WorkflowTemplate's class_index
+    for node_id, inputs in overlay.items():
+        node = template[node_id]
+        wf[node_id] = {**node, "inputs": {**node.get("inputs", {}), **inputs}}
+    return wf
+
+
 def compile_workflow(template, shot, video_length_seconds=None):
+    """
+    Compile a shot's workflow from a shared template.
 
-    wf = copy.deepcopy(template)
+    All per-shot changes (prompt, LoRAs, image, length, output prefix) are
+    collected as an overlay of input patches and applied with apply_overlay(),
+    so compiling a shot costs a shallow copy instead of a deepcopy of the graph.
+    """
+    overlay = {}
 
     # Inject motion prompt (will be enhanced with trigger keywords below)
     motion_node_id = config.MOTION_PROMPT_NODE_ID
@@ -278,12 +323,11 @@ def compile_workflow(template, shot, video_length_seconds=None):
 
         # Update low noise LoRA node if configured
         if low_noise_node_id and low_noise_lora:
-            if low_noise_node_id in wf:
-                old_lora = wf[low_noise_node_id]["inputs"].get("lora_name", "")
-                old_strength = wf[low_noise_node_id]["inputs"].get("strength_model", "")
+            if low_noise_node_id in template:
+                old_lora = template[low_noise_node_id]["inputs"].get("lora_name", "")
 
-                wf[low_noise_node_id]["inputs"]["lora_name"] = low_noise_lora
-                wf[low_noise_node_id]["inputs"]["strength_model"] = strength_low
+                overlay.setdefault(low_noise_node_id, {}).update(
+                    lora_name=low_noise_lora, strength_model=strength_low)
 
                 print(f"  Low Node {low_noise_node_id}: {low_noise_lora} (strength: {strength_low})")
                 if old_lora and old_lora != low_noise_lora:
@@ -293,12 +337,11 @@ def compile_workflow(template, shot, video_length_seconds=None):
 
         # Update high noise LoRA node if configured
         if high_noise_node_id and high_noise_lora:
-            if high_noise_node_id in wf:
-                old_lora = wf[high_noise_node_id]["inputs"].get("lora_name", "")
-                old_strength = wf[high_noise_node_id]["inputs"].get("strength_model", "")
+            if high_noise_node_id in template:
+                old_lora = template[high_noise_node_id]["inputs"].get("lora_name", "")
 
-                wf[high_noise_node_id]["inputs"]["lora_name"] = high_noise_lora
-                wf[high_noise_node_id]["inputs"]["strength_model"] = strength_high
+                overlay.setdefault(high_noise_node_id, {}).update(
+                    lora_name=high_noise_lora, strength_model=strength_high)
 
                 print(f"  High Node {high_noise_node_id}: {high_noise_lora} (strength: {strength_high})")
                 if old_lora and old_lora != high_noise_lora:
@@ -314,40 +357,43 @@ def compile_workflow(template, shot, video_length_seconds=None):
                 enhanced_prompt += f", {keyword}"
 
         # Inject enhanced motion prompt
-        if motion_node_id in wf:
-            wf[motion_node_id]["inputs"]["text"] = enhanced_prompt
+        if motion_node_id in template:
+            overlay.setdefault(motion_node_id, {})["text"] = enhanced_prompt
 
         print(f"\n[TRIGGERS] Added: {', '.join(all_trigger_keywords)}")
 
     # Inject base motion prompt if no triggers
-    elif motion_node_id in wf and base_motion_prompt:
-        wf[motion_node_id]["inputs"]["text"] = base_motion_prompt
+    elif motion_node_id in template and base_motion_prompt:
+        overlay.setdefault(motion_node_id, {})["text"] = base_motion_prompt
 
     # Inject image path to LoadImage node if available
     if "image_path" in shot and shot["image_path"]:
         load_node_id = config.LOAD_IMAGE_NODE_ID
-        if load_node_id in wf:
+        if load_node_id in template:
             image_path = shot["image_path"]
-            # Convert to absolute path if relative (ComfyUI requires absolute paths)
+            # Convert to absolute path if relative (ComfyUI requires absolute paths).
+            # Nodes that don't share our filesystem get the image uploaded at
+            # submit time instead (core/comfy_uploads.py)
             if image_path and not os.path.isabs(image_path):
                 image_path = os.path.abspath(image_path)
             # Normalize to use forward slashes (ComfyUI handles this better)
             image_path = image_path.replace('\\', '/')
-            wf[load_node_id]["inputs"]["image"] = image_path
+            overlay.setdefault(load_node_id, {})["image"] = image_path
 
     # Set video length in WanImageToVideo node if specified
-    if video_length_seconds and config.WAN_VIDEO_NODE_ID in wf:
-        wan_node = wf[config.WAN_VIDEO_NODE_ID]
+    if video_length_seconds and config.WAN_VIDEO_NODE_ID in template:
+        wan_node = template[config.WAN_VIDEO_NODE_ID]
+        frames = int(video_length_seconds * config.VIDEO_FPS) + 1  # Wan2.2 needs +1 frame
         # Check if it's API format (inputs has direct values) or UI format (has widgets_values)
         if "length" in wan_node.get("inputs", {}):
             # API format - set length directly
-            frames = int(video_length_seconds * config.VIDEO_FPS) + 1  # Wan2.2 needs +1 frame
-            wan_node["inputs"]["length"] = frames
+            if wan_node["inputs"]["length"] != frames:
+                overlay.setdefault(config.WAN_VIDEO_NODE_ID, {})["length"] = frames
         elif "widgets_values" in wan_node["inputs"]:
             # UI format - update widgets_values array
             widgets = wan_node["inputs"]["widgets_values"]
-            frames = int(video_length_seconds * config.VIDEO_FPS) + 1  # Wan2.2 needs +1 frame
-            wan_node["inputs"]["widgets_values"] = [widgets[0], widgets[1], frames, widgets[3]]
+            overlay.setdefault(config.WAN_VIDEO_NODE_ID, {})["widgets_values"] = \
+                [widgets[0], widgets[1], frames, widgets[3]]
 
     # Set video filename prefix to avoid collisions
     # Find SaveVideo node and set unique filename
@@ -357,12 +403,56 @@ def compile_workflow(template, shot, video_length_seconds=None):
     unique_id = f"{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
     video_filename_prefix = f"{unique_id}_shot_{shot_idx:03d}"
 
+    for node_id in nodes_by_class(template, "SaveVideo")[:1]:
+        node = template[node_id]
+        # Set the filename prefix
+        if "inputs" in node and "filename_prefix" in node["inputs"]:
+            overlay.setdefault(node_id, {})["filename_prefix"] = video_filename_prefix
+            logger.debug(f"Set video filename prefix for node {node_id}: {video_filename_prefix}")
+
+    return apply_overlay(template, overlay)
+
+# (path, mtime_ns, size) -> sha256, so unchanged input images are hashed once
+_file_hashes = {}
+
+
+def _file_sha256(path):
+    """SHA-256 of a file's content, cached by path, mtime and size."""
+    import hashlib
+
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _file_hashes:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        _file_hashes[key] = h.hexdigest()
+    return _file_hashes[key]
+
+
+def workflow_hash(wf):
+    """
+    Stable SHA-256 of a compiled workflow.
+
+    Save nodes get a unique filename_prefix on every compile, so that input is
+    left out; two compiles of the same shot with the same settings hash equal.
+    LoadImage inputs that point at local files are hashed by content, so a
+    regenerated image at the same path changes the hash (the render cache in
+    core/render_cache.py is keyed on this).
+    """
+    import hashlib
+
+    canonical = {}
     for node_id, node in wf.items():
-        if node.get("class_type") == "SaveVideo":
-            # Set the filename prefix
-            if "inputs" in node and "filename_prefix" in node["inputs"]:
-                node["inputs"]["filename_prefix"] = video_filename_prefix
-                logger.debug(f"Set video filename prefix for node {node_id}: {video_filename_prefix}")
-            break
-
-    return wf
\ No newline at end of file
+        inputs = node.get("inputs", {})
+        if "filename_prefix" in inputs and node.get("class_type", "").startswith("Save"):
+            inputs = {k: v for k, v in inputs.items() if k != "filename_prefix"}
+        if node.get("class_type") == "LoadImage":
+            image = inputs.get("image")
+            if isinstance(image, str) and os.path.isabs(image) and os.path.exists(image):
+                inputs = {**inputs, "image": f"sha256:{_file_sha256(image)}"}
+        canonical[node_id] = {"class_type": node.get("class_type"), "inputs": inputs}
+
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
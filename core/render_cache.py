@@ -0,0 +1,273 @@
+"""
+Render Cache - Content-addressed store of finished ComfyUI outputs
+
+Re-running a session, duplicating one or regenerating a shot often submits a
+workflow that is byte-identical to one rendered before (same image, prompt,
+LoRAs, frame count and seed). Finished outputs are stored here under the
+workflow's hash (prompt_compiler.workflow_hash, which folds in the content of
+local LoadImage inputs), and a later render with the same hash materializes the
+stored file (core/materialize.py: reflink, hardlink or copy) instead of using the GPU.
+
+Layout:
+    RENDER_CACHE_DIR/ab/abcdef....mp4   (first two hex chars fan out the entries)
+    RENDER_CACHE_DIR/index.json         (size, created and last_used per key)
+
+The cache is bounded by RENDER_CACHE_MAX_BYTES; least recently used entries are
+evicted first. Inspect and prune it with:
+    python -m core.render_cache stats|list|prune [--max-gb N]|clear
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import config
+from core.logger_config import get_logger
+from core.materialize import materialize_file
+
+
+# Get logger for the render cache
+logger = get_logger(__name__)
+
+# Global cache instance
+_render_cache = None
+_render_cache_lock = threading.Lock()
+
+
+class RenderCache:
+    """
+    Size-bounded LRU cache of render outputs keyed by workflow hash.
+
+    Usage:
+        cache = get_render_cache()
+        if cache.materialize(key, dest_path):
+            ...  # cache hit, dest_path now exists
+        else:
+            ...  # render, then:
+            cache.put(key, dest_path)
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or getattr(config, 'RENDER_CACHE_DIR',
+                                              os.path.join(config.OUTPUT_DIR, "render_cache"))
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            getattr(config, 'RENDER_CACHE_MAX_BYTES', 20 * 1024 ** 3)
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    # ------------------------------------------------------------------
+    # Index persistence
+    # ------------------------------------------------------------------
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read render cache index {self.index_path}: {e}")
+            self._entries = {}
+
+    def _save_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=1)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.warning(f"Could not write render cache index {self.index_path}: {e}")
+
+    def _entry_path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}{ext}")
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached output for key, or None. Counts as a use for LRU."""
+        if not key:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                path = self._entry_path(key, entry.get('ext', ''))
+                if os.path.exists(path) and os.path.getsize(path) == entry.get('size'):
+                    entry['last_used'] = time.time()
+                    entry['hits'] = entry.get('hits', 0) + 1
+                    self.hits += 1
+                    self._save_index()
+                    return path
+                # File removed or rewritten behind our back
+                self._remove(key)
+                self._save_index()
+            self.misses += 1
+            return None
+
+    def materialize(self, key: str, dest_path: str, link: bool = True) -> Optional[str]:
+        """
+        Place the cached output for key at dest_path.
+
+        Pass link=False for files that callers may later rewrite in place
+        (shot images), so the cached copy can never be modified through them.
+
+        Returns:
+            "reflink", "hardlink" or "copy" on a hit, None on a miss
+        """
+        source = self.get(key)
+        if not source:
+            return None
+        try:
+            method = materialize_file(source, dest_path, link=link)
+        except OSError as e:
+            logger.warning(f"Render cache hit for {key[:12]} but could not materialize it: {e}")
+            return None
+        logger.info(f"Render cache hit {key[:12]} -> {dest_path} ({method})")
+        return method
+
+    def put(self, key: str, source_path: str, link: bool = True) -> bool:
+        """Store a finished output under key (hardlinked when link is set) and evict down to max_bytes."""
+        if not key or not source_path or not os.path.exists(source_path):
+            return False
+
+        ext = os.path.splitext(source_path)[1].lower()
+        path = self._entry_path(key, ext)
+        with self._lock:
+            if key in self._entries and os.path.exists(path):
+                return True
+            try:
+                materialize_file(source_path, path, link=link)
+            except OSError as e:
+                logger.warning(f"Could not add {source_path} to render cache: {e}")
+                return False
+
+            now = time.time()
+            self._entries[key] = {
+                'ext': ext,
+                'size': os.path.getsize(path),
+                'created': now,
+                'last_used': now,
+                'hits': 0,
+                'source': os.path.basename(source_path),
+            }
+            self._evict(self.max_bytes, keep=key)
+            self._save_index()
+        return True
+
+    # ------------------------------------------------------------------
+    # Eviction / inspection
+    # ------------------------------------------------------------------
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(e.get('size', 0) for e in self._entries.values())
+
+    def _evict(self, max_bytes: int, keep: str = None) -> List[str]:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        removed = []
+        total = self.total_bytes()
+        for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1].get('last_used', 0)):
+            if total <= max_bytes:
+                break
+            if key == keep:
+                continue
+            self._remove(key)
+            total -= entry.get('size', 0)
+            removed.append(key)
+        if removed:
+            logger.info(f"Render cache evicted {len(removed)} entr{'y' if len(removed) == 1 else 'ies'}")
+        return removed
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            path = self._entry_path(key, entry.get('ext', ''))
+            if os.path.exists(path):
+                os.remove(path)
+
+    def prune(self, max_bytes: int = None) -> List[str]:
+        """Evict LRU entries down to max_bytes (default: RENDER_CACHE_MAX_BYTES)."""
+        with self._lock:
+            removed = self._evict(self.max_bytes if max_bytes is None else max_bytes)
+            self._save_index()
+            return removed
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number removed."""
+        with self._lock:
+            keys = list(self._entries)
+            for key in keys:
+                self._remove(key)
+            self._save_index()
+            return len(keys)
+
+    def entries(self) -> List[dict]:
+        """Entries, most recently used first."""
+        with self._lock:
+            items = [{'key': k, **v} for k, v in self._entries.items()]
+        return sorted(items, key=lambda e: e.get('last_used', 0), reverse=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes(),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Get the global render cache instance, or None when RENDER_CACHE_ENABLED is off."""
+    global _render_cache
+    if not getattr(config, 'RENDER_CACHE_ENABLED', True):
+        return None
+    with _render_cache_lock:
+        if _render_cache is None:
+            _render_cache = RenderCache()
+        return _render_cache
+
+
+def _format_bytes(num_bytes: int) -> str:
+    return f"{num_bytes / 1024 ** 2:,.1f} MB"
+
+
+def main(argv=None):
+    """Command line entry point: python -m core.render_cache <command>"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect and prune the ComfyUI render cache")
+    parser.add_argument("command", choices=["stats", "list", "prune", "clear"])
+    parser.add_argument("--max-gb", type=float, default=None,
+                        help="Size to prune down to (default: RENDER_CACHE_MAX_BYTES)")
+    args = parser.parse_args(argv)
+
+    cache = RenderCache()
+
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"[CACHE] {cache.cache_dir}")
+        print(f"        {stats['entries']} entries, {_format_bytes(stats['bytes'])} "
+              f"of {_format_bytes(stats['max_bytes'])}")
+    elif args.command == "list":
+        for entry in cache.entries():
+            last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get('last_used', 0)))
+            print(f"{entry['key'][:16]}  {_format_bytes(entry.get('size', 0)):>12}  "
+                  f"{last_used}  hits={entry.get('hits', 0):<3} {entry.get('source', '')}")
+    elif args.command == "prune":
+        max_bytes = int(args.max_gb * 1024 ** 3) if args.max_gb is not None else None
+        removed = cache.prune(max_bytes)
+        print(f"[CACHE] Pruned {len(removed)} entries, {_format_bytes(cache.total_bytes())} remaining")
+    elif args.command == "clear":
+        print(f"[CACHE] Removed {cache.clear()} entries")
+
+
+if __name__ == "__main__":
+    main()
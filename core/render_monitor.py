@@ -1,14 +1,58 @@
-import requests
 import time
 import config
+from core.http_client import get_session
+from core.logger_config import get_logger
 
-def wait_until_idle():
+logger = get_logger(__name__)
+
+
+def wait_until_idle(timeout=None):
+    """
+    Block until every ComfyUI node has nothing running or pending.
+
+    Uses queue depth pushed over the shared event bus; falls back to polling
+    /queue with adaptive backoff if the WebSocket is unavailable.
+
+    Args:
+        timeout: Maximum time to wait in seconds (None = wait forever)
+
+    Returns:
+        True when the queue is idle, False on timeout
+    """
+    from core.comfy_pool import get_backend_pool
+
+    start_time = time.time()
+    for url in get_backend_pool().urls:
+        remaining = None if timeout is None else max(0.0, timeout - (time.time() - start_time))
+        if not _wait_backend_idle(url, remaining):
+            return False
+    return True
+
+
+def _wait_backend_idle(url, timeout=None):
+    if getattr(config, 'COMFY_USE_EVENT_BUS', True):
+        from core.comfy_events import get_event_bus
+
+        bus = get_event_bus(url)
+        if bus.wait_until_connected(timeout=5):
+            return bus.wait_until_idle(timeout)
+        logger.warning(f"ComfyUI event bus unavailable for {url}, polling /queue until idle")
+
+    start_time = time.time()
+    interval = getattr(config, 'COMFY_POLL_MIN_INTERVAL', 0.5)
+    max_interval = getattr(config, 'COMFY_POLL_MAX_INTERVAL', 10.0)
 
     while True:
-        r = requests.get(f"{config.COMFY_URL}/queue")
-        q = r.json()
+        try:
+            r = get_session("probe").get(f"{url}/queue", timeout=5)
+            q = r.json()
+            if q["queue_running"] == [] and q["queue_pending"] == []:
+                return True
+        except Exception as e:
+            logger.debug(f"Queue check failed: {e}")
 
-        if q["queue_running"] == []:
-            break
+        if timeout is not None and time.time() - start_time > timeout:
+            return False
 
-        time.sleep(2)
\ No newline at end of file
+        time.sleep(interval)
+        interval = min(interval * 1.5, max_interval)
@@ -0,0 +1,231 @@
+"""
+Render Pipeline - Keep ComfyUI's queue full instead of submit-and-wait per shot
+
+The sequential render loop compiles one workflow, submits it, blocks until it
+finishes, copies the video and only then queues the next shot, so the GPU sits
+idle for the whole poll/copy/print gap between renders. The pipeline keeps up to
+RENDER_PIPELINE_DEPTH compiled workflows queued ahead in ComfyUI, collects
+completions out of order as they arrive, and hands each finished render to a
+separate collector thread for verify/copy/mark so submission never waits on
+file I/O. run_stream() keeps the same queue full while jobs are still being
+produced (streaming auto mode), so ComfyUI never drains between batches.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import config
+from core.logger_config import get_logger
+
+
+# Get logger for render pipeline operations
+logger = get_logger(__name__)
+
+# Seconds between checks for newly fed jobs while renders are in flight (run_stream)
+FEED_POLL_INTERVAL = 0.5
+
+
+@dataclass
+class RenderJob:
+    """A single video render: one shot rendered from one image variation"""
+    shot: dict
+    shot_idx: int
+    image_path: str
+    variation_idx: int = 1
+    variation_count: int = 1
+    prompt_id: Optional[str] = None  # Pre-set when re-attaching to an in-flight prompt
+    workflow: Optional[dict] = None  # Compiled workflow, when compiled ahead of submission
+    cache_key: Optional[str] = None  # Render cache key (workflow hash)
+    priority: int = 0  # Higher renders first (see core/render_scheduler.py)
+    deferred: bool = False  # Earlier prompt may still be rendering on an unreachable node; not submitted
+    submitted_at: float = 0.0
+    success: bool = False
+    error: Optional[str] = None
+    video_path: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        """Human readable label used in console output"""
+        if self.variation_count > 1:
+            return f"Shot {self.shot_idx} (variation {self.variation_idx}/{self.variation_count})"
+        return f"Shot {self.shot_idx}"
+
+
+class RenderPipeline:
+    """
+    Pipelined render queue for ComfyUI.
+
+    Usage:
+        pipeline = RenderPipeline(submit_fn, collect_fn, depth=3)
+        jobs = pipeline.run(jobs)
+
+        # or, while jobs are still being produced:
+        feed = queue.Queue()  # lists of RenderJob, then None
+        jobs = pipeline.run_stream(feed)
+
+    Args:
+        submit_fn: Callable(job) -> prompt_id. Compiles and queues the job's workflow.
+        collect_fn: Callable(job, wait_result) -> (success, error, video_path).
+            Runs on the collector thread once ComfyUI reports the prompt finished.
+        depth: Maximum number of prompts queued ahead in ComfyUI (default: RENDER_PIPELINE_DEPTH)
+        timeout: Render timeout per prompt in seconds (default: VIDEO_RENDER_TIMEOUT)
+        wait_fn: Callable(prompt_id, timeout) -> wait result dict
+            (default: comfy_client.wait_for_prompt_completion)
+    """
+
+    def __init__(self, submit_fn: Callable, collect_fn: Callable, depth: int = None,
+                 timeout: int = None, wait_fn: Callable = None):
+        if depth is None:
+            depth = getattr(config, 'RENDER_PIPELINE_DEPTH', 1)
+        if timeout is None:
+            timeout = getattr(config, 'VIDEO_RENDER_TIMEOUT', 900)
+        if wait_fn is None:
+            from core.comfy_client import wait_for_prompt_completion
+            wait_fn = wait_for_prompt_completion
+
+        self.submit_fn = submit_fn
+        self.collect_fn = collect_fn
+        self.wait_fn = wait_fn
+        self.depth = max(1, int(depth))
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.completed_order: List[RenderJob] = []
+
+    def _wait_timeout(self) -> int:
+        """
+        Timeout for a queued prompt.
+
+        A prompt can sit behind up to depth-1 other renders before it starts,
+        so the wait budget scales with the pipeline depth.
+        """
+        return self.timeout * self.depth
+
+    def _submit(self, job: RenderJob) -> bool:
+        """Submit a job, recording the error on the job if submission fails"""
+        if job.prompt_id:
+            # Re-attached to a prompt queued by an earlier run; nothing to submit
+            job.submitted_at = time.time()
+            print(f"[ATTACH] {job.label}: Prompt {job.prompt_id[:8]}... already in ComfyUI")
+            return True
+
+        try:
+            prompt_id = self.submit_fn(job)
+        except Exception as e:
+            job.error = f"Exception during submit: {str(e)}"
+            logger.error(f"{job.label}: {job.error}")
+            print(f"[FAIL] {job.label}: {job.error}")
+            return False
+
+        if not prompt_id:
+            job.error = "No prompt_id returned from ComfyUI"
+            print(f"[FAIL] {job.label}: {job.error}")
+            return False
+
+        job.prompt_id = prompt_id
+        job.submitted_at = time.time()
+        print(f"[QUEUE] {job.label}: Prompt {prompt_id[:8]}... submitted")
+        return True
+
+    def _collect(self, job: RenderJob, wait_result: dict) -> RenderJob:
+        """Verify/copy a finished render (runs on the collector thread)"""
+        try:
+            success, error, video_path = self.collect_fn(job, wait_result)
+        except Exception as e:
+            success, error, video_path = False, f"Exception during collect: {str(e)}", None
+            logger.error(f"{job.label}: {error}")
+
+        job.success = success
+        job.error = error
+        job.video_path = video_path
+
+        with self._lock:
+            self.completed_order.append(job)
+        return job
+
+    def run(self, jobs: List[RenderJob]) -> List[RenderJob]:
+        """
+        Render all jobs, keeping up to `depth` prompts queued in ComfyUI.
+
+        Returns:
+            The same list of jobs with success/error/video_path filled in
+        """
+        if not jobs:
+            return jobs
+
+        logger.info(f"Render pipeline starting: {len(jobs)} job(s), depth {self.depth}")
+        print(f"[PIPELINE] Rendering {len(jobs)} video(s) with up to {self.depth} queued in ComfyUI")
+        self._render(list(jobs))
+        return jobs
+
+    def run_stream(self, feed: "queue.Queue") -> List[RenderJob]:
+        """
+        Render jobs as they are fed, keeping up to `depth` prompts queued in ComfyUI.
+
+        Args:
+            feed: Queue of job lists; None marks the end of the stream
+
+        Returns:
+            Every job fed, with success/error/video_path filled in
+        """
+        logger.info(f"Render pipeline streaming, depth {self.depth}")
+        print(f"[PIPELINE] Rendering videos as their images arrive, up to {self.depth} queued in ComfyUI")
+        return self._render([], feed)
+
+    def _render(self, pending: List[RenderJob], feed: "queue.Queue" = None) -> List[RenderJob]:
+        jobs = list(pending)
+        in_flight: Dict = {}  # wait future -> job
+        collect_futures = []
+        feeding = feed is not None
+
+        with ThreadPoolExecutor(max_workers=self.depth, thread_name_prefix="render-wait") as waiters, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="render-collect") as collector:
+
+            while pending or in_flight or feeding:
+                # Take newly fed jobs (only as many as fit in ComfyUI's queue, so a
+                # bounded feed holds its producer back); block only when idle
+                block = not (pending or in_flight)
+                while feeding and len(pending) < self.depth:
+                    try:
+                        fed = feed.get(block=block)
+                    except queue.Empty:
+                        break
+                    block = False
+                    if fed is None:
+                        feeding = False
+                    else:
+                        pending.extend(fed)
+                        jobs.extend(fed)
+
+                # Top up ComfyUI's queue before blocking on anything
+                while pending and len(in_flight) < self.depth:
+                    job = pending.pop(0)
+                    if self._submit(job):
+                        future = waiters.submit(self.wait_fn, job.prompt_id, self._wait_timeout())
+                        in_flight[future] = job
+
+                if not in_flight:
+                    continue
+
+                done, _ = wait(list(in_flight.keys()), timeout=FEED_POLL_INTERVAL if feeding else None,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        wait_result = future.result()
+                    except Exception as e:
+                        wait_result = {'success': False, 'error': f"Exception while waiting: {str(e)}", 'outputs': []}
+
+                    elapsed = time.time() - job.submitted_at
+                    logger.info(f"{job.label}: prompt {job.prompt_id} finished after {elapsed:.1f}s in pipeline")
+                    collect_futures.append(collector.submit(self._collect, job, wait_result))
+
+            # Drain the collector before returning
+            for future in collect_futures:
+                future.result()
+
+        succeeded = sum(1 for j in jobs if j.success)
+        logger.info(f"Render pipeline finished: {succeeded}/{len(jobs)} succeeded")
+        return jobs
@@ -0,0 +1,125 @@
+"""
+Render Scheduler - Order pending renders to minimize ComfyUI LoRA re-patching
+
+Each shot's camera maps (CAMERA_LORA_MAPPING) to high/low-noise LoRAs on the
+LORA_NODES pairs. Whenever two consecutive prompts use a different LoRA stack,
+ComfyUI has to re-patch the Wan model. Rendering in shot order alternates camera
+types constantly; the scheduler groups jobs by their resolved LoRA signature
+instead, while:
+
+- keeping jobs re-attached to in-flight prompts first (ComfyUI already has them)
+- honoring RenderJob.priority (higher first; grouping happens within a tier)
+- never moving a job more than RENDER_AFFINITY_MAX_DELAY places behind its
+  shot-order position, so the shots the user is waiting on still arrive early
+
+RENDER_SCHEDULE selects "lora_affinity" (default) or "shot_order".
+"""
+from typing import Callable, Hashable, List, Optional, Tuple
+
+import config
+from core.logger_config import get_logger
+from core.template_cache import nodes_by_class
+
+
+# Get logger for render scheduling
+logger = get_logger(__name__)
+
+LORA_LOADER_CLASSES = ("LoraLoaderModelOnly", "LoraLoader")
+
+
+def lora_signature(wf: dict) -> Tuple:
+    """LoRA stack of a compiled workflow: (node id, lora name, strength) per LoRA loader."""
+    signature = []
+    for node_id in nodes_by_class(wf, *LORA_LOADER_CLASSES):
+        inputs = wf[node_id].get("inputs", {})
+        signature.append((node_id, inputs.get("lora_name"), inputs.get("strength_model")))
+    return tuple(sorted(signature, key=lambda entry: str(entry[0])))
+
+
+def count_switches(signatures: List[Hashable]) -> int:
+    """Number of times consecutive entries differ."""
+    return sum(1 for prev, cur in zip(signatures, signatures[1:]) if prev != cur)
+
+
+def order_by_affinity(jobs: List, signature_fn: Callable, max_delay: Optional[int] = None) -> List:
+    """
+    Reorder jobs so equal signatures run back to back.
+
+    Greedy: keep rendering the current signature while the highest-priority
+    tier has jobs for it; otherwise switch to the signature of that tier's
+    earliest job. A job that has waited max_delay places past its original
+    position is taken next regardless of signature.
+
+    Args:
+        jobs: Jobs in their original (shot) order
+        signature_fn: Callable(job) -> hashable signature
+        max_delay: Places a job may be pushed back (None = unlimited)
+
+    Returns:
+        New list with the same jobs
+    """
+    original = {id(job): i for i, job in enumerate(jobs)}
+    signatures = {id(job): signature_fn(job) for job in jobs}
+    remaining = list(jobs)
+    ordered = []
+    current = None
+
+    while remaining:
+        top = max(getattr(job, 'priority', 0) for job in remaining)
+        tier = [job for job in remaining if getattr(job, 'priority', 0) == top]
+
+        position = len(ordered)
+        overdue = [job for job in tier
+                   if max_delay is not None and position - original[id(job)] >= max_delay]
+        if overdue:
+            pick = overdue[0]
+        else:
+            same = [job for job in tier if signatures[id(job)] == current]
+            pick = same[0] if same else tier[0]
+
+        current = signatures[id(pick)]
+        ordered.append(pick)
+        remaining.remove(pick)
+
+    return ordered
+
+
+def schedule_render_jobs(jobs: List, signature_fn: Callable = None, mode: str = None,
+                         max_delay: Optional[int] = None) -> List:
+    """
+    Order RenderJobs for submission according to RENDER_SCHEDULE.
+
+    Jobs with a prompt_id (re-attached to ComfyUI) stay first in their original
+    order. Prints the LoRA switch count before and after scheduling.
+
+    Args:
+        jobs: RenderJobs in shot order, with .workflow compiled
+        signature_fn: Callable(job) -> signature (default: LoRA signature of job.workflow)
+        mode: "lora_affinity" or "shot_order" (default: RENDER_SCHEDULE)
+        max_delay: Default RENDER_AFFINITY_MAX_DELAY; negative means unlimited
+
+    Returns:
+        New list with the same jobs in submission order
+    """
+    mode = mode or getattr(config, 'RENDER_SCHEDULE', 'lora_affinity')
+    if max_delay is None:
+        max_delay = getattr(config, 'RENDER_AFFINITY_MAX_DELAY', 8)
+    if max_delay is not None and max_delay < 0:
+        max_delay = None
+    if signature_fn is None:
+        signature_fn = lambda job: lora_signature(job.workflow or {})
+
+    attached = [job for job in jobs if job.prompt_id]
+    fresh = [job for job in jobs if not job.prompt_id]
+    if mode != 'lora_affinity' or len(fresh) < 2:
+        return attached + fresh
+
+    before = count_switches([signature_fn(job) for job in fresh])
+    ordered = order_by_affinity(fresh, signature_fn, max_delay=max_delay)
+    after = count_switches([signature_fn(job) for job in ordered])
+
+    logger.info(f"LoRA-affinity schedule: {before} -> {after} LoRA switches over {len(fresh)} render(s)")
+    if before != after:
+        print(f"[SCHEDULE] Grouped {len(fresh)} render(s) by LoRA stack: "
+              f"{before} -> {after} LoRA switch(es)")
+    return attached + ordered
@@ -0,0 +1,181 @@
+"""
+Session Catalog - In-memory summaries of all sessions for fast listing
+
+Listing sessions used to load every {session_id}_meta.json (plus its journal)
+on each call; the web UI polls GET /api/sessions, so with hundreds of sessions
+that was the dominant backend cost. The catalog keeps the loaded metadata per
+session and only reloads what changed:
+
+- The sessions folder's mtime changes when a session is created or deleted,
+  so it is only rescanned then.
+- A session folder's mtime changes whenever its meta or shots file is
+  replaced (atomic writes go through a temp file in that folder); together with
+  the journal's mtime and size this keys each entry, so writes by another
+  process (CLI run vs. web UI) are picked up on the next listing.
+- SessionManager pushes metadata it writes itself with update(), so the
+  writing process does not have to reload it.
+
+snapshot() also returns an ETag over the listed metadata for HTTP caching; it is
+only recomputed when an entry changed.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.logger_config import get_logger
+from core.session_journal import JOURNAL_FILE
+
+
+# Get logger for session catalog
+logger = get_logger(__name__)
+
+
+def _mtime(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class SessionCatalog:
+    """Cached metadata of every session folder in a sessions directory."""
+
+    def __init__(self, sessions_dir: str, loader: Callable[[str], dict]):
+        """
+        Args:
+            sessions_dir: Folder holding one directory per session
+            loader: Loads one session's metadata (snapshot plus journal tail)
+        """
+        self.sessions_dir = sessions_dir
+        self.loader = loader
+        self._lock = threading.RLock()
+        self._dir_key = None
+        self._keys: Dict[str, tuple] = {}      # session_id -> (folder, journal) stat key
+        self._entries: Dict[str, dict] = {}    # session_id -> meta
+        self._sorted: Optional[List[dict]] = None
+        self._etag: Optional[str] = None
+
+    def _session_key(self, session_id: str) -> Optional[tuple]:
+        session_dir = os.path.join(self.sessions_dir, session_id)
+        folder = _mtime(session_dir)
+        if folder is None or not os.path.exists(os.path.join(session_dir, f"{session_id}_meta.json")):
+            return None
+        return folder, _mtime(os.path.join(session_dir, JOURNAL_FILE))
+
+    def _scan(self) -> List[str]:
+        session_ids = []
+        with os.scandir(self.sessions_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    session_ids.append(entry.name)
+        return session_ids
+
+    def refresh(self):
+        """Reload sessions whose folder changed; rescan when the sessions folder changed."""
+        with self._lock:
+            dir_key = _mtime(self.sessions_dir)
+            if dir_key != self._dir_key:
+                self._dir_key = dir_key
+                session_ids = self._scan() if dir_key is not None else []
+                for session_id in set(self._keys) - set(session_ids):
+                    self._drop(session_id)
+                for session_id in session_ids:
+                    self._keys.setdefault(session_id, None)
+
+            stale = []
+            for session_id, known in self._keys.items():
+                key = self._session_key(session_id)
+                if key is None:
+                    # Not a session (yet): no meta file
+                    if self._entries.pop(session_id, None) is not None:
+                        self._changed()
+                elif key != known or session_id not in self._entries:
+                    stale.append((session_id, known, key))
+
+        # Load outside the catalog lock: the loader takes session locks, and
+        # writers holding those call update()
+        loaded = []
+        for session_id, known, key in stale:
+            try:
+                loaded.append((session_id, known, key, self.loader(session_id)))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable session {session_id}: {e}")
+
+        with self._lock:
+            for session_id, known, key, meta in loaded:
+                if session_id in self._keys and self._keys[session_id] == known:
+                    self._keys[session_id] = key
+                    self._entries[session_id] = meta
+                    self._changed()
+            if loaded:
+                logger.debug(f"Session catalog reloaded {len(loaded)} session(s)")
+
+    def update(self, session_id: str, meta: dict):
+        """Store metadata this process just wrote (no reload on the next refresh)."""
+        with self._lock:
+            key = self._session_key(session_id)
+            if key is None:
+                return
+            self._keys[session_id] = key
+            self._entries[session_id] = copy.deepcopy(meta)
+            self._changed()
+
+    def invalidate(self, session_id: str):
+        """Reload a session on the next refresh."""
+        with self._lock:
+            if session_id in self._keys:
+                self._keys[session_id] = None
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._drop(session_id)
+
+    def _drop(self, session_id: str):
+        self._keys.pop(session_id, None)
+        if self._entries.pop(session_id, None) is not None:
+            self._changed()
+
+    def _changed(self):
+        self._sorted = None
+        self._etag = None
+
+    def snapshot(self) -> Tuple[List[dict], str]:
+        """
+        All sessions newest first, and an ETag for that list.
+
+        The returned dicts are shared with the catalog; treat them as read-only.
+        """
+        self.refresh()
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._entries.values(), key=lambda m: m.get('timestamp', ''), reverse=True)
+                body = json.dumps(self._sorted, sort_keys=True, default=str).encode('utf-8')
+                self._etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+            return self._sorted, self._etag
+
+    def sessions(self) -> List[dict]:
+        """Copies of all session metadata, newest first."""
+        return copy.deepcopy(self.snapshot()[0])
+
+    def latest(self) -> Optional[dict]:
+        """Copy of the most recent session's metadata (complete or not)."""
+        sessions = self.snapshot()[0]
+        return copy.deepcopy(sessions[0]) if sessions else None
+
+
+_catalogs: Dict[str, SessionCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_session_catalog(sessions_dir: str, loader: Callable[[str], dict]) -> SessionCatalog:
+    """Get the shared SessionCatalog for a sessions directory (loader is used on first creation)."""
+    sessions_dir = os.path.abspath(sessions_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(sessions_dir)
+        if catalog is None:
+            catalog = _catalogs[sessions_dir] = SessionCatalog(sessions_dir, loader)
+        return catalog
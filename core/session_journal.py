@@ -0,0 +1,239 @@
+"""
+Session Journal - Append-only event log for per-shot session state
+
+Marking one image or video used to load and rewrite all of shots.json and the
+session meta file. Per-shot updates are appended to events.jsonl in the session
+directory instead; shots.json and {session_id}_meta.json become snapshots, and
+SessionManager reads apply the journal tail on top of them.
+
+- Events are idempotent (set a flag or path, add to a list, set or clear a
+  pending render), so replaying a tail over a snapshot that already contains
+  it is harmless: a crash between writing the snapshots and truncating the
+  journal loses nothing.
+- A torn last line (crash mid-append) is ignored.
+- Compaction folds the tail into both snapshots (atomic os.replace) and then
+  truncates the journal. SessionManager compacts when the journal grows past
+  SESSION_JOURNAL_COMPACT_BYTES and before every full snapshot write.
+- Appends, reads and compaction hold the session lock file (fcntl.flock, or
+  msvcrt.locking on Windows), so the CLI and the web UI process can share a
+  session. Within a process each lock file has its own lock, so sessions do
+  not wait on each other's disk I/O.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from core.logger_config import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+# Get logger for session journal
+logger = get_logger(__name__)
+
+JOURNAL_FILE = "events.jsonl"
+LOCK_FILE = ".session.lock"
+
+# Serializes journal and snapshot access between threads, one lock per lock
+# file; the lock file itself does the same between processes
+_path_locks = {}  # lock path -> _PathLock
+_path_locks_guard = threading.Lock()
+
+
+class _PathLock:
+    """In-process side of one session lock file (re-entrant)."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.file = None
+        self.depth = 0
+
+
+def _lock_file(path, shared):
+    """Open the lock file and take the OS lock (shared only where the OS supports it)."""
+    lock_file = open(path, 'a+')
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        # Exclusive lock on the first byte; LK_LOCK gives up after ~10 s, so keep trying
+        lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                logger.debug(f"Still waiting for {path}")
+    return lock_file
+
+
+def _unlock_file(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    lock_file.close()
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file and os.replace it over path."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SessionJournal:
+    """events.jsonl of one session directory."""
+
+    def __init__(self, session_dir):
+        self.session_dir = session_dir
+        self.path = os.path.join(session_dir, JOURNAL_FILE)
+        self.lock_path = os.path.join(session_dir, LOCK_FILE)
+
+    @contextmanager
+    def locked(self, shared=False):
+        """Hold the session lock (re-entrant within a process)."""
+        with _path_locks_guard:
+            entry = _path_locks.get(self.lock_path)
+            if entry is None:
+                entry = _path_locks[self.lock_path] = _PathLock()
+        with entry.lock:
+            if entry.depth == 0:
+                if not os.path.isdir(self.session_dir):
+                    # Nothing on disk to protect yet (or the session does not exist)
+                    yield
+                    return
+                entry.file = _lock_file(self.lock_path, shared)
+            entry.depth += 1
+            try:
+                yield
+            finally:
+                entry.depth -= 1
+                if entry.depth == 0:
+                    _unlock_file(entry.file)
+                    entry.file = None
+
+    def append(self, event):
+        """Append one event as a single JSON line."""
+        self.extend([event])
+
+    def extend(self, events):
+        """Append events (one JSON line each) in a single write."""
+        line = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events).encode('utf-8')
+        with self.locked():
+            with open(self.path, 'ab+') as f:
+                # Start on a fresh line if a crash left a torn one behind
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+                f.flush()
+
+    def read(self):
+        """All complete events in the journal (a torn last line is skipped)."""
+        if not os.path.exists(self.path):
+            return []
+        events = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.endswith("\n"):
+                    logger.warning(f"Ignoring incomplete journal line {line_no} in {self.path}")
+                    break
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring corrupt journal line {line_no} in {self.path}")
+        return events
+
+    def size(self):
+        """Journal size in bytes (0 when absent)."""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def clear(self):
+        """Drop all events (after they were folded into the snapshots)."""
+        with self.locked():
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def refresh_stats(meta, shots):
+    """Recompute the image/video counters in meta from shots."""
+    stats = meta.setdefault('stats', {})
+    stats['images_generated'] = sum(1 for s in shots if s.get('image_generated', False))
+    stats['videos_rendered'] = sum(1 for s in shots if s.get('video_rendered', False))
+
+
+def touches_stats(events):
+    """True if events change the counters kept in the meta file."""
+    return any(event.get('op') in ('image', 'video') for event in events)
+
+
+# Shot fields written by journal events (everything else only changes in full writes)
+STATUS_FIELDS = ('image_generated', 'image_path', 'image_paths', 'video_rendered', 'video_path',
+                 'pending_renders')
+
+
+def _shot(shots, shot_index):
+    if isinstance(shot_index, int) and 0 <= shot_index - 1 < len(shots):
+        return shots[shot_index - 1]
+    return None
+
+
+def apply_events(shots, meta, events):
+    """
+    Replay journal events onto loaded snapshots (in place).
+
+    Args:
+        shots: shots.json list (may be None when only meta is needed)
+        meta: session meta dict (may be None)
+        events: Events from SessionJournal.read()
+
+    Returns:
+        tuple: (shots, meta)
+    """
+    for event in events:
+        op = event.get('op')
+        shot = _shot(shots, event.get('shot')) if shots is not None else None
+        if op == 'image':
+            if shot is not None:
+                path = event.get('path')
+                shot['image_generated'] = True
+                shot['image_path'] = path
+                image_paths = shot.setdefault('image_paths', [])
+                if path not in image_paths:
+                    image_paths.append(path)
+        elif op == 'video':
+            if shot is not None:
+                shot['video_rendered'] = True
+                if event.get('path'):
+                    shot['video_path'] = event['path']
+        elif op == 'render_submit':
+            if shot is not None:
+                shot.setdefault('pending_renders', {})[str(event.get('variation'))] = event.get('record')
+        elif op == 'render_clear':
+            if shot is not None:
+                pending = shot.get('pending_renders', {})
+                pending.pop(str(event.get('variation')), None)
+                if not pending:
+                    shot.pop('pending_renders', None)
+        else:
+            logger.warning(f"Ignoring unknown journal event: {op}")
+
+    if meta is not None and shots is not None and touches_stats(events):
+        refresh_stats(meta, shots)
+    return shots, meta
@@ -2,10 +2,15 @@
 Session Manager - Tracks progress and enables crash recovery
 Saves all outputs (story, shots, images) and tracks completion status
 """
+import hashlib
 import json
 import os
+import time
 from datetime import datetime
 from core.logger_config import get_logger
+from core.session_catalog import get_session_catalog
+from core.session_journal import SessionJournal, refresh_stats, write_json_atomic
+from core.session_state import drop_session_state, flush_all, get_session_state
 import config
 
 
@@ -14,52 +19,46 @@ logger = get_logger(__name__)
 
 
 class SessionManager:
-    def __init__(self, sessions_dir=None):
+    def __init__(self, sessions_dir=None, backend=None, db_path=None):
+        """
+        Args:
+            sessions_dir: Folder holding one directory per session
+            backend: "files" (JSON snapshots + journal) or "sqlite" (default: SESSION_BACKEND)
+            db_path: SQLite database for the sqlite backend (default: SESSION_DB_PATH,
+                     or sessions.db in sessions_dir)
+        """
         if sessions_dir is None:
-            # Import here to avoid circular dependencies
-            import config
             self.sessions_dir = getattr(config, 'ABS_SESSIONS_DIR', "output/sessions")
         else:
             self.sessions_dir = sessions_dir
             
         os.makedirs(self.sessions_dir, exist_ok=True)
 
+        self.backend = backend or getattr(config, 'SESSION_BACKEND', 'files')
+        self.store = None
+        self.catalog = None
+        if self.backend == 'sqlite':
+            from core.session_store import get_session_store, migrate_sessions
+            db_path = db_path or getattr(config, 'SESSION_DB_PATH', '') or os.path.join(self.sessions_dir, "sessions.db")
+            self.store = get_session_store(db_path)
+            if self.store.created:
+                # New database: import the existing session directories once
+                self.store.created = False
+                imported = migrate_sessions(self.sessions_dir, db_path)
+                if imported:
+                    print(f"[INFO] Imported {imported} existing session(s) into {db_path}")
+        else:
+            # Listing is served from a shared in-memory catalog (core/session_catalog.py)
+            self.catalog = get_session_catalog(self.sessions_dir, self.load_session)
+
     def get_latest_session(self):
         """Get the most recent incomplete session, or None if all complete"""
-        sessions = []
-
-        for item in os.listdir(self.sessions_dir):
-            item_path = os.path.join(self.sessions_dir, item)
-
-            # Check if it's a directory (session folder)
-            if os.path.isdir(item_path):
-                meta_file = f"{item}_meta.json"
-                meta_path = os.path.join(item_path, meta_file)
-
-                if os.path.exists(meta_path):
-                    try:
-                        with open(meta_path, 'r', encoding='utf-8') as f:
-                            meta = json.load(f)
-                            sessions.append({
-                                'file': meta_file,
-                                'meta': meta,
-                                'timestamp': meta.get('timestamp', ''),
-                                'completed': meta.get('completed', False)
-                            })
-                    except:
-                        pass
-
-        if not sessions:
-            return None
-
-        # Sort by timestamp descending, get most recent
-        sessions.sort(key=lambda x: x['timestamp'], reverse=True)
-        latest = sessions[0]
+        if self.store is not None:
+            latest = self.store.latest_session()
+            return latest if latest and not latest.get('completed', False) else None
 
-        # Only return if incomplete
-        if not latest['completed']:
-            return latest['meta']
-        return None
+        latest = self.catalog.latest()
+        return latest if latest and not latest.get('completed', False) else None
 
     def create_session(self, idea, session_id=None, story_agent="default", image_agent="default", video_agent="default", total_duration=None):
         """Create a new session
@@ -116,11 +115,15 @@ class SessionManager:
         return session_id, meta
 
     def load_session(self, session_id):
-        """Load an existing session"""
+        """Load an existing session (meta snapshot plus journal tail)"""
         logger.debug(f"Loading session: {session_id}")
-        meta_path = os.path.join(self.sessions_dir, session_id, f"{session_id}_meta.json")
-        with open(meta_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        if self.store is not None:
+            meta = self.store.get_session(session_id)
+            if meta is None:
+                meta = self._import_session(session_id)
+            return meta
+
+        return self._state(session_id).meta()
 
     def get_session(self, session_id):
         """Get session metadata (alias for load_session)"""
@@ -136,15 +139,13 @@ class SessionManager:
             f.write(story_json)
 
         # Update metadata
-        meta = self.load_session(session_id)
-        meta['steps']['story'] = True
-        self._save_meta(session_id, meta)
+        with self._locked(session_id):
+            meta = self.load_session(session_id)
+            meta['steps']['story'] = True
+            self._save_meta(session_id, meta)
 
     def save_shots(self, session_id, shots):
         """Save shot data (image prompts, motion prompts) and initialize status fields"""
-        session_dir = os.path.join(self.sessions_dir, session_id)
-        shots_path = os.path.join(session_dir, "shots.json")
-
         # Sort shots by batch_number, then preserve original order within each batch
         # If batch_number is not present, use the original index
         shots_with_batch = [(i, s) for i, s in enumerate(shots)]
@@ -154,21 +155,7 @@ class SessionManager:
         # Add status fields to each shot with reindexed values (1 to n)
         shots_with_status = []
         for idx, (original_idx, shot) in enumerate(shots_with_batch, start=1):
-            shot_data = {
-                'index': idx,
-                'image_prompt': shot.get('image_prompt', ''),
-                'motion_prompt': shot.get('motion_prompt', ''),
-                'camera': shot.get('camera', ''),
-                'narration': shot.get('narration', ''),
-                'batch_number': shot.get('batch_number', idx),
-                # Status fields
-                'image_generated': False,
-                'image_path': None,
-                'image_paths': [],  # For multiple image variations
-                'video_rendered': False,
-                'video_path': None
-            }
-            shots_with_status.append(shot_data)
+            shots_with_status.append(self._shot_record(shot, idx))
 
         # Log batch distribution for debugging
         batch_counts = {}
@@ -178,51 +165,90 @@ class SessionManager:
         logger.info(f"Shots sorted by batch_number: {batch_counts}")
 
         # Save to shots.json
-        with open(shots_path, 'w', encoding='utf-8') as f:
-            json.dump(shots_with_status, f, indent=2, ensure_ascii=False)
+        self._save_shots(session_id, shots_with_status)
 
         # Update metadata - only store stats, not the shots array
-        meta = self.load_session(session_id)
-        meta['stats']['total_shots'] = len(shots)
-        meta['steps']['shots'] = True
-        self._save_meta(session_id, meta)
+        with self._locked(session_id):
+            meta = self.load_session(session_id)
+            meta['stats']['total_shots'] = len(shots)
+            meta['steps']['shots'] = True
+            self._save_meta(session_id, meta)
 
-    def mark_image_generated(self, session_id, shot_index, image_path):
-        """Mark that an image has been generated for a shot"""
-        # Load shots from shots.json
-        shots = self._load_shots(session_id)
+    def append_shots(self, session_id, shots):
+        """
+        Append a batch of planned shots to shots.json (incremental shot planning).
 
-        if 0 <= shot_index - 1 < len(shots):
-            # Normalize path to use forward slashes (JSON-safe)
-            normalized_path = image_path.replace('\\', '/')
-            
-            # Convert to relative path if absolute and inside project root
-            if os.path.isabs(normalized_path):
-                project_root = getattr(config, 'PROJECT_ROOT', None)
-                if project_root:
-                    project_root_norm = project_root.replace('\\', '/')
-                    if normalized_path.startswith(project_root_norm):
-                        normalized_path = os.path.relpath(normalized_path, project_root).replace('\\', '/')
-
-            shots[shot_index - 1]['image_generated'] = True
-            shots[shot_index - 1]['image_path'] = normalized_path
-
-            # Also add to image_paths array if not already there
-            if normalized_path not in shots[shot_index - 1].get('image_paths', []):
-                if 'image_paths' not in shots[shot_index - 1]:
-                    shots[shot_index - 1]['image_paths'] = []
-                shots[shot_index - 1]['image_paths'].append(normalized_path)
-
-            # Update stats
-            images_generated = sum(1 for s in shots if s.get('image_generated', False))
-
-            # Save updated shots.json
+        Shots keep the 'index' assigned by the planner. The shots step is not
+        marked complete; call mark_step_complete(session_id, 'shots') once the
+        last batch has been appended.
+        """
+        with self._locked(session_id):
+            existing = self._load_shots(session_id)
+            for shot in shots:
+                existing.append(self._shot_record(shot, shot.get('index', len(existing) + 1)))
+            self._save_shots(session_id, existing)
+
+            meta = self.load_session(session_id)
+            meta['stats']['total_shots'] = len(existing)
+            self._save_meta(session_id, meta)
+
+        logger.debug(f"Appended {len(shots)} shot(s) to {session_id} ({len(existing)} total)")
+        return existing
+
+    def mark_batch_planned(self, session_id, batch_num):
+        """Record that a shot-planning batch was planned completely (incremental planning)"""
+        with self._locked(session_id):
+            meta = self.load_session(session_id)
+            planned_batches = meta.setdefault('planned_batches', [])
+            if batch_num not in planned_batches:
+                planned_batches.append(batch_num)
+                self._save_meta(session_id, meta)
+
+    def truncate_shots(self, session_id, count):
+        """
+        Keep only the first count shots (drops unfinished planning batches on resume).
+
+        Planning batches from the first dropped shot's batch on are no longer
+        recorded as planned, so they are planned again.
+        """
+        with self._locked(session_id):
+            shots = self._load_shots(session_id)
+            if len(shots) <= count:
+                return shots
+            first_dropped = shots[count].get('batch_number')
+            shots = shots[:count]
             self._save_shots(session_id, shots)
 
-            # Update metadata stats
             meta = self.load_session(session_id)
-            meta['stats']['images_generated'] = images_generated
+            if 'planned_batches' in meta and first_dropped is not None:
+                meta['planned_batches'] = [b for b in meta['planned_batches'] if b < first_dropped]
+            meta['stats']['total_shots'] = len(shots)
+            refresh_stats(meta, shots)
             self._save_meta(session_id, meta)
+        return shots
+
+    @staticmethod
+    def _shot_record(shot, idx):
+        """Shot entry as stored in shots.json, with fresh status fields"""
+        return {
+            'index': idx,
+            'image_prompt': shot.get('image_prompt', ''),
+            'motion_prompt': shot.get('motion_prompt', ''),
+            'camera': shot.get('camera', ''),
+            'narration': shot.get('narration', ''),
+            'batch_number': shot.get('batch_number', idx),
+            # Status fields
+            'image_generated': False,
+            'image_path': None,
+            'image_paths': [],  # For multiple image variations
+            'video_rendered': False,
+            'video_path': None
+        }
+
+    def mark_image_generated(self, session_id, shot_index, image_path):
+        """Mark that an image has been generated for a shot"""
+        self._record(session_id, {'op': 'image', 'shot': shot_index,
+                                  'path': self._session_relative_path(image_path)})
 
     def mark_video_rendered(self, session_id, shot_index, video_path=None):
         """
@@ -233,57 +259,155 @@ class SessionManager:
             shot_index: Shot number (1-based)
             video_path: Optional path to the video file (will verify existence)
         """
-        import os
-
         # Verify video file exists before marking as rendered
         if video_path and not os.path.exists(video_path):
             print(f"[WARN] mark_video_rendered: Video file doesn't exist: {video_path}")
             print(f"[WARN] Shot {shot_index} will NOT be marked as rendered")
             return
 
-        # Load shots from shots.json
-        shots = self._load_shots(session_id)
+        self._record(session_id, {'op': 'video', 'shot': shot_index,
+                                  'path': self._session_relative_path(video_path) if video_path else None})
 
-        if 0 <= shot_index - 1 < len(shots):
-            shots[shot_index - 1]['video_rendered'] = True
-            if video_path:
-                # Normalize path to use forward slashes (JSON-safe)
-                normalized_path = video_path.replace('\\', '/')
-                
-                # Convert to relative path if absolute and inside project root
-                if os.path.isabs(normalized_path):
-                    project_root = getattr(config, 'PROJECT_ROOT', None)
-                    if project_root:
-                        project_root_norm = project_root.replace('\\', '/')
-                        if normalized_path.startswith(project_root_norm):
-                            normalized_path = os.path.relpath(normalized_path, project_root).replace('\\', '/')
-                
-                shots[shot_index - 1]['video_path'] = normalized_path
-
-            # Update stats
-            videos_rendered = sum(1 for s in shots if s.get('video_rendered', False))
-
-            # Save updated shots.json
-            self._save_shots(session_id, shots)
+    def record_render_submission(self, session_id, shot_index, variation_idx, prompt_id, backend,
+                                 workflow_hash=None):
+        """
+        Remember an in-flight ComfyUI render so a crashed run can re-attach to it.
 
-            # Update metadata stats
-            meta = self.load_session(session_id)
-            meta['stats']['videos_rendered'] = videos_rendered
-            self._save_meta(session_id, meta)
+        Written right after submission, cleared by clear_render_submission()
+        once the output has been collected (or the render failed).
+
+        Args:
+            session_id: Session identifier
+            shot_index: Shot number (1-based)
+            variation_idx: Image variation rendered (1-based)
+            prompt_id: ComfyUI prompt id
+            backend: URL of the ComfyUI node the prompt was queued on
+            workflow_hash: Hash of the compiled workflow (prompt_compiler.workflow_hash)
+        """
+        self._record(session_id, {'op': 'render_submit', 'shot': shot_index, 'variation': variation_idx,
+                                  'record': {
+                                      'prompt_id': prompt_id,
+                                      'backend': backend,
+                                      'workflow_hash': workflow_hash,
+                                      'submitted_at': time.time()
+                                  }})
+
+    def clear_render_submission(self, session_id, shot_index, variation_idx):
+        """Forget an in-flight render once its output has been collected."""
+        self._record(session_id, {'op': 'render_clear', 'shot': shot_index, 'variation': variation_idx})
+
+    def compact(self, session_id):
+        """Fold the session journal (or the database state) into shots.json and the meta file."""
+        if self.store is not None:
+            self._export_session(session_id)
+            return
+        self._write_snapshots(session_id)
+
+    def flush(self, session_id=None):
+        """Append per-shot updates still held in memory to the journal (all sessions by default)."""
+        if self.store is not None:
+            return
+        if session_id is None:
+            flush_all()
+        else:
+            self._state(session_id).flush()
+
+    def find_shots(self, session_id=None, image_generated=None, video_rendered=None):
+        """
+        Shots matching a status filter, across all sessions unless session_id is given.
+
+        Each result is the shot dict plus its 'session_id'. The sqlite backend
+        answers from its status index; the files backend loads every session.
+        """
+        if self.store is not None:
+            return self.store.find_shots(session_id, image_generated, video_rendered)
+
+        session_ids = [session_id] if session_id else [meta['session_id'] for meta in self.list_all_sessions()]
+        results = []
+        for sid in session_ids:
+            for shot in self._load_shots(sid):
+                if image_generated is not None and bool(shot.get('image_generated')) != image_generated:
+                    continue
+                if video_rendered is not None and bool(shot.get('video_rendered')) != video_rendered:
+                    continue
+                results.append(dict(shot, session_id=sid))
+        return results
+
+    def delete_session(self, session_id):
+        """Delete a session directory and its database rows. Returns True if anything was removed."""
+        import shutil
+        removed = False
+        if self.store is not None and self.store.get_session(session_id) is not None:
+            self.store.delete_session(session_id)
+            removed = True
+        session_dir = self.get_session_dir(session_id)
+        drop_session_state(session_dir)
+        if os.path.exists(session_dir):
+            shutil.rmtree(session_dir)
+            removed = True
+        if self.catalog is not None:
+            self.catalog.discard(session_id)
+        return removed
+
+    def _record(self, session_id, event):
+        """Apply a per-shot event in memory; it is appended to the session journal shortly after"""
+        if self.store is not None:
+            if self._ensure_imported(session_id):
+                self.store.apply_event(session_id, event)
+            return
+        if not os.path.isdir(self.get_session_dir(session_id)):
+            return
+        self._state(session_id).record(event)
+        self.catalog.invalidate(session_id)
+
+    @staticmethod
+    def _session_relative_path(path):
+        """Forward-slash path, relative to the project root when inside it (JSON-safe)"""
+        normalized_path = path.replace('\\', '/')
+
+        # Convert to relative path if absolute and inside project root
+        if os.path.isabs(normalized_path):
+            project_root = getattr(config, 'PROJECT_ROOT', None)
+            if project_root:
+                project_root_norm = project_root.replace('\\', '/')
+                if normalized_path.startswith(project_root_norm):
+                    normalized_path = os.path.relpath(normalized_path, project_root).replace('\\', '/')
+        return normalized_path
+
+    def get_render_submission(self, session_id, shot_index, variation_idx):
+        """Recorded in-flight render for a shot variation, or None."""
+        shots = self._load_shots(session_id)
+        if not 0 <= shot_index - 1 < len(shots):
+            return None
+        return shots[shot_index - 1].get('pending_renders', {}).get(str(variation_idx))
 
     def mark_step_complete(self, session_id, step_name):
         """Mark a pipeline step as complete"""
         logger.debug(f"Marking step complete: {session_id} - {step_name}")
-        meta = self.load_session(session_id)
-        meta['steps'][step_name] = True
-        self._save_meta(session_id, meta)
+        with self._locked(session_id):
+            meta = self.load_session(session_id)
+            meta['steps'][step_name] = True
+            self._save_meta(session_id, meta)
 
     def mark_session_complete(self, session_id):
         """Mark the entire session as complete"""
-        meta = self.load_session(session_id)
-        meta['completed'] = True
-        meta['completed_at'] = datetime.now().isoformat()
-        self._save_meta(session_id, meta)
+        with self._locked(session_id):
+            meta = self.load_session(session_id)
+            meta['completed'] = True
+            meta['completed_at'] = datetime.now().isoformat()
+            self._save_meta(session_id, meta)
+
+        # Share identical media with other sessions (BLOB_STORE_ENABLED)
+        from core.blob_store import get_blob_store
+        blob_store = get_blob_store()
+        if blob_store:
+            try:
+                result = blob_store.ingest_session(self.get_session_dir(session_id))
+                if result['saved']:
+                    print(f"[BLOBS] {result['linked']} file(s) deduplicated, "
+                          f"{result['saved'] / 1024 ** 2:,.1f} MB saved")
+            except Exception as e:
+                logger.warning(f"Blob store ingest failed for {session_id}: {e}")
 
     def get_session_dir(self, session_id):
         """Get the directory path for a session"""
@@ -305,61 +429,127 @@ class SessionManager:
         """Get shots from shots.json"""
         return self._load_shots(session_id)
 
+    def update_shots(self, session_id, shots):
+        """
+        Write back shots edited after get_shots() (prompts, paths, order).
+
+        Unlike save_shots() the shots are stored as given, without reindexing
+        or resetting their status. Image/video marks recorded since the
+        get_shots() call are kept for fields the caller did not change.
+        """
+        self._save_shots(session_id, shots)
+
     def _save_meta(self, session_id, meta):
         """Save session metadata"""
-        session_dir = os.path.join(self.sessions_dir, session_id)
-        os.makedirs(session_dir, exist_ok=True)
-
-        meta_path = os.path.join(session_dir, f"{session_id}_meta.json")
-        with open(meta_path, 'w', encoding='utf-8') as f:
-            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.makedirs(self.get_session_dir(session_id), exist_ok=True)
+        self._write_snapshots(session_id, meta=meta)
 
     def _update_shots_file(self, session_id, shots):
         """Update the shots.json file with current shot data"""
-        # This method is kept for backward compatibility but now delegates to _save_shots
-        self._save_shots(session_id, shots)
+        # This method is kept for backward compatibility but now delegates to update_shots
+        self.update_shots(session_id, shots)
 
     def _load_shots(self, session_id):
-        """Load shots from shots.json"""
-        session_dir = self.get_session_dir(session_id)
-        shots_path = os.path.join(session_dir, "shots.json")
-
-        if not os.path.exists(shots_path):
-            return []
+        """Load shots (shots.json snapshot plus journal tail)"""
+        if self.store is not None:
+            return self.store.get_shots(session_id) if self._ensure_imported(session_id) else []
 
-        with open(shots_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return self._state(session_id).shots()
 
     def _save_shots(self, session_id, shots):
         """Save shots to shots.json"""
-        session_dir = self.get_session_dir(session_id)
-        shots_path = os.path.join(session_dir, "shots.json")
+        self._write_snapshots(session_id, shots=shots)
 
-        with open(shots_path, 'w', encoding='utf-8') as f:
-            json.dump(shots, f, indent=2, ensure_ascii=False)
+    def _write_snapshots(self, session_id, shots=None, meta=None):
+        """
+        Fold the journal into the snapshots and write them atomically.
+
+        shots/meta, when given, replace the stored state. Status updates made
+        after the shots were read (by any thread or process) are merged into
+        them before the journal is truncated (see SessionState.write).
+        With the sqlite backend the database is updated and the JSON files are
+        written as an export.
+        """
+        if self.store is not None:
+            if meta is not None:
+                self.store.save_session(meta)
+            elif not self._ensure_imported(session_id):
+                return
+            if shots is not None:
+                self.store.replace_shots(session_id, shots)
+            self._export_session(session_id)
+            return
+
+        written_meta = self._state(session_id).write(shots=shots, meta=meta)
+        if written_meta is not None:
+            self.catalog.update(session_id, written_meta)
+
+    def _locked(self, session_id):
+        """Session lock for read-modify-write sequences"""
+        if self.store is not None:
+            return SessionJournal(self.get_session_dir(session_id)).locked()
+        return self._state(session_id).locked()
+
+    def _state(self, session_id):
+        """files backend: this process's write-back state of a session (core/session_state.py)"""
+        return get_session_state(self.get_session_dir(session_id), session_id)
+
+    def _ensure_imported(self, session_id):
+        """sqlite backend: make sure a session directory is in the database (False if it does not exist)"""
+        if self.store.get_session(session_id) is not None:
+            return True
+        try:
+            self._import_session(session_id)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _import_session(self, session_id):
+        """sqlite backend: import one session directory; raises FileNotFoundError if it has no meta file"""
+        files = SessionManager(self.sessions_dir, backend="files")
+        meta = files.load_session(session_id)
+        files.compact(session_id)  # The journal must not be replayed over later exports
+        self.store.save_session(meta)
+        self.store.replace_shots(session_id, files.get_shots(session_id))
+        logger.info(f"Imported session {session_id} into {self.store.db_path}")
+        return self.store.get_session(session_id)
+
+    def _export_session(self, session_id):
+        """sqlite backend: write the database state of a session to its JSON files"""
+        meta = self.store.get_session(session_id)
+        if meta is None:
+            return
+        os.makedirs(self.get_session_dir(session_id), exist_ok=True)
+        shots = self.store.get_shots(session_id)
+        # Like the files backend, shots.json only exists once shots were planned
+        if shots or os.path.exists(self._shots_path(session_id)):
+            write_json_atomic(self._shots_path(session_id), shots)
+        write_json_atomic(self._meta_path(session_id), meta)
+
+    def _meta_path(self, session_id):
+        return os.path.join(self.get_session_dir(session_id), f"{session_id}_meta.json")
+
+    def _shots_path(self, session_id):
+        return os.path.join(self.get_session_dir(session_id), "shots.json")
 
     def list_all_sessions(self):
         """List all sessions with their status"""
-        sessions = []
-
-        for item in os.listdir(self.sessions_dir):
-            item_path = os.path.join(self.sessions_dir, item)
-
-            # Check if it's a directory (session folder)
-            if os.path.isdir(item_path):
-                meta_file = f"{item}_meta.json"
-                meta_path = os.path.join(item_path, meta_file)
-
-                if os.path.exists(meta_path):
-                    try:
-                        with open(meta_path, 'r', encoding='utf-8') as f:
-                            meta = json.load(f)
-                            sessions.append(meta)
-                    except:
-                        pass
-
-        sessions.sort(key=lambda x: x['timestamp'], reverse=True)
-        return sessions
+        if self.store is not None:
+            return self.store.list_sessions()
+        return self.catalog.sessions()
+
+    def list_sessions_with_etag(self):
+        """
+        All sessions newest first plus an ETag for the list (for HTTP caching).
+
+        The files backend serves both from the session catalog; the returned
+        dicts are shared with it and must not be modified.
+        """
+        if self.store is not None:
+            sessions = self.store.list_sessions()
+            body = json.dumps(sessions, sort_keys=True, default=str).encode('utf-8')
+            return sessions, f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        return self.catalog.snapshot()
 
     def print_session_summary(self, session_id):
         """Print a summary of a session"""
@@ -0,0 +1,318 @@
+"""
+Session State - Write-back in-memory state of one session per process
+
+SessionManager (files backend) keeps each session's meta and shots in memory
+instead of re-reading and replaying shots.json, the meta file and events.jsonl
+on every get_shots()/load_session() call:
+
+- Per-shot updates (image/video marks, in-flight renders) are applied in
+  memory at once and appended to the journal in one write after
+  SESSION_FLUSH_DELAY seconds (0 = append immediately). A process exit
+  flushes whatever is still pending.
+- Full writes (save_shots, step completion, compaction) flush and fold
+  everything into the snapshots right away (temp file + os.replace). When a
+  caller writes back shots it got from shots(), their status fields (image,
+  video, in-flight render) are merged three-way before the journal is
+  truncated: a field the caller left as it was read takes the current value,
+  which includes marks made since by any thread or process (journal or an
+  intermediate compaction); a field the caller changed keeps its value. The
+  read is found from the shot dicts themselves (not the calling thread, since
+  web UI requests share one).
+- Every disk access holds the session lock file (core/session_journal.py).
+  The stat of the meta file, shots.json and the journal is remembered after
+  each sync; if another process (CLI run vs. web UI) changed them, the next
+  read reloads from disk and re-applies this process's pending updates.
+"""
+import atexit
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from core.logger_config import get_logger
+from core.session_journal import (STATUS_FIELDS, SessionJournal, apply_events, refresh_stats,
+                                  touches_stats, write_json_atomic)
+import config
+
+
+# Get logger for session state
+logger = get_logger(__name__)
+
+# Sessions kept in memory per process; the least recently used clean ones are dropped
+MAX_CACHED_SESSIONS = 64
+
+# shots() results remembered per session to recognise them when written back
+MAX_TRACKED_READS = 64
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+_MISSING = object()
+
+
+def _status(shot):
+    """Copy of a shot's status fields (absent ones left out)."""
+    return {field: copy.deepcopy(shot[field]) for field in STATUS_FIELDS if field in shot}
+
+
+def _read_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SessionState:
+    """Meta and shots of one session, with pending journal events."""
+
+    def __init__(self, session_dir, session_id):
+        self.session_dir = session_dir
+        self.session_id = session_id
+        self.journal = SessionJournal(session_dir)
+        self.meta_path = os.path.join(session_dir, f"{session_id}_meta.json")
+        self.shots_path = os.path.join(session_dir, "shots.json")
+        self._lock = threading.RLock()
+        self._meta = None
+        self._shots = None
+        self._disk_key = None  # None = reload on next access
+        self._pending = []
+        self._timer = None
+        self._reads = OrderedDict()  # read number -> (shots returned, {id(shot): (position, status read)})
+        self._read_count = 0
+
+    @contextmanager
+    def locked(self):
+        """Hold this state and the session lock file (in that order) across several calls."""
+        with self._lock:
+            with self.journal.locked():
+                yield
+
+    def _stat_key(self):
+        return _stat(self.meta_path), _stat(self.shots_path), _stat(self.journal.path)
+
+    def _sync(self):
+        """Reload from disk if the files changed since the last sync (caller holds _lock)."""
+        with self.journal.locked(shared=True):
+            key = self._stat_key()
+            if key == self._disk_key:
+                return
+            meta = _read_json(self.meta_path)
+            shots = _read_json(self.shots_path, [])
+            events = self.journal.read() + self._pending
+            if events:
+                apply_events(shots, meta, events)
+            self._meta, self._shots, self._disk_key = meta, shots, key
+
+    def meta(self):
+        """Copy of the session meta; raises FileNotFoundError if the session has none."""
+        with self._lock:
+            self._sync()
+            if self._meta is None:
+                raise FileNotFoundError(self.meta_path)
+            return copy.deepcopy(self._meta)
+
+    def shots(self):
+        """Copy of the shots list ([] before shots are planned)."""
+        with self._lock:
+            self._sync()
+            shots = copy.deepcopy(self._shots)
+            self._track_read(shots)
+            return shots
+
+    def _track_read(self, shots):
+        """Remember shots handed to a caller as the base of a later write (caller holds _lock)."""
+        # The dicts identify this read when they are written back; holding
+        # them keeps their ids from being reused meanwhile
+        self._read_count += 1
+        self._reads[self._read_count] = (shots, {id(shot): (position, _status(shot))
+                                                 for position, shot in enumerate(shots)})
+        while len(self._reads) > MAX_TRACKED_READS:
+            self._reads.popitem(last=False)
+
+    def record(self, event):
+        """Apply a journal event in memory and schedule its append."""
+        with self._lock:
+            self._sync()
+            apply_events(self._shots, self._meta, [event])
+            self._pending.append(event)
+            delay = getattr(config, 'SESSION_FLUSH_DELAY', 1.0)
+            if delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Append pending events to the journal, compacting it when it grew too large."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            if not os.path.isdir(self.session_dir):
+                # Session deleted meanwhile
+                self._pending = []
+                return
+            with self.journal.locked():
+                unchanged = self._stat_key() == self._disk_key
+                self.journal.extend(self._pending)
+                self._pending = []
+                # Keep the cache unless another process wrote since the last sync
+                self._disk_key = self._stat_key() if unchanged else None
+                if self.journal.size() > getattr(config, 'SESSION_JOURNAL_COMPACT_BYTES', 256 * 1024):
+                    self.write()
+
+    def _read_base(self, shot):
+        """(position, status) of a shot dict in the newest shots() read it came from, or None."""
+        for _, bases in reversed(self._reads.values()):
+            base = bases.get(id(shot))
+            if base is not None:
+                return base
+        return None
+
+    def _merge_status(self, shots):
+        """
+        Three-way merge of the status fields of written shots (caller holds _lock, state synced).
+
+        Returns:
+            tuple: (shots to write, number of fields taken from the current state)
+        """
+        merged = 0
+        result = list(shots)
+        for written_pos, shot in enumerate(shots):
+            base = self._read_base(shot)
+            if base is None or base[0] >= len(self._shots):
+                continue  # Built from scratch: written as given
+            position, read_status = base
+            current = self._shots[position]
+            for field in STATUS_FIELDS:
+                read_value = read_status.get(field, _MISSING)
+                value = current.get(field, _MISSING)
+                if shot.get(field, _MISSING) != read_value or value == read_value:
+                    continue
+                if result[written_pos] is shot:
+                    result[written_pos] = dict(shot)
+                if value is _MISSING:
+                    result[written_pos].pop(field, None)
+                else:
+                    result[written_pos][field] = copy.deepcopy(value)
+                merged += 1
+        return result, merged
+
+    def write(self, shots=None, meta=None):
+        """
+        Write the snapshots atomically, folding journal and pending events into them.
+
+        shots/meta, when given, replace the stored state. Status fields of
+        shots that came from shots() are merged with the current state (see
+        the module docstring) before the journal is truncated, so updates
+        made after the caller's read are kept and its own edits are not
+        undone. Shots built from scratch (no tracked read) are written as given.
+
+        Returns:
+            dict or None: The meta written (if any)
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            with self.journal.locked():
+                self._sync()
+                events = self.journal.read() + self._pending
+                given = shots
+                merged = 0
+                if shots is not None:
+                    shots, merged = self._merge_status(shots)
+                    if merged:
+                        logger.debug(f"Kept {merged} concurrent status update(s) in written "
+                                     f"{self.session_id} shots")
+                if events or merged:
+                    if shots is None:
+                        shots = self._shots
+                    if meta is None and self._meta is not None:
+                        meta = self._meta
+                        if merged or touches_stats(events):
+                            refresh_stats(meta, shots)
+
+                if shots is not None:
+                    write_json_atomic(self.shots_path, shots)
+                    self._shots = copy.deepcopy(shots)
+                if meta is not None:
+                    write_json_atomic(self.meta_path, meta)
+                    self._meta = copy.deepcopy(meta)
+                if events:
+                    self.journal.clear()
+                    self._pending = []
+                    logger.debug(f"Compacted {len(events)} journal event(s) into {self.session_id} snapshots")
+                self._disk_key = self._stat_key()
+                if given is not None:
+                    # The caller's copy is the base of its next write
+                    self._track_read(given)
+            return meta
+
+    def discard(self):
+        """Drop pending events (the session is being deleted)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending = []
+            self._disk_key = None
+
+    def is_clean(self):
+        return not self._pending
+
+
+_states = OrderedDict()  # abs session dir -> SessionState
+_states_lock = threading.Lock()
+
+
+def get_session_state(session_dir, session_id):
+    """Get this process's SessionState for a session directory."""
+    key = os.path.abspath(session_dir)
+    with _states_lock:
+        state = _states.get(key)
+        if state is None:
+            state = _states[key] = SessionState(session_dir, session_id)
+        _states.move_to_end(key)
+        for old_key in list(_states)[:-MAX_CACHED_SESSIONS]:
+            old = _states[old_key]
+            if old._lock.acquire(blocking=False):
+                try:
+                    if old.is_clean():
+                        del _states[old_key]
+                finally:
+                    old._lock.release()
+        return state
+
+
+def drop_session_state(session_dir):
+    """Forget a session (after it was deleted)."""
+    with _states_lock:
+        state = _states.pop(os.path.abspath(session_dir), None)
+    if state is not None:
+        state.discard()
+
+
+def flush_all():
+    """Append every session's pending events to its journal."""
+    with _states_lock:
+        states = list(_states.values())
+    for state in states:
+        try:
+            state.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush session {state.session_id}: {e}")
+
+
+atexit.register(flush_all)
@@ -0,0 +1,379 @@
+"""
+Session Store - SQLite (WAL) backend for session metadata and shot status
+
+With SESSION_BACKEND="sqlite", SessionManager keeps session meta, shots, image
+variations and in-flight renders in one database instead of parsing every
+session's JSON files:
+
+- sessions:   one row per session, meta JSON plus indexed status columns
+- shots:      one row per shot, shot JSON plus image/video status columns
+- variations: image variations (shots[].image_paths) in order
+- renders:    in-flight ComfyUI renders (shots[].pending_renders)
+
+Marking an image or video is a single-row UPDATE, and cross-session status
+queries ("shots with images but no video") use the status indexes. The JSON
+files are still written on full saves (save_shots, step completion) as a
+readable export; SessionManager.compact() refreshes them on demand.
+
+Import existing session directories (done automatically when the database is
+first created):
+
+    python -m core.session_store migrate [--sessions-dir DIR]
+    python -m core.session_store pending       # shots with images but no video
+    python -m core.session_store stats
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import config
+from core.logger_config import get_logger
+
+
+# Get logger for session store
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id       TEXT PRIMARY KEY,
+    timestamp        TEXT,
+    started_at       TEXT,
+    completed        INTEGER NOT NULL DEFAULT 0,
+    total_shots      INTEGER NOT NULL DEFAULT 0,
+    images_generated INTEGER NOT NULL DEFAULT 0,
+    videos_rendered  INTEGER NOT NULL DEFAULT 0,
+    meta             TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_completed ON sessions (completed, timestamp);
+
+CREATE TABLE IF NOT EXISTS shots (
+    session_id      TEXT NOT NULL,
+    idx             INTEGER NOT NULL,
+    image_generated INTEGER NOT NULL DEFAULT 0,
+    image_path      TEXT,
+    video_rendered  INTEGER NOT NULL DEFAULT 0,
+    video_path      TEXT,
+    data            TEXT NOT NULL,
+    PRIMARY KEY (session_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_shots_status ON shots (image_generated, video_rendered);
+
+CREATE TABLE IF NOT EXISTS variations (
+    session_id TEXT NOT NULL,
+    shot_idx   INTEGER NOT NULL,
+    position   INTEGER NOT NULL,
+    image_path TEXT NOT NULL,
+    PRIMARY KEY (session_id, shot_idx, image_path)
+);
+
+CREATE TABLE IF NOT EXISTS renders (
+    session_id    TEXT NOT NULL,
+    shot_idx      INTEGER NOT NULL,
+    variation_idx TEXT NOT NULL,
+    prompt_id     TEXT,
+    backend       TEXT,
+    workflow_hash TEXT,
+    submitted_at  REAL,
+    PRIMARY KEY (session_id, shot_idx, variation_idx)
+);
+CREATE INDEX IF NOT EXISTS idx_renders_prompt ON renders (prompt_id);
+"""
+
+# Shot fields kept in columns/child tables rather than in shots.data
+STATUS_FIELDS = ('image_generated', 'image_path', 'image_paths', 'video_rendered', 'video_path', 'pending_renders')
+
+
+class SessionStore:
+    """SQLite database of sessions and shots (one connection per thread)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self.created = not os.path.exists(db_path)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # Sessions
+
+    def save_session(self, meta: dict):
+        """Insert or replace a session's metadata."""
+        stats = meta.get('stats', {})
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, timestamp, started_at, completed, total_shots, "
+                "images_generated, videos_rendered, meta) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (meta['session_id'], meta.get('timestamp', ''), meta.get('started_at'),
+                 1 if meta.get('completed') else 0, stats.get('total_shots', 0),
+                 stats.get('images_generated', 0), stats.get('videos_rendered', 0),
+                 json.dumps(meta, ensure_ascii=False)))
+            # The counters follow the shot rows once a session has any
+            if conn.execute("SELECT 1 FROM shots WHERE session_id = ? LIMIT 1", (meta['session_id'],)).fetchone():
+                self._refresh_counts(conn, meta['session_id'])
+
+    def get_session(self, session_id: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return self._meta_from_row(row) if row else None
+
+    def list_sessions(self) -> List[dict]:
+        """All sessions, newest first."""
+        rows = self._conn().execute("SELECT * FROM sessions ORDER BY timestamp DESC").fetchall()
+        return [self._meta_from_row(row) for row in rows]
+
+    def latest_session(self) -> Optional[dict]:
+        """Most recent session (complete or not)."""
+        row = self._conn().execute("SELECT * FROM sessions ORDER BY timestamp DESC LIMIT 1").fetchone()
+        return self._meta_from_row(row) if row else None
+
+    def delete_session(self, session_id: str):
+        with self._conn() as conn:
+            for table in ('sessions', 'shots', 'variations', 'renders'):
+                conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+    @staticmethod
+    def _meta_from_row(row) -> dict:
+        meta = json.loads(row['meta'])
+        stats = meta.setdefault('stats', {})
+        stats['images_generated'] = row['images_generated']
+        stats['videos_rendered'] = row['videos_rendered']
+        return meta
+
+    # Shots
+
+    def replace_shots(self, session_id: str, shots: List[dict]):
+        """Replace all shots of a session (with their variations and pending renders)."""
+        with self._conn() as conn:
+            for table in ('shots', 'variations', 'renders'):
+                conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+            for position, shot in enumerate(shots, start=1):
+                idx = shot.get('index', position)
+                data = {k: v for k, v in shot.items() if k not in STATUS_FIELDS}
+                conn.execute(
+                    "INSERT OR REPLACE INTO shots (session_id, idx, image_generated, image_path, video_rendered, "
+                    "video_path, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, idx, 1 if shot.get('image_generated') else 0, shot.get('image_path'),
+                     1 if shot.get('video_rendered') else 0, shot.get('video_path'),
+                     json.dumps(data, ensure_ascii=False)))
+                for var_position, image_path in enumerate(shot.get('image_paths') or [], start=1):
+                    conn.execute(
+                        "INSERT OR IGNORE INTO variations (session_id, shot_idx, position, image_path) "
+                        "VALUES (?, ?, ?, ?)", (session_id, idx, var_position, image_path))
+                for variation_idx, record in (shot.get('pending_renders') or {}).items():
+                    self._insert_render(conn, session_id, idx, variation_idx, record)
+            self._refresh_counts(conn, session_id)
+
+    def get_shots(self, session_id: str) -> List[dict]:
+        """Shots of a session in index order, in shots.json form."""
+        conn = self._conn()
+        variations: Dict[int, List[str]] = {}
+        for row in conn.execute("SELECT shot_idx, image_path FROM variations WHERE session_id = ? "
+                                "ORDER BY shot_idx, position", (session_id,)):
+            variations.setdefault(row['shot_idx'], []).append(row['image_path'])
+        renders: Dict[int, dict] = {}
+        for row in conn.execute("SELECT * FROM renders WHERE session_id = ?", (session_id,)):
+            renders.setdefault(row['shot_idx'], {})[row['variation_idx']] = {
+                'prompt_id': row['prompt_id'],
+                'backend': row['backend'],
+                'workflow_hash': row['workflow_hash'],
+                'submitted_at': row['submitted_at']
+            }
+
+        shots = []
+        for row in conn.execute("SELECT * FROM shots WHERE session_id = ? ORDER BY idx", (session_id,)):
+            shots.append(self._shot_from_row(row, variations.get(row['idx'], []), renders.get(row['idx'])))
+        return shots
+
+    @staticmethod
+    def _shot_from_row(row, image_paths, pending_renders=None) -> dict:
+        shot = json.loads(row['data'])
+        shot['image_generated'] = bool(row['image_generated'])
+        shot['image_path'] = row['image_path']
+        shot['image_paths'] = image_paths
+        shot['video_rendered'] = bool(row['video_rendered'])
+        shot['video_path'] = row['video_path']
+        if pending_renders:
+            shot['pending_renders'] = pending_renders
+        return shot
+
+    def apply_event(self, session_id: str, event: dict):
+        """Apply one per-shot update (same events as core.session_journal)."""
+        op = event.get('op')
+        shot_idx = event.get('shot')
+        with self._conn() as conn:
+            if op == 'image':
+                updated = conn.execute(
+                    "UPDATE shots SET image_generated = 1, image_path = ? WHERE session_id = ? AND idx = ?",
+                    (event.get('path'), session_id, shot_idx)).rowcount
+                if updated:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO variations (session_id, shot_idx, position, image_path) "
+                        "SELECT ?, ?, COALESCE(MAX(position), 0) + 1, ? FROM variations "
+                        "WHERE session_id = ? AND shot_idx = ?",
+                        (session_id, shot_idx, event.get('path'), session_id, shot_idx))
+                    self._refresh_counts(conn, session_id)
+            elif op == 'video':
+                if event.get('path'):
+                    updated = conn.execute(
+                        "UPDATE shots SET video_rendered = 1, video_path = ? WHERE session_id = ? AND idx = ?",
+                        (event['path'], session_id, shot_idx)).rowcount
+                else:
+                    updated = conn.execute(
+                        "UPDATE shots SET video_rendered = 1 WHERE session_id = ? AND idx = ?",
+                        (session_id, shot_idx)).rowcount
+                if updated:
+                    self._refresh_counts(conn, session_id)
+            elif op == 'render_submit':
+                exists = conn.execute("SELECT 1 FROM shots WHERE session_id = ? AND idx = ?",
+                                      (session_id, shot_idx)).fetchone()
+                if exists:
+                    self._insert_render(conn, session_id, shot_idx, event.get('variation'), event.get('record') or {})
+            elif op == 'render_clear':
+                conn.execute("DELETE FROM renders WHERE session_id = ? AND shot_idx = ? AND variation_idx = ?",
+                             (session_id, shot_idx, str(event.get('variation'))))
+            else:
+                logger.warning(f"Ignoring unknown session event: {op}")
+
+    @staticmethod
+    def _insert_render(conn, session_id, shot_idx, variation_idx, record):
+        conn.execute(
+            "INSERT OR REPLACE INTO renders (session_id, shot_idx, variation_idx, prompt_id, backend, "
+            "workflow_hash, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (session_id, shot_idx, str(variation_idx), record.get('prompt_id'), record.get('backend'),
+             record.get('workflow_hash'), record.get('submitted_at')))
+
+    @staticmethod
+    def _refresh_counts(conn, session_id):
+        conn.execute(
+            "UPDATE sessions SET "
+            "images_generated = (SELECT COUNT(*) FROM shots WHERE session_id = ? AND image_generated = 1), "
+            "videos_rendered = (SELECT COUNT(*) FROM shots WHERE session_id = ? AND video_rendered = 1) "
+            "WHERE session_id = ?", (session_id, session_id, session_id))
+
+    # Status queries
+
+    def find_shots(self, session_id: str = None, image_generated: bool = None,
+                   video_rendered: bool = None) -> List[dict]:
+        """
+        Shots matching a status filter, across sessions unless session_id is given.
+
+        Each result is the shot dict plus its 'session_id'.
+        """
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if image_generated is not None:
+            clauses.append("image_generated = ?")
+            params.append(1 if image_generated else 0)
+        if video_rendered is not None:
+            clauses.append("video_rendered = ?")
+            params.append(1 if video_rendered else 0)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self._conn()
+        results = []
+        for row in conn.execute(f"SELECT * FROM shots {where} ORDER BY session_id, idx", params).fetchall():
+            image_paths = [r['image_path'] for r in conn.execute(
+                "SELECT image_path FROM variations WHERE session_id = ? AND shot_idx = ? ORDER BY position",
+                (row['session_id'], row['idx']))]
+            shot = self._shot_from_row(row, image_paths)
+            shot['session_id'] = row['session_id']
+            results.append(shot)
+        return results
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        return {
+            'db_path': self.db_path,
+            'sessions': conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0],
+            'incomplete_sessions': conn.execute("SELECT COUNT(*) FROM sessions WHERE completed = 0").fetchone()[0],
+            'shots': conn.execute("SELECT COUNT(*) FROM shots").fetchone()[0],
+            'pending_videos': conn.execute(
+                "SELECT COUNT(*) FROM shots WHERE image_generated = 1 AND video_rendered = 0").fetchone()[0],
+            'in_flight_renders': conn.execute("SELECT COUNT(*) FROM renders").fetchone()[0],
+        }
+
+
+# Global store instances, one per database path
+_stores: Dict[str, SessionStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_session_store(db_path: str = None) -> SessionStore:
+    """Get the shared SessionStore for a database path (default SESSION_DB_PATH)."""
+    db_path = os.path.abspath(db_path or config.SESSION_DB_PATH)
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = SessionStore(db_path)
+        return store
+
+
+def migrate_sessions(sessions_dir: str = None, db_path: str = None) -> int:
+    """
+    Import every session directory (meta file, shots.json and journal) into the database.
+
+    Returns:
+        int: Number of sessions imported
+    """
+    from core.session_manager import SessionManager
+
+    sessions_dir = sessions_dir or config.ABS_SESSIONS_DIR
+    files = SessionManager(sessions_dir, backend="files")
+    store = get_session_store(db_path)
+
+    imported = 0
+    for item in sorted(os.listdir(sessions_dir)):
+        if not os.path.exists(os.path.join(sessions_dir, item, f"{item}_meta.json")):
+            continue
+        try:
+            meta = files.load_session(item)
+            files.compact(item)  # The journal must not be replayed over later exports
+            shots = files.get_shots(item)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping session {item}: {e}")
+            print(f"[WARN] Skipping session {item}: {e}")
+            continue
+        store.save_session(meta)
+        store.replace_shots(item, shots)
+        imported += 1
+
+    logger.info(f"Imported {imported} session(s) from {sessions_dir} into {store.db_path}")
+    return imported
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SQLite session store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate_cmd = sub.add_parser("migrate", help="Import existing session directories")
+    migrate_cmd.add_argument("--sessions-dir", default=None)
+    migrate_cmd.add_argument("--db", default=None)
+    pending_cmd = sub.add_parser("pending", help="Shots with images but no video")
+    pending_cmd.add_argument("--session", default=None)
+    sub.add_parser("stats", help="Database summary")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        count = migrate_sessions(args.sessions_dir, args.db)
+        print(f"[OK] Imported {count} session(s) into {get_session_store(args.db).db_path}")
+    elif args.command == "pending":
+        for shot in get_session_store().find_shots(args.session, image_generated=True, video_rendered=False):
+            print(f"{shot['session_id']}  shot {shot['index']:03d}  {shot.get('image_path')}")
+    else:
+        for key, value in get_session_store().stats().items():
+            print(f"{key}: {value}")
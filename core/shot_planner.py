@@ -2,6 +2,7 @@
 Shot Planner - Plan cinematic shots using LLM agents.
 """
 from core.llm_engine import get_provider
+from core.llm_cache import carry_llm_cache_bypass
 from core.agent_loader import load_agent_prompt
 from core.logger_config import setup_agent_logger
 from core.log_decorators import log_agent_call
@@ -9,9 +10,12 @@ import json
 import re
 from config import (DEFAULT_SHOTS_PER_SCENE, MIN_SHOTS_PER_SCENE, MAX_SHOTS_PER_SCENE,
                     SHOT_GENERATION_BATCH_SIZE, LLM_PROVIDER, MAX_PARALLEL_BATCH_THREADS,
-                    DEFAULT_SHOT_LENGTH)
+                    DEFAULT_SHOT_LENGTH, STREAM_LLM_SHOTS, STREAM_SHOTS_SAVE_INTERVAL)
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
 import threading
+import time
+from collections import deque
 
 
 # Get logger for agent operations
@@ -24,8 +28,171 @@ def is_local_provider():
     return LLM_PROVIDER.lower() in local_providers
 
 
-def plan_shots_batch(scenes_batch, batch_num, total_batches, max_shots_instruction, image_agent, video_agent):
-    """Plan shots for a batch of scenes"""
+class BatchReleaser:
+    """
+    Release planned batches in batch order with their final global shot indices.
+
+    Parallel batches complete in any order; a batch is released (on_batch called
+    with its shots) as soon as it and every earlier batch are done, so shot
+    indices never change afterwards. Shots streamed from a batch that is still
+    being planned (add_shot) are released once every earlier batch is done:
+    the first one at once, later ones collected for save_interval seconds so
+    on_batch is not called for every shot. on_batch_done(batch_num) is called
+    once a batch has been planned completely; a failed batch is skipped but
+    never counted as done. Batches already in `planned` (resumed session, see
+    complete_planned_shots) are counted but not released again.
+
+    Callbacks run after the internal lock is released (they save the session),
+    one at a time and in release order.
+    """
+
+    def __init__(self, on_batch=None, max_shots=None, planned=None, on_batch_done=None, save_interval=None):
+        self.on_batch = on_batch
+        self.on_batch_done = on_batch_done
+        self.max_shots = max_shots
+        self.save_interval = STREAM_SHOTS_SAVE_INTERVAL if save_interval is None else save_interval
+        self.shots = list(planned or [])
+        self.done_batches = {shot.get('batch_number') for shot in self.shots}
+        self.dropped = 0
+        self._pending = {}
+        self._partial = {}   # batch -> shots streamed so far
+        self._streamed = {}  # batch -> how many of them were released
+        self._next_batch = 1
+        self._last_release = None
+        self._timer = None
+        self._lock = threading.RLock()
+        self._outbox = deque()  # callbacks queued under _lock, run by _deliver
+        self._deliver_lock = threading.Lock()
+        self._skip_done()
+
+    def _skip_done(self):
+        while self._next_batch in self.done_batches:
+            self._next_batch += 1
+
+    def add_shot(self, batch_num, shot):
+        """Record one shot of a batch that is still being planned; released if earlier batches are done."""
+        with self._lock:
+            self._partial.setdefault(batch_num, []).append(shot)
+            if batch_num != self._next_batch:
+                return
+            wait = 0 if self._last_release is None else \
+                self._last_release + self.save_interval - time.monotonic()
+            if wait <= 0:
+                self._release_partial()
+            elif self._timer is None:
+                self._timer = threading.Timer(wait, self._flush_partial)
+                self._timer.daemon = True
+                self._timer.start()
+        self._deliver(wait=False)
+
+    def _flush_partial(self):
+        with self._lock:
+            self._timer = None
+            self._release_partial()
+        self._deliver(wait=False)
+
+    def add(self, batch_num, batch_shots):
+        """
+        Record a finished batch (empty list for a failed one) and release what is in order.
+
+        batch_shots starts with the shots already passed to add_shot, in the same order.
+        """
+        with self._lock:
+            self._pending[batch_num] = batch_shots
+            while self._next_batch in self._pending:
+                batch_shots = self._pending.pop(self._next_batch)
+                self._release(self._next_batch, batch_shots[self._streamed.pop(self._next_batch, 0):])
+                self._partial.pop(self._next_batch, None)
+                if batch_shots:
+                    self.done_batches.add(self._next_batch)
+                    if self.on_batch_done:
+                        self._outbox.append(functools.partial(self.on_batch_done, self._next_batch))
+                self._next_batch += 1
+                self._skip_done()
+            self._release_partial()
+        self._deliver()
+
+    def _deliver(self, wait=True):
+        """
+        Run queued callbacks outside _lock, in order, one caller at a time.
+
+        With wait False (streamed shots) a thread that finds another one
+        delivering leaves its callbacks to that thread instead of waiting;
+        add() waits, so everything is delivered when the last batch is added.
+        """
+        while True:
+            if not self._deliver_lock.acquire(blocking=wait):
+                return
+            try:
+                while True:
+                    with self._lock:
+                        if not self._outbox:
+                            break
+                        callback = self._outbox.popleft()
+                    callback()
+            finally:
+                self._deliver_lock.release()
+            # Callbacks queued between the last check and the release are ours to run
+            with self._lock:
+                if not self._outbox:
+                    return
+
+    def _release_partial(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        partial = self._partial.get(self._next_batch, [])
+        released = self._streamed.get(self._next_batch, 0)
+        if len(partial) > released:
+            self._streamed[self._next_batch] = len(partial)
+            self._release(self._next_batch, partial[released:])
+
+    def _release(self, batch_num, batch_shots):
+        if self.max_shots:
+            room = max(0, self.max_shots - len(self.shots))
+            self.dropped += max(0, len(batch_shots) - room)
+            batch_shots = batch_shots[:room]
+        for shot in batch_shots:
+            shot['batch_number'] = batch_num
+            shot['index'] = len(self.shots) + 1
+            self.shots.append(shot)
+        if batch_shots and self.on_batch:
+            self._last_release = time.monotonic()
+            self._outbox.append(functools.partial(self.on_batch, batch_shots))
+
+
+def complete_planned_shots(planned, planned_batches):
+    """
+    Shots of an interrupted incremental planning run that can be kept on resume.
+
+    Batches are released in order, but one cut off mid-stream or failed after
+    streaming some shots leaves them behind, and a failed batch leaves a gap
+    before the batches released after it. Shots are kept up to the first batch
+    number missing from planned_batches (batch numbers reported through
+    on_batch_done); everything from there on is planned again, so the kept
+    shots keep their indices. With planned_batches None (session planned
+    before batches were recorded) all shots are kept.
+    """
+    planned = list(planned or [])
+    if planned_batches is None or not planned:
+        return planned
+    first_missing = 1
+    while first_missing in planned_batches:
+        first_missing += 1
+    keep = 0
+    while keep < len(planned) and (planned[keep].get('batch_number') or 0) < first_missing:
+        keep += 1
+    return planned[:keep]
+
+
+def plan_shots_batch(scenes_batch, batch_num, total_batches, max_shots_instruction, image_agent, video_agent,
+                     on_shot=None):
+    """
+    Plan shots for a batch of scenes.
+
+    With on_shot, the LLM response is streamed and on_shot(shot) is called for
+    each shot as soon as its JSON object is complete (see ask_for_shots).
+    """
     # Create scene graph for this batch
     batch_graph = json.dumps(scenes_batch, ensure_ascii=False)
 
@@ -42,9 +209,7 @@ IMPORTANT: Generate ONLY shots for these {len(scenes_batch)} scenes in this batc
         user_input = f"{batch_graph}{batch_instruction}"
         image_prompt = load_agent_prompt("image", user_input, image_agent)
 
-        provider = get_provider()
-        response = provider.ask(image_prompt, response_format="application/json")
-        shots = extract_and_repair_json(response)
+        shots = ask_for_shots(get_provider(), image_prompt, on_shot)
 
         logger.info(f"Batch {batch_num}/{total_batches}: Generated {len(shots)} shots")
         return shots
@@ -68,13 +233,103 @@ Return JSON list (each shot MUST include narration from scene):
 SCENES:
 {batch_graph}
 """
-        provider = get_provider()
-        response = provider.ask(prompt, response_format="application/json")
-        shots = extract_and_repair_json(response)
+        shots = ask_for_shots(get_provider(), prompt, on_shot)
         logger.info(f"Batch {batch_num}/{total_batches}: Generated {len(shots)} shots (legacy mode)")
         return shots
 
 
+class ShotStreamExtractor:
+    """
+    Incremental parser for a streamed JSON list of shots.
+
+    feed() takes response text as it arrives and returns every object of the
+    (first) top-level array whose closing brace has arrived, so a shot can be
+    used before the rest of the list is written. Markdown fences and prose
+    around the JSON are skipped, as is a wrapper such as {"shots": [...]}.
+    Objects that do not parse are left out; extract_and_repair_json() is the
+    fallback when the stream yields none.
+    """
+
+    def __init__(self):
+        self.objects = []
+        self._stack = []          # open brackets/braces of the JSON being read
+        self._array_depth = None  # depth of the shot array
+        self._in_string = False
+        self._escape = False
+        self._current = None      # characters of the shot object being read
+
+    def feed(self, chunk):
+        """Consume a chunk of response text; returns the shot objects completed by it."""
+        completed = []
+        for char in chunk:
+            if self._current is not None:
+                self._current.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"' and self._stack:
+                self._in_string = True
+            elif char in '[{':
+                if char == '[' and self._array_depth is None:
+                    self._array_depth = len(self._stack) + 1
+                elif char == '{' and len(self._stack) == self._array_depth and self._stack[-1] == '[':
+                    self._current = ['{']
+                self._stack.append(char)
+            elif char in ']}' and self._stack:
+                self._stack.pop()
+                if char == '}' and self._current is not None and len(self._stack) == self._array_depth:
+                    obj = self._parse("".join(self._current))
+                    self._current = None
+                    if obj is not None:
+                        self.objects.append(obj)
+                        completed.append(obj)
+        return completed
+
+    @staticmethod
+    def _parse(obj_str):
+        for candidate in (obj_str, apply_json_repairs(obj_str)):
+            try:
+                obj = json.loads(candidate)
+                return obj if isinstance(obj, dict) else None
+            except json.JSONDecodeError:
+                continue
+        logger.debug(f"Skipping unparseable streamed shot: {obj_str[:200]}")
+        return None
+
+
+def ask_for_shots(provider, prompt, on_shot=None):
+    """
+    Ask the LLM for a JSON list of shots.
+
+    Args:
+        provider: LLM provider (core/llm_engine.py)
+        prompt: Shot planning prompt
+        on_shot: Optional callback(shot); when given, the response is streamed
+                 (provider.ask_stream) and each shot is passed on as soon as
+                 its object is complete
+
+    Returns:
+        List of shots (with on_shot: the streamed shots, in order)
+    """
+    if on_shot is None:
+        return extract_and_repair_json(provider.ask(prompt, response_format="application/json"))
+
+    extractor = ShotStreamExtractor()
+    chunks = []
+    for chunk in provider.ask_stream(prompt, response_format="application/json"):
+        chunks.append(chunk)
+        for shot in extractor.feed(chunk):
+            on_shot(shot)
+    if extractor.objects:
+        return extractor.objects
+    return extract_and_repair_json("".join(chunks))
+
+
 def extract_and_repair_json(response):
     """
     Extract JSON from LLM response and repair common issues.
@@ -283,7 +538,8 @@ def extract_complete_objects(json_str):
 
 
 @log_agent_call
-def plan_shots(scene_graph, max_shots=None, image_agent="default", video_agent="default", shots_per_scene=None):
+def plan_shots(scene_graph, max_shots=None, image_agent="default", video_agent="default", shots_per_scene=None,
+               on_batch=None, planned=None, on_batch_done=None):
     """
     Plan cinematic shots for WAN 2.2 video generation.
 
@@ -295,6 +551,13 @@ def plan_shots(scene_graph, max_shots=None, image_agent="default", video_agent="
         video_agent: Name of video motion agent to use (default: "default")
                     Available: default, cinematic
         shots_per_scene: Target number of shots per scene (optional)
+        on_batch: Optional callback function(shots) called for each planned batch
+                  in batch order, as soon as it is final; shots carry their
+                  global 'index' and 'batch_number' (incremental planning)
+        planned: Shots of batches already planned by an interrupted run; those
+                 batches are not requested again (see complete_planned_shots)
+        on_batch_done: Optional callback function(batch_num) called once a batch
+                       has been planned completely and all its shots passed to on_batch
 
     Returns:
         List of shot dictionaries with image_prompt, motion_prompt, and camera
@@ -450,6 +713,19 @@ CRITICAL SHOT REQUIREMENTS:
                 'end_idx': end_idx
             })
 
+        # Batches are released in order so every shot gets its final index right away
+        releaser = BatchReleaser(on_batch=on_batch, max_shots=max_shots, planned=planned,
+                                 on_batch_done=on_batch_done)
+
+        def shot_callback(batch_num):
+            """Stream shots into the releaser while a batch is planned (incremental planning only)."""
+            if not (on_batch and STREAM_LLM_SHOTS):
+                return None
+            return lambda shot: releaser.add_shot(batch_num, shot)
+        if releaser.done_batches:
+            print(f"[RESUME] {len(releaser.shots)} shot(s) from {len(releaser.done_batches)} batch(es) already planned")
+        batches = [batch for batch in batches if batch['batch_num'] not in releaser.done_batches]
+
         # Check if provider is local
         use_parallel = not is_local_provider()
 
@@ -458,7 +734,6 @@ CRITICAL SHOT REQUIREMENTS:
             logger.info(f"Using PARALLEL batch processing: {total_batches} batches concurrently")
             print(f"[INFO] Processing {total_batches} batches in parallel (cloud provider)")
 
-            all_shots = []
             completed = 0
             lock = threading.Lock()
 
@@ -470,13 +745,10 @@ CRITICAL SHOT REQUIREMENTS:
                     total_batches=batch_data['total_batches'],
                     max_shots_instruction=batch_data['max_shots_instruction'],
                     image_agent=batch_data['image_agent'],
-                    video_agent=batch_data['video_agent']
+                    video_agent=batch_data['video_agent'],
+                    on_shot=shot_callback(batch_data['batch_num'])
                 )
 
-                # Add batch number
-                for shot in result:
-                    shot['batch_number'] = batch_data['batch_num']
-
                 # Update progress
                 nonlocal completed
                 with lock:
@@ -487,37 +759,30 @@ CRITICAL SHOT REQUIREMENTS:
                 return result, batch_data['batch_num']
 
             # Process batches in parallel
-            max_workers = min(total_batches, MAX_PARALLEL_BATCH_THREADS)
+            max_workers = max(1, min(len(batches), MAX_PARALLEL_BATCH_THREADS))
             logger.info(f"Using {max_workers} parallel threads (max configured: {MAX_PARALLEL_BATCH_THREADS})")
 
-            # Store results with batch numbers for later sorting
-            batch_results = []
-
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(process_batch, batch): batch['batch_num']
+                # Worker threads honour an explicit regeneration's cache bypass
+                process = carry_llm_cache_bypass(process_batch)
+                futures = {executor.submit(process, batch): batch['batch_num']
                           for batch in batches}
 
                 for future in as_completed(futures):
                     try:
                         batch_shots, batch_num = future.result()
-                        batch_results.append((batch_num, batch_shots))
                     except Exception as e:
                         batch_num = futures[future]
+                        batch_shots = []
                         logger.error(f"Batch {batch_num} failed: {e}")
                         print(f"[ERROR] Batch {batch_num} failed: {e}")
-
-            # Sort results by batch_num to ensure correct order
-            batch_results.sort(key=lambda x: x[0])
-            for batch_num, batch_shots in batch_results:
-                all_shots.extend(batch_shots)
+                    releaser.add(batch_num, batch_shots)
 
         else:
             # Sequential processing for local providers
             logger.info(f"Using SEQUENTIAL batch processing: {total_batches} batches (local provider)")
             print(f"[INFO] Processing {scene_count} scenes in {total_batches} batches sequentially (local provider)")
 
-            all_shots = []
-
             for batch_data in batches:
                 print(f"[INFO] Processing batch {batch_data['batch_num']}/{total_batches} (scenes {batch_data['start_idx'] + 1}-{batch_data['end_idx']})")
 
@@ -528,22 +793,19 @@ CRITICAL SHOT REQUIREMENTS:
                     total_batches=batch_data['total_batches'],
                     max_shots_instruction=batch_data['max_shots_instruction'],
                     image_agent=batch_data['image_agent'],
-                    video_agent=batch_data['video_agent']
+                    video_agent=batch_data['video_agent'],
+                    on_shot=shot_callback(batch_data['batch_num'])
                 )
 
-                # Add batch number
-                for shot in batch_shots:
-                    shot['batch_number'] = batch_data['batch_num']
-
-                all_shots.extend(batch_shots)
+                releaser.add(batch_data['batch_num'], batch_shots)
 
-        logger.info(f"Batch processing complete: {len(all_shots)} total shots generated")
+        all_shots = releaser.shots
+        logger.info(f"Batch processing complete: {len(all_shots) + releaser.dropped} total shots generated")
 
-        # Enforce max_shots limit if specified
-        if max_shots and len(all_shots) > max_shots:
-            print(f"[INFO] Generated {len(all_shots)} shots, limiting to {max_shots}")
-            logger.info(f"Generated {len(all_shots)} shots, limiting to {max_shots}")
-            all_shots = all_shots[:max_shots]
+        # max_shots limit is enforced by the releaser
+        if releaser.dropped:
+            print(f"[INFO] Generated {len(all_shots) + releaser.dropped} shots, limiting to {max_shots}")
+            logger.info(f"Generated {len(all_shots) + releaser.dropped} shots, limiting to {max_shots}")
 
         # Log results
         if max_shots:
@@ -556,7 +818,11 @@ CRITICAL SHOT REQUIREMENTS:
         return all_shots
 
     # Single batch processing (original logic)
+    if planned:
+        return list(planned)
     user_input = f"{scene_graph}{max_shots_instruction}"
+    releaser = BatchReleaser(on_batch=on_batch, max_shots=max_shots, on_batch_done=on_batch_done)
+    on_shot = (lambda shot: releaser.add_shot(1, shot)) if on_batch and STREAM_LLM_SHOTS else None
 
     # Try to use agent prompts
     try:
@@ -564,9 +830,7 @@ CRITICAL SHOT REQUIREMENTS:
         image_prompt = load_agent_prompt("image", user_input, image_agent)
 
         # Get the response
-        provider = get_provider()
-        response = provider.ask(image_prompt, response_format="application/json")
-        shots = extract_and_repair_json(response)
+        shots = ask_for_shots(get_provider(), image_prompt, on_shot)
 
         # Ensure shots is a list
         if isinstance(shots, dict):
@@ -594,6 +858,7 @@ CRITICAL SHOT REQUIREMENTS:
                 print(f"[INFO] Final shot count: {len(shots)} shots = ~{len(shots) * DEFAULT_SHOT_LENGTH}s video")
             logger.info(f"Final shot count: {len(shots)} shots, ~{len(shots) * DEFAULT_SHOT_LENGTH}s video")
 
+        releaser.add(1, shots)
         return shots
 
     except (FileNotFoundError, ValueError):
@@ -615,9 +880,7 @@ Return JSON list (each shot MUST include narration from scene):
 SCENES:
 {scene_graph}
 """
-        provider = get_provider()
-        response = provider.ask(prompt, response_format="application/json")
-        shots = extract_and_repair_json(response)
+        shots = ask_for_shots(get_provider(), prompt, on_shot)
 
         # Ensure shots is a list
         if isinstance(shots, dict):
@@ -635,4 +898,5 @@ SCENES:
             print(f"[INFO] Generated {len(shots)} shots, limiting to {max_shots}")
             shots = shots[:max_shots]
 
-        return shots
\ No newline at end of file
+        releaser.add(1, shots)
+        return shots
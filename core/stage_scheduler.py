@@ -0,0 +1,91 @@
+"""
+Stage Scheduler - Keep Flux (image) and Wan (video) prompts from interleaving on one GPU
+
+Image workflows (Flux, under workflow/image/) and the Wan 2.2 video workflow
+load different models. On a ComfyUI node that serves both, every switch from an
+image prompt to a video prompt (or back) unloads one model family and loads the
+other. Two mechanisms avoid that:
+
+- Batching (GPU_STAGE_SCHEDULING="batched"): work that needs both stages is run
+  as all pending image prompts for a window of GPU_STAGE_BATCH_WINDOW shots,
+  then all of their video prompts, instead of image/video per shot.
+- Dedicated nodes (COMFY_NODE_ROLES): in a backend pool, nodes can be reserved
+  for one model family; ComfyBackendPool.acquire(stage=...) then routes each
+  prompt to a node of its family, and batching becomes unnecessary.
+
+The pool counts actual stage switches per node (ComfyBackendPool.stats()).
+"""
+from typing import Dict, List, Sequence
+
+import config
+from core.logger_config import get_logger
+from core.template_cache import nodes_by_class
+
+
+# Get logger for stage scheduling
+logger = get_logger(__name__)
+
+IMAGE = "image"
+VIDEO = "video"
+
+VIDEO_NODE_CLASSES = ("WanImageToVideo", "SaveVideo", "CreateVideo", "VHS_VideoCombine")
+
+
+def workflow_stage(wf: dict) -> str:
+    """Model family a compiled workflow belongs to: "video" or "image"."""
+    return VIDEO if nodes_by_class(wf, *VIDEO_NODE_CLASSES) else IMAGE
+
+
+def parse_node_roles(spec: str) -> Dict[str, str]:
+    """
+    Parse COMFY_NODE_ROLES ("url=image,url=video") into {url: role}.
+
+    Nodes not listed serve both stages ("any").
+    """
+    roles = {}
+    for entry in (spec or "").split(","):
+        if "=" not in entry:
+            continue
+        url, role = entry.rsplit("=", 1)
+        role = role.strip().lower()
+        if role in (IMAGE, VIDEO, "any"):
+            roles[url.strip().rstrip("/")] = role
+        else:
+            logger.warning(f"Ignoring unknown ComfyUI node role '{role}' for {url.strip()}")
+    return roles
+
+
+def stage_batches(items: Sequence, window: int = None) -> List[list]:
+    """Split items into windows of GPU_STAGE_BATCH_WINDOW (0 = one window with everything)."""
+    if window is None:
+        window = getattr(config, 'GPU_STAGE_BATCH_WINDOW', 0)
+    items = list(items)
+    if not window or window <= 0:
+        return [items] if items else []
+    return [items[i:i + window] for i in range(0, len(items), window)]
+
+
+def estimate_model_swaps(num_shots: int, window: int = None) -> Dict[str, int]:
+    """
+    Estimated image<->video model swaps on one shared node.
+
+    Returns:
+        dict with 'interleaved' (image, video per shot), 'batched' (per window)
+        and 'avoided'
+    """
+    if num_shots <= 0:
+        return {'interleaved': 0, 'batched': 0, 'avoided': 0}
+    interleaved = 2 * num_shots - 1
+    batched = 2 * len(stage_batches(range(num_shots), window)) - 1
+    return {'interleaved': interleaved, 'batched': batched, 'avoided': interleaved - batched}
+
+
+def use_stage_batching(pool=None) -> bool:
+    """True when image and video work should be batched by stage."""
+    if getattr(config, 'GPU_STAGE_SCHEDULING', 'batched') != 'batched':
+        return False
+    if pool is None:
+        from core.comfy_pool import get_backend_pool
+        pool = get_backend_pool()
+    # Nodes dedicated to each family never swap, so per-shot order costs nothing
+    return not pool.has_dedicated_stages()
@@ -0,0 +1,188 @@
+"""
+Template Cache - Converted API-format workflow templates, reused across calls
+
+load_workflow() and the image generator used to re-read the UI-format workflow
+JSON and convert it to API format on every call; the web UI did this for every
+single shot and every image. Converted graphs are now cached by
+
+    (absolute path, mtime, size, variant)
+
+where the variant carries everything else the conversion depends on (target
+width/height, frame length). Entries live in memory for the process and are
+persisted under TEMPLATE_CACHE_DIR so the CLI, batch_videos.py and the web
+backend all skip the conversion after the first run.
+
+Each cached graph is a WorkflowTemplate: a plain dict of API-format nodes that
+also carries `class_index` (class_type -> node ids), so callers can find nodes
+without scanning the whole graph (see nodes_by_class()).
+
+WorkflowLoader.save_workflow() calls invalidate() for the file it writes.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+from core.logger_config import get_logger
+
+
+# Get logger for the template cache
+logger = get_logger(__name__)
+
+# Bump when a converter changes so persisted entries from older code are ignored
+CACHE_FORMAT_VERSION = 1
+
+# Global cache instance
+_template_cache = None
+_template_cache_lock = threading.Lock()
+
+
+class WorkflowTemplate(dict):
+    """API-format workflow graph with a node-id index by class_type."""
+
+    def __init__(self, graph: dict = None, class_index: Dict[str, List[str]] = None):
+        super().__init__(graph or {})
+        self.class_index = class_index if class_index is not None else build_class_index(self)
+
+
+def build_class_index(graph: dict) -> Dict[str, List[str]]:
+    """Map each class_type to the ids of the nodes using it, in graph order."""
+    index: Dict[str, List[str]] = {}
+    for node_id, node in graph.items():
+        if isinstance(node, dict):
+            index.setdefault(node.get("class_type", ""), []).append(node_id)
+    return index
+
+
+def nodes_by_class(graph: dict, *class_types: str) -> List[str]:
+    """
+    Ids of nodes with any of the given class_types.
+
+    Uses the precomputed index of a WorkflowTemplate, and scans plain dicts.
+    """
+    index = getattr(graph, 'class_index', None)
+    if index is None:
+        return [node_id for node_id, node in graph.items()
+                if isinstance(node, dict) and node.get("class_type") in class_types]
+    return [node_id for class_type in class_types for node_id in index.get(class_type, [])]
+
+
+class TemplateCache:
+    """
+    In-memory + on-disk cache of converted workflow templates.
+
+    Usage:
+        cache = get_template_cache()
+        template = cache.get(path, ("video", width, height, frames), build_fn)
+        wf = copy.deepcopy(template)  # callers never mutate the cached graph
+    """
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir if cache_dir is not None else \
+            getattr(config, 'TEMPLATE_CACHE_DIR', None)
+        self._entries: Dict[Tuple, WorkflowTemplate] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.builds = 0
+
+    @staticmethod
+    def _file_key(path: str, variant: tuple) -> Tuple:
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, tuple(variant))
+
+    def _disk_path(self, key: Tuple) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha1(json.dumps([CACHE_FORMAT_VERSION, *key], default=str).encode("utf-8")).hexdigest()
+        name = os.path.splitext(os.path.basename(key[0]))[0]
+        return os.path.join(self.cache_dir, f"{name}-{digest[:16]}.json")
+
+    def _load_from_disk(self, key: Tuple) -> Optional[WorkflowTemplate]:
+        disk_path = self._disk_path(key)
+        if not disk_path or not os.path.exists(disk_path):
+            return None
+        try:
+            with open(disk_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return WorkflowTemplate(data['graph'], data.get('class_index'))
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable template cache file {disk_path}: {e}")
+            return None
+
+    def _save_to_disk(self, key: Tuple, template: WorkflowTemplate):
+        disk_path = self._disk_path(key)
+        if not disk_path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = disk_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'source': key[0], 'graph': dict(template), 'class_index': template.class_index}, f)
+            os.replace(tmp_path, disk_path)
+        except Exception as e:
+            logger.warning(f"Could not persist template cache entry {disk_path}: {e}")
+
+    def get(self, path: str, variant: tuple, build_fn: Callable[[], dict]) -> WorkflowTemplate:
+        """
+        Return the converted template for path + variant, building it on a miss.
+
+        The returned object is shared; deepcopy it before modifying.
+        """
+        key = self._file_key(path, variant)
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self.hits += 1
+                return template
+
+        template = self._load_from_disk(key)
+        if template is not None:
+            self.disk_hits += 1
+        else:
+            template = WorkflowTemplate(build_fn())
+            self.builds += 1
+            self._save_to_disk(key, template)
+            logger.debug(f"Converted workflow template {os.path.basename(path)} {variant}")
+
+        with self._lock:
+            # Drop entries for older versions of this file
+            for old_key in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                del self._entries[old_key]
+            self._entries[key] = template
+        return template
+
+    def invalidate(self, path: str):
+        """Forget every cached variant of a workflow file (memory and disk)."""
+        abs_path = os.path.abspath(path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == abs_path]:
+                del self._entries[key]
+
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            prefix = os.path.splitext(os.path.basename(abs_path))[0] + "-"
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix) and name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+        logger.info(f"Template cache invalidated for {abs_path}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits,
+                    'disk_hits': self.disk_hits, 'builds': self.builds}
+
+
+def get_template_cache() -> TemplateCache:
+    """Get the global template cache instance."""
+    global _template_cache
+    with _template_cache_lock:
+        if _template_cache is None:
+            _template_cache = TemplateCache()
+        return _template_cache
+
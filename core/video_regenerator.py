@@ -4,15 +4,15 @@ Allows changing video length or re-rendering with different settings
 """
 import sys
 import os
-import shutil
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.session_manager import SessionManager
-from core.prompt_compiler import load_workflow, compile_workflow
-from core.comfy_client import submit, wait_for_prompt_completion, get_output_file_path
-from core.render_monitor import wait_until_idle
+from core.media_inventory import get_media_inventory
+from core.prompt_compiler import load_workflow, compile_workflow, workflow_hash
+from core.comfy_client import submit, wait_for_prompt_completion, fetch_output
+from core.render_cache import get_render_cache
 import config
 
 
@@ -34,20 +34,10 @@ def generate_unique_video_filename(videos_dir, shot_idx):
     Returns:
         tuple: (video_filename, video_save_path)
     """
-    # Suffix letters to try: empty (no suffix), 'a', 'b', 'c', ..., 'z'
-    suffixes = [''] + [chr(ord('a') + i) for i in range(26)]
-
-    for suffix in suffixes:
-        if suffix:
-            video_filename = f"shot_{shot_idx:03d}{suffix}.mp4"
-        else:
-            video_filename = f"shot_{shot_idx:03d}.mp4"
-
-        video_save_path = os.path.join(videos_dir, video_filename)
-
-        # Check if file exists
-        if not os.path.exists(video_save_path):
-            return video_filename, video_save_path
+    # Existing names come from one scan of the folder (core/media_inventory.py)
+    video_filename = get_media_inventory(videos_dir).next_video_filename(shot_idx)
+    if video_filename:
+        return video_filename, os.path.join(videos_dir, video_filename)
 
     # Fallback (should never reach here with 26+ suffixes)
     # Use timestamp as last resort
@@ -88,9 +78,7 @@ def regenerate_videos(session_id, new_shot_length=None, force_regenerate_all=Fal
         print(f"[ERROR] Shots file not found: {shots_path}")
         return False
 
-    import json
-    with open(shots_path, 'r', encoding='utf-8') as f:
-        shots = json.load(f)
+    shots = session_mgr.get_shots(session_id)
 
     # Get current video config
     video_config = session_meta.get('video_config', {})
@@ -196,6 +184,22 @@ def regenerate_videos(session_id, new_shot_length=None, force_regenerate_all=Fal
 
         try:
             wf = compile_workflow(template, shot, video_length_seconds=shot_length)
+
+            # Identical workflow rendered before: reuse the cached video instead of the GPU
+            cache = get_render_cache()
+            cache_key = workflow_hash(wf) if cache else None
+            if cache:
+                videos_dir = session_mgr.get_videos_dir(session_id)
+                os.makedirs(videos_dir, exist_ok=True)
+                video_filename, video_save_path = generate_unique_video_filename(videos_dir, shot_idx)
+                method = cache.materialize(cache_key, video_save_path)
+                if method:
+                    print(f"[CACHE] Shot {shot_idx}: Identical workflow rendered before, "
+                          f"reusing {video_filename} ({method}, key {cache_key[:12]})")
+                    session_mgr.mark_video_rendered(session_id, shot_idx, video_save_path)
+                    successful_renders += 1
+                    continue
+
             result = submit(wf)
 
             prompt_id = result.get('prompt_id')
@@ -241,17 +245,17 @@ def regenerate_videos(session_id, new_shot_length=None, force_regenerate_all=Fal
                 video_info = video_outputs[0]
                 video_filename, video_save_path = generate_unique_video_filename(videos_dir, shot_idx)
 
-                source_path = get_output_file_path(video_info)
-                if os.path.exists(source_path):
-                    shutil.copy2(source_path, video_save_path)
-                    file_size = os.path.getsize(video_save_path)
-                    print(f"[COPY] Shot {shot_idx}: {video_filename} -> session/videos/")
-                    print(f"       Size: {file_size:,} bytes")
+                fetch = fetch_output(video_info, video_save_path)
+                if fetch['success']:
+                    print(f"[FETCH] Shot {shot_idx}: {video_filename} -> session/videos/")
+                    print(f"       Size: {fetch['size']:,} bytes (sha256 {fetch['sha256'][:12]})")
 
                     # Mark as rendered with video path
                     session_mgr.mark_video_rendered(session_id, shot_idx, video_save_path)
+                    if cache:
+                        cache.put(cache_key, video_save_path)
                 else:
-                    print(f"[WARN] Source video not found: {source_path}")
+                    print(f"[WARN] Could not fetch video {video_info['filename']}: {fetch['error']}")
                     # Mark as rendered anyway
                     session_mgr.mark_video_rendered(session_id, shot_idx)
 
@@ -81,6 +81,10 @@ class WorkflowLoader:
         with open(workflow_file, 'w', encoding='utf-8') as f:
             f.write(content)
 
+        # Converted API-format copies of the old content must not be reused
+        from core.template_cache import get_template_cache
+        get_template_cache().invalidate(str(workflow_file))
+
     def get_all_workflows(self) -> List[Dict[str, str]]:
         """Get all workflows grouped by category."""
         all_workflows = []
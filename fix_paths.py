@@ -1,4 +1,3 @@
-import json
 import os
 from core.session_manager import SessionManager
 
@@ -7,9 +6,7 @@ session_mgr = SessionManager()
 images_dir = session_mgr.get_images_dir(session_id)
 
 # Load shots
-shots_path = os.path.join(session_mgr.get_session_dir(session_id), 'shots.json')
-with open(shots_path, 'r', encoding='utf-8') as f:
-    shots = json.load(f)
+shots = session_mgr.get_shots(session_id)
 
 # Update shots with image paths
 shots_with_paths = []
@@ -29,7 +26,6 @@ for idx, shot in enumerate(shots):
     shots_with_paths.append(shot_with_path)
 
 # Save updated shots
-with open(shots_path, 'w', encoding='utf-8') as f:
-    json.dump(shots_with_paths, f, indent=2, ensure_ascii=False)
+session_mgr.update_shots(session_id, shots_with_paths)
 
 print('\n[SUCCESS] Updated shots.json with image paths')
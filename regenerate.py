@@ -10,6 +10,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.video_regenerator import regenerate_videos, interactive_regenerate
+from core.media_inventory import get_media_inventory
 
 
 def regenerate_images(session_id):
@@ -34,9 +35,7 @@ def regenerate_images(session_id):
         print(f"[ERROR] Shots file not found: {shots_path}")
         return False
 
-    import json
-    with open(shots_path, 'r', encoding='utf-8') as f:
-        shots = json.load(f)
+    shots = session_mgr.get_shots(session_id)
 
     # Get image config
     image_config = session.get('image_config', {})
@@ -49,7 +48,8 @@ def regenerate_images(session_id):
     failed_images = []
     images_dir = session_mgr.get_images_dir(session_id)
 
-    # Check for failed images
+    # Check for failed images (one scan of the images folder)
+    inventory = get_media_inventory(images_dir)
     for idx, shot_meta in enumerate(session['shots']):
         # Use the shot's stored index field for consistency
         shot_idx = shot_meta.get('index', idx + 1)
@@ -57,7 +57,7 @@ def regenerate_images(session_id):
         expected_path = os.path.join(images_dir, expected_filename)
 
         # Check if actual file exists
-        file_exists = os.path.exists(expected_path)
+        file_exists = inventory.has(expected_filename)
 
         if not file_exists:
             # Image file doesn't exist - needs regeneration
@@ -79,16 +79,14 @@ def regenerate_images(session_id):
             shot_idx = shot.get('index', idx + 1)
             expected_filename = f"shot_{shot_idx:03d}.png"
             expected_path = os.path.join(images_dir, expected_filename)
-            if os.path.exists(expected_path):
+            if inventory.has(expected_filename):
                 # Normalize path to use forward slashes (JSON-safe)
                 normalized_path = expected_path.replace('\\', '/')
                 shot['image_path'] = normalized_path
             shots_with_paths.append(shot)
 
         # Save the updated shots array with proper paths
-        shots_path = os.path.join(session_mgr.get_session_dir(session_id), "shots.json")
-        with open(shots_path, 'w', encoding='utf-8') as f:
-            json.dump(shots_with_paths, f, indent=2, ensure_ascii=False)
+        session_mgr.update_shots(session_id, shots_with_paths)
         return True
 
     print(f"[INFO] Found {len(failed_images)} failed image(s)")
@@ -121,6 +119,7 @@ def regenerate_images(session_id):
             image_path = generate_image_gemini(image_prompt, output_path)
 
         if image_path:
+            inventory.add(os.path.basename(image_path))
             # Update local shots array
             shot['image_path'] = image_path
 
@@ -134,27 +133,24 @@ def regenerate_images(session_id):
     print(f"\n[SUCCESS] Regenerated {regenerated_count}/{len(failed_images)} images")
 
     # Final sync: create shots array with image_path for all shots
+    inventory = get_media_inventory(images_dir)
     shots_with_paths = []
     for idx, shot in enumerate(shots):
         shot_idx = shot.get('index', idx + 1)
         expected_filename = f"shot_{shot_idx:03d}.png"
         expected_path = os.path.join(images_dir, expected_filename)
 
-        # Copy the shot data
-        shot_with_path = shot.copy()
-
-        # Add image_path if file exists
-        if os.path.exists(expected_path):
+        # Add image_path if file exists (the dicts from get_shots are updated in
+        # place so marks recorded meanwhile are merged on save)
+        if inventory.has(expected_filename):
             # Normalize path to use forward slashes (JSON-safe)
             normalized_path = expected_path.replace('\\', '/')
-            shot_with_path['image_path'] = normalized_path
+            shot['image_path'] = normalized_path
 
-        shots_with_paths.append(shot_with_path)
+        shots_with_paths.append(shot)
 
     # Save updated shots to file
-    shots_path = os.path.join(session_mgr.get_session_dir(session_id), "shots.json")
-    with open(shots_path, 'w', encoding='utf-8') as f:
-        json.dump(shots_with_paths, f, indent=2, ensure_ascii=False)
+    session_mgr.update_shots(session_id, shots_with_paths)
 
     print(f"[INFO] Updated shots.json and session metadata")
     print(f"[INFO] Shots now have image_path field for video regeneration")
@@ -227,6 +223,11 @@ def list_sessions():
         print("\n[INFO] No sessions found.")
         return
 
+    # Shots with an image but no video, per session (one indexed query with the sqlite backend)
+    pending_videos = {}
+    for shot in session_mgr.find_shots(image_generated=True, video_rendered=False):
+        pending_videos[shot['session_id']] = pending_videos.get(shot['session_id'], 0) + 1
+
     print("\n" + "="*80)
     print("AI FILM STUDIO - SESSIONS")
     print("="*80)
@@ -242,6 +243,8 @@ def list_sessions():
         print(f"  Shot length: {shot_length}s")
         print(f"  Progress: {session['stats']['images_generated']}/{session['stats']['total_shots']} images, "
               f"{session['stats']['videos_rendered']} videos")
+        if pending_videos.get(session['session_id']):
+            print(f"  Waiting for video: {pending_videos[session['session_id']]} shot(s)")
 
     print("\n" + "="*80)
     print("\nTo regenerate, use:")
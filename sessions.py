@@ -53,6 +53,21 @@ def view_session(session_id):
         print(f"[ERROR] Could not load session: {e}")
 
 
+def list_pending(session_id=None):
+    """List shots that have images but no rendered video"""
+    session_mgr = SessionManager()
+    shots = session_mgr.find_shots(session_id, image_generated=True, video_rendered=False)
+
+    if not shots:
+        print("\n[INFO] No shots waiting for a video.")
+        return
+
+    print(f"\n{len(shots)} shot(s) with images but no video:")
+    for shot in shots:
+        print(f"  {shot['session_id']} | Shot {shot.get('index', '?')}: {shot.get('image_prompt', '')[:50]}...")
+    print("\nRender them with: python regenerate.py --session <session_id>")
+
+
 def show_help():
     """Show help"""
     print("""
@@ -61,6 +76,7 @@ AI Film Studio - Session Viewer
 Commands:
   python sessions.py list              List all sessions
   python sessions.py view <session_id> View detailed session info
+  python sessions.py pending [id]      Shots with images but no video
   python sessions.py help              Show this help
 
 Examples:
@@ -83,6 +99,8 @@ if __name__ == "__main__":
                 print("Usage: python sessions.py view <session_id>")
             else:
                 view_session(sys.argv[2])
+        elif command == "pending":
+            list_pending(sys.argv[2] if len(sys.argv) > 2 else None)
         elif command == "help":
             show_help()
         else:
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: cost per compiled shot for compile_workflow()
+
+Compares the copy-on-write compile (shared template + per-shot overlay) with the
+previous approach of deep-copying the whole template for every shot, and the
+cost of serializing the result into a /prompt payload.
+
+Usage:
+    python tests/benchmarks/bench_compile_workflow.py [workflow.json] [--shots N]
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import config
+from core.prompt_compiler import load_workflow, compile_workflow
+
+
+def _shots(count):
+    cameras = list(config.CAMERA_LORA_MAPPING.keys()) or ["default"]
+    return [{
+        "index": i + 1,
+        "motion_prompt": f"slow push in on subject {i}",
+        "image_prompt": f"subject {i} standing in the rain",
+        "camera": cameras[i % len(cameras)],
+        "image_path": f"/tmp/shots/shot_{i + 1:03d}.png",
+    } for i in range(count)]
+
+
+def _time_per_shot(fn, shots):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for shot in shots:
+            fn(shot)
+        elapsed = time.perf_counter() - start
+    return elapsed / len(shots) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compile_workflow per shot")
+    parser.add_argument("workflow", nargs="?",
+                        default=os.path.join(config.PROJECT_ROOT, "workflow", "video", "wan22_workflow_old.json"))
+    parser.add_argument("--shots", type=int, default=500)
+    parser.add_argument("--length", type=float, default=config.DEFAULT_SHOT_LENGTH)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        template = load_workflow(args.workflow, video_length_seconds=args.length)
+    shots = _shots(args.shots)
+    size = len(json.dumps(template))
+
+    overlay_us = _time_per_shot(lambda s: compile_workflow(template, s, args.length), shots)
+    deepcopy_us = _time_per_shot(lambda s: compile_workflow(copy.deepcopy(template), s, args.length), shots)
+    payload_us = _time_per_shot(
+        lambda s: json.dumps({"prompt": compile_workflow(template, s, args.length)}), shots)
+
+    print(f"Workflow: {os.path.basename(args.workflow)} ({len(template)} nodes, {size:,} bytes as API JSON)")
+    print(f"Shots:    {args.shots}")
+    print(f"  compile (overlay)              {overlay_us:8.1f} us/shot")
+    print(f"  compile (deepcopy + overlay)   {deepcopy_us:8.1f} us/shot")
+    print(f"  compile + /prompt payload      {payload_us:8.1f} us/shot")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,47 @@
 """
 pytest configuration and shared fixtures
 """
+import atexit
+import shutil
 import sys
 import os
+import tempfile
 from pathlib import Path
 
+import pytest
+
+# Sessions, caches and logs written by tests go to a scratch output directory
+# (set before config is imported; logs are opened at import time)
+_test_output_dir = tempfile.mkdtemp(prefix="video_factory_tests_")
+os.environ["OUTPUT_DIR"] = _test_output_dir
+atexit.register(shutil.rmtree, _test_output_dir, ignore_errors=True)
+
 # Add project root to Python path for imports
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 # Shared fixtures for tests can be added here
 
+@pytest.fixture(autouse=True)
+def isolated_template_cache(tmp_path, monkeypatch):
+    """Keep converted workflow templates out of the real output/template_cache"""
+    import config
+    import core.template_cache as template_cache
+
+    monkeypatch.setattr(config, 'TEMPLATE_CACHE_DIR', str(tmp_path / "template_cache"))
+    monkeypatch.setattr(template_cache, '_template_cache', None)
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_cache(tmp_path, monkeypatch):
+    """Give every test an empty LLM response cache"""
+    import config
+    import core.llm_cache as llm_cache
+
+    monkeypatch.setattr(config, 'LLM_CACHE_PATH', str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(llm_cache, '_llm_cache', None)
+
+
 def temp_output_dir(tmp_path):
     """Fixture providing temporary output directory for tests"""
     return tmp_path
@@ -0,0 +1,36 @@
+"""
+Unit tests for the content-addressed blob store
+"""
+import os
+
+from core.blob_store import BlobStore
+
+
+def _session(root, name, videos):
+    videos_dir = root / name / "videos"
+    videos_dir.mkdir(parents=True)
+    for filename, body in videos.items():
+        (videos_dir / filename).write_bytes(body)
+    return str(root / name)
+
+
+def test_identical_media_is_stored_once_and_gc_reclaims_orphans(tmp_path):
+    store = BlobStore(root=str(tmp_path / "blobs"), dirs=["videos"])
+    first = _session(tmp_path, "session_a", {"shot_001.mp4": b"same" * 100, "shot_002.mp4": b"a"})
+    second = _session(tmp_path, "session_b", {"shot_001.mp4": b"same" * 100})
+
+    assert store.ingest_session(first)['saved'] == 0
+    result = store.ingest_session(second)
+    assert result == {'files': 1, 'linked': 1, 'saved': 400}
+    assert os.path.samefile(os.path.join(first, "videos", "shot_001.mp4"),
+                            os.path.join(second, "videos", "shot_001.mp4"))
+
+    # Re-ingesting an unchanged session does not rehash or relink
+    assert store.ingest_session(second)['linked'] == 0
+
+    report = store.report()
+    assert report['blobs'] == 2 and report['saved_bytes'] == 400
+
+    os.remove(os.path.join(first, "videos", "shot_002.mp4"))
+    assert store.gc() == {'removed': 1, 'bytes': 1}
+    assert len(store.blobs()) == 1
@@ -0,0 +1,59 @@
+"""
+Unit tests for core.comfy_events
+"""
+from core.comfy_events import ComfyEventBus
+
+
+def _bus():
+    # Never started, so no network access; dispatch() is driven directly
+    bus = ComfyEventBus(comfy_url="http://127.0.0.1:1", client_id="test")
+    bus.start = lambda: None
+    return bus
+
+
+def test_dispatch_routes_by_prompt_id():
+    bus = _bus()
+    progress_a = []
+    sub_a = bus.subscribe("a", progress_callback=lambda v, m: progress_a.append((v, m)))
+    sub_b = bus.subscribe("b")
+
+    bus.dispatch({"type": "executing", "data": {"prompt_id": "a", "node": "3"}})
+    bus.dispatch({"type": "progress", "data": {"prompt_id": "a", "value": 4, "max": 20}})
+    # Older ComfyUI progress messages carry no prompt_id
+    bus.dispatch({"type": "progress", "data": {"value": 5, "max": 20}})
+    bus.dispatch({"type": "executing", "data": {"prompt_id": "a", "node": None}})
+
+    assert sub_a.done and sub_a.status == "success"
+    assert sub_a.started_at is not None
+    assert (4, 20) in progress_a and (5, 20) in progress_a
+    assert not sub_b.done
+
+
+def test_dispatch_execution_error():
+    bus = _bus()
+    sub = bus.subscribe("c")
+    bus.dispatch({"type": "execution_error", "data": {"prompt_id": "c", "node_type": "KSampler",
+                                                      "exception_message": "CUDA out of memory"}})
+    assert sub.wait(0.1)
+    assert sub.status == "error"
+    assert "CUDA out of memory" in sub.error
+
+
+def test_unsubscribe_removes_subscription():
+    bus = _bus()
+    sub = bus.subscribe("d")
+    bus.unsubscribe(sub)
+    bus.dispatch({"type": "execution_success", "data": {"prompt_id": "d"}})
+    assert not sub.done
+
+
+def test_status_messages_track_idle_queue():
+    """Queue depth from status broadcasts should drive wait_until_idle"""
+    bus = _bus()
+
+    bus.dispatch({"type": "status", "data": {"status": {"exec_info": {"queue_remaining": 2}}}})
+    assert bus.queue_remaining == 2
+    assert bus.wait_until_idle(timeout=0.01) is False
+
+    bus.dispatch({"type": "status", "data": {"status": {"exec_info": {"queue_remaining": 0}}}})
+    assert bus.wait_until_idle(timeout=0.01) is True
@@ -0,0 +1,84 @@
+"""
+Unit tests for comfy_client.fetch_output
+"""
+import hashlib
+
+import core.comfy_client as comfy_client
+
+
+class _FakeResponse:
+    def __init__(self, body, content_length=None):
+        self.body = body
+        self.headers = {'Content-Length': str(content_length if content_length is not None else len(body))}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class _FakeSession:
+    def __init__(self, get):
+        self.get = get
+
+
+def test_fetch_output_streams_with_checksum(tmp_path, monkeypatch):
+    body = b"video-bytes" * 1000
+    requested = {}
+
+    def fake_get(url, params=None, stream=False, timeout=None):
+        requested.update(url=url, params=params, stream=stream)
+        return _FakeResponse(body)
+
+    monkeypatch.setattr(comfy_client, "get_session", lambda name="default": _FakeSession(fake_get))
+    dest = tmp_path / "videos" / "shot_001.mp4"
+
+    result = comfy_client.fetch_output(
+        {'filename': 'abc_shot_001_00001_.mp4', 'subfolder': 'video', 'backend': 'http://gpu2:8188'},
+        str(dest), chunk_size=4096
+    )
+
+    assert result['success']
+    assert requested['url'] == "http://gpu2:8188/view"
+    assert requested['params']['subfolder'] == "video"
+    assert requested['stream'] is True
+    assert dest.read_bytes() == body
+    assert result['sha256'] == hashlib.sha256(body).hexdigest()
+    assert not (tmp_path / "videos" / "shot_001.mp4.part").exists()
+
+
+def test_fetch_output_rejects_truncated_download(tmp_path, monkeypatch):
+    monkeypatch.setattr(comfy_client, "get_session", lambda name="default": _FakeSession(
+        lambda *args, **kwargs: _FakeResponse(b"partial", content_length=100)))
+    monkeypatch.setattr(comfy_client.time, "sleep", lambda s: None)
+    dest = tmp_path / "shot_001.mp4"
+
+    result = comfy_client.fetch_output({'filename': 'x.mp4', 'backend': 'http://gpu1:8188'}, str(dest), retries=2)
+
+    assert not result['success']
+    assert "Truncated" in result['error']
+    assert not dest.exists()
+
+
+def test_fetch_output_rejects_checksum_mismatch(tmp_path, monkeypatch):
+    body = b"video-bytes" * 100
+    monkeypatch.setattr(comfy_client, "get_session", lambda name="default": _FakeSession(
+        lambda *args, **kwargs: _FakeResponse(body)))
+    monkeypatch.setattr(comfy_client.time, "sleep", lambda s: None)
+    dest = tmp_path / "shot_001.mp4"
+    info = {'filename': 'x.mp4', 'backend': 'http://gpu1:8188'}
+
+    result = comfy_client.fetch_output(info, str(dest), retries=2, expected_sha256="0" * 64)
+    assert not result['success'] and "Checksum mismatch" in result['error']
+    assert not dest.exists() and not (tmp_path / "shot_001.mp4.part").exists()
+
+    result = comfy_client.fetch_output(info, str(dest), expected_sha256=hashlib.sha256(body).hexdigest())
+    assert result['success'] and dest.read_bytes() == body
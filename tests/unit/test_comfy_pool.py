@@ -0,0 +1,60 @@
+"""
+Unit tests for core.comfy_pool
+"""
+import config
+from core.comfy_pool import ComfyBackend, ComfyBackendPool
+
+
+def _pool(urls):
+    # refresh_interval is irrelevant: refresh() is stubbed so no network is touched
+    pool = ComfyBackendPool(urls=urls, refresh_interval=60)
+    pool.refresh = lambda force=False: None
+    return pool
+
+
+def test_acquire_picks_least_loaded_node():
+    pool = _pool(["http://gpu1:8188", "http://gpu2:8188", "http://gpu3:8188"])
+    pool.backends[0].queue_pending = 3
+    pool.backends[1].queue_running = 1
+    pool.backends[2].queue_running = 1
+    pool.backends[2].queue_pending = 1
+
+    assert pool.acquire().url == "http://gpu2:8188"
+
+
+def test_submissions_count_against_load_and_pin_prompts():
+    pool = _pool(["http://gpu1:8188", "http://gpu2:8188"])
+
+    first = pool.acquire()
+    pool.record_submit(first, "p1")
+    second = pool.acquire()
+    pool.record_submit(second, "p2")
+
+    assert {first.url, second.url} == {"http://gpu1:8188", "http://gpu2:8188"}
+    assert pool.url_for("p1") == first.url
+    assert pool.url_for("p2") == second.url
+    assert pool.url_for("unknown") == "http://gpu1:8188"
+
+
+def test_unhealthy_nodes_are_skipped():
+    pool = _pool(["http://gpu1:8188", "http://gpu2:8188"])
+    pool.mark_unhealthy(pool.backends[0], "connection refused")
+    pool.backends[1].queue_pending = 5
+
+    assert pool.acquire().url == "http://gpu2:8188"
+    assert pool.acquire(exclude=["http://gpu2:8188"]).url == "http://gpu1:8188"
+
+
+def test_locality_follows_hostname_not_comfy_url(monkeypatch):
+    # A single COMFY_URL on another box is remote, so its inputs get uploaded
+    monkeypatch.setattr(config, "COMFY_URL", "http://gpu-box.example.invalid:8188")
+    monkeypatch.setattr(config, "COMFY_LOCAL_URLS", [])
+    assert not ComfyBackend(url="http://gpu-box.example.invalid:8188").is_local
+
+    assert ComfyBackend(url="http://127.0.0.1:8188").is_local
+    assert ComfyBackend(url="http://localhost:8188").is_local
+    assert ComfyBackend(url="http://[::1]:8188").is_local
+
+    # Nodes on shared storage can be declared local explicitly
+    monkeypatch.setattr(config, "COMFY_LOCAL_URLS", ["http://gpu-box.example.invalid:8188"])
+    assert ComfyBackend(url="http://gpu-box.example.invalid:8188").is_local
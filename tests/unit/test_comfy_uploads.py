@@ -0,0 +1,58 @@
+"""
+Unit tests for core.comfy_uploads
+"""
+import core.comfy_uploads as comfy_uploads
+from core.comfy_pool import ComfyBackend
+from core.comfy_uploads import InputUploader
+
+
+class _FakeUploadResponse:
+    def __init__(self, name):
+        self.name = name
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'name': self.name, 'subfolder': '', 'type': 'input'}
+
+
+def test_images_upload_once_per_backend_and_hash(tmp_path, monkeypatch):
+    posts = []
+
+    def fake_post(url, files=None, data=None, timeout=None):
+        posts.append(url)
+        return _FakeUploadResponse(files['image'][0])
+
+    monkeypatch.setattr(comfy_uploads, "get_session", lambda name="default": type("S", (), {"post": staticmethod(fake_post)})())
+    image = tmp_path / "shot_001_001.png"
+    image.write_bytes(b"png-bytes")
+    copy = tmp_path / "shot_001_002.png"
+    copy.write_bytes(b"png-bytes")
+
+    uploader = InputUploader(registry_path=str(tmp_path / "registry.json"), downscale=False)
+    first = uploader.upload(str(image), "http://gpu2:8188")
+    second = uploader.upload(str(copy), "http://gpu2:8188")
+    uploader.upload(str(image), "http://gpu3:8188")
+
+    assert first == second and first.startswith("vf_")
+    assert posts == ["http://gpu2:8188/upload/image", "http://gpu3:8188/upload/image"]
+    assert uploader.reused == 1
+
+
+def test_prepare_workflow_rewrites_load_image_for_remote_nodes(tmp_path, monkeypatch):
+    image = tmp_path / "shot_001.png"
+    image.write_bytes(b"png-bytes")
+    workflow = {"97": {"class_type": "LoadImage", "inputs": {"image": str(image)}},
+                "93": {"class_type": "CLIPTextEncode", "inputs": {"text": "pan left"}}}
+
+    monkeypatch.setattr(comfy_uploads.config, "COMFY_UPLOAD_INPUTS", "remote", raising=False)
+    monkeypatch.setattr(comfy_uploads, "get_uploader", lambda: type("U", (), {"upload": lambda self, p, u: "vf_abc.png"})())
+
+    local = comfy_uploads.prepare_workflow_inputs(workflow, ComfyBackend(url="http://127.0.0.1:8188"))
+    remote = comfy_uploads.prepare_workflow_inputs(workflow, ComfyBackend(url="http://gpu2:8188"))
+
+    assert local is workflow
+    assert remote["97"]["inputs"]["image"] == "vf_abc.png"
+    assert workflow["97"]["inputs"]["image"] == str(image)
+    assert remote["93"] is workflow["93"]
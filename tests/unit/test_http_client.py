@@ -0,0 +1,18 @@
+"""
+Unit tests for core.http_client
+"""
+from core.http_client import create_session, get_session
+
+
+def test_sessions_are_shared_per_name():
+    assert get_session() is get_session()
+    assert get_session("probe") is not get_session()
+
+
+def test_session_applies_default_timeout_and_retry_policy():
+    session = create_session(retries=2)
+    adapter = session.get_adapter("http://127.0.0.1:8188")
+
+    assert session.default_timeout is not None
+    assert adapter.max_retries.total == 2
+    assert "POST" not in adapter.max_retries.allowed_methods
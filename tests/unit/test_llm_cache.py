@@ -0,0 +1,142 @@
+"""
+Unit tests for the on-disk LLM response cache
+"""
+import config
+from core import llm_cache
+from core.llm_cache import LLMCache, bypass_llm_cache, cache_key, cached_ask, carry_llm_cache_bypass
+
+
+class FakeProvider:
+    name = "Fake"
+    model = "fake-1"
+    max_tokens = 100
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    @cached_ask
+    def ask(self, prompt, response_format=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def test_identical_requests_are_served_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True, raising=False)
+    monkeypatch.setattr(llm_cache, "_llm_cache", LLMCache(str(tmp_path / "llm.db")))
+    provider = FakeProvider(['not json', '[{"shot": 1}]', '[{"shot": 2}]', "other"])
+
+    # Unparseable JSON is not cached, so the retry reaches the model
+    assert provider.ask("plan", "application/json") == 'not json'
+    assert provider.ask("plan", "application/json") == '[{"shot": 1}]'
+    assert provider.ask("plan", "application/json") == '[{"shot": 1}]'
+    assert provider.calls == 2
+
+    with bypass_llm_cache():
+        assert provider.ask("plan", "application/json") == '[{"shot": 2}]'
+    assert provider.ask("plan", "application/json") == '[{"shot": 2}]'
+    assert provider.ask("plan") == "other"
+    assert provider.calls == 4
+    assert LLMCache(str(tmp_path / "llm.db")).stats()['entries'] == 2
+
+
+def test_lru_eviction_and_ttl(tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / "llm.db"), max_bytes=10 ** 6, ttl_seconds=60)
+    keys = [cache_key("Fake", "m", f"prompt {i}") for i in range(3)]
+    for i, key in enumerate(keys):
+        monkeypatch.setattr(llm_cache.time, "time", lambda i=i: 1000.0 + i)
+        cache.put(key, f"response {i}", "Fake", "m")
+    monkeypatch.setattr(llm_cache.time, "time", lambda: 1010.0)
+    assert cache.get(keys[0]) == "response 0"  # now most recently used
+
+    size = cache.stats()['bytes'] // 3
+    assert cache.prune(max_bytes=2 * size) == 1
+    assert cache.get(keys[1]) is None and cache.get(keys[2]) == "response 2"
+
+    monkeypatch.setattr(llm_cache.time, "time", lambda: 2000.0)
+    assert cache.get(keys[0]) is None
+
+
+def test_streamed_responses_share_the_cache(tmp_path, monkeypatch):
+    from core.llm_engine import LLMProvider
+
+    class StreamingProvider(LLMProvider):
+        name = "Streaming"
+        model = "s-1"
+        requires_api_key = False
+        supports_streaming = True
+
+        @cached_ask
+        def ask(self, prompt, response_format=None):
+            raise AssertionError("served from the cache")
+
+        def _stream(self, prompt, response_format=None):
+            yield '[{"shot": '
+            yield '1}]'
+
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True, raising=False)
+    monkeypatch.setattr(llm_cache, "_llm_cache", LLMCache(str(tmp_path / "llm.db")))
+    provider = StreamingProvider()
+
+    assert list(provider.ask_stream("plan", "application/json")) == ['[{"shot": ', '1}]']
+    assert list(provider.ask_stream("plan", "application/json")) == ['[{"shot": 1}]']
+    assert provider.ask("plan", "application/json") == '[{"shot": 1}]'
+    assert provider.latency_stats()['calls'] == 1
+
+
+def test_cache_outcome_is_logged_per_call(tmp_path, monkeypatch):
+    import logging
+    from core import log_decorators
+    from core.log_decorators import log_api_call, note_cache_result
+
+    messages = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            messages.append(record.getMessage())
+
+    api_logger = logging.getLogger("test_api_calls")
+    api_logger.setLevel(logging.INFO)
+    api_logger.propagate = False
+    api_logger.handlers = [ListHandler()]
+    monkeypatch.setattr(log_decorators, "setup_api_logger", lambda name: api_logger)
+
+    @log_api_call
+    def inner():
+        note_cache_result(hit=False)
+
+    @log_api_call
+    def outer():
+        note_cache_result(hit=True)
+        inner()
+
+    @log_api_call
+    def uncached():
+        return "no cache involved"
+
+    outer()
+    uncached()
+    assert [m.split(":")[0] for m in messages] == ["  Cache miss", "  Cache hit"]
+
+    # Streamed responses report their outcome through the same hook
+    messages.clear()
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True, raising=False)
+    monkeypatch.setattr(llm_cache, "_llm_cache", LLMCache(str(tmp_path / "llm.db")))
+    provider = FakeProvider([])
+    stream = lambda prompt, response_format: iter(["a", "b"])
+    assert list(llm_cache.cached_stream(provider, stream, "plan")) == ["a", "b"]
+    assert list(llm_cache.cached_stream(provider, stream, "plan")) == ["ab"]
+    assert [m.split(":")[0] for m in messages] == ["  Cache miss", "  Cache hit"]
+
+
+def test_bypass_carries_into_worker_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    def bypassed():
+        return llm_cache._bypassed()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert not executor.submit(carry_llm_cache_bypass(bypassed)).result()
+        with bypass_llm_cache():
+            assert not executor.submit(bypassed).result()
+            assert executor.submit(carry_llm_cache_bypass(bypassed)).result()
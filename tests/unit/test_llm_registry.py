@@ -0,0 +1,31 @@
+"""
+Unit tests for the long-lived LLM provider registry
+"""
+from types import SimpleNamespace
+
+from core.llm_engine import OllamaProvider, get_provider, provider_stats
+
+
+def test_providers_are_reused_per_model():
+    settings = SimpleNamespace(LLM_PROVIDER="ollama", OLLAMA_MODEL="registry-a",
+                               OLLAMA_BASE_URL="http://127.0.0.1:1")
+    provider = get_provider(config_module=settings)
+    assert get_provider(config_module=settings) is provider
+
+    settings.OLLAMA_MODEL = "registry-b"
+    assert get_provider(config_module=settings) is not provider
+
+
+def test_client_is_created_once_and_latency_is_recorded(monkeypatch):
+    created = []
+    monkeypatch.setattr(OllamaProvider, "_create_client", lambda self: created.append(1) or object(), raising=False)
+    provider = get_provider(config_module=SimpleNamespace(LLM_PROVIDER="ollama", OLLAMA_MODEL="registry-c",
+                                                          OLLAMA_BASE_URL="http://127.0.0.1:1"))
+
+    assert provider.client() is provider.client()
+    provider.log_response("{}", 1.5)
+    provider.log_error(RuntimeError("boom"), 0.5)
+
+    stats = next(entry for entry in provider_stats() if entry['model'] == "registry-c")
+    assert created == [1] and stats['client_setups'] == 1
+    assert (stats['calls'], stats['errors'], stats['avg_seconds'], stats['first_seconds']) == (2, 1, 1.0, 1.5)
@@ -0,0 +1,39 @@
+"""
+Unit tests for reflink/hardlink/copy materialization
+"""
+import os
+
+from core import materialize
+from core.materialize import materialize_file, materialize_tree
+
+
+def test_falls_back_from_reflink_to_hardlink_to_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(materialize, "reflink", lambda source, dest_path: False)
+    source = tmp_path / "shot_001.mp4"
+    source.write_bytes(b"video")
+
+    assert materialize_file(str(source), str(tmp_path / "linked.mp4")) == "hardlink"
+    assert os.path.samefile(source, tmp_path / "linked.mp4")
+
+    assert materialize_file(str(source), str(tmp_path / "copied.mp4"), link=False) == "copy"
+    assert (tmp_path / "copied.mp4").read_bytes() == b"video"
+    assert not os.path.samefile(source, tmp_path / "copied.mp4")
+
+
+def test_tree_links_only_where_allowed(tmp_path, monkeypatch):
+    monkeypatch.setattr(materialize, "reflink", lambda source, dest_path: False)
+    src = tmp_path / "session_a"
+    (src / "videos").mkdir(parents=True)
+    (src / "images").mkdir()
+    (src / "videos" / "shot_001.mp4").write_bytes(b"v")
+    (src / "images" / "shot_001_001.png").write_bytes(b"i")
+    (src / "events.jsonl").write_text("{}\n")
+
+    dst = tmp_path / "session_b"
+    counts = materialize_tree(str(src), str(dst), link=lambda rel: rel.startswith("videos"),
+                              skip=("events.jsonl",))
+
+    assert counts == {"reflink": 0, "hardlink": 1, "copy": 1}
+    assert os.path.samefile(src / "videos" / "shot_001.mp4", dst / "videos" / "shot_001.mp4")
+    assert (dst / "images" / "shot_001_001.png").read_bytes() == b"i"
+    assert not (dst / "events.jsonl").exists()
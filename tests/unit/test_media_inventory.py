@@ -0,0 +1,42 @@
+"""
+Unit tests for the single-scan media inventory
+"""
+import os
+
+from core import media_inventory
+from core.media_inventory import MediaInventory, get_media_inventory
+
+
+def _touch(directory, *names):
+    for name in names:
+        open(os.path.join(directory, name), 'wb').close()
+
+
+def test_naming_is_indexed_by_shot(tmp_path):
+    _touch(tmp_path, "shot_001_001.png", "shot_001_003.png", "shot_002.png", "shot_001.mp4",
+           "shot_001a.mp4", "shot_001_002.mp4", "notes.txt")
+    inventory = MediaInventory(str(tmp_path))
+
+    assert sorted(inventory.variations(1)) == [1, 3]
+    assert inventory.next_version(1) == 4
+    assert inventory.next_version(2) == 1
+    assert inventory.has("shot_002.png") and inventory.has("notes.txt")
+    assert inventory.files(1, ext="mp4") == ["shot_001.mp4", "shot_001_002.mp4", "shot_001a.mp4"]
+    assert inventory.next_video_filename(1) == "shot_001b.mp4"
+    assert inventory.next_video_filename(3) == "shot_003.mp4"
+
+
+def test_inventory_is_reused_until_the_folder_changes(tmp_path, monkeypatch):
+    _touch(tmp_path, "shot_001.mp4")
+    first = get_media_inventory(str(tmp_path))
+    assert get_media_inventory(str(tmp_path)) is first
+
+    # A stale listing (coarse mtime) still never hands out an existing name
+    monkeypatch.setattr(media_inventory, "_dir_mtime", lambda directory: first.mtime)
+    _touch(tmp_path, "shot_001a.mp4")
+    assert get_media_inventory(str(tmp_path)).next_video_filename(1) == "shot_001b.mp4"
+    monkeypatch.undo()
+
+    _touch(tmp_path, "shot_002.mp4")
+    os.utime(tmp_path, ns=(0, first.mtime + 10 ** 9))
+    assert get_media_inventory(str(tmp_path)).has("shot_002.mp4")
@@ -0,0 +1,35 @@
+"""
+Unit tests for core.prompt_compiler
+"""
+import json
+
+import config
+from core.prompt_compiler import apply_overlay, compile_workflow, load_workflow
+
+
+def test_compile_shares_untouched_nodes_and_never_mutates_template(capsys):
+    template = load_workflow(config.WORKFLOW_PATH, video_length_seconds=5)
+    before = json.dumps(template, sort_keys=True)
+
+    first = compile_workflow(template, {"index": 1, "motion_prompt": "pan left", "camera": "drone",
+                                        "image_path": "/tmp/a.png"}, video_length_seconds=5)
+    second = compile_workflow(template, {"index": 2, "motion_prompt": "zoom in",
+                                         "image_path": "/tmp/b.png"}, video_length_seconds=5)
+
+    assert json.dumps(template, sort_keys=True) == before
+    assert first[config.LOAD_IMAGE_NODE_ID]["inputs"]["image"] == "/tmp/a.png"
+    assert second[config.LOAD_IMAGE_NODE_ID]["inputs"]["image"] == "/tmp/b.png"
+    assert second[config.MOTION_PROMPT_NODE_ID]["inputs"]["text"].startswith("zoom in")
+
+    patched = {config.LOAD_IMAGE_NODE_ID, config.MOTION_PROMPT_NODE_ID}
+    untouched = [node_id for node_id in template if node_id not in patched
+                 and template[node_id].get("class_type") not in ("SaveVideo", "LoraLoaderModelOnly")]
+    assert untouched and all(second[node_id] is template[node_id] for node_id in untouched)
+
+
+def test_apply_overlay_copies_only_patched_nodes():
+    template = {"1": {"class_type": "A", "inputs": {"x": 1, "y": 2}}, "2": {"class_type": "B", "inputs": {}}}
+    wf = apply_overlay(template, {"1": {"x": 5}})
+    assert wf["1"]["inputs"] == {"x": 5, "y": 2}
+    assert template["1"]["inputs"] == {"x": 1, "y": 2}
+    assert wf["2"] is template["2"]
@@ -0,0 +1,59 @@
+"""
+Unit tests for core.render_cache
+"""
+import os
+import time
+
+from core.prompt_compiler import workflow_hash
+from core.render_cache import RenderCache
+
+
+def test_hit_materializes_stored_output(tmp_path):
+    cache = RenderCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024)
+    video = tmp_path / "shot_001.mp4"
+    video.write_bytes(b"video-bytes")
+
+    assert cache.materialize("ab" * 32, str(tmp_path / "miss.mp4")) is None
+    assert cache.put("ab" * 32, str(video))
+
+    dest = tmp_path / "session" / "shot_001a.mp4"
+    assert cache.materialize("ab" * 32, str(dest)) in ("hardlink", "copy")
+    assert dest.read_bytes() == b"video-bytes"
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    # The index survives a restart
+    assert RenderCache(cache_dir=str(tmp_path / "cache")).get("ab" * 32)
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = RenderCache(cache_dir=str(tmp_path / "cache"), max_bytes=25)
+    for name in ("aa", "bb"):
+        path = tmp_path / f"{name}.mp4"
+        path.write_bytes(b"x" * 10)
+        cache.put(name * 32, str(path))
+        time.sleep(0.01)
+
+    cache.get("aa" * 32)  # aa is now the most recently used
+    third = tmp_path / "cc.mp4"
+    third.write_bytes(b"x" * 10)
+    cache.put("cc" * 32, str(third))
+
+    keys = [e['key'] for e in cache.entries()]
+    assert "bb" * 32 not in keys
+    assert set(keys) == {"aa" * 32, "cc" * 32}
+    assert cache.total_bytes() <= 25
+
+
+def test_workflow_hash_follows_input_image_content(tmp_path):
+    image = tmp_path / "shot_001.png"
+    image.write_bytes(b"first")
+    wf = {
+        "1": {"class_type": "LoadImage", "inputs": {"image": str(image)}},
+        "2": {"class_type": "SaveVideo", "inputs": {"filename_prefix": "video/a"}},
+    }
+    first = workflow_hash(wf)
+    assert first == workflow_hash({**wf, "2": {"class_type": "SaveVideo", "inputs": {"filename_prefix": "video/b"}}})
+
+    image.write_bytes(b"second")
+    os.utime(image, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+    assert workflow_hash(wf) != first
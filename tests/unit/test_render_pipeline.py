@@ -0,0 +1,115 @@
+"""
+Unit tests for core.render_pipeline
+"""
+import threading
+import time
+
+from core.render_pipeline import RenderJob, RenderPipeline
+
+
+def _make_jobs(count):
+    return [RenderJob(shot={'index': i}, shot_idx=i, image_path=f"shot_{i:03d}.png") for i in range(1, count + 1)]
+
+
+def test_pipeline_keeps_depth_prompts_in_flight():
+    """Submission should run ahead of completion up to the configured depth"""
+    lock = threading.Lock()
+    in_flight = {'now': 0, 'max': 0}
+
+    def submit_fn(job):
+        with lock:
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        return f"prompt-{job.shot_idx}"
+
+    def wait_fn(prompt_id, timeout):
+        time.sleep(0.05)
+        with lock:
+            in_flight['now'] -= 1
+        return {'success': True, 'outputs': [], 'error': None}
+
+    def collect_fn(job, wait_result):
+        return True, None, f"videos/shot_{job.shot_idx:03d}.mp4"
+
+    jobs = RenderPipeline(submit_fn, collect_fn, depth=3, timeout=10, wait_fn=wait_fn).run(_make_jobs(7))
+
+    assert all(job.success for job in jobs)
+    assert in_flight['max'] == 3
+    assert [job.video_path for job in jobs] == [f"videos/shot_{i:03d}.mp4" for i in range(1, 8)]
+
+
+def test_pipeline_collects_out_of_order():
+    """A slow early render must not block collection of later ones"""
+    def wait_fn(prompt_id, timeout):
+        time.sleep(0.2 if prompt_id == "prompt-1" else 0.01)
+        return {'success': True, 'outputs': [], 'error': None}
+
+    pipeline = RenderPipeline(lambda job: f"prompt-{job.shot_idx}", lambda job, result: (True, None, None),
+                              depth=3, timeout=10, wait_fn=wait_fn)
+    pipeline.run(_make_jobs(3))
+
+    assert pipeline.completed_order[-1].shot_idx == 1
+
+
+def test_pipeline_records_failures():
+    """Submit errors and failed renders are reported per job without stopping the queue"""
+    def submit_fn(job):
+        if job.shot_idx == 2:
+            raise ConnectionError("ComfyUI unreachable")
+        return f"prompt-{job.shot_idx}"
+
+    def wait_fn(prompt_id, timeout):
+        if prompt_id == "prompt-3":
+            return {'success': False, 'outputs': [], 'error': 'ComfyUI error: OOM'}
+        return {'success': True, 'outputs': [], 'error': None}
+
+    def collect_fn(job, wait_result):
+        if not wait_result['success']:
+            return False, wait_result['error'], None
+        return True, None, "ok.mp4"
+
+    jobs = RenderPipeline(submit_fn, collect_fn, depth=2, timeout=10, wait_fn=wait_fn).run(_make_jobs(3))
+
+    assert [job.success for job in jobs] == [True, False, False]
+    assert "ComfyUI unreachable" in jobs[1].error
+    assert jobs[2].error == 'ComfyUI error: OOM'
+
+
+def test_streamed_jobs_join_prompts_already_in_flight():
+    """Jobs fed while a render is running are queued behind it instead of waiting for it to finish"""
+    import queue
+
+    release_first = threading.Event()
+    submitted = []
+
+    def submit_fn(job):
+        submitted.append(job.shot_idx)
+        return f"prompt-{job.shot_idx}"
+
+    def wait_fn(prompt_id, timeout):
+        if prompt_id == "prompt-1":
+            assert release_first.wait(5)
+        return {'success': True, 'outputs': [], 'error': None}
+
+    feed = queue.Queue()
+    jobs = _make_jobs(3)
+    feed.put(jobs[:1])
+    pipeline = RenderPipeline(submit_fn, lambda job, result: (True, None, None), depth=2, timeout=10,
+                              wait_fn=wait_fn)
+    result = {}
+    runner = threading.Thread(target=lambda: result.setdefault('jobs', pipeline.run_stream(feed)))
+    runner.start()
+
+    feed.put(jobs[1:])
+    deadline = time.time() + 5
+    while len(submitted) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    # Shots 2 and 3 went through ComfyUI while shot 1 was still rendering
+    assert submitted == [1, 2, 3]
+    assert not jobs[0].success
+
+    release_first.set()
+    feed.put(None)
+    runner.join(5)
+    assert [job.shot_idx for job in result['jobs']] == [1, 2, 3]
+    assert all(job.success for job in result['jobs'])
@@ -0,0 +1,114 @@
+"""
+Unit tests for re-attaching to in-flight renders after a crash
+"""
+from core.prompt_compiler import workflow_hash
+from core.render_pipeline import RenderJob, RenderPipeline
+from core.session_manager import SessionManager
+
+
+def test_render_submissions_are_recorded_and_cleared(tmp_path):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_id, _ = session_mgr.create_session("test idea", session_id="session_test")
+    session_mgr.save_shots(session_id, [{'image_prompt': 'a'}, {'image_prompt': 'b'}])
+
+    session_mgr.record_render_submission(session_id, 2, 1, "prompt-abc", "http://gpu2:8188", "deadbeef")
+
+    record = session_mgr.get_render_submission(session_id, 2, 1)
+    assert record['prompt_id'] == "prompt-abc"
+    assert record['backend'] == "http://gpu2:8188"
+    assert record['workflow_hash'] == "deadbeef"
+
+    session_mgr.clear_render_submission(session_id, 2, 1)
+    assert session_mgr.get_render_submission(session_id, 2, 1) is None
+    assert 'pending_renders' not in session_mgr.get_shots(session_id)[1]
+
+
+def test_pipeline_does_not_resubmit_reattached_jobs():
+    submitted = []
+    waited = []
+
+    def submit_fn(job):
+        submitted.append(job.shot_idx)
+        return f"new-{job.shot_idx}"
+
+    def wait_fn(prompt_id, timeout):
+        waited.append(prompt_id)
+        return {'success': True, 'outputs': [], 'error': None}
+
+    jobs = [RenderJob(shot={'index': 1}, shot_idx=1, image_path="a.png", prompt_id="from-crashed-run"),
+            RenderJob(shot={'index': 2}, shot_idx=2, image_path="b.png")]
+    RenderPipeline(submit_fn, lambda job, result: (True, None, None), depth=2, timeout=10,
+                   wait_fn=wait_fn).run(jobs)
+
+    assert submitted == [2]
+    assert sorted(waited) == ["from-crashed-run", "new-2"]
+
+
+def test_workflow_hash_ignores_save_prefix():
+    wf_a = {"1": {"class_type": "SaveVideo", "inputs": {"filename_prefix": "111_shot_001", "fps": 16}},
+            "2": {"class_type": "CLIPTextEncode", "inputs": {"text": "pan left"}}}
+    wf_b = {"1": {"class_type": "SaveVideo", "inputs": {"filename_prefix": "222_shot_001", "fps": 16}},
+            "2": {"class_type": "CLIPTextEncode", "inputs": {"text": "pan left"}}}
+    wf_c = {"1": {"class_type": "SaveVideo", "inputs": {"filename_prefix": "111_shot_001", "fps": 16}},
+            "2": {"class_type": "CLIPTextEncode", "inputs": {"text": "pan right"}}}
+
+    assert workflow_hash(wf_a) == workflow_hash(wf_b)
+    assert workflow_hash(wf_a) != workflow_hash(wf_c)
+
+
+def test_reattach_checks_workflow_hash_and_defers_unreachable_nodes(tmp_path, monkeypatch):
+    import core.comfy_client as comfy_client
+    from core.main import _reattach_render_jobs
+
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_id, _ = session_mgr.create_session("test idea", session_id="session_test")
+    session_mgr.save_shots(session_id, [{'image_prompt': 'a'}, {'image_prompt': 'b'}, {'image_prompt': 'c'}])
+
+    wf_old = {"1": {"class_type": "CLIPTextEncode", "inputs": {"text": "pan left"}}}
+    wf_new = {"1": {"class_type": "CLIPTextEncode", "inputs": {"text": "pan right"}}}
+    session_mgr.record_render_submission(session_id, 1, 1, "stale", "http://gpu1:8188", workflow_hash(wf_old))
+    session_mgr.record_render_submission(session_id, 2, 1, "live", "http://gpu1:8188", workflow_hash(wf_new))
+    session_mgr.record_render_submission(session_id, 3, 1, "offline", "http://gpu2:8188", workflow_hash(wf_new))
+
+    deleted = []
+    states = {"stale": "queued", "live": "queued", "offline": "unreachable"}
+    monkeypatch.setattr(comfy_client, "get_prompt_state", lambda prompt_id: states[prompt_id])
+    monkeypatch.setattr(comfy_client, "delete_queued_prompt", deleted.append)
+
+    jobs = [RenderJob(shot={'index': i}, shot_idx=i, image_path=f"{i}.png", workflow=dict(wf_new))
+            for i in (1, 2, 3)]
+    _reattach_render_jobs(jobs, session_id, session_mgr)
+
+    # Shot changed since submission: record dropped, stale prompt removed, rendered fresh
+    assert jobs[0].prompt_id is None and not jobs[0].deferred
+    assert deleted == ["stale"]
+    assert session_mgr.get_render_submission(session_id, 1, 1) is None
+    # Unchanged and still queued: re-attached
+    assert jobs[1].prompt_id == "live"
+    # Node unreachable: neither re-attached nor resubmitted, record kept for the next resume
+    assert jobs[2].deferred and jobs[2].prompt_id is None and jobs[2].error
+    assert session_mgr.get_render_submission(session_id, 3, 1)['prompt_id'] == "offline"
+
+
+def test_collect_keeps_submission_until_prompt_is_settled(tmp_path):
+    from core.main import _collect_video_output
+
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_id, _ = session_mgr.create_session("test idea", session_id="session_test")
+    session_mgr.save_shots(session_id, [{'image_prompt': 'a'}, {'image_prompt': 'b'}])
+    session_mgr.record_render_submission(session_id, 1, 1, "slow", "http://gpu1:8188", "deadbeef")
+    session_mgr.record_render_submission(session_id, 2, 1, "broken", "http://gpu1:8188", "deadbeef")
+
+    # Timed out: the prompt may still finish, so a resume must be able to re-attach
+    success, error, _ = _collect_video_output(
+        {'success': False, 'error': 'Timeout after 10s of execution', 'outputs': [], 'timed_out': True},
+        session_id, 1, session_mgr)
+    assert not success and error
+    assert session_mgr.get_render_submission(session_id, 1, 1)['prompt_id'] == "slow"
+
+    # ComfyUI reported an error: nothing to re-attach to
+    success, _, _ = _collect_video_output(
+        {'success': False, 'error': 'ComfyUI error: OOM', 'outputs': []},
+        session_id, 2, session_mgr)
+    assert not success
+    assert session_mgr.get_render_submission(session_id, 2, 1) is None
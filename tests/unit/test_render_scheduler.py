@@ -0,0 +1,40 @@
+"""
+Unit tests for core.render_scheduler
+"""
+from core.render_pipeline import RenderJob
+from core.render_scheduler import count_switches, lora_signature, schedule_render_jobs
+
+
+def _job(shot_idx, camera, priority=0, prompt_id=None):
+    job = RenderJob(shot={"index": shot_idx}, shot_idx=shot_idx, image_path=f"{shot_idx}.png",
+                    priority=priority, prompt_id=prompt_id)
+    job.workflow = {"127": {"class_type": "LoraLoaderModelOnly",
+                            "inputs": {"lora_name": f"{camera}.safetensors", "strength_model": 0.8}}}
+    return job
+
+
+def _cameras(jobs):
+    return [lora_signature(j.workflow)[0][1].split(".")[0] for j in jobs]
+
+
+def test_groups_by_lora_stack_and_reduces_switches():
+    jobs = [_job(i + 1, cam) for i, cam in enumerate(["drone", "zoom", "drone", "zoom", "drone", "orbit"])]
+    ordered = schedule_render_jobs(jobs, mode="lora_affinity", max_delay=-1)
+
+    assert sorted(j.shot_idx for j in ordered) == [1, 2, 3, 4, 5, 6]
+    assert _cameras(ordered) == ["drone", "drone", "drone", "zoom", "zoom", "orbit"]
+    assert count_switches(_cameras(jobs)) == 5 and count_switches(_cameras(ordered)) == 2
+
+
+def test_priority_max_delay_and_attached_jobs_are_honored():
+    jobs = [_job(1, "drone"), _job(2, "zoom"), _job(3, "drone"), _job(4, "drone"),
+            _job(5, "zoom", priority=1), _job(6, "orbit", prompt_id="abc")]
+    ordered = schedule_render_jobs(jobs, mode="lora_affinity", max_delay=1)
+
+    # Re-attached prompt first, then the priority shot, then no job more than 1 place late
+    assert [j.shot_idx for j in ordered][:2] == [6, 5]
+    fresh = [j for j in ordered if j.priority == 0 and not j.prompt_id]
+    original = [1, 2, 3, 4]
+    assert all(pos - original.index(j.shot_idx) <= 1 for pos, j in enumerate(fresh))
+
+    assert [j.shot_idx for j in schedule_render_jobs(jobs, mode="shot_order")] == [6, 1, 2, 3, 4, 5]
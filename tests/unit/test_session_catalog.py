@@ -0,0 +1,52 @@
+"""
+Unit tests for the cached session catalog
+"""
+import json
+import os
+
+from core.session_manager import SessionManager
+
+
+def test_listing_is_cached_and_follows_writes(tmp_path, monkeypatch):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_mgr.create_session("old idea", session_id="session_20260101_000000")
+    session_mgr.create_session("new idea", session_id="session_20260102_000000")
+
+    sessions, etag = session_mgr.list_sessions_with_etag()
+    assert [meta['idea'] for meta in sessions] == ["new idea", "old idea"]
+
+    # Unchanged folders are served from memory
+    loads = []
+    monkeypatch.setattr(session_mgr.catalog, "loader", lambda session_id: loads.append(session_id))
+    assert session_mgr.list_sessions_with_etag()[1] == etag
+    assert loads == []
+    monkeypatch.undo()
+
+    session_mgr.mark_session_complete("session_20260102_000000")
+    sessions, new_etag = session_mgr.list_sessions_with_etag()
+    assert new_etag != etag
+    assert sessions[0]['completed']
+    assert session_mgr.get_latest_session() is None
+
+
+def test_changes_from_another_process_are_picked_up(tmp_path):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_id, _ = session_mgr.create_session("idea", session_id="session_20260101_000000")
+    session_mgr.save_shots(session_id, [{'image_prompt': "shot"}])
+    assert session_mgr.get_latest_session()['stats']['images_generated'] == 0
+
+    # Journal append (no meta rewrite) and a new session folder written directly
+    session_mgr.mark_image_generated(session_id, 1, "a.png")
+    other_dir = tmp_path / "session_20260103_000000"
+    other_dir.mkdir()
+    meta = dict(session_mgr.load_session(session_id), session_id=other_dir.name,
+                timestamp="20260103_000000", idea="other")
+    (other_dir / f"{other_dir.name}_meta.json").write_text(json.dumps(meta))
+
+    sessions = session_mgr.list_all_sessions()
+    assert [s['session_id'] for s in sessions] == ["session_20260103_000000", session_id]
+    assert sessions[1]['stats']['images_generated'] == 1
+
+    session_mgr.delete_session(other_dir.name)
+    assert not os.path.exists(other_dir)
+    assert session_mgr.get_latest_session()['session_id'] == session_id
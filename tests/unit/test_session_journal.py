@@ -0,0 +1,148 @@
+"""
+Unit tests for the append-only session journal
+"""
+import json
+import os
+
+from core.session_journal import SessionJournal
+from core.session_manager import SessionManager
+
+
+def _session(tmp_path, shots=3):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_id, _ = session_mgr.create_session("test idea", session_id="session_test")
+    session_mgr.save_shots(session_id, [{'image_prompt': f"shot {i}"} for i in range(shots)])
+    return session_mgr, session_id
+
+
+def test_marks_are_journaled_and_folded_on_compaction(tmp_path):
+    session_mgr, session_id = _session(tmp_path)
+    shots_path = os.path.join(session_mgr.get_session_dir(session_id), "shots.json")
+    snapshot = open(shots_path).read()
+
+    session_mgr.mark_image_generated(session_id, 2, "/tmp/shot_002_001.png")
+    session_mgr.mark_video_rendered(session_id, 2)
+
+    # Snapshot untouched, readers see the tail
+    assert open(shots_path).read() == snapshot
+    shot = session_mgr.get_shots(session_id)[1]
+    assert shot['image_generated'] and shot['video_rendered']
+    assert shot['image_paths'] == ["/tmp/shot_002_001.png"]
+    assert session_mgr.load_session(session_id)['stats']['videos_rendered'] == 1
+
+    session_mgr.compact(session_id)
+    journal = SessionJournal(session_mgr.get_session_dir(session_id))
+    assert journal.read() == []
+    assert json.load(open(shots_path))[1]['video_rendered']
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    session_mgr, session_id = _session(tmp_path)
+    session_mgr.mark_image_generated(session_id, 1, "a.png")
+    session_mgr.flush(session_id)
+    journal = SessionJournal(session_mgr.get_session_dir(session_id))
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "video", "sh')  # crash mid-append
+
+    assert session_mgr.get_shots(session_id)[0]['image_generated']
+    session_mgr.mark_image_generated(session_id, 3, "c.png")
+    session_mgr.flush(session_id)
+    assert [event['shot'] for event in journal.read()] == [1, 3]
+
+
+def test_full_rewrite_is_not_undone_by_older_events(tmp_path):
+    session_mgr, session_id = _session(tmp_path)
+    session_mgr.mark_video_rendered(session_id, 1)
+
+    # Web UI reorders shots: shot 1 moves to the end with its status reset
+    shots = session_mgr.get_shots(session_id)
+    moved = dict(shots[0], video_rendered=False)
+    reordered = shots[1:] + [moved]
+    for idx, shot in enumerate(reordered, start=1):
+        shot['index'] = idx
+    session_mgr.update_shots(session_id, reordered)
+
+    assert [s['video_rendered'] for s in session_mgr.get_shots(session_id)] == [False, False, False]
+    assert session_mgr.load_session(session_id)['stats']['videos_rendered'] == 0
+
+
+def test_saving_a_stale_shots_copy_keeps_later_marks(tmp_path):
+    session_mgr, session_id = _session(tmp_path)
+
+    # API handler reads the shots, a render finishes, then the handler saves its copy
+    shots = session_mgr.get_shots(session_id)
+    shots[0]['image_prompt'] = "edited"
+    session_mgr.mark_video_rendered(session_id, 2)
+    session_mgr.update_shots(session_id, shots)
+
+    saved = session_mgr.get_shots(session_id)
+    assert saved[0]['image_prompt'] == "edited"
+    assert saved[1]['video_rendered']
+    assert session_mgr.load_session(session_id)['stats']['videos_rendered'] == 1
+
+
+def test_concurrent_step_marks_are_not_lost(tmp_path):
+    import threading
+
+    session_mgr, session_id = _session(tmp_path)
+    steps = [f"step_{i}" for i in range(8)]
+    threads = [threading.Thread(target=session_mgr.mark_step_complete, args=(session_id, step))
+               for step in steps]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    meta = session_mgr.load_session(session_id)
+    assert all(meta['steps'].get(step) for step in steps)
+
+
+def test_sessions_lock_independently(tmp_path):
+    import threading
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    held = threading.Event()
+    release = threading.Event()
+    acquired = threading.Event()
+
+    def hold_a():
+        with SessionJournal(str(tmp_path / "a")).locked():
+            held.set()
+            release.wait(5)
+
+    def lock_b():
+        with SessionJournal(str(tmp_path / "b")).locked():
+            acquired.set()
+
+    holder = threading.Thread(target=hold_a)
+    holder.start()
+    assert held.wait(5)
+    other = threading.Thread(target=lock_b)
+    other.start()
+    # Session b does not wait for session a's lock
+    assert acquired.wait(5)
+    release.set()
+    holder.join()
+    other.join()
+
+
+def test_windows_lock_fallback(tmp_path, monkeypatch):
+    from core import session_journal
+
+    calls = []
+
+    class FakeMsvcrt:
+        LK_LOCK, LK_UNLCK = 1, 0
+
+        @staticmethod
+        def locking(fd, mode, nbytes):
+            calls.append(mode)
+
+    monkeypatch.setattr(session_journal, "fcntl", None)
+    monkeypatch.setattr(session_journal, "msvcrt", FakeMsvcrt)
+    journal = session_journal.SessionJournal(str(tmp_path))
+    with journal.locked():
+        with journal.locked(shared=True):
+            journal.append({'op': 'video', 'shot': 1})
+    assert calls == [FakeMsvcrt.LK_LOCK, FakeMsvcrt.LK_UNLCK]
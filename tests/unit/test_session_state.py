@@ -0,0 +1,123 @@
+"""
+Unit tests for the write-back session state
+"""
+import threading
+
+import config
+from core.session_journal import SessionJournal
+from core.session_manager import SessionManager
+from core.session_state import SessionState
+
+
+def _session(tmp_path, shots=8):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_id, _ = session_mgr.create_session("test idea", session_id="session_test")
+    session_mgr.save_shots(session_id, [{'image_prompt': f"shot {i}"} for i in range(shots)])
+    return session_mgr, session_id
+
+
+def test_updates_are_batched_into_one_journal_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SESSION_FLUSH_DELAY", 60, raising=False)
+    session_mgr, session_id = _session(tmp_path)
+    journal = SessionJournal(session_mgr.get_session_dir(session_id))
+
+    threads = [threading.Thread(target=session_mgr.mark_image_generated, args=(session_id, i, f"{i}.png"))
+               for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session_mgr.mark_video_rendered(session_id, 3)
+
+    # Visible in this process right away, on disk after the flush
+    assert session_mgr.load_session(session_id)['stats']['images_generated'] == 8
+    assert journal.read() == []
+    session_mgr.flush(session_id)
+    assert len(journal.read()) == 9
+
+    # Step completion folds everything into the snapshots
+    session_mgr.mark_step_complete(session_id, 'images')
+    assert journal.read() == []
+    other = SessionState(session_mgr.get_session_dir(session_id), session_id)
+    assert all(shot['image_generated'] for shot in other.shots())
+    assert other.meta()['stats']['videos_rendered'] == 1
+
+
+def test_writes_by_another_process_are_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SESSION_FLUSH_DELAY", 60, raising=False)
+    session_mgr, session_id = _session(tmp_path, shots=2)
+    session_mgr.mark_image_generated(session_id, 1, "1.png")
+
+    # Another process (fresh state object) renders shot 2 and compacts
+    other = SessionState(session_mgr.get_session_dir(session_id), session_id)
+    other.record({'op': 'video', 'shot': 2})
+    other.write()
+
+    # This process sees that write and keeps its own pending update
+    shots = session_mgr.get_shots(session_id)
+    assert shots[0]['image_generated'] and shots[1]['video_rendered']
+    session_mgr.flush(session_id)
+    other = SessionState(session_mgr.get_session_dir(session_id), session_id)
+    assert [shot['image_generated'] for shot in other.shots()] == [True, False]
+
+
+def test_explicit_write_keeps_updates_recorded_after_the_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SESSION_FLUSH_DELAY", 60, raising=False)
+    session_mgr, session_id = _session(tmp_path, shots=3)
+    session_mgr.mark_image_generated(session_id, 1, "1.png")
+
+    # Web UI edits a prompt while a render thread marks shot 2
+    shots = session_mgr.get_shots(session_id)
+    shots[0]['image_path'] = "other_variation.png"
+    render = threading.Thread(target=session_mgr.mark_video_rendered, args=(session_id, 2))
+    render.start()
+    render.join()
+    session_mgr.update_shots(session_id, shots)
+
+    other = SessionState(session_mgr.get_session_dir(session_id), session_id)
+    assert other.shots()[1]['video_rendered']
+    # The image event read before the edit is not replayed over it
+    assert other.shots()[0]['image_path'] == "other_variation.png"
+    assert other.meta()['stats']['videos_rendered'] == 1
+    assert SessionJournal(session_mgr.get_session_dir(session_id)).read() == []
+
+
+def test_write_back_is_matched_to_its_own_read_not_the_thread(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SESSION_FLUSH_DELAY", 60, raising=False)
+    session_mgr, session_id = _session(tmp_path, shots=2)
+
+    # Two web UI requests handled on the same thread: A reads, a mark lands, B reads, A writes
+    shots_a = session_mgr.get_shots(session_id)
+    session_mgr.mark_video_rendered(session_id, 1)
+    session_mgr.get_shots(session_id)
+    shots_a[1]['image_prompt'] = "edited by A"
+    session_mgr.update_shots(session_id, shots_a)
+
+    shots = session_mgr.get_shots(session_id)
+    assert shots[0]['video_rendered']
+    assert shots[1]['image_prompt'] == "edited by A"
+
+
+def test_full_write_keeps_marks_made_by_another_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SESSION_FLUSH_DELAY", 60, raising=False)
+    session_mgr, session_id = _session(tmp_path, shots=3)
+    session_dir = session_mgr.get_session_dir(session_id)
+
+    # Web UI reads; the CLI (another process) journals a video mark, then compacts another
+    shots = session_mgr.get_shots(session_id)
+    cli = SessionState(session_dir, session_id)
+    cli.record({'op': 'video', 'shot': 1})
+    cli.flush()
+    cli.record({'op': 'video', 'shot': 3})
+    cli.write()
+    cli.record({'op': 'image', 'shot': 2, 'path': "2.png"})
+    cli.flush()
+
+    shots[1]['image_prompt'] = "edited in the web UI"
+    session_mgr.update_shots(session_id, shots)
+
+    saved = SessionState(session_dir, session_id)
+    assert [shot['video_rendered'] for shot in saved.shots()] == [True, False, True]
+    assert saved.shots()[1]['image_path'] == "2.png"
+    assert saved.shots()[1]['image_prompt'] == "edited in the web UI"
+    assert saved.meta()['stats']['videos_rendered'] == 2
@@ -0,0 +1,53 @@
+"""
+Unit tests for the SQLite session backend
+"""
+import json
+import os
+
+from core.session_manager import SessionManager
+
+
+def _files_session(tmp_path, session_id, shots=3):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path), backend="files")
+    session_mgr.create_session("test idea", session_id=session_id)
+    session_mgr.save_shots(session_id, [{'image_prompt': f"shot {i}"} for i in range(shots)])
+    return session_mgr
+
+
+def test_existing_sessions_are_imported_and_queried(tmp_path):
+    files = _files_session(tmp_path, "session_old")
+    files.mark_image_generated("session_old", 1, "a.png")  # still in the journal
+
+    store_mgr = SessionManager(sessions_dir=str(tmp_path), backend="sqlite")
+    assert [meta['session_id'] for meta in store_mgr.list_all_sessions()] == ["session_old"]
+
+    store_mgr.mark_image_generated("session_old", 2, "b.png")
+    store_mgr.mark_video_rendered("session_old", 2)
+    pending = store_mgr.find_shots(image_generated=True, video_rendered=False)
+    assert [(shot['session_id'], shot['index']) for shot in pending] == [("session_old", 1)]
+    assert store_mgr.load_session("session_old")['stats']['videos_rendered'] == 1
+
+
+def test_round_trip_matches_files_backend(tmp_path):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path), backend="sqlite")
+    session_id, _ = session_mgr.create_session("test idea", session_id="session_new")
+    assert not os.path.exists(os.path.join(str(tmp_path), session_id, "shots.json"))
+
+    session_mgr.save_shots(session_id, [{'image_prompt': "a", 'camera': "drone"}, {'image_prompt': "b"}])
+    session_mgr.mark_image_generated(session_id, 1, "x_001.png")
+    session_mgr.mark_image_generated(session_id, 1, "x_002.png")
+    session_mgr.record_render_submission(session_id, 1, 2, "prompt-1", "http://gpu:8188", "abc")
+
+    shot = session_mgr.get_shots(session_id)[0]
+    assert shot['image_paths'] == ["x_001.png", "x_002.png"]
+    assert shot['camera'] == "drone" and shot['index'] == 1
+    assert session_mgr.get_render_submission(session_id, 1, 2)['prompt_id'] == "prompt-1"
+
+    session_mgr.clear_render_submission(session_id, 1, 2)
+    session_mgr.mark_step_complete(session_id, 'images')
+    exported = json.load(open(os.path.join(str(tmp_path), session_id, "shots.json")))
+    assert exported[0]['image_paths'] == ["x_001.png", "x_002.png"]
+    assert 'pending_renders' not in exported[0]
+
+    assert session_mgr.delete_session(session_id)
+    assert session_mgr.list_all_sessions() == []
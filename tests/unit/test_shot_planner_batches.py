@@ -0,0 +1,122 @@
+"""
+Unit tests for incremental shot planning (batches released in order with final indices)
+"""
+import json
+import threading
+
+from core import shot_planner
+
+
+def _scenes(count):
+    return json.dumps([{"scene": i, "description": f"scene {i}"} for i in range(1, count + 1)])
+
+
+def test_batches_are_released_in_order_with_final_indices(monkeypatch):
+    batch_two_done = threading.Event()
+
+    def fake_plan_shots_batch(scenes_batch, batch_num, total_batches, max_shots_instruction,
+                              image_agent, video_agent, on_shot=None):
+        if batch_num == 1:
+            # Batch 1 finishes last; batch 2 must wait for it before release
+            assert batch_two_done.wait(5)
+        shots = [{"image_prompt": f"b{batch_num}-s{i}"} for i in range(batch_num)]
+        if batch_num == 2:
+            batch_two_done.set()
+        return shots
+
+    monkeypatch.setattr(shot_planner, "plan_shots_batch", fake_plan_shots_batch)
+    monkeypatch.setattr(shot_planner, "SHOT_GENERATION_BATCH_SIZE", 1)
+    monkeypatch.setattr(shot_planner, "is_local_provider", lambda: False)
+
+    released = []
+    shots = shot_planner.plan_shots(_scenes(3), on_batch=lambda batch: released.append(
+        [(shot['batch_number'], shot['index']) for shot in batch]))
+
+    assert released == [[(1, 1)], [(2, 2), (2, 3)], [(3, 4), (3, 5), (3, 6)]]
+    assert [shot['index'] for shot in shots] == [1, 2, 3, 4, 5, 6]
+
+
+def test_resume_skips_planned_batches_and_caps_max_shots(monkeypatch):
+    requested = []
+
+    def fake_plan_shots_batch(scenes_batch, batch_num, total_batches, max_shots_instruction,
+                              image_agent, video_agent, on_shot=None):
+        requested.append(batch_num)
+        return [{"image_prompt": f"b{batch_num}-s{i}"} for i in range(2)]
+
+    monkeypatch.setattr(shot_planner, "plan_shots_batch", fake_plan_shots_batch)
+    monkeypatch.setattr(shot_planner, "SHOT_GENERATION_BATCH_SIZE", 1)
+    monkeypatch.setattr(shot_planner, "is_local_provider", lambda: True)
+
+    planned = [{"index": 1, "batch_number": 1}, {"index": 2, "batch_number": 1}]
+    released = []
+    shots = shot_planner.plan_shots(_scenes(3), max_shots=5, planned=planned, on_batch=released.append)
+
+    assert requested == [2, 3]
+    assert [[shot['index'] for shot in batch] for batch in released] == [[3, 4], [5]]
+    assert len(shots) == 5
+
+
+def test_streamed_shots_are_saved_in_groups_and_batches_reported_when_done():
+    released = []
+    done = []
+    releaser = shot_planner.BatchReleaser(on_batch=lambda batch: released.append([s['index'] for s in batch]),
+                                          on_batch_done=done.append, save_interval=60)
+
+    batch_one = [{"image_prompt": f"b1-s{i}"} for i in range(4)]
+    for shot in batch_one[:3]:
+        releaser.add_shot(1, shot)
+    # The first shot goes out at once, the rest wait for the save interval or the batch end
+    assert released == [[1]] and done == []
+
+    releaser.add(1, batch_one)
+    assert released == [[1], [2, 3, 4]]
+    assert done == [1]
+
+    # A batch that failed mid-stream keeps its released shots but is not reported done
+    releaser.add_shot(2, {"image_prompt": "b2-s0"})
+    releaser.add(2, [])
+    assert done == [1]
+    assert 2 not in releaser.done_batches
+
+    # Later batches are still released after it
+    releaser.add(3, [{"image_prompt": "b3-s0"}])
+    assert released[-1] == [5] and done == [1, 3]
+
+
+def test_callbacks_run_outside_the_releaser_lock():
+    seen = []
+
+    def on_batch(batch):
+        if batch[0]['index'] == 1:
+            # A streaming thread must be able to hand in shots while the batch is saved
+            worker = threading.Thread(target=releaser.add_shot, args=(2, {"image_prompt": "b2-s0"}))
+            worker.start()
+            worker.join(timeout=5)
+            assert not worker.is_alive()
+        seen.append([s['index'] for s in batch])
+
+    releaser = shot_planner.BatchReleaser(on_batch=on_batch, on_batch_done=lambda n: seen.append(f"done {n}"),
+                                          save_interval=0)
+    releaser.add(1, [{"image_prompt": "b1-s0"}])
+    # The streamed shot was delivered by the saving thread, after batch 1 was reported done
+    assert seen == [[1], "done 1", [2]]
+
+
+def test_unfinished_last_batch_is_dropped_on_resume():
+    planned = [{"index": 1, "batch_number": 1}, {"index": 2, "batch_number": 2}, {"index": 3, "batch_number": 2}]
+
+    assert shot_planner.complete_planned_shots(planned, [1]) == planned[:1]
+    assert shot_planner.complete_planned_shots(planned, [1, 2]) == planned
+
+
+def test_everything_from_an_unfinished_middle_batch_is_dropped_on_resume():
+    planned = [{"index": 1, "batch_number": 1}, {"index": 2, "batch_number": 2},
+               {"index": 3, "batch_number": 3}, {"index": 4, "batch_number": 3}]
+
+    # Batch 2 failed after streaming a shot: batch 3 is replanned too so indices stay put
+    assert shot_planner.complete_planned_shots(planned, [1, 3]) == planned[:1]
+    # Batch 2 failed before streaming anything: the gap drops batch 3
+    assert shot_planner.complete_planned_shots([planned[0]] + planned[2:], [1, 3]) == planned[:1]
+    # Sessions planned before batches were recorded keep everything
+    assert shot_planner.complete_planned_shots(planned, None) == planned
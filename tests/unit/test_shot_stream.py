@@ -0,0 +1,54 @@
+"""
+Unit tests for streamed shot planning (incremental JSON extraction and release)
+"""
+import json
+
+from core.shot_planner import BatchReleaser, ShotStreamExtractor, ask_for_shots
+
+
+def test_shots_are_extracted_as_their_objects_close():
+    shots = [{"image_prompt": 'a "quoted" {brace} [x]', "camera": "static", "meta": {"lens": 35}},
+             {"image_prompt": "second", "camera": "orbit"}]
+    response = "```json\n" + json.dumps({"shots": shots}) + "\n```"
+    extractor = ShotStreamExtractor()
+
+    seen = []
+    for i in range(0, len(response), 7):
+        completed = extractor.feed(response[i:i + 7])
+        seen.extend(completed)
+        if completed == [shots[0]]:
+            # The first shot is out before the second one has been written
+            assert "second" not in response[:i + 7]
+    assert seen == shots == extractor.objects
+
+
+def test_streamed_shots_are_released_in_order():
+    released = []
+    releaser = BatchReleaser(on_batch=lambda batch: released.append([shot['index'] for shot in batch]),
+                             save_interval=0)
+
+    # Batch 2 streams while batch 1 is still being planned: held back until batch 1 is done
+    releaser.add_shot(2, {"image_prompt": "b2-s1"})
+    releaser.add_shot(1, {"image_prompt": "b1-s1"})
+    assert released == [[1]]
+    releaser.add(1, [releaser.shots[0], {"image_prompt": "b1-s2"}])
+    assert released == [[1], [2], [3]]
+
+    releaser.add_shot(2, {"image_prompt": "b2-s2"})
+    releaser.add(2, releaser._partial[2] + [{"image_prompt": "b2-s3"}])
+    assert released == [[1], [2], [3], [4], [5]]
+    assert [shot['image_prompt'] for shot in releaser.shots] == ["b1-s1", "b1-s2", "b2-s1", "b2-s2", "b2-s3"]
+
+
+def test_ask_for_shots_hands_out_shots_while_streaming():
+    events = []
+
+    class FakeProvider:
+        def ask_stream(self, prompt, response_format=None):
+            for chunk in ['[{"image_prompt": "one"},', ' {"image_prompt": "tw', 'o"}]']:
+                events.append("chunk")
+                yield chunk
+
+    shots = ask_for_shots(FakeProvider(), "plan", on_shot=lambda shot: events.append(shot['image_prompt']))
+    assert events == ["chunk", "one", "chunk", "chunk", "two"]
+    assert [shot['image_prompt'] for shot in shots] == ["one", "two"]
@@ -0,0 +1,44 @@
+"""
+Unit tests for core.stage_scheduler
+"""
+import config
+from core.comfy_pool import ComfyBackendPool
+from core.stage_scheduler import estimate_model_swaps, stage_batches, use_stage_batching, workflow_stage
+
+
+def _pool(urls, roles, monkeypatch):
+    monkeypatch.setattr(config, "COMFY_NODE_ROLES", roles)
+    pool = ComfyBackendPool(urls=urls, refresh_interval=60)
+    pool.refresh = lambda force=False: None
+    return pool
+
+
+def test_dedicated_nodes_receive_only_their_stage(monkeypatch):
+    pool = _pool(["http://gpu1:8188", "http://gpu2:8188"],
+                 "http://gpu1:8188=image,http://gpu2:8188=video", monkeypatch)
+    pool.backends[0].queue_pending = 5  # busy, but still the only image node
+
+    assert pool.acquire(stage="image").url == "http://gpu1:8188"
+    assert pool.acquire(stage="video").url == "http://gpu2:8188"
+    assert pool.capacity(2, stage="video") == 2
+    assert not use_stage_batching(pool)
+
+
+def test_shared_nodes_prefer_loaded_stage_and_count_swaps(monkeypatch):
+    pool = _pool(["http://gpu1:8188", "http://gpu2:8188"], "", monkeypatch)
+    gpu1, gpu2 = pool.backends
+    pool.record_submit(gpu1, "a", stage="video")
+    pool.record_submit(gpu2, "b", stage="image")
+    gpu1.submitted_since_refresh = gpu2.submitted_since_refresh = 0
+
+    assert pool.acquire(stage="image") is gpu2
+    pool.record_submit(gpu1, "c", stage="image")
+    assert gpu1.stage_swaps == 1 and gpu2.stage_swaps == 0
+
+
+def test_batches_and_swap_estimate():
+    assert stage_batches([1, 2, 3, 4, 5], window=2) == [[1, 2], [3, 4], [5]]
+    assert stage_batches([1, 2, 3], window=0) == [[1, 2, 3]]
+    assert estimate_model_swaps(5, window=0) == {'interleaved': 9, 'batched': 1, 'avoided': 8}
+    assert workflow_stage({"1": {"class_type": "SaveVideo", "inputs": {}}}) == "video"
+    assert workflow_stage({"1": {"class_type": "SaveImage", "inputs": {}}}) == "image"
@@ -0,0 +1,77 @@
+"""
+Unit tests for streaming image generation into video rendering (auto mode)
+"""
+import threading
+
+from core import main
+from core.render_pipeline import RenderPipeline
+from core.session_manager import SessionManager
+
+
+def _fake_render(monkeypatch, collect_fn):
+    """Skip compiling/caching and render through a pipeline whose ComfyUI is instant."""
+    monkeypatch.setattr(main, "_prepare_render_jobs", lambda template, jobs, *args: list(jobs))
+    monkeypatch.setattr(main, "_video_render_pipeline", lambda *args: RenderPipeline(
+        lambda job: f"prompt-{job.shot_idx}", collect_fn, depth=2, timeout=10,
+        wait_fn=lambda prompt_id, timeout: {'success': True, 'outputs': [], 'error': None}))
+
+
+def test_videos_render_while_images_are_generated(tmp_path, monkeypatch):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_id, _ = session_mgr.create_session("test idea", session_id="session_test")
+    shots = [{'index': i, 'image_prompt': f"shot {i}"} for i in (1, 2, 3)]
+    session_mgr.save_shots(session_id, shots)
+
+    first_render = threading.Event()
+    rendered = []
+
+    def fake_generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot,
+                             shot_callback=None):
+        for shot in shots:
+            shot['image_path'] = f"shot_{shot['index']:03d}_001.png"
+            shot['image_paths'] = [shot['image_path']]
+            shot_callback(shot)
+            if shot['index'] == 1:
+                # The video stage starts before the remaining images are generated
+                assert first_render.wait(5)
+
+    def collect_fn(job, wait_result):
+        rendered.append(job.shot_idx)
+        first_render.set()
+        return True, None, f"shot_{job.shot_idx:03d}.mp4"
+
+    monkeypatch.setattr(main, "_generate_images", fake_generate_images)
+    _fake_render(monkeypatch, collect_fn)
+    monkeypatch.setattr(main, "load_workflow", lambda path, video_length_seconds=None: {})
+    monkeypatch.setattr(main.config, "STREAM_QUEUE_SIZE", 1)
+
+    assert main._generate_and_render_streaming(session_id, session_mgr, shots, "gemini", "", 1, 5)
+    assert sorted(rendered) == [1, 2, 3]
+    assert session_mgr.load_session(session_id)['steps']['videos']
+
+
+def test_shots_without_images_keep_the_session_incomplete(tmp_path, monkeypatch):
+    session_mgr = SessionManager(sessions_dir=str(tmp_path))
+    session_id, _ = session_mgr.create_session("test idea", session_id="session_test")
+    shots = [{'index': i, 'image_prompt': f"shot {i}"} for i in (1, 2)]
+    session_mgr.save_shots(session_id, shots)
+
+    def fake_generate_images(session_id, session_mgr, shots, image_mode, negative_prompt, images_per_shot,
+                             shot_callback=None):
+        shots[0]['image_path'] = "shot_001_001.png"
+        shots[0]['image_paths'] = [shots[0]['image_path']]
+        shot_callback(shots[0])
+        raise RuntimeError("image backend down")
+
+    def collect_fn(job, wait_result):
+        session_mgr.mark_video_rendered(session_id, job.shot_idx, f"shot_{job.shot_idx:03d}.mp4")
+        return True, None, f"shot_{job.shot_idx:03d}.mp4"
+
+    monkeypatch.setattr(main, "_generate_images", fake_generate_images)
+    _fake_render(monkeypatch, collect_fn)
+    monkeypatch.setattr(main, "load_workflow", lambda path, video_length_seconds=None: {})
+
+    assert not main._generate_and_render_streaming(session_id, session_mgr, shots, "gemini", "", 1, 5)
+    meta = session_mgr.load_session(session_id)
+    assert meta['steps']['videos']
+    assert not meta.get('completed')
@@ -0,0 +1,63 @@
+"""
+Unit tests for core.template_cache
+"""
+import copy
+import json
+
+from core.template_cache import TemplateCache, WorkflowTemplate, nodes_by_class
+
+
+def _write_workflow(path, sampler="euler"):
+    path.write_text(json.dumps({
+        "1": {"class_type": "KSamplerSelect", "inputs": {"sampler_name": sampler}},
+        "2": {"class_type": "SaveVideo", "inputs": {"filename_prefix": "video/x"}},
+        "3": {"class_type": "SaveVideo", "inputs": {"filename_prefix": "video/y"}},
+    }))
+
+
+def test_conversion_cached_per_variant_and_persisted(tmp_path):
+    workflow = tmp_path / "wan.json"
+    _write_workflow(workflow)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return json.loads(workflow.read_text())
+
+    cache = TemplateCache(cache_dir=str(tmp_path / "cache"))
+    first = cache.get(str(workflow), ("video", 832, 480, 97), build)
+    assert cache.get(str(workflow), ("video", 832, 480, 97), build) is first
+    cache.get(str(workflow), ("video", 832, 480, 49), build)
+    assert len(builds) == 2
+
+    # A fresh process picks the converted graph up from disk
+    restarted = TemplateCache(cache_dir=str(tmp_path / "cache"))
+    again = restarted.get(str(workflow), ("video", 832, 480, 97), build)
+    assert len(builds) == 2 and restarted.disk_hits == 1
+    assert again == first and again.class_index == first.class_index
+
+
+def test_invalidate_forces_rebuild(tmp_path):
+    workflow = tmp_path / "wan.json"
+    _write_workflow(workflow)
+    cache = TemplateCache(cache_dir=str(tmp_path / "cache"))
+    build = lambda: json.loads(workflow.read_text())
+
+    cache.get(str(workflow), ("video",), build)
+    cache.invalidate(str(workflow))
+    assert cache.stats()['entries'] == 0
+    assert not list((tmp_path / "cache").iterdir())
+
+    cache.get(str(workflow), ("video",), build)
+    assert cache.builds == 2
+
+
+def test_class_index_survives_deepcopy():
+    template = WorkflowTemplate({
+        "7": {"class_type": "RandomNoise", "inputs": {}},
+        "9": {"class_type": "SaveImage", "inputs": {}},
+    })
+    wf = copy.deepcopy(template)
+    assert wf.class_index == {"RandomNoise": ["7"], "SaveImage": ["9"]}
+    assert nodes_by_class(wf, "SaveImage") == ["9"]
+    assert nodes_by_class(dict(wf), "RandomNoise") == ["7"]
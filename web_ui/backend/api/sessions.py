@@ -1,9 +1,9 @@
 """
 Sessions API endpoints
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from fastapi.responses import FileResponse
-from typing import List
+from typing import List, Optional
 import logging
 import os
 
@@ -21,12 +21,17 @@ session_service = SessionService()
 
 
 @router.get("", response_model=List[SessionListItem])
-async def list_sessions():
-    """List all sessions"""
-    logger.info("list_sessions endpoint called")
+async def list_sessions(request: Request, response: Response):
+    """List all sessions (served from the session catalog; supports If-None-Match)"""
+    logger.debug("list_sessions endpoint called")
     try:
-        sessions = session_service.list_sessions()
-        logger.info(f"Returning {len(sessions)} sessions")
+        sessions, etag = session_service.list_sessions_with_etag()
+        # Polled by the frontend: answer unchanged listings with 304
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        logger.debug(f"Returning {len(sessions)} sessions")
         return sessions
     except Exception as e:
         logger.error(f"Error listing sessions: {e}", exc_info=True)
@@ -36,6 +41,20 @@ async def list_sessions():
         )
 
 
+@router.get("/shots/status")
+async def find_shots(session_id: Optional[str] = None, image_generated: Optional[bool] = None,
+                     video_rendered: Optional[bool] = None):
+    """Shots across sessions filtered by status, e.g. ?image_generated=true&video_rendered=false"""
+    try:
+        return session_service.find_shots(session_id, image_generated, video_rendered)
+    except Exception as e:
+        logger.error(f"Error finding shots: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to find shots: {str(e)}"
+        )
+
+
 @router.post("", response_model=SessionDetail, status_code=status.HTTP_201_CREATED)
 async def create_session(request: CreateSessionRequest):
     """Create a new session"""
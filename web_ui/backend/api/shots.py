@@ -4,7 +4,6 @@ Shots API endpoints
 from fastapi import APIRouter, HTTPException, status
 import sys
 import os
-import json
 import logging
 
 # Add parent directory to path
@@ -79,7 +78,6 @@ async def update_shots(session_id: str, request: UpdateShotsRequest):
 
         # Update shots.json and perform safe renaming of associated media
         session_dir = os.path.join(config.ABS_SESSIONS_DIR, session_id)
-        shots_path = os.path.join(session_dir, "shots.json")
         images_dir = os.path.join(session_dir, "images")
         videos_dir = os.path.join(session_dir, "videos")
 
@@ -198,9 +196,8 @@ async def update_shots(session_id: str, request: UpdateShotsRequest):
                 except Exception as e:
                     logger.warning(f"Failed final rename {tmp} -> {dst}: {e}")
 
-        # Save updated shots JSON
-        with open(shots_path, 'w', encoding='utf-8') as f:
-            json.dump(shots_dicts, f, indent=2, ensure_ascii=False)
+        # Save updated shots JSON (folds pending journal events first)
+        session_service.session_manager.update_shots(session_id, shots_dicts)
 
         # Return updated session
         return session_service.get_session(session_id)
@@ -241,11 +238,7 @@ async def update_shot(session_id: str, shot_index: int, request: UpdateShotReque
             shot['narration'] = request.narration
 
         # Save updated shots
-        session_dir = session_service.get_session_dir(session_id)
-        shots_path = os.path.join(session_dir, "shots.json")
-
-        with open(shots_path, 'w', encoding='utf-8') as f:
-            json.dump(shots, f, indent=2, ensure_ascii=False)
+        session_service.session_manager.update_shots(session_id, shots)
 
         return shot
     except HTTPException:
@@ -345,11 +338,7 @@ async def select_shot_image(session_id: str, shot_index: int, request: SelectIma
         shot['image_path'] = request.image_path
 
         # Save updated shots
-        session_dir = session_service.get_session_dir(session_id)
-        shots_path = os.path.join(session_dir, "shots.json")
-
-        with open(shots_path, 'w', encoding='utf-8') as f:
-            json.dump(shots, f, indent=2, ensure_ascii=False)
+        session_service.session_manager.update_shots(session_id, shots)
 
         return {"status": "success", "image_path": request.image_path}
     except HTTPException:
@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../.."))
 from web_ui.backend.models.story import UpdateStoryRequest, RegenerateStoryRequest
 from web_ui.backend.services.session_service import SessionService
 from core.story_engine import build_story
+from core.llm_cache import bypass_llm_cache
 from core.session_manager import SessionManager
 
 logger = logging.getLogger(__name__)
@@ -109,7 +110,9 @@ async def regenerate_story(session_id: str, request: RegenerateStoryRequest):
         if target_length is None:
             target_length = config.TARGET_VIDEO_LENGTH if hasattr(config, 'TARGET_VIDEO_LENGTH') else None
 
-        story_json = build_story(idea, request.agent, target_length)
+        # An explicit regeneration must not get the cached story back
+        with bypass_llm_cache():
+            story_json = build_story(idea, request.agent, target_length)
 
         # Save story
         session_manager.save_story(session_id, story_json)
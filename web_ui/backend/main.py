@@ -59,6 +59,11 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check endpoint"""
+    from core.comfy_pool import get_backend_pool
+    from core.http_client import pool_stats
+    from core.llm_cache import get_llm_cache
+    from core.llm_engine import provider_stats
+    llm_cache = get_llm_cache()
     return {
         "status": "healthy",
         "config": {
@@ -66,7 +71,11 @@ async def health():
             "llm_provider": config.LLM_PROVIDER,
             "image_generation_mode": config.IMAGE_GENERATION_MODE,
             "comfy_url": config.COMFY_URL
-        }
+        },
+        "comfy_backends": get_backend_pool().stats(),
+        "http_pools": pool_stats(),
+        "llm_providers": provider_stats(),
+        "llm_cache": llm_cache.stats() if llm_cache else None
     }
 
 
@@ -98,6 +107,10 @@ async def startup_event():
     # Ensure output directories exist
     sessions_dir = config.ABS_SESSIONS_DIR
     os.makedirs(sessions_dir, exist_ok=True)
+
+    # Create the LLM client and open its connection before the first story request
+    from core.llm_engine import warm_up_in_background
+    warm_up_in_background()
     
     # Note: Sessions assets (images/videos) are now served dynamically 
     # via endpoints in sessions.py to support newly created sessions
@@ -3,8 +3,6 @@ Generation service - Async wrapper for core generation modules
 """
 import sys
 import os
-import re
-import glob
 import random
 import asyncio
 from typing import List, Dict, Any, Optional
@@ -14,8 +12,11 @@ import logging
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 
 from core.session_manager import SessionManager
+from core.media_inventory import get_media_inventory
 from core.image_generator import generate_images_for_shots
 from core.shot_planner import plan_shots
+from core.llm_cache import bypass_llm_cache
+from core.stage_scheduler import estimate_model_swaps, stage_batches, use_stage_batching
 from core.logger_config import get_logger
 from web_ui.backend.websocket.manager import manager
 
@@ -71,15 +72,20 @@ class GenerationService:
         if session_id in self.cancelled_shots:
             self.cancelled_shots.pop(session_id)
             
-        limit = getattr(config, 'CONCURRENT_GENERATION_LIMIT', 2)
+        # The limit applies per ComfyUI node so throughput scales with the backend pool
+        from core.comfy_pool import get_backend_pool
+        limit = get_backend_pool().capacity(getattr(config, 'CONCURRENT_GENERATION_LIMIT', 2))
         logger.info(f"Using concurrency limit of {limit} for batch generation")
         semaphore = asyncio.Semaphore(limit)
         
         # Populate the queued tracking dict for UI refreshes
         self.queued_shots[session_id] = set(request.shot_indices)
         
+        # Shots whose image stage failed are not sent on to the video stage
+        failed_shots = set()
+
         # Helper to process a single shot synchronously within the bounded async loop
-        async def process_shot(shot_index: int):
+        async def process_shot(shot_index: int, do_images: bool = True, do_videos: bool = True):
             # Abort before even acquiring semaphore if session or shot was cancelled
             if session_id in self.cancelled_sessions:
                 logger.info(f"Session {session_id} cancelled. Skipping background shot {shot_index}.")
@@ -102,10 +108,13 @@ class GenerationService:
                     if session_id in self.queued_shots and shot_index in self.queued_shots[session_id]:
                         self.queued_shots[session_id].remove(shot_index)
 
+                    if shot_index in failed_shots:
+                        return
+
                     # Load current shot state in case we need to skip existing images
                     # (only load if we're actually generating images to save disk IO)
                     shot_wants_skip = False
-                    if request.regenerate_images and not request.force:
+                    if do_images and request.regenerate_images and not request.force:
                         try:
                             session = self.session_manager.get_session(session_id)
                             if session and session.shots:
@@ -117,19 +126,23 @@ class GenerationService:
                             logger.warning(f"Failed to check shot state before batch: {e}")
 
                     # 1. Regenerate Image
-                    if request.regenerate_images and not shot_wants_skip:
+                    if do_images and request.regenerate_images and not shot_wants_skip:
                         await self.regenerate_shot_image(
                             session_id, shot_index, force=request.force,
                             image_mode=request.image_mode, image_workflow=request.image_workflow
                         )
 
                     # 2. Regenerate Video
-                    if request.regenerate_videos:
+                    if do_videos and request.regenerate_videos:
                         await self.regenerate_shot_video(
                             session_id, shot_index, force=request.force,
                             video_workflow=request.video_workflow
                         )
-                    
+
+                    # In batched mode the image pass is not the last word on this shot
+                    if not do_videos and request.regenerate_videos:
+                        return
+
                     # Ensure websocket completes for this shot if it hasn't somehow
                     manager.broadcast_sync(session_id, {
                         "type": "completed",
@@ -138,6 +151,7 @@ class GenerationService:
                     })
 
                 except Exception as e:
+                    failed_shots.add(shot_index)
                     logger.error(f"Batch error on shot {shot_index}: {str(e)}")
                     # Broadcast error/cancel so UI spinner doesn't run forever
                     manager.broadcast_sync(session_id, {
@@ -148,8 +162,22 @@ class GenerationService:
 
         # Launch all tasks bounded by the semaphore
         logger.info(f"Starting server-side batch generation for {len(request.shot_indices)} shots")
-        tasks = [process_shot(idx) for idx in request.shot_indices]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        if request.regenerate_images and request.regenerate_videos and use_stage_batching():
+            # Image and video prompts would alternate Flux and Wan on the same GPU:
+            # run all images of a window of shots, then all of their videos
+            windows = stage_batches(request.shot_indices)
+            swaps = estimate_model_swaps(len(request.shot_indices))
+            logger.info(f"Stage batching {len(request.shot_indices)} shots in {len(windows)} window(s): "
+                        f"~{swaps['batched']} model swap(s) instead of ~{swaps['interleaved']} "
+                        f"({swaps['avoided']} avoided)")
+            for window in windows:
+                await asyncio.gather(*[process_shot(idx, do_videos=False) for idx in window],
+                                     return_exceptions=True)
+                await asyncio.gather(*[process_shot(idx, do_images=False) for idx in window],
+                                     return_exceptions=True)
+        else:
+            tasks = [process_shot(idx) for idx in request.shot_indices]
+            await asyncio.gather(*tasks, return_exceptions=True)
         logger.info(f"Completed server-side batch generation for session {session_id}")
 
     async def regenerate_shot_image(
@@ -192,7 +220,7 @@ class GenerationService:
                 if old_image_path not in shot['image_paths']:
                     shot['image_paths'].append(old_image_path)
                     # Save updated image_paths immediately
-                    self.session_manager._save_shots(session_id, shots)
+                    self.session_manager.update_shots(session_id, shots)
 
             # Generate image for single shot
             logger.info(f"Regenerating image for shot {shot_index}")
@@ -336,14 +364,14 @@ class GenerationService:
             # Plan shots
             logger.info(f"Re-planning shots for session {session_id}")
 
-            # Run in thread pool to avoid blocking
-            shots = await asyncio.to_thread(
-                plan_shots,
-                story_json,
-                max_shots=max_shots,
-                image_agent=image_agent,
-                video_agent=video_agent
-            )
+            # Run in thread pool to avoid blocking; a re-plan must not get
+            # the cached shot list back
+            def replan():
+                with bypass_llm_cache():
+                    return plan_shots(story_json, max_shots=max_shots,
+                                      image_agent=image_agent, video_agent=video_agent)
+
+            shots = await asyncio.to_thread(replan)
 
             # Save shots
             self.session_manager.save_shots(session_id, shots)
@@ -358,23 +386,11 @@ class GenerationService:
     def _get_next_image_version(self, images_dir: str, shot_index: int) -> int:
         """Find the next available version number for a shot image.
         
-        Scans for existing files like shot_001_001.png, shot_001_002.png, etc.
+        Looks up existing files like shot_001_001.png, shot_001_002.png, etc.
+        in the images folder inventory (one scan per folder change).
         Returns the next version number (starting from 1).
         """
-        pattern = os.path.join(images_dir, f"shot_{shot_index:03d}_*.png")
-        existing_files = glob.glob(pattern)
-        
-        max_version = 0
-        version_re = re.compile(rf"shot_{shot_index:03d}_(\d+)\.png$")
-        
-        for filepath in existing_files:
-            filename = os.path.basename(filepath)
-            match = version_re.match(filename)
-            if match:
-                version = int(match.group(1))
-                max_version = max(max_version, version)
-        
-        return max_version + 1
+        return get_media_inventory(images_dir).next_version(shot_index, "png")
 
     def _generate_single_image(self, session_id: str, shot: Dict[str, Any], 
                                mode: Optional[str] = None, 
@@ -429,9 +445,8 @@ class GenerationService:
     def _generate_single_video(self, session_id: str, shot: Dict[str, Any],
                                workflow_path: Optional[str] = None) -> str:
         """Generate video for a single shot (synchronous)"""
-        import shutil
         from core.prompt_compiler import load_workflow, compile_workflow
-        from core.comfy_client import submit, wait_for_prompt_completion_with_progress, get_output_file_path
+        from core.comfy_client import submit, wait_for_prompt_completion_with_progress, fetch_output
         from core.video_regenerator import generate_unique_video_filename
         import config
 
@@ -488,13 +503,12 @@ class GenerationService:
         video_info = video_outputs[0]
         video_filename, video_save_path = generate_unique_video_filename(videos_dir, shot_index)
 
-        source_path = get_output_file_path(video_info)
-        if os.path.exists(source_path):
-            shutil.copy2(source_path, video_save_path)
-            logger.info(f"Video copied: {video_filename} ({os.path.getsize(video_save_path):,} bytes)")
+        fetch = fetch_output(video_info, video_save_path)
+        if fetch['success']:
+            logger.info(f"Video fetched: {video_filename} ({fetch['size']:,} bytes, sha256={fetch['sha256'][:12]})")
 
             # Mark as rendered
             self.session_manager.mark_video_rendered(session_id, shot_index, video_save_path)
             return video_save_path
         else:
-            raise RuntimeError(f"Video source file not found: {source_path}")
+            raise RuntimeError(f"Video fetch failed for shot {shot_index}: {fetch['error']}")
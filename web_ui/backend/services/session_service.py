@@ -3,12 +3,14 @@ Session service - Wrapper around SessionManager
 """
 import sys
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 # Add parent directory to path to import core modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
 
 from core.session_manager import SessionManager
+from core.session_journal import JOURNAL_FILE, LOCK_FILE
+from core.materialize import materialize_tree
 from web_ui.backend.models.session import (
     SessionMetadata, SessionDetail, SessionListItem,
     CreateSessionRequest, UpdateSessionRequest
@@ -46,6 +48,11 @@ class SessionService:
         sessions_data = self.session_manager.list_all_sessions()
         return [SessionListItem.from_metadata(s) for s in sessions_data]
 
+    def list_sessions_with_etag(self) -> Tuple[List[SessionListItem], str]:
+        """List all sessions from the session catalog, plus the ETag of the listing"""
+        sessions_data, etag = self.session_manager.list_sessions_with_etag()
+        return [SessionListItem.from_metadata(s) for s in sessions_data], etag
+
     def get_session(self, session_id: str) -> SessionDetail:
         """Get session detail with story and shots"""
         meta = self.session_manager.load_session(session_id)
@@ -106,17 +113,15 @@ class SessionService:
 
     def delete_session(self, session_id: str) -> bool:
         """Delete a session and all its files"""
-        import shutil
-        session_dir = self.session_manager.get_session_dir(session_id)
+        return self.session_manager.delete_session(session_id)
 
-        if os.path.exists(session_dir):
-            shutil.rmtree(session_dir)
-            return True
-        return False
+    def find_shots(self, session_id: Optional[str] = None, image_generated: Optional[bool] = None,
+                   video_rendered: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Shots matching a status filter across sessions (indexed with the sqlite backend)"""
+        return self.session_manager.find_shots(session_id, image_generated, video_rendered)
 
     def duplicate_session(self, session_id: str, new_session_id: Optional[str] = None) -> SessionDetail:
         """Duplicate a session"""
-        import shutil
         from datetime import datetime
 
         old_session_dir = self.session_manager.get_session_dir(session_id)
@@ -126,8 +131,18 @@ class SessionService:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         new_session_id = new_session_id or f"session_{timestamp}"
 
+        # Reflink where the filesystem supports it; videos may also be hardlinked
+        # (they are only ever replaced, never rewritten in place). The journal
+        # and lock file belong to the source session.
         new_session_dir = self.session_manager.get_session_dir(new_session_id)
-        shutil.copytree(old_session_dir, new_session_dir)
+        if os.path.exists(new_session_dir):
+            raise FileExistsError(f"Session already exists: {new_session_id}")
+        counts = materialize_tree(
+            old_session_dir, new_session_dir,
+            link=lambda rel_path: rel_path.split(os.sep)[0] == "videos",
+            skip=(JOURNAL_FILE, LOCK_FILE)
+        )
+        print(f"[INFO] Duplicated {session_id} -> {new_session_id}: {counts}")
 
         # Update metadata
         new_meta = meta.copy()
@@ -151,16 +166,13 @@ class SessionService:
             'narration_generated': False
         }
 
-        # Reset shot status in shots.json
-        shots_path = os.path.join(new_session_dir, "shots.json")
-        if os.path.exists(shots_path):
-            with open(shots_path, 'r', encoding='utf-8') as f:
-                shots = json.load(f)
+        # Reset shot status in shots.json (from the source session's current state)
+        shots = self.session_manager.get_shots(session_id)
+        if shots:
             for shot in shots:
                 shot['image_generated'] = False
                 shot['video_rendered'] = False
-            with open(shots_path, 'w', encoding='utf-8') as f:
-                json.dump(shots, f, indent=2, ensure_ascii=False)
+            self.session_manager.update_shots(new_session_id, shots)
 
         self.session_manager._save_meta(new_session_id, new_meta)
 